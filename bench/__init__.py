@@ -0,0 +1,3 @@
+"""
+Oasis 目标检测系统 - 性能基准测试
+"""
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+推理后端基准测试
+在本机上对比 PyTorch、ONNX Runtime、OpenVINO 与 OpenCV DNN 的导出/加载耗时、推理延迟，
+以及与 PyTorch 检测结果的一致性（同类别 IoU ≥ 0.5 匹配的比例），选出最快的后端
+
+只有与 PyTorch 结果一致（匹配比例不低于 --min-agreement）的后端参与选择；
+--apply 把选出的后端写入 config.json 的 detection.inference_backend。
+
+用法:
+    python -m bench.backends [--model yolo11n.pt] [--image bus.jpg] [--runs 50]
+                             [--backends pytorch onnxruntime openvino opencv]
+                             [--apply] [--json result.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from ui.backends import BACKENDS, available_backends, load_engine
+from ui.config import config_manager
+from ui.postprocess import DetectionPostProcessor
+from bench.class_filter import load_image, measure
+from bench.tiling import match
+
+
+def agreement(batch, reference):
+    """reference（PyTorch）中被 batch 检出的比例；reference 没有检测时两者都为空记为 1"""
+    if not len(reference):
+        return 1.0 if not len(batch) else 0.0
+    found = match(batch.boxes, batch.class_ids, reference.boxes, reference.class_ids)
+    return round(float(found.mean()), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="推理后端基准测试")
+    parser.add_argument('--model', default=config_manager.detection.model_path)
+    parser.add_argument('--image', default=None, help="测试图像，默认使用 ultralytics 自带的 bus.jpg")
+    parser.add_argument('--runs', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument('--classes', nargs='+', default=None, help="目标类别，默认使用配置中的类别")
+    parser.add_argument('--min-agreement', type=float, default=0.9,
+                        help="与 PyTorch 检测结果的最低匹配比例，低于此值的后端不参与选择")
+    parser.add_argument('--apply', action='store_true', help="把最快的后端写入 config.json")
+    parser.add_argument('--json', default=None, help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    image = load_image(args.image)
+    classes = args.classes or (config_manager.detection.target_classes + config_manager.detection.custom_classes)
+    threshold = config_manager.detection.confidence_threshold
+    max_det = config_manager.detection.max_detections
+    available = available_backends()
+    print(f"模型: {args.model}  图像: {image.shape[1]}x{image.shape[0]}  目标类别: {len(classes)}")
+
+    report = {'model': args.model, 'image_shape': list(image.shape), 'classes': classes, 'backends': {}}
+    batches = {}
+    for backend in args.backends:
+        if not available[backend]:
+            print(f"⚠️  {backend}: 未安装，跳过")
+            report['backends'][backend] = {'error': '未安装'}
+            continue
+        engine = load_engine(args.model, backend)
+        if engine.fallback:
+            print(f"❌ {backend}: {engine.fallback}")
+            report['backends'][backend] = {'error': engine.fallback}
+            continue
+        processor = DetectionPostProcessor()
+        batches[backend] = processor.infer(engine, image, classes, threshold, max_det)
+        result = measure(lambda: processor.infer(engine, image, classes, threshold, max_det),
+                         args.runs, args.warmup)
+        result.update({
+            'path': engine.path,
+            'export_s': round(engine.export_seconds, 2),
+            'load_s': round(engine.load_seconds, 2),
+            'detections': len(batches[backend]),
+        })
+        report['backends'][backend] = result
+
+    measured = {name: r for name, r in report['backends'].items() if 'p50_ms' in r}
+    if not measured:
+        print("❌ 没有可用的推理后端")
+        return 1
+
+    baseline = measured.get('pytorch')
+    print(f"{'后端':<13}{'导出 (s)':>9}{'加载 (s)':>9}{'p50 (ms)':>10}{'p95 (ms)':>10}{'加速比':>8}"
+          f"{'检出':>6}{'一致性':>8}")
+    for name, r in measured.items():
+        r['speedup'] = round(baseline['p50_ms'] / max(r['p50_ms'], 1e-6), 2) if baseline else None
+        r['agreement'] = agreement(batches[name], batches['pytorch']) if baseline else None
+        speedup, agree = (r['speedup'], r['agreement']) if baseline else ('-', '-')
+        print(f"{name:<13}{r['export_s']:>9}{r['load_s']:>9}{r['p50_ms']:>10}{r['p95_ms']:>10}"
+              f"{speedup:>8}{r['detections']:>6}{agree:>8}")
+
+    candidates = [name for name, r in measured.items()
+                  if r['agreement'] is None or r['agreement'] >= args.min_agreement]
+    best = min(candidates, key=lambda name: measured[name]['p50_ms']) if candidates else 'pytorch'
+    report['best'] = best
+    print(f"本机最快的推理后端: {best}")
+
+    if args.apply:
+        config_manager.detection.inference_backend = best
+        config_manager.save_config()
+        print(f"已写入 {config_manager.config_file}: inference_backend = {best}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"结果已写入 {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
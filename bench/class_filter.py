@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+类别过滤基准测试
+对比"全部 80 类推理后在 Python 中过滤"与"目标类别索引传入模型"两种方式的延迟
+
+用法:
+    python -m bench.class_filter [--model yolo11n.pt] [--image bus.jpg] [--runs 50]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from ui.config import config_manager
+from ui.postprocess import DetectionPostProcessor
+
+
+def legacy_process(results, names, classes, threshold, max_detections):
+    """原实现：逐框循环过滤"""
+    detections = []
+    for r in results:
+        for box in r.boxes:
+            class_name = names[int(box.cls[0])]
+            conf = box.conf[0].item()
+            if class_name in classes and conf >= threshold:
+                x1, y1, x2, y2 = box.xyxy[0].tolist()
+                detections.append({'class_name': class_name, 'confidence': conf,
+                                   'bbox': (int(x1), int(y1), int(x2), int(y2))})
+                if len(detections) >= max_detections:
+                    break
+    return detections
+
+
+def load_image(path):
+    import cv2
+    if path:
+        image = cv2.imread(path)
+        if image is None:
+            raise FileNotFoundError(path)
+        return image
+    try:
+        from ultralytics.utils import ASSETS
+        image = cv2.imread(str(ASSETS / 'bus.jpg'))
+        if image is not None:
+            return image
+    except Exception:
+        pass
+    return np.random.default_rng(0).integers(0, 255, (1080, 1920, 3), dtype=np.uint8)
+
+
+def measure(func, runs, warmup=3):
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'p50_ms': round(statistics.median(samples), 2),
+        'p95_ms': round(samples[int(len(samples) * 0.95) - 1], 2),
+        'mean_ms': round(statistics.fmean(samples), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="类别过滤基准测试")
+    parser.add_argument('--model', default=config_manager.detection.model_path)
+    parser.add_argument('--image', default=None, help="测试图像，默认使用 ultralytics 自带的 bus.jpg")
+    parser.add_argument('--runs', type=int, default=50)
+    parser.add_argument('--classes', nargs='+',
+                        default=['bottle', 'cup', 'cell phone', 'mouse', 'person'],
+                        help="目标类别（默认 5 个 COCO 类别）")
+    parser.add_argument('--json', default=None, help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    try:
+        from ultralytics import YOLO
+    except ImportError:
+        print("❌ 需要安装 ultralytics 才能运行此基准测试")
+        return 1
+
+    model = YOLO(args.model)
+    image = load_image(args.image)
+    threshold = config_manager.detection.confidence_threshold
+    max_det = config_manager.detection.max_detections
+    processor = DetectionPostProcessor()
+
+    print(f"模型: {args.model}  图像: {image.shape[1]}x{image.shape[0]}  "
+          f"目标类别: {len(args.classes)}/{len(model.names)}")
+
+    def all_classes():
+        results = model(image, verbose=False)
+        return legacy_process(results, model.names, args.classes, threshold, max_det)
+
+    def filtered():
+        return processor.infer(model, image, args.classes, threshold, max_det).to_dicts()
+
+    report = {
+        'model': args.model,
+        'image_shape': list(image.shape),
+        'classes': args.classes,
+        'all_classes': measure(all_classes, args.runs),
+        'filtered_in_model': measure(filtered, args.runs),
+    }
+    speedup = report['all_classes']['p50_ms'] / max(report['filtered_in_model']['p50_ms'], 1e-6)
+    report['p50_speedup'] = round(speedup, 3)
+
+    print(f"{'方式':<24}{'p50 (ms)':>10}{'p95 (ms)':>10}{'mean (ms)':>11}")
+    for key, label in (('all_classes', '全部类别 + Python 过滤'), ('filtered_in_model', '类别索引传入模型')):
+        r = report[key]
+        print(f"{label:<24}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['mean_ms']:>11}")
+    print(f"p50 加速比: {report['p50_speedup']}x")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"结果已写入 {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
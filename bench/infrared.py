@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+红外显示基准测试
+对比原实现（两次求最大值、掩码求最小值、float64 归一化、逐帧 equalizeHist）与
+InfraredColorizer 三种显示模式的每帧延迟与内存分配
+
+用法:
+    python -m bench.infrared [--input synthetic|sessions/desk] [--frames 300] [--json result.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from ui.visualize import INFRARED_MODES, InfraredColorizer
+from bench.sources import open_source
+
+
+def legacy_infrared(frame):
+    """原实现：_get_infrared_frame 中的归一化与直方图均衡"""
+    frame_max = np.max(frame) if np.max(frame) > 0 else 65535
+    frame_min = np.min(frame[frame > 0]) if np.any(frame > 0) else 0
+    if frame_max > frame_min:
+        frame_normalized = np.clip(
+            (frame - frame_min) / (frame_max - frame_min) * 255, 0, 255
+        ).astype(np.uint8)
+    else:
+        frame_normalized = np.zeros_like(frame, dtype=np.uint8)
+    frame_enhanced = cv2.equalizeHist(frame_normalized)
+    return cv2.cvtColor(frame_enhanced, cv2.COLOR_GRAY2BGR)
+
+
+def load_frames(path, count):
+    """从帧源读取 count 帧红外图像（循环读取，不足时重复）"""
+    source = open_source(path, 'infrared')
+    desc = source.infrared_frame_desc
+    frames = []
+    try:
+        while len(frames) < count:
+            if source.has_new_infrared_frame():
+                frame = source.get_last_infrared_frame()
+                if frame is not None and frame.size > 0:
+                    frames.append(frame.reshape((desc.Height, desc.Width)))
+    finally:
+        source.close()
+    return frames
+
+
+def measure(func, frames, warmup=10):
+    """逐帧计时（毫秒）并用 tracemalloc 统计每帧的内存分配峰值（KB）"""
+    for frame in frames[:warmup]:
+        func(frame)
+    samples = []
+    for frame in frames:
+        start = time.perf_counter()
+        func(frame)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    allocations = []
+    try:
+        for frame in frames[:20]:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            func(frame)
+            allocations.append((tracemalloc.get_traced_memory()[1] - before) / 1024.0)
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    return {
+        'p50_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(samples[int(len(samples) * 0.95) - 1], 3),
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'alloc_kb': round(statistics.fmean(allocations), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="红外显示基准测试")
+    parser.add_argument('--input', default='synthetic', help="synthetic 或 record_kinect.py 录制的目录")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--gain', type=float, default=8.0, help="fixed 模式的增益")
+    parser.add_argument('--json', default=None, help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    frames = load_frames(args.input, args.frames)
+    height, width = frames[0].shape
+    print(f"输入: {args.input}  帧数: {len(frames)}  尺寸: {width}x{height}")
+
+    report = {'input': args.input, 'frames': len(frames), 'cases': {}}
+    report['cases']['legacy'] = measure(legacy_infrared, frames)
+    for mode in INFRARED_MODES:
+        colorizer = InfraredColorizer(mode, args.gain)
+        report['cases'][mode] = measure(colorizer.colorize, frames)
+        report['cases'][mode]['table_rebuilds'] = colorizer.rebuilds
+
+    legacy_p50 = report['cases']['legacy']['p50_ms']
+    print(f"{'方式':<10}{'p50 (ms)':>10}{'p95 (ms)':>10}{'mean (ms)':>11}{'分配 (KB)':>11}{'加速比':>8}")
+    for name, r in report['cases'].items():
+        r['p50_speedup'] = round(legacy_p50 / max(r['p50_ms'], 1e-6), 2)
+        print(f"{name:<10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['mean_ms']:>11}"
+              f"{r['alloc_kb']:>11}{r['p50_speedup']:>8}x")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"结果已写入 {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+多路摄像头微批推理基准测试
+模拟 N 路按固定帧率出帧的摄像头，对比两种推理方式的总吞吐量与每帧延迟（出帧到得到检测结果）：
+  separate: 每路一个单帧推理循环（各自加载一份模型），即 N 个独立的 CameraThread
+  batched:  各路共用一个 MicroBatcher，在截止时间内凑批后一次批量推理（多路摄像头模式）
+
+两种方式都只处理每路最新的一帧，处理不过来时丢弃旧帧，与界面中的行为一致。
+
+用法:
+    python -m bench.multi_source [--model yolo11n.pt] [--image bus.jpg] [--sources 4]
+                                 [--fps 30] [--seconds 10] [--max-batch 4] [--deadline-ms 15]
+                                 [--json result.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from ui.backends import load_engine
+from ui.config import config_manager
+from ui.pipeline import FramePacket, MicroBatcher
+from ui.postprocess import DetectionPostProcessor
+from bench.class_filter import load_image
+from bench.pipeline import summarize
+
+
+def make_frames(image, sources):
+    """每路一张内容不同的帧（平移后的测试图像），避免各路输入完全相同"""
+    width = image.shape[1]
+    return [np.ascontiguousarray(np.roll(image, source * width // (sources + 1), axis=1))
+            for source in range(sources)]
+
+
+def latest_tick(start, fps, now):
+    """now 时刻摄像头最新一帧的序号与出帧时间"""
+    index = int((now - start) * fps)
+    return index, start + index / fps
+
+
+def wait_tick(start, fps, index):
+    """等待第 index 帧出帧"""
+    delay = start + index / fps - time.perf_counter()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def run_separate(engines, frames, infer_args, seconds, fps):
+    """每路一个单帧推理循环：空闲时取该路最新一帧推理"""
+    latencies, counts = [], [0] * len(frames)
+    lock = threading.Lock()
+    start = time.perf_counter()
+    end = start + seconds
+
+    def loop(source):
+        processor = DetectionPostProcessor()
+        last = -1
+        while True:
+            index, captured = latest_tick(start, fps, time.perf_counter())
+            if index == last:
+                wait_tick(start, fps, index + 1)
+                continue
+            if captured >= end:
+                break
+            last = index
+            processor.infer(engines[source], frames[source], *infer_args)
+            done = time.perf_counter()
+            with lock:
+                latencies.append((done - captured) * 1000)
+                counts[source] += 1
+
+    threads = [threading.Thread(target=loop, args=(source,)) for source in range(len(frames))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, counts, time.perf_counter() - start, None
+
+
+def run_batched(engine, frames, infer_args, seconds, fps, max_batch, deadline_ms):
+    """各路按帧率投递到 MicroBatcher，凑批后一次批量推理"""
+    latencies, counts = [], [0] * len(frames)
+    processor = DetectionPostProcessor()
+
+    def infer_batch(packets):
+        processor.infer_batch(engine, [packet.image for packet in packets], *infer_args)
+        done = time.perf_counter()
+        for packet in packets:
+            latencies.append((done - packet.timestamp) * 1000)
+            counts[packet.source] += 1
+        return []
+
+    batcher = MicroBatcher(infer_batch, lambda packet: None, len(frames), max_batch, deadline_ms)
+    batcher.start()
+    start = time.perf_counter()
+    end = start + seconds
+
+    def feed(source):
+        index = 0
+        while True:
+            wait_tick(start, fps, index)
+            captured = start + index / fps
+            if captured >= end:
+                break
+            batcher.submit(FramePacket(index, captured, frames[source], source=source))
+            index += 1
+
+    feeders = [threading.Thread(target=feed, args=(source,)) for source in range(len(frames))]
+    for feeder in feeders:
+        feeder.start()
+    for feeder in feeders:
+        feeder.join()
+    # 等待最后一批完成
+    deadline = time.perf_counter() + 5.0
+    while batcher.frames < sum(batcher.submitted.values()) - sum(batcher.dropped.values()) \
+            and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    batcher.stop()
+    batcher.join(1.0)
+    return latencies, counts, elapsed, batcher.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多路摄像头微批推理基准测试")
+    parser.add_argument('--model', default=config_manager.detection.model_path)
+    parser.add_argument('--backend', default=config_manager.detection.inference_backend)
+    parser.add_argument('--image', default=None, help="测试图像，默认使用 ultralytics 自带的 bus.jpg")
+    parser.add_argument('--size', default='640x480', help="摄像头分辨率（测试图像缩放到此大小）")
+    parser.add_argument('--sources', type=int, default=4)
+    parser.add_argument('--fps', type=float, default=30.0, help="每路摄像头帧率")
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--max-batch', type=int, default=config_manager.detection.micro_batch_size)
+    parser.add_argument('--deadline-ms', type=float, default=config_manager.detection.micro_batch_deadline_ms)
+    parser.add_argument('--classes', nargs='+', default=None, help="目标类别，默认使用配置中的类别")
+    parser.add_argument('--json', default=None, help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+    if args.sources < 1 or args.fps <= 0:
+        parser.error("--sources 至少为 1，--fps 必须大于 0")
+
+    import cv2
+    width, height = (int(v) for v in args.size.split('x'))
+    frames = make_frames(cv2.resize(load_image(args.image), (width, height)), args.sources)
+    classes = args.classes or (config_manager.detection.target_classes + config_manager.detection.custom_classes)
+    infer_args = (classes, config_manager.detection.confidence_threshold, config_manager.detection.max_detections)
+    print(f"模型: {args.model} ({args.backend})  {args.sources} 路 {width}x{height} @ {args.fps:g} FPS  "
+          f"微批 ≤{args.max_batch} 帧 / {args.deadline_ms:g}ms")
+
+    # 每个单帧循环各自一份模型；批量推理共用第一份。先按各种批大小预热
+    engines = [load_engine(args.model, args.backend) for _ in range(args.sources)]
+    for source, engine in enumerate(engines):
+        DetectionPostProcessor().infer(engine, frames[source], *infer_args)
+    for size in range(1, min(args.max_batch, args.sources) + 1):
+        DetectionPostProcessor().infer_batch(engines[0], frames[:size], *infer_args)
+
+    report = {'model': args.model, 'backend': engines[0].backend, 'sources': args.sources,
+              'fps': args.fps, 'size': [width, height], 'max_batch': args.max_batch,
+              'deadline_ms': args.deadline_ms, 'modes': {}}
+    runs = {
+        'separate': lambda: run_separate(engines, frames, infer_args, args.seconds, args.fps),
+        'batched': lambda: run_batched(engines[0], frames, infer_args, args.seconds, args.fps,
+                                       args.max_batch, args.deadline_ms),
+    }
+    print(f"{'方式':<10}{'总 FPS':>9}{'每路 FPS':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}{'平均批':>8}")
+    for mode, run in runs.items():
+        latencies, counts, elapsed, batch = run()
+        latency = summarize(latencies) or {'p50_ms': 0.0, 'p95_ms': 0.0}
+        result = {
+            'throughput_fps': round(sum(counts) / elapsed, 1),
+            'per_source_fps': [round(count / elapsed, 1) for count in counts],
+            'latency': latency,
+        }
+        if batch is not None:
+            result['micro_batch'] = batch
+        report['modes'][mode] = result
+        mean_batch = batch['mean_batch'] if batch else 1.0
+        print(f"{mode:<10}{result['throughput_fps']:>9}{min(result['per_source_fps']):>10}"
+              f"{latency['p50_ms']:>10}{latency['p95_ms']:>10}{mean_batch:>8}")
+
+    separate, batched = report['modes']['separate'], report['modes']['batched']
+    report['speedup'] = round(batched['throughput_fps'] / max(separate['throughput_fps'], 1e-6), 2)
+    print(f"微批吞吐量 / 单帧循环吞吐量: {report['speedup']}x")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"结果已写入 {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
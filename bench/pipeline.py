@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+检测流水线无界面基准测试
+不创建 Qt 窗口，按 采集 -> 推理 -> 后处理 -> 3D 映射 -> 显示准备 的顺序逐帧驱动
+ui/main_window.py 中的同一组阶段，统计各阶段延迟、FPS、峰值内存与每帧内存分配
+
+用法:
+    python -m bench.pipeline [--input synthetic|video.mp4|sessions/desk]
+                             [--streams color depth] [--models yolo11n.pt yolo11s.pt]
+                             [--frames 200] [--3d] [--track-skip] [--tiled] [--motion-gate]
+                             [--json result.json]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from ui.config import config_manager
+from ui.pipeline import FramePacket
+from ui.render import draw_detections, draw_stream_label, prepare_display_frame
+from ui.frame_pool import FramePoolSet
+from bench.sources import open_source
+
+STAGES = ('capture', 'gate', 'infer', 'postprocess', 'track', 'map3d', 'render')
+STREAM_TYPES = ('color', 'depth', 'infrared', 'body_index')
+# 与 DetectionSettingsTab 中的模型列表一致
+MODEL_CHOICES = ('yolo11n.pt', 'yolo11s.pt', 'yolo11m.pt', 'yolo11l.pt')
+# 默认窗口布局下视频显示区域的大小
+DISPLAY_SIZE = (796, 596)
+
+
+def summarize(samples_ms):
+    """延迟样本（毫秒）-> p50/p95/p99/mean"""
+    if not samples_ms:
+        return None
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        'count': int(samples.size),
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'mean_ms': round(float(samples.mean()), 3),
+    }
+
+
+def peak_rss_mb():
+    """进程峰值常驻内存（MB），无法获取时返回 None"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, 'peak_wset', info.rss) / (1024 * 1024), 1)
+    except ImportError:
+        return None
+
+
+def environment():
+    """机器与版本信息，便于比较不同机器和提交的结果"""
+    info = {
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+    }
+    try:
+        import torch
+        info['torch'] = torch.__version__
+        info['cuda'] = torch.cuda.is_available()
+    except ImportError:
+        pass
+    try:
+        info['commit'] = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root,
+            capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        info['commit'] = None
+    return info
+
+
+class PipelineBench:
+    """逐帧同步驱动 VideoThread 的各阶段（不启动线程），分别计时"""
+
+    def __init__(self, source, stream_type, model=None, enable_3d=False, display_size=DISPLAY_SIZE,
+                 track_skip=False, tiled=False, motion_gate=False):
+        from ui.main_window import VideoThread
+
+        self.thread = VideoThread()
+        self.thread.set_kinect(source)
+        self.thread.stream_type = stream_type
+        self.thread.set_model(model)
+        self.stream_type = stream_type
+        self.model = model
+        self.enable_3d = enable_3d and stream_type == "color"
+        self.track_skip = track_skip and model is not None and stream_type == "color"
+        self.tiled = tiled and model is not None and stream_type == "color"
+        self.motion_gate = motion_gate and model is not None and stream_type == "color"
+        self.display_size = display_size
+        self.pools = FramePoolSet()
+        self.samples = {stage: [] for stage in STAGES}
+        self.detections = 0
+
+    def step(self, frame_id, record=True):
+        """处理一帧，返回是否取到帧"""
+        thread = self.thread
+        timings = {}
+
+        start = time.perf_counter()
+        frame = thread.capture_frame()
+        timings['capture'] = time.perf_counter() - start
+        if frame is None:
+            return False
+
+        detections = []
+        if self.model is not None and self.stream_type == "color":
+            packet = FramePacket(frame_id, time.time(), frame, self.stream_type)
+            packet.extras['bundle'] = thread.frame_source.last_bundle
+            processor = thread.postprocessor
+            classes = thread._active_classes()
+            threshold = config_manager.detection.confidence_threshold
+            max_det = config_manager.detection.max_detections
+
+            if self.track_skip or self.tiled or self.motion_gate:
+                # 与推理阶段相同：关键帧检测或分块推理（计入 infer，含后处理与跨块合并），其余帧光流跟踪；
+                # 变化门控跳过推理的帧计入 gate
+                start = time.perf_counter()
+                thread._infer_stage(packet)
+                stage = 'track' if packet.extras.get('keyframe') is False else 'infer'
+                if packet.extras.get('gate') == 'skip':
+                    stage = 'gate'
+                timings[stage] = time.perf_counter() - start
+            else:
+                start = time.perf_counter()
+                processor.compile(self.model.names, classes)
+                results = processor.predict(self.model, frame, threshold, max_det) \
+                    if processor.class_indices else []
+                timings['infer'] = time.perf_counter() - start
+
+                start = time.perf_counter()
+                packet.batch = processor.process(results, self.model.names, classes, threshold, max_det)
+                packet.detections = packet.batch.to_dicts()
+                timings['postprocess'] = time.perf_counter() - start
+
+            if self.enable_3d:
+                start = time.perf_counter()
+                thread._map_3d_stage(packet)
+                timings['map3d'] = time.perf_counter() - start
+            detections = packet.detections
+
+        # 显示准备：与界面相同，缩小到显示区域大小写入池中缓冲区并绘制叠加层（QImage 为零拷贝包装，不计入）
+        start = time.perf_counter()
+        lease, scale = prepare_display_frame(frame, self.display_size, self.pools)
+        if self.stream_type != "color":
+            draw_stream_label(lease.array, self.stream_type)
+        elif detections:
+            draw_detections(lease.array, detections, config_manager.display, scale)
+        lease.release()
+        timings['render'] = time.perf_counter() - start
+
+        if record:
+            for stage, seconds in timings.items():
+                self.samples[stage].append(seconds * 1000.0)
+            self.detections += len(detections)
+        return True
+
+    def run(self, frames, warmup):
+        """计时运行，返回 (处理帧数, 总耗时秒)"""
+        for i in range(warmup):
+            self.step(-1 - i, record=False)
+        done = 0
+        start = time.perf_counter()
+        while done < frames:
+            if self.step(done):
+                done += 1
+        return done, time.perf_counter() - start
+
+    def measure_allocations(self, frames):
+        """用 tracemalloc 单独统计每帧的内存分配峰值（KB），不影响计时结果"""
+        tracemalloc.start()
+        per_frame = []
+        try:
+            for i in range(frames):
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                self.step(-1000 - i, record=False)
+                per_frame.append((tracemalloc.get_traced_memory()[1] - before) / 1024.0)
+        finally:
+            tracemalloc.stop()
+        values = np.asarray(per_frame)
+        return {
+            'mean_kb': round(float(values.mean()), 1),
+            'p95_kb': round(float(np.percentile(values, 95)), 1),
+            'max_kb': round(float(values.max()), 1),
+        }
+
+
+def load_model(path):
+    if path == 'none':
+        return None
+    from ultralytics import YOLO
+    return YOLO(path)
+
+
+def run_case(args, stream_type, model_path):
+    source = open_source(args.input, stream_type)
+    model = load_model(model_path) if stream_type == "color" else None
+    bench = PipelineBench(source, stream_type, model, args.enable_3d, track_skip=args.track_skip,
+                          tiled=args.tiled, motion_gate=args.motion_gate)
+
+    # 各阶段的调试输出不写入终端
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        done, elapsed = bench.run(args.frames, args.warmup)
+        allocations = bench.measure_allocations(args.alloc_frames) if args.alloc_frames else None
+    source.close()
+
+    return {
+        'stream_type': stream_type,
+        'model': model_path if model is not None else None,
+        'enable_3d': bench.enable_3d,
+        'track_skip': bench.track_skip,
+        'tiled': bench.tiled,
+        'motion_gate': bench.motion_gate,
+        'frames': done,
+        'fps': round(done / elapsed, 2) if elapsed > 0 else None,
+        'detections_per_frame': round(bench.detections / max(done, 1), 2),
+        'stages': {stage: summarize(bench.samples[stage]) for stage in STAGES
+                   if bench.samples[stage]},
+        'peak_rss_mb': peak_rss_mb(),
+        'allocations_per_frame': allocations,
+        'pools': bench.pools.stats(),
+        'keyframe': bench.thread.track_and_skip.stats() if bench.track_skip else None,
+        'tiling': bench.thread.tiled_detector.stats() if bench.tiled else None,
+        'gate': bench.thread.motion_gate.stats() if bench.motion_gate else None,
+    }
+
+
+def print_case(case):
+    title = f"{case['stream_type']} | 模型: {case['model'] or '-'} | 3D: {'是' if case['enable_3d'] else '否'}"
+    if case['track_skip']:
+        title += " | 关键帧检测"
+    if case['tiled']:
+        title += " | 分块推理"
+    if case['motion_gate']:
+        title += " | 变化门控"
+    print(f"\n{title}")
+    print(f"  FPS: {case['fps']}  帧数: {case['frames']}  峰值内存: {case['peak_rss_mb']} MB")
+    print(f"  {'阶段':<12}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'mean (ms)':>11}")
+    for stage, s in case['stages'].items():
+        print(f"  {stage:<12}{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}{s['mean_ms']:>11}")
+    if case['allocations_per_frame']:
+        a = case['allocations_per_frame']
+        print(f"  每帧内存分配: mean {a['mean_kb']} KB, p95 {a['p95_kb']} KB")
+    if case['keyframe']:
+        k = case['keyframe']
+        print(f"  关键帧: {k['keyframes']}/{k['keyframes'] + k['tracked']}  当前间隔 {k['interval']}  "
+              f"检测 {k['detect_ms']} ms")
+    if case['tiling']:
+        t = case['tiling']
+        print(f"  分块: 平均 {t['tiles_per_frame']} 块/帧{' + 整帧' if t['full_frame'] else ''}")
+    if case['gate']:
+        g = case['gate']
+        print(f"  变化门控: 整帧 {g['full']} 局部 {g['regions']} 跳过 {g['skip']} ({g['skip_rate']:.0%})  "
+              f"节省检测器 CPU {g['cpu_saved']:.0%}  门控 {g['gate_ms']} ms/帧")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="检测流水线无界面基准测试")
+    parser.add_argument('--input', default='synthetic',
+                        help="synthetic、视频文件路径或 record_kinect.py 录制的目录")
+    parser.add_argument('--streams', nargs='+', default=['color'], choices=STREAM_TYPES)
+    parser.add_argument('--models', nargs='+', default=[config_manager.detection.model_path],
+                        help=f"模型列表，如 {' '.join(MODEL_CHOICES)}；none 表示不推理")
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--alloc-frames', type=int, default=20, help="内存分配统计帧数，0 表示跳过")
+    parser.add_argument('--3d', dest='enable_3d', action='store_true', help="彩色流启用 3D 坐标映射")
+    parser.add_argument('--track-skip', action='store_true',
+                        help="只在关键帧运行检测器，其余帧光流跟踪（config 中的 track_and_skip）")
+    parser.add_argument('--tiled', action='store_true',
+                        help="原分辨率重叠分块推理（config 中的 tiled_inference 及 tile_* 参数）")
+    parser.add_argument('--motion-gate', action='store_true',
+                        help="画面没有变化时跳过推理（config 中的 motion_gate 及 motion_* 参数）")
+    parser.add_argument('--json', default=None, help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    # 只修改内存中的配置，不写回 config.json
+    config_manager.detection.enable_3d_coordinates = args.enable_3d
+    config_manager.detection.track_and_skip = args.track_skip
+    config_manager.detection.tiled_inference = args.tiled
+    config_manager.detection.motion_gate = args.motion_gate
+
+    report = {'input': args.input, 'environment': environment(), 'cases': []}
+    for stream_type in args.streams:
+        # 非彩色流不推理，模型大小不影响结果，只运行一次
+        models = args.models if stream_type == "color" else ['none']
+        for model_path in models:
+            try:
+                case = run_case(args, stream_type, model_path)
+            except ImportError as e:
+                print(f"❌ {stream_type} / {model_path}: 缺少依赖 {e}")
+                continue
+            report['cases'].append(case)
+            print_case(case)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n结果已写入 {args.json}")
+    return 0 if report['cases'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+推理进程池基准测试
+对比推理线程（界面进程内）与 N 个推理进程的检测吞吐量和每帧延迟（投递到得到检测结果）：
+  thread:     与 CameraThread 的推理阶段相同，在本进程的线程中推理
+  process-N:  InferenceProcessPool，帧经共享内存交给 N 个工作进程
+
+--gil-load 模拟界面进程中与推理争用 GIL 的纯 Python 工作（绘制、3D 计算、信号分发），
+按给定占空比在后台线程中运行；推理进程不受其影响。
+
+用法:
+    python -m bench.process_pool [--model yolo11n.pt] [--image bus.jpg] [--workers 1 2 4]
+                                 [--seconds 10] [--gil-load 0.5] [--json result.json]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from ui.backends import load_engine
+from ui.config import config_manager
+from ui.pipeline import FramePacket
+from ui.postprocess import DetectionPostProcessor
+from ui.process_pool import InferenceProcessPool, task_params
+from bench.class_filter import load_image
+from bench.pipeline import summarize
+
+
+class GilLoad(threading.Thread):
+    """按占空比运行纯 Python 计算的后台线程，每 10ms 周期内忙 duty * 10ms"""
+
+    def __init__(self, duty):
+        super().__init__(daemon=True)
+        self.duty = duty
+        self.running = True
+
+    def run(self):
+        period = 0.01
+        while self.running:
+            start = time.perf_counter()
+            while time.perf_counter() - start < period * self.duty:
+                sum(i * i for i in range(200))
+            time.sleep(max(0.0, period - (time.perf_counter() - start)))
+
+
+def run_thread(engine, frame, classes, config, seconds):
+    """推理线程：连续推理同一帧"""
+    processor = DetectionPostProcessor()
+    latencies = []
+
+    def loop():
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            start = time.perf_counter()
+            processor.infer(engine, frame, classes, config.confidence_threshold, config.max_detections)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    thread = threading.Thread(target=loop)
+    thread.start()
+    thread.join()
+    return latencies, time.perf_counter() - start, None
+
+
+def run_pool(pool, frame, classes, config, seconds):
+    """推理进程池：所有进程都忙时 submit() 阻塞，等到空闲进程后投递最新帧，与推理阶段的行为一致"""
+    latencies = []
+    pool.set_callback(lambda packet: latencies.append((time.perf_counter() - packet.timestamp) * 1000))
+    params = task_params(classes, config)
+    frame_ids = itertools.count(1)
+    start = time.perf_counter()
+    end = start + seconds
+
+    def latest():
+        # 摄像头持续出帧：等到空闲进程时总有一帧刚采集的新帧
+        return FramePacket(next(frame_ids), time.perf_counter(), frame)
+
+    while time.perf_counter() < end:
+        pool.submit(latest(), params, latest=latest)
+    # 等待处理中的帧完成
+    deadline = time.perf_counter() + 5.0
+    while pool.stats()['in_flight'] and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    pool.set_callback(None)
+    return latencies, elapsed, pool.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="推理进程池基准测试")
+    parser.add_argument('--model', default=config_manager.detection.model_path)
+    parser.add_argument('--backend', default=config_manager.detection.inference_backend)
+    parser.add_argument('--image', default=None, help="测试图像，默认使用 ultralytics 自带的 bus.jpg")
+    parser.add_argument('--size', default='640x480', help="帧分辨率（测试图像缩放到此大小）")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help="推理进程数")
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--gil-load', type=float, default=0.0,
+                        help="界面进程中纯 Python 工作的占空比（0~1），模拟绘制与 3D 计算")
+    parser.add_argument('--classes', nargs='+', default=None, help="目标类别，默认使用配置中的类别")
+    parser.add_argument('--json', default=None, help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+    if not 0.0 <= args.gil_load < 1.0 or min(args.workers) < 1:
+        parser.error("--gil-load 取值 0~1，--workers 至少为 1")
+
+    import cv2
+    width, height = (int(v) for v in args.size.split('x'))
+    frame = cv2.resize(load_image(args.image), (width, height))
+    config = config_manager.detection
+    classes = args.classes or (config.target_classes + config.custom_classes)
+    print(f"模型: {args.model} ({args.backend})  {width}x{height}  界面进程 GIL 负载 {args.gil_load:.0%}  "
+          f"CPU 核心 {os.cpu_count()}")
+
+    engine = load_engine(args.model, args.backend)
+    DetectionPostProcessor().infer(engine, frame, classes, config.confidence_threshold, config.max_detections)
+
+    gil_load = None
+    if args.gil_load > 0:
+        gil_load = GilLoad(args.gil_load)
+        gil_load.start()
+
+    report = {'model': args.model, 'backend': engine.backend, 'size': [width, height],
+              'gil_load': args.gil_load, 'cpu_count': os.cpu_count(), 'modes': {}}
+    print(f"{'方式':<12}{'FPS':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}{'进程内 (ms)':>12}")
+    runs = [('thread', None)] + [(f"process-{workers}", workers) for workers in args.workers]
+    try:
+        for mode, workers in runs:
+            if workers is None:
+                latencies, elapsed, pool_stats = run_thread(engine, frame, classes, config, args.seconds)
+            else:
+                pool = InferenceProcessPool(args.model, args.backend, workers, warmup_size=(width, height))
+                pool.start()
+                try:
+                    while pool.ready + len(pool.failures) < workers:
+                        time.sleep(0.05)
+                    if pool.failed:
+                        print(f"{mode:<12}工作进程加载模型失败: {pool.failures[0]}")
+                        continue
+                    latencies, elapsed, pool_stats = run_pool(pool, frame, classes, config, args.seconds)
+                finally:
+                    pool.stop()
+            latency = summarize(latencies) or {'p50_ms': 0.0, 'p95_ms': 0.0}
+            result = {'throughput_fps': round(len(latencies) / elapsed, 1), 'latency': latency}
+            if pool_stats is not None:
+                result['process_pool'] = pool_stats
+            report['modes'][mode] = result
+            worker_ms = pool_stats['worker_ms'] if pool_stats else latency['p50_ms']
+            print(f"{mode:<12}{result['throughput_fps']:>8}{latency['p50_ms']:>10}"
+                  f"{latency['p95_ms']:>10}{worker_ms:>12}")
+    finally:
+        if gil_load is not None:
+            gil_load.running = False
+
+    baseline = report['modes']['thread']['throughput_fps']
+    for mode, result in report['modes'].items():
+        if mode != 'thread':
+            result['speedup'] = round(result['throughput_fps'] / max(baseline, 1e-6), 2)
+            print(f"{mode} / thread 吞吐量: {result['speedup']}x")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"结果已写入 {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+自适应质量控制基准测试
+1. 逐级测量各质量级别的每帧检测耗时与可支撑的帧率（1000 * 跨帧数 / 耗时）；
+2. 闭环运行：按 --fps 出帧的模拟摄像头 + QualityController，运行到三分之一时启动 --contention 个
+   占满 CPU 的进程，三分之二时停止，记录级别调整、每秒处理帧率与端到端延迟，
+   观察 CPU 紧张时逐级降级、竞争消失后恢复的过程。
+
+用法:
+    python -m bench.quality [--model yolo11s.pt] [--image bus.jpg] [--fps 30] [--target-fps 15]
+                            [--target-latency-ms 0] [--seconds 30] [--contention 4] [--json result.json]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from ui.backends import load_engine
+from ui.config import config_manager
+from ui.postprocess import DetectionPostProcessor
+from ui.quality import QualityController, build_levels, format_decision
+from ui.tiling import TiledDetector
+from bench.class_filter import load_image
+from bench.pipeline import summarize
+
+
+def burn():
+    """占满一个 CPU 核心（模拟其他程序的 CPU 竞争）"""
+    while True:
+        pass
+
+
+class LevelRunner:
+    """按质量级别检测一帧；每个级别的模型只加载一次"""
+
+    def __init__(self, backend, classes, config):
+        self.backend = backend
+        self.classes = classes
+        self.config = config
+        self.engines = {}
+        self.processor = DetectionPostProcessor()
+        self.tiled = TiledDetector()
+        self.tiled.configure(config.tile_size, config.tile_overlap, config.tile_full_frame, config.tile_roi)
+
+    def engine(self, model_path):
+        if model_path not in self.engines:
+            self.engines[model_path] = load_engine(model_path, self.backend)
+        return self.engines[model_path]
+
+    def detect(self, level, frame):
+        engine = self.engine(level.model_path)
+        self.processor.imgsz = level.imgsz
+        args = (self.classes, self.config.confidence_threshold, self.config.max_detections)
+        if self.config.tiled_inference and level.tiling:
+            return self.tiled.infer(self.processor, engine, frame, *args)
+        return self.processor.infer(engine, frame, *args)
+
+
+def measure_levels(runner, levels, frame, runs):
+    """各级别的平均检测耗时（毫秒）"""
+    costs = []
+    for level in levels:
+        runner.detect(level, frame)
+        start = time.perf_counter()
+        for _ in range(runs):
+            runner.detect(level, frame)
+        costs.append((time.perf_counter() - start) * 1000 / runs)
+    return costs
+
+
+def run_closed_loop(runner, controller, frame, fps, seconds, contention, tiled_configured):
+    """模拟摄像头按 fps 出帧，检测线程只处理最新一帧并按跨帧数跳过，每秒更新一次控制器"""
+    start = time.perf_counter()
+    end = start + seconds
+    burners = []
+    timeline, decisions, latencies = [], [], []
+    last_index = last_detected = -1
+    next_update = start + 1.0
+    handled = 0
+    while True:
+        now = time.perf_counter()
+        if now >= end:
+            break
+        if contention and not burners and now - start >= seconds / 3:
+            burners = [multiprocessing.Process(target=burn, daemon=True) for _ in range(contention)]
+            for burner in burners:
+                burner.start()
+            print(f"  {now - start:5.1f}s 启动 {contention} 个 CPU 竞争进程")
+        if burners and burners[0].is_alive() and now - start >= seconds * 2 / 3:
+            for burner in burners:
+                burner.terminate()
+            print(f"  {now - start:5.1f}s 停止 CPU 竞争进程")
+
+        index = int((now - start) * fps)
+        if index == last_index:
+            time.sleep(max(0.0, start + (index + 1) / fps - time.perf_counter()))
+            continue
+        last_index = index
+        captured = start + index / fps
+        handled += 1
+        level = controller.level
+        if last_detected >= 0 and index - last_detected < level.stride:
+            continue
+        last_detected = index
+        sample = controller.index
+        detect_start = time.perf_counter()
+        runner.detect(level, frame)
+        done = time.perf_counter()
+        latencies.append((done - captured) * 1000)
+        controller.observe(sample, (done - detect_start) * 1000, (done - captured) * 1000, now=done)
+
+        if done >= next_update:
+            decision = controller.update(now=done, capture_fps=fps)
+            timeline.append({'t': round(done - start, 1), 'level': controller.index,
+                             'load': round(controller.load, 2), 'handled_fps': handled})
+            handled = 0
+            next_update = done + 1.0
+            if decision is not None:
+                text = format_decision(decision, tiled_configured)
+                decisions.append({'t': round(done - start, 1), 'decision': text})
+                print(f"  {done - start:5.1f}s {text}")
+    for burner in burners:
+        if burner.is_alive():
+            burner.terminate()
+    return timeline, decisions, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="自适应质量控制基准测试")
+    parser.add_argument('--model', default=config_manager.detection.model_path)
+    parser.add_argument('--backend', default=config_manager.detection.inference_backend)
+    parser.add_argument('--image', default=None, help="测试图像，默认使用 ultralytics 自带的 bus.jpg")
+    parser.add_argument('--size', default='1280x720', help="帧分辨率（测试图像缩放到此大小）")
+    parser.add_argument('--fps', type=float, default=30.0, help="模拟摄像头帧率")
+    parser.add_argument('--target-fps', type=float, default=config_manager.detection.quality_target_fps)
+    parser.add_argument('--target-latency-ms', type=float,
+                        default=config_manager.detection.quality_target_latency_ms)
+    parser.add_argument('--tiled', action='store_true', help="最高质量级别使用分块推理")
+    parser.add_argument('--runs', type=int, default=10, help="测量每个级别时的推理次数")
+    parser.add_argument('--seconds', type=float, default=30.0, help="闭环运行时长，0 表示只测量各级别")
+    parser.add_argument('--contention', type=int, default=os.cpu_count() or 1,
+                        help="闭环运行中段启动的 CPU 竞争进程数")
+    parser.add_argument('--classes', nargs='+', default=None, help="目标类别，默认使用配置中的类别")
+    parser.add_argument('--json', default=None, help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    import cv2
+    width, height = (int(v) for v in args.size.split('x'))
+    frame = cv2.resize(load_image(args.image), (width, height))
+    config = config_manager.detection
+    config.model_path = args.model
+    config.tiled_inference = args.tiled
+    classes = args.classes or (config.target_classes + config.custom_classes)
+
+    runner = LevelRunner(args.backend, classes, config)
+    levels = build_levels(config, runner.engine(args.model).backend)
+    print(f"模型: {args.model} ({runner.engine(args.model).backend})  {width}x{height}  {len(levels)} 个质量级别")
+
+    costs = measure_levels(runner, levels, frame, args.runs)
+    report = {'model': args.model, 'size': [width, height], 'fps': args.fps, 'target_fps': args.target_fps,
+              'target_latency_ms': args.target_latency_ms, 'levels': []}
+    print(f"{'级别':<6}{'设置':<34}{'检测 (ms)':>10}{'可支撑 FPS':>12}")
+    for index, (level, cost) in enumerate(zip(levels, costs)):
+        capacity = round(1000.0 * level.stride / cost, 1)
+        report['levels'].append({'level': index, 'setting': level.describe(args.tiled),
+                                 'detect_ms': round(cost, 2), 'capacity_fps': capacity})
+        print(f"{index:<6}{level.describe(args.tiled):<34}{cost:>10.1f}{capacity:>12}")
+
+    if args.seconds > 0:
+        print(f"闭环运行 {args.seconds:g}s：摄像头 {args.fps:g} FPS，目标 {args.target_fps:g} FPS"
+              + (f" / p95 {args.target_latency_ms:g}ms" if args.target_latency_ms > 0 else ""))
+        controller = QualityController(levels, args.target_fps, args.target_latency_ms)
+        timeline, decisions, latencies = run_closed_loop(runner, controller, frame, args.fps, args.seconds,
+                                                         args.contention, args.tiled)
+        report['timeline'] = timeline
+        report['decisions'] = decisions
+        report['latency'] = summarize(latencies)
+        print(f"级别调整 {len(decisions)} 次，最终级别 {controller.index}，"
+              f"端到端延迟 p95 {report['latency']['p95_ms'] if latencies else 0}ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"结果已写入 {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+基准测试输入源
+合成帧、视频文件与录制会话，均提供 PyKinectRuntime 的接口，
+使基准测试走与界面相同的 Kinect 采集路径
+"""
+
+import os
+
+import numpy as np
+
+from ui.kinect_replay import KinectReplay, FrameDesc
+
+COLOR_SIZE = (1920, 1080)
+DEPTH_SIZE = (512, 424)
+
+# 合成帧预先生成的帧数，循环使用，采集阶段不包含生成开销
+SYNTHETIC_FRAMES = 8
+
+
+def _synthetic_scene(index, rng):
+    """一帧合成场景：远处平面 + 若干移动的近处矩形（深度毫米、彩色 BGR）"""
+    wd, hd = DEPTH_SIZE
+    depth = np.full((hd, wd), 3000, dtype=np.uint16)
+    depth += rng.integers(0, 30, size=depth.shape, dtype=np.uint16)
+    boxes = []
+    for k in range(3):
+        x = int((60 + 130 * k + 12 * index) % (wd - 80))
+        y = 100 + 60 * k
+        depth[y:y + 70, x:x + 60] = 800 + 400 * k
+        boxes.append((x, y, x + 60, y + 70))
+    depth[rng.random(depth.shape) < 0.03] = 0  # 无效像素
+
+    wc, hc = COLOR_SIZE
+    color = rng.integers(0, 60, size=(hc, wc, 4), dtype=np.uint8)
+    color[..., 3] = 255
+    sx, sy = wc / wd, hc / hd
+    for k, (x1, y1, x2, y2) in enumerate(boxes):
+        color[int(y1 * sy):int(y2 * sy), int(x1 * sx):int(x2 * sx), k] = 220
+    return color, depth
+
+
+class SyntheticKinect:
+    """合成帧源：每次检查都有新帧，四种流循环使用预生成的帧"""
+
+    def __init__(self, frames=SYNTHETIC_FRAMES, seed=0):
+        rng = np.random.default_rng(seed)
+        self.color_frame_desc = FrameDesc(*COLOR_SIZE)
+        self.depth_frame_desc = FrameDesc(*DEPTH_SIZE)
+        self.infrared_frame_desc = FrameDesc(*DEPTH_SIZE)
+        self.body_index_frame_desc = FrameDesc(*DEPTH_SIZE)
+
+        self._color, self._depth, self._infrared, self._body_index = [], [], [], []
+        for i in range(frames):
+            color, depth = _synthetic_scene(i, rng)
+            self._color.append(color.reshape(-1))
+            self._depth.append(depth.reshape(-1))
+            infrared = (depth.astype(np.float32) * 6 + rng.normal(0, 500, depth.shape))
+            self._infrared.append(np.clip(infrared, 0, 65535).astype(np.uint16).reshape(-1))
+            # Kinect 人体索引：255 为背景，0-5 为人体
+            body = np.full(depth.shape, 255, dtype=np.uint8)
+            body[depth == 800] = 0
+            body[depth == 1200] = 1
+            self._body_index.append(body.reshape(-1))
+        self._counters = {'color': 0, 'depth': 0, 'infrared': 0, 'body_index': 0}
+
+    def _next(self, stream, frames):
+        i = self._counters[stream]
+        self._counters[stream] = i + 1
+        return frames[i % len(frames)].copy()
+
+    def has_new_color_frame(self):
+        return True
+
+    def has_new_depth_frame(self):
+        return True
+
+    def has_new_infrared_frame(self):
+        return True
+
+    def has_new_body_index_frame(self):
+        return True
+
+    def get_last_color_frame(self):
+        return self._next('color', self._color)
+
+    def get_last_depth_frame(self):
+        return self._next('depth', self._depth)
+
+    def get_last_infrared_frame(self):
+        return self._next('infrared', self._infrared)
+
+    def get_last_body_index_frame(self):
+        return self._next('body_index', self._body_index)
+
+    def close(self):
+        pass
+
+
+class VideoFileKinect(SyntheticKinect):
+    """视频文件帧源：彩色帧来自视频（预先解码，缩放到 Kinect 彩色分辨率），其余流为合成帧"""
+
+    def __init__(self, path, max_frames=120):
+        import cv2
+
+        super().__init__()
+        capture = cv2.VideoCapture(path)
+        frames = []
+        while len(frames) < max_frames:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frame = cv2.resize(frame, COLOR_SIZE)
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA).reshape(-1))
+        capture.release()
+        if not frames:
+            raise ValueError(f"无法读取视频: {path}")
+        self._color = frames
+
+
+def open_source(spec, stream_type="color"):
+    """按输入描述打开帧源：synthetic、录制目录或视频文件"""
+    if spec == "synthetic":
+        return SyntheticKinect()
+    if os.path.isdir(spec):
+        return KinectReplay(spec, pacing='fast', loop=True, master=stream_type)
+    return VideoFileKinect(spec)
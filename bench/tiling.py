@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+分块推理基准测试
+对比整帧推理与分块推理（整帧网格、ROI、深度范围）的每帧延迟、推理分块数与检出结果
+
+有标注时（--images 目录中与图片同名的 YOLO 格式 .txt：cls cx cy w h，归一化坐标）统计
+IoU ≥ 0.5 的精确率、召回率与小目标召回率；没有标注时统计各方式的检出数、小目标检出数，
+以及只被分块推理检出（整帧推理中没有 IoU ≥ 0.5 的同类框）的目标数。
+
+用法:
+    python -m bench.tiling [--input synthetic|video.mp4|sessions/desk] [--images labeled_dir]
+                           [--model yolo11n.pt] [--frames 50] [--roi x1 y1 x2 y2]
+                           [--depth-range 400 1500] [--json result.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from ui.config import config_manager
+from ui.kinect_frames import KinectFrameSource
+from ui.postprocess import DetectionPostProcessor
+from ui.registration import get_registration
+from ui.tiling import TILE_OVERLAP, TILE_SIZE, TiledDetector
+from ui.tracking import box_iou
+from bench.sources import open_source
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+# 小目标：面积小于此值（原图像素）的框
+SMALL_AREA = 48 * 48
+MATCH_IOU = 0.5
+
+
+def load_images(path, count):
+    """读取目录中的图片与同名 YOLO 标注，返回 [(图像, 标注 (N, 5) 或 None)]"""
+    frames = []
+    for name in sorted(os.listdir(path)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        image = cv2.imread(os.path.join(path, name))
+        if image is None:
+            continue
+        labels = None
+        label_path = os.path.join(path, os.path.splitext(name)[0] + '.txt')
+        if os.path.exists(label_path):
+            rows = np.loadtxt(label_path, dtype=np.float32, ndmin=2).reshape(-1, 5)
+            h, w = image.shape[:2]
+            cx, cy, bw, bh = rows[:, 1] * w, rows[:, 2] * h, rows[:, 3] * w, rows[:, 4] * h
+            labels = np.column_stack([rows[:, 0], cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2])
+        frames.append({'image': image, 'depth': None, 'labels': labels})
+        if len(frames) >= count:
+            break
+    if not frames:
+        raise ValueError(f"目录中没有图片: {path}")
+    return frames
+
+
+def load_stream(spec, count):
+    """从帧源读取 count 组彩色帧与配对的深度帧（不足时循环），返回帧列表与配准表"""
+    source = open_source(spec, 'color')
+    frame_source = KinectFrameSource(source)
+    frames = []
+    try:
+        while len(frames) < count:
+            bundle = frame_source.poll(need_depth=True)
+            if bundle is None:
+                continue
+            depth = bundle.depth.copy() if bundle.depth is not None else None
+            frames.append({'image': np.ascontiguousarray(bundle.color), 'depth': depth, 'labels': None})
+        registration = get_registration(source, cache_dir=None)
+    finally:
+        source.close()
+    return frames, registration
+
+
+def match(pred_boxes, pred_classes, gt_boxes, gt_classes, threshold=MATCH_IOU):
+    """同类别按 IoU 贪心匹配，返回每个真实框是否被检出"""
+    found = np.zeros(len(gt_boxes), dtype=bool)
+    if not len(pred_boxes) or not len(gt_boxes):
+        return found
+    iou = box_iou(np.asarray(gt_boxes, dtype=np.float32), np.asarray(pred_boxes, dtype=np.float32))
+    iou[np.asarray(gt_classes)[:, None] != np.asarray(pred_classes)[None, :]] = 0.0
+    used = np.zeros(len(pred_boxes), dtype=bool)
+    for i in np.argsort(-iou.max(axis=1)).tolist():
+        candidates = np.where(used, 0.0, iou[i])
+        j = int(np.argmax(candidates))
+        if candidates[j] >= threshold:
+            found[i] = True
+            used[j] = True
+    return found
+
+
+def run_case(infer, frames, warmup):
+    """逐帧计时推理（含后处理与跨块合并），返回统计与每帧检测批次"""
+    for frame in frames[:warmup]:
+        infer(frame)
+    samples, batches = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        batch = infer(frame)
+        samples.append((time.perf_counter() - start) * 1000)
+        batches.append(batch)
+    samples.sort()
+    areas = [(b.boxes[:, 2] - b.boxes[:, 0]) * (b.boxes[:, 3] - b.boxes[:, 1]) for b in batches]
+    return {
+        'p50_ms': round(statistics.median(samples), 2),
+        'p95_ms': round(samples[max(int(len(samples) * 0.95) - 1, 0)], 2),
+        'detections_per_frame': round(statistics.fmean(len(b) for b in batches), 2),
+        'small_per_frame': round(statistics.fmean(int((a < SMALL_AREA).sum()) for a in areas), 2),
+    }, batches
+
+
+def accuracy(frames, batches, class_indices):
+    """有标注的帧上的精确率、召回率与小目标召回率"""
+    tp = gt_total = pred_total = small_found = small_total = 0
+    for frame, batch in zip(frames, batches):
+        labels = frame['labels']
+        if labels is None:
+            continue
+        labels = labels[np.isin(labels[:, 0].astype(np.int32), class_indices)]
+        found = match(batch.boxes, batch.class_ids, labels[:, 1:], labels[:, 0].astype(np.int32))
+        areas = (labels[:, 3] - labels[:, 1]) * (labels[:, 4] - labels[:, 2])
+        tp += int(found.sum())
+        gt_total += len(labels)
+        pred_total += len(batch)
+        small = areas < SMALL_AREA
+        small_found += int(found[small].sum())
+        small_total += int(small.sum())
+    if not gt_total:
+        return None
+    return {
+        'precision': round(tp / pred_total, 3) if pred_total else 0.0,
+        'recall': round(tp / gt_total, 3),
+        'small_recall': round(small_found / small_total, 3) if small_total else None,
+    }
+
+
+def only_in(batches, reference):
+    """batches 中与 reference 同帧所有同类框 IoU 都低于 MATCH_IOU 的检测数（每帧平均）"""
+    extra = 0
+    for batch, ref in zip(batches, reference):
+        found = match(ref.boxes, ref.class_ids, batch.boxes, batch.class_ids)
+        extra += int((~found).sum())
+    return round(extra / max(len(batches), 1), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分块推理基准测试")
+    parser.add_argument('--input', default='synthetic', help="synthetic、视频文件路径或 record_kinect.py 录制的目录")
+    parser.add_argument('--images', default=None, help="图片目录（可带 YOLO 格式标注），给出时代替 --input")
+    parser.add_argument('--model', default=config_manager.detection.model_path)
+    parser.add_argument('--frames', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--tile-size', type=int, default=TILE_SIZE)
+    parser.add_argument('--overlap', type=float, default=TILE_OVERLAP)
+    parser.add_argument('--roi', type=int, nargs=4, default=None, metavar=('X1', 'Y1', 'X2', 'Y2'))
+    parser.add_argument('--depth-range', type=int, nargs=2, default=None, metavar=('NEAR', 'FAR'),
+                        help="只推理包含该深度范围（毫米）像素的分块，需要带深度的输入")
+    parser.add_argument('--json', default=None, help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    try:
+        from ultralytics import YOLO
+    except ImportError as e:
+        print(f"❌ 缺少依赖 {e}")
+        return 1
+    model = YOLO(args.model)
+
+    registration = None
+    if args.images:
+        frames = load_images(args.images, args.frames)
+    else:
+        frames, registration = load_stream(args.input, args.frames)
+    height, width = frames[0]['image'].shape[:2]
+    print(f"输入: {args.images or args.input}  帧数: {len(frames)}  尺寸: {width}x{height}  模型: {args.model}")
+
+    classes = config_manager.detection.target_classes + config_manager.detection.custom_classes
+    threshold = config_manager.detection.confidence_threshold
+    max_det = config_manager.detection.max_detections
+    processor = DetectionPostProcessor()
+    processor.compile(model.names, classes)
+
+    def tiled(full_frame=True, roi=None, depth_range=None):
+        detector = TiledDetector(args.tile_size, args.overlap, full_frame, roi)
+        counts = []
+
+        def infer(frame):
+            batch = detector.infer(processor, model, frame['image'], classes, threshold, max_det,
+                                   depth_frame=frame['depth'], registration=registration,
+                                   depth_range=depth_range)
+            counts.append(detector.last['tiles'] + int(full_frame))
+            return batch
+        return infer, counts
+
+    cases = {'full': (lambda frame: processor.infer(model, frame['image'], classes, threshold, max_det), None)}
+    cases['tiled'] = tiled()
+    cases['tiled_only'] = tiled(full_frame=False)
+    if args.roi:
+        cases['tiled_roi'] = tiled(roi=args.roi)
+    if args.depth_range:
+        if registration is None or frames[0]['depth'] is None:
+            print("⚠️  输入没有深度帧，跳过深度范围")
+        else:
+            cases['tiled_depth'] = tiled(roi=args.roi, depth_range=args.depth_range)
+
+    report = {'input': args.images or args.input, 'model': args.model, 'frames': len(frames),
+              'tile_size': args.tile_size, 'overlap': args.overlap, 'cases': {}}
+    batches = {}
+    for name, (infer, counts) in cases.items():
+        result, batches[name] = run_case(infer, frames, args.warmup)
+        result['images_per_frame'] = round(statistics.fmean(counts[args.warmup:]), 2) if counts else 1.0
+        result['accuracy'] = accuracy(frames, batches[name], processor.class_indices)
+        if name != 'full':
+            result['only_tiled_per_frame'] = only_in(batches[name], batches['full'])
+        report['cases'][name] = result
+
+    full_p50 = report['cases']['full']['p50_ms']
+    print(f"{'方式':<13}{'p50 (ms)':>10}{'p95 (ms)':>10}{'相对耗时':>9}{'推理图数':>9}{'检出/帧':>9}"
+          f"{'小目标/帧':>10}{'仅分块':>8}{'召回':>8}{'小目标召回':>11}")
+    for name, r in report['cases'].items():
+        r['cost_ratio'] = round(r['p50_ms'] / max(full_p50, 1e-6), 2)
+        acc = r['accuracy'] or {}
+        print(f"{name:<13}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['cost_ratio']:>8}x{r['images_per_frame']:>9}"
+              f"{r['detections_per_frame']:>9}{r['small_per_frame']:>10}{r.get('only_tiled_per_frame', '-'):>8}"
+              f"{acc.get('recall', '-'):>8}{str(acc.get('small_recall', '-')):>11}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"结果已写入 {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
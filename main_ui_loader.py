@@ -33,12 +33,17 @@ import os
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
+# 启动辅助只使用标准库，在导入其他模块之前启用 --profile-startup
+from ui.startup import startup_profiler, profile_requested, missing_modules, module_available
+profile_requested()
+
 try:
-    from PyQt6.QtWidgets import QApplication, QMessageBox
-    from PyQt6.QtCore import Qt
-    from ui.main_window_ui import MainWindowUI
-    from ui.config import config_manager
-    from ui.ui_loader import validate_ui_files, setup_ui_environment
+    with startup_profiler.phase("导入界面模块"):
+        from PyQt6.QtWidgets import QApplication, QMessageBox
+        from PyQt6.QtCore import Qt, QTimer
+        from ui.main_window_ui import MainWindowUI
+        from ui.config import config_manager
+        from ui.ui_loader import validate_ui_files, setup_ui_environment
 except ImportError as e:
     print(f"导入错误: {e}")
     print("请确保已安装所有必需的依赖包:")
@@ -55,19 +60,13 @@ def check_dependencies():
     if not os.path.exists(model_path):
         missing_deps.append(f"YOLO 模型文件: {model_path}")
     
-    # 检查 Kinect SDK
-    try:
-        import pykinect2
-    except ImportError:
+    # 检查 Kinect SDK（只查找模块，不导入）
+    if not module_available('pykinect2'):
         missing_deps.append("pykinect2 (Kinect for Windows SDK 2.0)")
     
-    # 检查其他依赖
-    try:
-        import cv2
-        import numpy as np
-        from ultralytics import YOLO
-    except ImportError as e:
-        missing_deps.append(f"Python 包: {e}")
+    # 检查其他依赖（ultralytics 等在第一次检测时才导入）
+    for name in missing_modules(['cv2', 'numpy', 'ultralytics']):
+        missing_deps.append(f"Python 包: {name}")
     
     return missing_deps
 
@@ -114,7 +113,8 @@ def main():
     
     # 检查依赖项
     print("🔍 检查依赖项...")
-    missing_deps = check_dependencies()
+    with startup_profiler.phase("检查依赖项"):
+        missing_deps = check_dependencies()
     
     if missing_deps:
         print("❌ 缺少以下依赖项:")
@@ -131,7 +131,8 @@ def main():
     print()
     
     # 创建 Qt 应用
-    app = QApplication(sys.argv)
+    with startup_profiler.phase("创建 QApplication"):
+        app = QApplication(sys.argv)
     
     # 设置 UI 环境
     setup_ui_environment()
@@ -149,8 +150,12 @@ def main():
         print("🚀 启动图形界面 (UI文件版本)...")
         
         # 创建主窗口
-        main_window = MainWindowUI()
-        main_window.show()
+        with startup_profiler.phase("创建主窗口"):
+            main_window = MainWindowUI()
+            main_window.show()
+        if startup_profiler.enabled:
+            # 事件循环处理完第一批事件（窗口绘制）后输出启动耗时分析
+            QTimer.singleShot(0, startup_profiler.finish)
         
         print("✅ 界面启动成功!")
         print("💡 使用提示:")
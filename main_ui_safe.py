@@ -18,6 +18,10 @@ import traceback
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
+# 启动辅助只使用标准库，在导入其他模块之前启用 --profile-startup
+from ui.startup import startup_profiler, profile_requested, missing_modules, module_available
+profile_requested()
+
 
 def check_pyqt6_compatibility():
     """检查 PyQt6 兼容性"""
@@ -112,16 +116,12 @@ def check_dependencies():
         ('ultralytics', 'YOLO (ultralytics)'),
     ]
     
-    for module_name, display_name in optional_deps:
-        try:
-            __import__(module_name)
-        except ImportError:
-            missing_deps.append(display_name)
+    # 只查找模块，不导入（ultralytics 等在第一次检测时才导入）
+    missing = missing_modules(name for name, _ in optional_deps)
+    missing_deps.extend(display_name for name, display_name in optional_deps if name in missing)
     
     # 检查 Kinect SDK
-    try:
-        import pykinect2
-    except ImportError:
+    if not module_available('pykinect2'):
         print("⚠️  Kinect SDK 未安装 (可选，用于 Kinect 2.0 支持)")
     
     return missing_deps
@@ -182,7 +182,8 @@ def main():
         show_startup_info()
         
         # 检查依赖项
-        missing_deps = check_dependencies()
+        with startup_profiler.phase("检查依赖项"):
+            missing_deps = check_dependencies()
         
         if missing_deps:
             error_msg = "缺少以下依赖项，程序无法启动："
@@ -203,11 +204,13 @@ def main():
         
         # 创建应用程序
         print("🚀 创建应用程序...")
-        app = create_safe_application()
+        with startup_profiler.phase("创建 QApplication"):
+            app = create_safe_application()
         
         # 尝试导入 UI 模块
         print("📦 加载 UI 模块...")
-        main_window_class, version_name = try_import_ui_module()
+        with startup_profiler.phase("导入 UI 模块"):
+            main_window_class, version_name = try_import_ui_module()
         
         if main_window_class is None:
             error_msg = "无法加载任何 UI 模块，请检查代码完整性。"
@@ -217,8 +220,13 @@ def main():
         
         # 创建并显示主窗口
         print(f"🎨 启动界面 ({version_name})...")
-        main_window = main_window_class()
-        main_window.show()
+        with startup_profiler.phase("创建主窗口"):
+            main_window = main_window_class()
+            main_window.show()
+        if startup_profiler.enabled:
+            from PyQt6.QtCore import QTimer
+            # 事件循环处理完第一批事件（窗口绘制）后输出启动耗时分析
+            QTimer.singleShot(0, startup_profiler.finish)
         
         print("✅ 界面启动成功!")
         print("💡 使用提示:")
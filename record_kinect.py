@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Kinect 会话录制脚本
+录制彩色/深度/红外/人体索引帧及时间戳，录制结果可通过 config.json 中
+kinect.replay_path 在任意平台上回放
+
+用法:
+    python record_kinect.py sessions/desk --seconds 10 --streams color depth
+"""
+
+import argparse
+import sys
+import time
+
+from ui.kinect_replay import STREAMS, KinectRecorder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kinect 会话录制")
+    parser.add_argument('path', help="录制目录")
+    parser.add_argument('--seconds', type=float, default=10.0, help="录制时长（秒）")
+    parser.add_argument('--streams', nargs='+', default=['color', 'depth'],
+                        choices=list(STREAMS), help="录制的流")
+    args = parser.parse_args()
+
+    try:
+        from pykinect2 import PyKinectV2, PyKinectRuntime
+    except ImportError:
+        print("❌ 需要 pykinect2 与 Kinect for Windows SDK 2.0 才能录制")
+        return 1
+
+    frame_type_map = {
+        'color': PyKinectV2.FrameSourceTypes_Color,
+        'depth': PyKinectV2.FrameSourceTypes_Depth,
+        'infrared': PyKinectV2.FrameSourceTypes_Infrared,
+        'body_index': PyKinectV2.FrameSourceTypes_BodyIndex,
+    }
+    frame_types = 0
+    for stream in args.streams:
+        frame_types |= frame_type_map[stream]
+
+    try:
+        kinect = PyKinectRuntime.PyKinectRuntime(frame_types)
+    except Exception as e:
+        print(f"初始化Kinect时出错: {e}")
+        return 1
+
+    recorder = KinectRecorder(args.path, args.streams)
+    print(f"🎬 录制 {', '.join(args.streams)} 到 {args.path}，时长 {args.seconds:.0f} 秒...")
+    start = time.perf_counter()
+    try:
+        deadline = start + args.seconds
+        while time.perf_counter() < deadline:
+            if not recorder.poll(kinect):
+                time.sleep(0.002)
+    except KeyboardInterrupt:
+        print("录制被中断")
+    finally:
+        elapsed = max(time.perf_counter() - start, 1e-6)
+        recorder.close()
+        kinect.close()
+
+    for stream, count in recorder.frame_counts.items():
+        print(f"  {stream}: {count} 帧 ({count / elapsed:.1f} FPS)")
+    print("✅ 录制完成")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
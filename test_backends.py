@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+推理后端测试脚本
+测试导出缓存路径与过期判断、后端依赖检查，以及导出模型逐张推理分块时与批量推理结果一致
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from test_postprocess import FakeModel
+
+
+class FreshNamesModel(FakeModel):
+    """names 与 ultralytics 一样每次返回新的字典"""
+
+    @property
+    def names(self):
+        return {0: 'cup', 1: 'pen'}
+
+
+def test_export_cache():
+    """测试导出结果缓存在模型文件旁，模型文件更新后缓存过期"""
+    print("🧪 测试导出缓存...")
+
+    try:
+        from ui.backends import export_path, is_fresh
+
+        weights = os.path.join('models', 'yolo11n.pt')
+        assert export_path(weights, 'pytorch') == weights
+        assert export_path(weights, 'onnxruntime') == os.path.join('models', 'yolo11n.onnx')
+        assert export_path(weights, 'opencv') == export_path(weights, 'onnxruntime')
+        assert export_path(weights, 'openvino') == os.path.join('models', 'yolo11n_openvino_model')
+        print("✅ 导出结果与模型文件同目录，ONNX Runtime 与 OpenCV DNN 共用一个 .onnx")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            weights = os.path.join(tmp, 'model.pt')
+            exported = export_path(weights, 'onnxruntime')
+            open(weights, 'wb').close()
+            assert not is_fresh(exported, weights)
+            open(exported, 'wb').close()
+            now = time.time()
+            os.utime(weights, (now - 10, now - 10))
+            assert is_fresh(exported, weights)
+            os.utime(weights, (now + 10, now + 10))
+            assert not is_fresh(exported, weights)
+        print("✅ 没有导出或模型文件更新时重新导出，否则直接使用缓存")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 导出缓存测试失败: {e}")
+        return False
+
+def test_available_backends():
+    """测试后端依赖检查不导入模块"""
+    print("\n🧪 测试后端依赖检查...")
+
+    try:
+        from ui.backends import BACKENDS, available_backends
+        from ui.config import config_manager
+
+        before = set(sys.modules)
+        available = available_backends()
+        assert tuple(available) == BACKENDS
+        assert available['opencv'] is True
+        assert not {'onnxruntime', 'openvino', 'torch'} & (set(sys.modules) - before)
+        assert set(config_manager.get_inference_backends()) == set(BACKENDS)
+        print(f"✅ 已安装: {[name for name, ok in available.items() if ok]}")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 后端依赖检查测试失败: {e}")
+        return False
+
+def test_engine():
+    """测试导出模型逐张推理分块，结果顺序与批量推理一致；类别表只读取一次"""
+    print("\n🧪 测试推理引擎...")
+
+    try:
+        from ui.backends import InferenceEngine
+        from ui.postprocess import DetectionPostProcessor
+        from ui.tiling import TiledDetector
+
+        rng = np.random.default_rng(0)
+        image = rng.integers(0, 255, (1080, 1920, 3), dtype=np.uint8)
+        image[:, 1200:] = 250  # 右侧分块的置信度更高
+
+        results = {}
+        for batched in (True, False):
+            model = FreshNamesModel()
+            engine = InferenceEngine(model, 'pytorch' if batched else 'onnxruntime', 'yolo11n.pt',
+                                     'yolo11n.pt', batched=batched)
+            processor = DetectionPostProcessor()
+            tiled = TiledDetector(640, 0.2)
+            results[batched] = tiled.infer(processor, engine, image, ['cup'], 0.1, 50)
+            assert model.calls == ([9] if batched else [1] * 9), model.calls
+            processor.infer(engine, image, ['cup'], 0.1, 50)
+            assert model.calls[-1] == 1
+            assert processor._names_ref is engine.names
+        assert np.array_equal(results[True].boxes, results[False].boxes)
+        assert np.array_equal(results[True].scores, results[False].scores)
+        print("✅ 批大小固定为 1 的后端逐张推理 9 个分块，结果与批量推理一致")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 推理引擎测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 推理后端测试")
+    print("=" * 60)
+
+    tests = [
+        ("导出缓存", test_export_cache),
+        ("后端依赖检查", test_available_backends),
+        ("推理引擎", test_engine),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试出现异常: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 60)
+    print("📊 测试结果总结:")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("🎉 推理后端测试通过！")
+    else:
+        print("⚠️  部分测试失败，请检查相关功能")
+
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
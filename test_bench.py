@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+基准测试工具测试脚本
+测试合成帧源与延迟统计（不需要模型和 Kinect 设备）
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+
+def test_synthetic_source():
+    """测试合成帧源提供 PyKinectRuntime 接口"""
+    print("🧪 测试合成帧源...")
+
+    try:
+        from bench.sources import SyntheticKinect, COLOR_SIZE, DEPTH_SIZE
+        from ui.kinect_frames import KinectFrameSource
+
+        kinect = SyntheticKinect(frames=3)
+        source = KinectFrameSource(kinect)
+        bundle = source.poll(need_depth=True)
+        assert bundle.color.shape == (COLOR_SIZE[1], COLOR_SIZE[0], 3)
+        assert bundle.depth.shape == (DEPTH_SIZE[1], DEPTH_SIZE[0])
+        print("✅ 彩色/深度帧组尺寸与 Kinect v2 一致")
+
+        for name in ('infrared', 'body_index'):
+            assert getattr(kinect, f'has_new_{name}_frame')()
+            frame = getattr(kinect, f'get_last_{name}_frame')()
+            assert frame.size == DEPTH_SIZE[0] * DEPTH_SIZE[1]
+        body = kinect.get_last_body_index_frame()
+        assert set(np.unique(body).tolist()) <= {0, 1, 255}
+        print("✅ 红外与人体索引帧可用，人体索引背景为 255")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 合成帧源测试失败: {e}")
+        return False
+
+def test_summarize():
+    """测试延迟分位数统计"""
+    print("\n🧪 测试延迟统计...")
+
+    try:
+        from bench.pipeline import summarize
+
+        stats = summarize(list(range(1, 101)))
+        assert stats['count'] == 100
+        assert abs(stats['p50_ms'] - 50.5) < 1e-6 and stats['p99_ms'] > stats['p95_ms'] > stats['p50_ms']
+        assert summarize([]) is None
+        print(f"✅ p50={stats['p50_ms']} p95={stats['p95_ms']} p99={stats['p99_ms']}")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 延迟统计测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 基准测试工具测试")
+    print("=" * 60)
+
+    tests = [
+        ("合成帧源", test_synthetic_source),
+        ("延迟统计", test_summarize),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试异常: {e}")
+            results.append((test_name, False))
+
+    # 显示测试结果
+    print("\n" + "=" * 60)
+    print("📊 基准测试工具测试结果")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("\n🎉 基准测试工具测试通过！")
+        return 0
+    else:
+        print("\n⚠️  部分测试失败，请检查实现。")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -76,10 +76,8 @@ def test_depth_frame_processing():
             'def _get_depth_frame(self):',
             'hasattr(self.kinect, \'has_new_depth_frame\')',
             'if frame is not None and frame.size > 0:',
-            'valid_depth = frame[frame > 0]',
-            'np.percentile(valid_depth, 5)',
-            'np.percentile(valid_depth, 95)',
-            'cv2.applyColorMap(frame_normalized, cv2.COLORMAP_JET)',
+            'self._get_depth_colorizer().colorize(frame)',
+            'DepthColorizer(config_manager.get_kinect_depth_range(self.depth_mode))',
             'except Exception as e:',
             'print(f"深度帧处理错误: {e}")'
         ]
@@ -94,9 +92,8 @@ def test_depth_frame_processing():
         # 检查红外帧处理改进
         infrared_improvements = [
             'def _get_infrared_frame(self):',
-            'frame_max = np.max(frame) if np.max(frame) > 0 else 65535',
-            'frame_min = np.min(frame[frame > 0])',
-            'cv2.equalizeHist(frame_normalized)',
+            'return self._get_infrared_colorizer().colorize(frame)',
+            'InfraredColorizer(config.infrared_mode, config.infrared_gain)',
             'print(f"红外帧处理错误: {e}")'
         ]
         
@@ -280,10 +277,8 @@ def test_color_display_fixes():
         # 检查颜色处理改进
         color_improvements = [
             'if stream_type == "color":',
-            'frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)',
-            'QImage(frame_rgb.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)',
-            'else:',
-            'QImage(frame.data, width, height, bytes_per_line, QImage.Format.Format_RGB888).rgbSwapped()'
+            'bytes_per_line = frame.strides[0]',
+            'QImage(frame.data, width, height, bytes_per_line, QImage.Format.Format_BGR888)',
         ]
         
         for improvement in color_improvements:
@@ -52,10 +52,12 @@ def test_control_panel_debug_features():
     print("\n🧪 测试控制面板调试功能...")
     
     try:
+        from PyQt6.QtWidgets import QApplication
         from ui.main_window import ControlPanel
         print("✅ ControlPanel 类导入成功")
         
-        # 创建实例
+        # 创建实例（控件需要先创建 QApplication）
+        app = QApplication.instance() or QApplication(sys.argv)
         control_panel = ControlPanel()
         print("✅ ControlPanel 实例创建成功")
         
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+深度区域统计测试脚本
+测试积分图区域统计与逐像素计算的一致性、配准批量计算中的区域深度，
+以及不使用直方图时每帧 3D 计算的耗时与中心邻域中位数相当
+"""
+
+import sys
+import os
+import time
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+
+def make_depth(seed=0):
+    rng = np.random.default_rng(seed)
+    depth = rng.integers(500, 4500, size=(424, 512)).astype(np.uint16)
+    depth[rng.random(depth.shape) < 0.2] = 0  # 20% 无效像素
+    return depth
+
+
+def test_region_matches_reference():
+    """测试区域均值、有效比例与逐像素计算一致"""
+    print("🧪 测试积分图区域统计...")
+
+    try:
+        from ui.depth_stats import DepthStats
+
+        depth = make_depth()
+        stats = DepthStats(depth)
+        boxes = np.array([[0, 0, 512, 424], [10, 20, 60, 90], [300, 200, 301, 201], [500, 400, 600, 500]])
+        mean, ratio, count = stats.region(boxes)
+
+        for i, (x1, y1, x2, y2) in enumerate(boxes):
+            patch = depth[y1:min(y2, 424), x1:min(x2, 512)]
+            valid = patch[patch > 0]
+            assert count[i] == valid.size, f"有效像素数不一致: {count[i]} vs {valid.size}"
+            assert abs(ratio[i] - valid.size / patch.size) < 1e-6
+            if valid.size:
+                assert abs(mean[i] - valid.mean()) < 1e-3, f"均值不一致: {mean[i]} vs {valid.mean()}"
+            else:
+                assert np.isnan(mean[i])
+        print(f"✅ {len(boxes)} 个区域的均值、有效比例与逐像素计算一致")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 区域统计测试失败: {e}")
+        return False
+
+def test_approximate_percentile():
+    """测试直方图近似分位数与稳健深度"""
+    print("\n🧪 测试近似分位数...")
+
+    try:
+        from ui.depth_stats import DepthStats
+
+        depth = make_depth(1)
+        stats = DepthStats(depth)
+        boxes = np.array([[0, 0, 512, 424], [100, 100, 180, 160], [400, 50, 420, 70]])
+        for q in (10, 50, 90):
+            approx = stats.percentile(boxes, q)
+            for i, (x1, y1, x2, y2) in enumerate(boxes):
+                patch = depth[y1:y2, x1:x2]
+                exact = np.percentile(patch[patch > 0], q)
+                assert abs(approx[i] - exact) <= 1.5 * stats.bin_width, \
+                    f"q={q} 误差过大: {approx[i]} vs {exact}"
+        print(f"✅ 近似分位数误差在 {1.5 * stats.bin_width:.0f}mm 以内")
+
+        # 目标 (1000mm) 占区域大部分，背景 (3000mm) 不应拉偏稳健深度
+        scene = np.full((424, 512), 3000, dtype=np.uint16)
+        scene[100:200, 100:200] = 1000
+        mean, _, _ = DepthStats(scene).region([[90, 90, 210, 210]])
+        robust, _, _ = DepthStats(scene).robust_depth([[90, 90, 210, 210]])
+        assert mean[0] > 1500 and abs(robust[0] - 1000) <= DepthStats(scene).bin_width
+        print(f"✅ 混入背景时均值 {mean[0]:.0f}mm，稳健深度 {robust[0]:.0f}mm")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 近似分位数测试失败: {e}")
+        return False
+
+def test_map_boxes_with_stats():
+    """测试配准批量计算使用共享的区域统计"""
+    print("\n🧪 测试配准区域深度...")
+
+    try:
+        from ui.registration import Registration
+        from ui.depth_stats import DepthStats
+
+        reg = Registration.from_intrinsics()
+        depth = np.full((424, 512), 1500, dtype=np.uint16)
+        depth[:, :256] = 0  # 左半边无效
+        stats = DepthStats(depth)
+        boxes = np.array([[100, 100, 200, 200], [1500, 500, 1600, 600], [900, 400, 1000, 500]],
+                         dtype=np.float32)
+        mapping = reg.map_boxes(boxes, depth, stats=stats)
+        reference = reg.map_boxes(boxes, depth)
+
+        valid = np.isfinite(mapping['depth_mm'])
+        assert np.array_equal(valid, np.isfinite(reference['depth_mm']))
+        assert np.allclose(mapping['depth_mm'][valid], 1500)
+        assert np.allclose(mapping['xyz'][valid], reference['xyz'][valid], atol=1.0)
+        assert np.all(mapping['valid_ratio'][valid] > 0.99)
+        assert np.all(mapping['valid_pixels'][~valid] == 0)
+        print(f"✅ 共享积分图得到的 3D 坐标与中心邻域采样一致（有效 {int(valid.sum())} 个）")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 配准区域深度测试失败: {e}")
+        return False
+
+def best_ms(func, frames, runs=20, repeat=5):
+    """多轮计时取最快一轮的平均每帧耗时（毫秒），减少调度抖动的影响"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(runs):
+            func(frames[i % len(frames)])
+        best = min(best, (time.perf_counter() - start) * 1000 / runs)
+    return best
+
+def test_default_cost():
+    """测试默认不构建直方图：每帧构建统计结构并计算 3D 坐标的耗时与中心邻域中位数相当"""
+    print("\n🧪 测试每帧 3D 计算耗时...")
+
+    try:
+        from ui.registration import Registration
+        from ui.depth_stats import DepthStats
+
+        reg = Registration.from_intrinsics()
+        frames = [make_depth(seed) for seed in range(4)]
+        rng = np.random.default_rng(0)
+        xy = np.column_stack([rng.uniform(0, 1700, 20), rng.uniform(0, 950, 20)])
+        boxes = np.hstack([xy, xy + [150, 120]]).astype(np.float32)
+
+        stats = DepthStats(frames[0], hist_bins=0)
+        mean, _, _ = stats.region(boxes[:3])
+        robust, _, _ = stats.robust_depth(boxes[:3])
+        assert np.array_equal(mean, robust, equal_nan=True) and stats._hist_table is None
+
+        median_ms = best_ms(lambda depth: reg.map_boxes(boxes, depth), frames)
+        mean_ms = best_ms(lambda depth: reg.map_boxes(boxes, depth, stats=DepthStats(depth, hist_bins=0)), frames)
+        hist_ms = best_ms(lambda depth: reg.map_boxes(boxes, depth, stats=DepthStats(depth)), frames)
+        assert mean_ms < 2.0 * median_ms, f"{mean_ms:.2f}ms vs 中位数 {median_ms:.2f}ms"
+        assert mean_ms * 3 < hist_ms, f"{mean_ms:.2f}ms vs 直方图 {hist_ms:.2f}ms"
+        print(f"✅ 20 个检测每帧: 中心邻域中位数 {median_ms:.2f}ms，区域均值 {mean_ms:.2f}ms，"
+              f"直方图 {hist_ms:.2f}ms")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 每帧 3D 计算耗时测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 深度区域统计测试")
+    print("=" * 60)
+
+    tests = [
+        ("积分图区域统计", test_region_matches_reference),
+        ("近似分位数", test_approximate_percentile),
+        ("配准区域深度", test_map_boxes_with_stats),
+        ("每帧 3D 计算耗时", test_default_cost),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试异常: {e}")
+            results.append((test_name, False))
+
+    # 显示测试结果
+    print("\n" + "=" * 60)
+    print("📊 深度区域统计测试结果")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("\n🎉 深度区域统计测试通过！")
+        return 0
+    else:
+        print("\n⚠️  部分测试失败，请检查实现。")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -24,13 +24,7 @@ def test_body_index_fixes():
             'def _get_body_index_frame(self):',
             'hasattr(self.kinect, \'has_new_body_index_frame\')',
             'if frame is not None and frame.size > 0:',
-            '更鲜明的颜色组合，包括背景处理',
-            'unique_values = np.unique(frame)',
-            'print(f"人体索引帧包含值: {unique_values}")',
-            'print(f"检测到人体索引 {i}: {np.sum(mask)} 像素")',
-            'if len(unique_values) <= 1 or np.all(frame == 0):',
-            'print("未检测到人体，显示原始索引数据")',
-            'frame_norm = np.clip(frame.astype(np.float32) * 40, 0, 255)',
+            'self.body_index_colorizer.colorize(frame)',
             'print("人体索引帧数据为空")',
             'print(f"人体索引帧处理错误: {e}")'
         ]
@@ -55,14 +49,15 @@ def test_color_frame_fixes():
     try:
         with open('ui/main_window.py', 'r', encoding='utf-8') as f:
             content = f.read()
+        with open('ui/kinect_frames.py', 'r', encoding='utf-8') as f:
+            content += f.read()
         
-        # 检查彩色帧处理改进
+        # 检查彩色帧处理改进（BGRA 转换在帧组采集层中完成）
         color_improvements = [
             'def _get_color_frame(self):',
             'if frame is not None and frame.size > 0:',
-            '# Kinect v2 实际提供的是BGRA格式（注意顺序）',
-            'frame_bgr = frame[:, :, :3]  # 取前3个通道 (BGR)',
-            'print(f"彩色帧: {frame_width}x{frame_height}, 数据范围: {frame_bgr.min()}-{frame_bgr.max()}")',
+            '# Kinect v2 提供 BGRA 格式，取前 3 个通道即为 BGR',
+            'return bundle.color',
             'print(f"彩色帧处理错误: {e}")'
         ]
         
@@ -76,8 +71,7 @@ def test_color_frame_fixes():
         # 检查Qt显示的颜色转换
         display_improvements = [
             'if stream_type == "color":',
-            'frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)',
-            'QImage(frame_rgb.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)'
+            'QImage(frame.data, width, height, bytes_per_line, QImage.Format.Format_BGR888)'
         ]
         
         for improvement in display_improvements:
@@ -100,6 +94,8 @@ def test_3d_coordinate_multi_sensor():
     try:
         with open('ui/main_window.py', 'r', encoding='utf-8') as f:
             content = f.read()
+        with open('ui/kinect_frames.py', 'r', encoding='utf-8') as f:
+            content += f.read()
         
         # 检查多传感器初始化
         multi_sensor_features = [
@@ -119,18 +115,13 @@ def test_3d_coordinate_multi_sensor():
                 print(f"❌ 缺少多传感器功能: {feature[:40]}...")
                 return False
         
-        # 检查改进的深度帧获取
+        # 检查帧组同步的深度帧获取（每周期获取一次，所有检测共享）
         depth_improvements = [
-            '# 获取深度数据 - 改进的同步策略',
-            'for attempt in range(5):  # 增加重试次数',
-            '# 方法1：检查是否有新的深度帧',
-            '# 方法2：直接获取最后的深度帧',
-            'print(f"方法1成功获取深度帧 (尝试{attempt+1})")',
-            'print(f"方法2成功获取深度帧 (尝试{attempt+1})")',
-            'time.sleep(0.005)  # 5ms等待',
+            'class KinectFrameSource',
+            'def poll(self, need_depth=False)',
+            "bundle = packet.extras.get('bundle')",
+            'self.depth_stalls += 1',
             'print("⚠️  无法获取深度帧")',
-            'print("📝 建议:")',
-            'print("   4. 在Kinect设置中同时启用彩色和深度传感器")'
         ]
         
         for improvement in depth_improvements:
@@ -222,14 +213,8 @@ def test_debugging_output():
         with open('ui/main_window.py', 'r', encoding='utf-8') as f:
             content = f.read()
         
-        # 检查调试输出
+        # 检查调试输出（逐帧输出已由阶段延迟统计取代）
         debug_outputs = [
-            'print(f"人体索引帧包含值: {unique_values}")',
-            'print(f"检测到人体索引 {i}: {np.sum(mask)} 像素")',
-            'print("未检测到人体，显示原始索引数据")',
-            'print(f"彩色帧: {frame_width}x{frame_height}, 数据范围: {frame_bgr.min()}-{frame_bgr.max()}")',
-            'print(f"方法1成功获取深度帧 (尝试{attempt+1})")',
-            'print(f"方法2成功获取深度帧 (尝试{attempt+1})")',
             'print("🎯 3D坐标模式：同时启用彩色和深度传感器")',
             'print(f"📷 添加额外传感器: {stream_type}")',
             'print(f"🔧 Kinect初始化类型: {frame_types}")',
@@ -243,6 +228,16 @@ def test_debugging_output():
                 print(f"❌ 缺少调试输出: {debug_output[:40]}...")
                 return False
         
+        per_frame_outputs = [
+            'print(f"人体索引帧包含值: {unique_values}")',
+            'print(f"彩色帧: {frame_width}x{frame_height}',
+        ]
+        for debug_output in per_frame_outputs:
+            if debug_output in content:
+                print(f"❌ 采集循环中仍有逐帧输出: {debug_output[:40]}...")
+                return False
+        print("✅ 采集循环中无逐帧调试输出")
+        
         return True
         
     except Exception as e:
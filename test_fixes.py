@@ -87,10 +87,9 @@ def test_color_fixes():
         
         # 检查颜色处理改进
         color_improvements = [
-            'frame_bgr = frame[:, :, :3]',  # 直接取BGR通道
+            'return bundle.color',  # 帧组中已是BGR通道
             'if stream_type == "color":',
-            'frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)',
-            'QImage.Format.Format_RGB888)',
+            'QImage.Format.Format_BGR888)',
             'except Exception as e:',
             'print(f"彩色帧处理错误: {e}")'
         ]
@@ -102,26 +101,12 @@ def test_color_fixes():
                 print(f"❌ 缺少颜色修复: {improvement[:40]}...")
                 return False
         
-        # 检查是否移除了错误的rgbSwapped调用
-        if 'rgbSwapped()' in content:
-            # 应该只在非彩色流中使用rgbSwapped
-            lines = content.split('\n')
-            rgbSwapped_lines = [i for i, line in enumerate(lines) if 'rgbSwapped()' in line]
-            
-            if len(rgbSwapped_lines) == 1:
-                # 检查上下文，确保只在else分支中使用
-                line_content = lines[rgbSwapped_lines[0]]
-                if 'else:' in content[content.rfind('else:', 0, content.find(line_content))::]:
-                    print("✅ rgbSwapped()正确地只用于非彩色流")
-                else:
-                    print("❌ rgbSwapped()使用位置不正确")
-                    return False
-            else:
-                print(f"❌ rgbSwapped()使用次数不正确: {len(rgbSwapped_lines)}")
+        # 显示路径以 BGR888 直接包装帧，不应再有颜色转换副本
+        for conversion in ('rgbSwapped()', 'cv2.COLOR_BGR2RGB'):
+            if conversion in content:
+                print(f"❌ 显示路径中仍有颜色转换: {conversion}")
                 return False
-        else:
-            print("❌ 缺少rgbSwapped()处理")
-            return False
+        print("✅ 所有流类型都以 BGR888 零拷贝显示")
         
         return True
         
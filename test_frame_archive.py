@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+原始帧归档测试脚本
+测试固定步长帧文件的写入、零拷贝随机访问、按时间查找与中断恢复
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+
+def test_roundtrip_and_random_access():
+    """测试写入后按帧号零拷贝读取"""
+    print("🧪 测试帧归档读写...")
+
+    try:
+        from ui.frame_archive import FrameArchive, FrameArchiveWriter
+
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = FrameArchiveWriter(tmp, 'depth', (424, 512), np.uint16, meta={'fps': 30})
+            frames = [np.full((424, 512), 1000 + i, dtype=np.uint16) for i in range(20)]
+            for i, frame in enumerate(frames):
+                assert writer.append(frame, i / 30.0) == i
+            writer.close()
+
+            archive = FrameArchive(tmp, 'depth')
+            assert len(archive) == 20 and archive.shape == (424, 512)
+            assert archive.meta == {'fps': 30}
+            for i in (0, 7, 19, -1):
+                assert np.array_equal(archive[i], frames[i])
+            assert isinstance(archive[5], np.memmap), "帧应为 memmap 视图"
+            print("✅ 20 帧深度帧随机访问一致，帧为零拷贝 memmap 视图")
+            archive.close()
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 帧归档读写测试失败: {e}")
+        return False
+
+def test_time_lookup():
+    """测试按时间戳查找帧"""
+    print("\n🧪 测试按时间查找...")
+
+    try:
+        from ui.frame_archive import FrameArchive, FrameArchiveWriter
+
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = FrameArchiveWriter(tmp, 'color', (8,), np.uint8)
+            for i in range(10):
+                writer.append(np.full(8, i, dtype=np.uint8), 1.0 + i * 0.1)
+            writer.close()
+
+            archive = FrameArchive(tmp, 'color')
+            assert archive.index_at(0.5) == -1 and archive.frame_at(0.5) is None
+            assert archive.index_at(1.0) == 0
+            assert archive.index_at(1.55) == 5
+            assert int(archive.frame_at(100.0)[0]) == 9
+            print("✅ 时间戳查找返回不晚于给定时间的最新帧")
+            archive.close()
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 按时间查找测试失败: {e}")
+        return False
+
+def test_interrupted_and_live_tail():
+    """测试录制中断时的截断与录制中的增量读取"""
+    print("\n🧪 测试中断恢复与增量读取...")
+
+    try:
+        from ui.frame_archive import FrameArchive, FrameArchiveWriter, archive_paths
+
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = FrameArchiveWriter(tmp, 'ir', (16, 16), np.uint16)
+            for i in range(3):
+                writer.append(np.full((16, 16), i, dtype=np.uint16), float(i))
+            writer.flush()
+
+            archive = FrameArchive(tmp, 'ir')
+            assert len(archive) == 3
+            writer.append(np.full((16, 16), 3, dtype=np.uint16), 3.0)
+            writer.flush()
+            assert archive.refresh() == 4 and int(archive[3][0, 0]) == 3
+            print("✅ refresh() 读取到录制中新追加的帧")
+            writer.close()
+            archive.close()
+
+            # 模拟中断：帧数据只写了一半且没有时间戳
+            frames_path, _ = archive_paths(tmp, 'ir')
+            with open(frames_path, 'ab') as f:
+                f.write(b'\x00' * 100)
+            archive = FrameArchive(tmp, 'ir')
+            assert len(archive) == 4
+            print("✅ 不完整的末尾帧被忽略")
+            archive.close()
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 中断恢复测试失败: {e}")
+        return False
+
+def test_color_write_throughput():
+    """测试 1920x1080 BGRA 彩色帧写入速度"""
+    print("\n🧪 测试彩色帧写入速度...")
+
+    try:
+        from ui.frame_archive import FrameArchiveWriter
+
+        frame = np.zeros(1920 * 1080 * 4, dtype=np.uint8)
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = FrameArchiveWriter(tmp, 'color', frame.shape, frame.dtype)
+            start = time.perf_counter()
+            for i in range(30):
+                writer.append(frame, i / 30.0)
+            writer.close()
+            elapsed = time.perf_counter() - start
+        print(f"✅ 30 帧彩色帧写入耗时 {elapsed * 1000:.0f}ms ({30 / elapsed:.0f} FPS)")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 写入速度测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 原始帧归档测试")
+    print("=" * 60)
+
+    tests = [
+        ("读写与随机访问", test_roundtrip_and_random_access),
+        ("按时间查找", test_time_lookup),
+        ("中断恢复与增量读取", test_interrupted_and_live_tail),
+        ("彩色帧写入速度", test_color_write_throughput),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试异常: {e}")
+            results.append((test_name, False))
+
+    # 显示测试结果
+    print("\n" + "=" * 60)
+    print("📊 帧归档测试结果")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("\n🎉 帧归档测试通过！")
+        return 0
+    else:
+        print("\n⚠️  部分测试失败，请检查实现。")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
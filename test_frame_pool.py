@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+帧缓冲池测试脚本
+测试租约引用计数、缓冲区复用、池耗尽统计、显示帧零分配与流水线丢帧归还
+"""
+
+import sys
+import os
+import time
+import threading
+import tracemalloc
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+
+def test_lease_refcount():
+    """测试所有持有者归还后缓冲区才回到池中"""
+    print("🧪 测试租约引用计数...")
+
+    try:
+        from ui.frame_pool import FramePool
+
+        pool = FramePool('capture', (480, 640, 3), np.uint8, capacity=2)
+        lease = pool.acquire()
+        buffer = lease.array
+        lease.retain()  # 推理阶段
+        assert pool.in_use == 1
+        lease.release()  # 采集循环
+        assert pool.in_use == 1, "仍有持有者时缓冲区不应归还"
+        lease.release()  # 推理阶段
+        assert pool.in_use == 0
+
+        again = pool.acquire()
+        assert again.array is buffer, "归还的缓冲区应被复用"
+        again.release()
+        try:
+            again.release()
+            print("❌ 重复归还未报错")
+            return False
+        except RuntimeError:
+            pass
+        print("✅ 引用计数归零后缓冲区被复用，重复归还会报错")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 租约引用计数测试失败: {e}")
+        return False
+
+def test_exhaustion_and_resize():
+    """测试池耗尽时临时分配并计数，形状变化时替换池"""
+    print("\n🧪 测试池耗尽与尺寸变化...")
+
+    try:
+        from ui.frame_pool import FramePoolSet, format_pool_stats
+
+        pools = FramePoolSet(capacity=2)
+        leases = [pools.lease('display', (10, 10, 3)) for _ in range(3)]
+        stats = pools.stats()['display']
+        assert stats['in_use'] == 2 and stats['exhausted'] == 1 and stats['peak_in_use'] == 2
+        assert "display:2/2!1" in format_pool_stats(pools.stats())
+        for lease in leases:
+            lease.release()
+        assert pools.stats()['display']['in_use'] == 0
+        print("✅ 池耗尽时不阻塞，耗尽次数被统计")
+
+        old = pools.get('display', (10, 10, 3))
+        assert pools.get('display', (20, 20, 3)) is not old and pools.resized == 1
+        print("✅ 请求的形状变化时替换为新池")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 池耗尽与尺寸变化测试失败: {e}")
+        return False
+
+def test_display_frame_steady_state():
+    """测试显示帧写入缓冲池后稳态不再分配大块内存"""
+    print("\n🧪 测试显示帧稳态分配...")
+
+    try:
+        from ui.frame_pool import FramePoolSet
+        from ui.render import prepare_display_frame
+
+        bgra = np.random.default_rng(0).integers(0, 255, (1080, 1920, 4), dtype=np.uint8)
+        frame = bgra[:, :, :3]  # 与 Kinect 帧组中的彩色帧相同的 BGR 视图
+        pools = FramePoolSet()
+
+        expected, scale = prepare_display_frame(frame, (800, 600))
+        lease, pooled_scale = prepare_display_frame(frame, (800, 600), pools)
+        assert np.array_equal(lease.array, expected) and scale == pooled_scale
+        lease.release()
+
+        tracemalloc.start()
+        for _ in range(10):
+            lease, _ = prepare_display_frame(frame, (800, 600), pools)
+            lease.release()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert peak < 64 * 1024, f"稳态分配峰值 {peak / 1024:.0f} KB"
+        assert all(s['exhausted'] == 0 and s['in_use'] == 0 for s in pools.stats().values())
+        print(f"✅ 池化输出与直接输出一致，10 帧分配峰值 {peak / 1024:.1f} KB")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 显示帧稳态分配测试失败: {e}")
+        return False
+
+def test_pipeline_returns_dropped_frames():
+    """测试推理前被覆盖的帧与推理后的帧都归还缓冲区"""
+    print("\n🧪 测试流水线归还缓冲区...")
+
+    try:
+        from ui.frame_pool import FramePool
+        from ui.pipeline import DetectionPipeline, FramePacket
+
+        pool = FramePool('capture', (4, 4), capacity=4)
+        gate = threading.Event()
+
+        def infer(packet):
+            gate.wait(1.0)
+            packet.release()
+            return packet
+
+        pipeline = DetectionPipeline(infer=infer, on_result=lambda packet: None)
+        pipeline.start()
+        for frame_id in range(20):
+            lease = pool.acquire()
+            packet = FramePacket(frame_id, time.time(), lease.array)
+            packet.lease = lease.retain()
+            pipeline.submit(packet)
+            lease.release()
+        gate.set()
+        deadline = time.time() + 2.0
+        while pool.in_use and time.time() < deadline:
+            time.sleep(0.01)
+        pipeline.stop()
+
+        assert pool.in_use == 0, f"仍有 {pool.in_use} 个缓冲区未归还"
+        assert pool.exhausted == 0, "丢弃的帧未及时归还导致池耗尽"
+        print(f"✅ 20 帧投递（丢弃 {pipeline.infer_slot.dropped} 帧）后缓冲区全部归还，未耗尽")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 流水线归还缓冲区测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 帧缓冲池测试")
+    print("=" * 60)
+
+    tests = [
+        ("租约引用计数", test_lease_refcount),
+        ("池耗尽与尺寸变化", test_exhaustion_and_resize),
+        ("显示帧稳态分配", test_display_frame_steady_state),
+        ("流水线归还缓冲区", test_pipeline_returns_dropped_frames),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试异常: {e}")
+            results.append((test_name, False))
+
+    # 显示测试结果
+    print("\n" + "=" * 60)
+    print("📊 帧缓冲池测试结果")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("\n🎉 帧缓冲池测试通过！")
+        return 0
+    else:
+        print("\n⚠️  部分测试失败，请检查实现。")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
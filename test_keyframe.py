@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+关键帧检测测试脚本
+测试光流传播检测框、跟踪 ID 沿用、关键帧间隔调度（CPU 预算与运动）以及吞吐量提升
+"""
+
+import sys
+import os
+import time
+
+import cv2
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+
+def _texture(shape, seed):
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 255, (shape[0] // 8, shape[1] // 8, 3), dtype=np.uint8)
+    return cv2.resize(noise, (shape[1], shape[0]), interpolation=cv2.INTER_LINEAR)
+
+
+def _frames(count, step=(6, 2), size=(1080, 1920), box=(400, 300, 700, 560)):
+    """纹理背景上匀速移动的纹理方块，返回 [(帧, 方块 xyxy)]"""
+    background = _texture(size, 0)
+    patch = _texture((box[3] - box[1], box[2] - box[0]), 1)
+    frames = []
+    for i in range(count):
+        x1, y1 = box[0] + step[0] * i, box[1] + step[1] * i
+        frame = background.copy()
+        frame[y1:y1 + patch.shape[0], x1:x1 + patch.shape[1]] = patch
+        frames.append((frame, np.array([x1, y1, x1 + patch.shape[1], y1 + patch.shape[0]], dtype=np.float32)))
+    return frames
+
+
+def _detector(frames_by_id, delay=0.0):
+    """按帧返回真实方块位置的检测器，delay 模拟模型推理耗时"""
+    from ui.postprocess import DetectionBatch
+
+    calls = []
+    names = np.array(['cup'], dtype=object)
+
+    def detect(image):
+        calls.append(image)
+        if delay:
+            time.sleep(delay)
+        box = frames_by_id[id(image)]
+        return DetectionBatch(boxes=box[None, :].copy(), scores=np.array([0.9], dtype=np.float32),
+                              class_ids=np.array([0], dtype=np.int32), names=names)
+    return detect, calls
+
+
+def test_flow_tracking():
+    """测试光流传播检测框、跟踪 ID 沿用与帧尺寸变化"""
+    print("🧪 测试光流跟踪...")
+
+    try:
+        from ui.keyframe import TrackAndSkip, KeyframeScheduler, box_iou
+
+        frames = _frames(12)
+        detect, calls = _detector({id(f): b for f, b in frames})
+        tracker = TrackAndSkip(KeyframeScheduler(min_interval=6, max_interval=6))
+
+        ids = set()
+        worst = 1.0
+        for i, (frame, truth) in enumerate(frames):
+            batch, keyframe = tracker.process(i, i / 30.0, frame, detect)
+            ids.update(batch.track_ids.tolist())
+            worst = min(worst, float(box_iou(batch.boxes, truth[None, :])[0, 0]))
+            assert batch.to_dicts()[0]['track_id'] == 1
+        assert len(calls) == 2, len(calls)
+        assert worst > 0.9, worst
+        assert ids == {1}
+        print(f"✅ 12 帧检测 {len(calls)} 次，跟踪框与真实位置 IoU ≥ {worst:.3f}，ID 保持不变")
+
+        # 帧尺寸变化（切换分辨率）时不跟踪，保持原框到下一个关键帧
+        from ui.keyframe import FlowTracker
+        flow = FlowTracker()
+        small = cv2.resize(frames[0][0], (640, 480))
+        flow.reset(small, [[100, 100, 200, 200]])
+        boxes, motion, lost = flow.track(frames[1][0])
+        assert np.array_equal(boxes, [[100, 100, 200, 200]]) and motion == 0.0 and lost == 0.0
+        flow.reset(frames[1][0], frames[1][1][None, :])
+        boxes, _, _ = flow.track(frames[2][0])
+        assert box_iou(boxes, frames[2][1][None, :])[0, 0] > 0.9
+        print("✅ 640x480 切换到 1920x1080 时保持原框，重新开始后继续跟踪")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 光流跟踪测试失败: {e}")
+        return False
+
+def test_scheduler():
+    """测试关键帧间隔随 CPU 预算与运动调整"""
+    print("\n🧪 测试关键帧调度...")
+
+    try:
+        from ui.keyframe import KeyframeScheduler
+
+        # 检测 100ms、帧间隔 33ms、预算 50%：检测器均摊后不超过一半 CPU 至少需要间隔 5
+        scheduler = KeyframeScheduler(max_interval=10, cpu_budget=0.5)
+        scheduler.note_frame_period(0.033)
+        scheduler.detected(0.1)
+        assert scheduler.budget_interval == 5 and scheduler.interval == 5
+        print(f"✅ 预算间隔 {scheduler.budget_interval}")
+
+        # 静止画面：运动间隔逐步增加到上限
+        scheduler = KeyframeScheduler(max_interval=6, cpu_budget=1.0)
+        for _ in range(10):
+            scheduler.detected(0.01)
+            scheduler.tracked_frame(0.001, 0.0)
+        assert scheduler.interval == 6
+        # 快速运动：减半；跟踪点大量丢失：下一帧强制检测
+        scheduler.tracked_frame(0.2, 0.0)
+        scheduler.detected(0.01)
+        assert scheduler.interval == 3
+        scheduler.tracked_frame(0.0, 0.8)
+        assert scheduler.should_detect() and scheduler.motion_interval == 1
+        print("✅ 静止画面间隔增大，快速运动减半，跟踪丢失立即重新检测")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 关键帧调度测试失败: {e}")
+        return False
+
+def test_throughput():
+    """测试 CPU 预算下检测结果吞吐量提升"""
+    print("\n🧪 测试吞吐量...")
+
+    try:
+        from ui.keyframe import TrackAndSkip, KeyframeScheduler
+
+        frames = _frames(60, step=(2, 1))
+        truth = {id(f): b for f, b in frames}
+        delay = 0.06  # CPU 上 yolo11n 推理 1080p 帧的典型耗时
+
+        detect, calls = _detector(truth, delay)
+        start = time.perf_counter()
+        for frame, _ in frames[:15]:
+            detect(frame)
+        baseline = 15 / (time.perf_counter() - start)
+
+        detect, calls = _detector(truth, delay)
+        tracker = TrackAndSkip(KeyframeScheduler(max_interval=8, cpu_budget=0.3))
+        start = time.perf_counter()
+        for i, (frame, _) in enumerate(frames):
+            tracker.process(i, i / 30.0, frame, detect)
+        throughput = len(frames) / (time.perf_counter() - start)
+        speedup = throughput / baseline
+        stats = tracker.stats()
+        assert speedup >= 3.0, speedup
+        print(f"✅ 每帧检测 {baseline:.1f} FPS，关键帧检测 {throughput:.1f} FPS ({speedup:.1f}x)，"
+              f"间隔 {stats['interval']}，检测 {stats['keyframe_ratio']:.0%}")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 吞吐量测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 关键帧检测测试")
+    print("=" * 60)
+
+    tests = [
+        ("光流跟踪", test_flow_tracking),
+        ("关键帧调度", test_scheduler),
+        ("吞吐量", test_throughput),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试出现异常: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 60)
+    print("📊 测试结果总结:")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("🎉 关键帧检测测试通过！")
+    else:
+        print("⚠️  部分测试失败，请检查相关功能")
+
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Kinect 帧组采集测试脚本
+使用模拟的 PyKinectRuntime 测试彩色/深度帧配对、停顿与时间差统计
+"""
+
+import sys
+import os
+import time
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+
+class FakeDesc:
+    def __init__(self, width, height):
+        self.Width = width
+        self.Height = height
+
+
+class FakeKinect:
+    """按调用方设置的标志提供新帧的模拟运行时"""
+    def __init__(self):
+        self.color_frame_desc = FakeDesc(64, 36)
+        self.depth_frame_desc = FakeDesc(32, 24)
+        self.new_color = False
+        self.new_depth = False
+        self.depth_reads = 0
+
+    def has_new_color_frame(self):
+        return self.new_color
+
+    def get_last_color_frame(self):
+        self.new_color = False
+        return np.full(64 * 36 * 4, 7, dtype=np.uint8)
+
+    def has_new_depth_frame(self):
+        return self.new_depth
+
+    def get_last_depth_frame(self):
+        self.new_depth = False
+        self.depth_reads += 1
+        return np.full(32 * 24, 1000 + self.depth_reads, dtype=np.uint16)
+
+
+def test_bundle_pairing():
+    """测试彩色帧与最新深度帧配对"""
+    print("🧪 测试帧组配对...")
+
+    try:
+        from ui.kinect_frames import KinectFrameSource
+
+        kinect = FakeKinect()
+        source = KinectFrameSource(kinect)
+
+        assert source.poll(need_depth=True) is None
+        print("✅ 无新彩色帧时返回 None")
+
+        kinect.new_depth = True
+        kinect.new_color = True
+        bundle = source.poll(need_depth=True)
+        assert bundle.color.shape == (36, 64, 3)
+        assert bundle.depth.shape == (24, 32) and bundle.depth[0, 0] == 1001
+        assert bundle.skew_ms is not None and bundle.skew_ms >= 0
+        print(f"✅ 帧组包含彩色 {bundle.color.shape} 与深度 {bundle.depth.shape}，时间差 {bundle.skew_ms:.3f}ms")
+
+        # 深度未更新时复用缓存的最新深度帧
+        kinect.new_color = True
+        bundle = source.poll(need_depth=True)
+        assert bundle.depth[0, 0] == 1001 and kinect.depth_reads == 1
+        print("✅ 深度未更新时复用最新深度帧，不重复读取")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 帧组配对测试失败: {e}")
+        return False
+
+def test_depth_stall():
+    """测试深度帧过旧时计为停顿"""
+    print("\n🧪 测试深度停顿统计...")
+
+    try:
+        from ui.kinect_frames import KinectFrameSource
+
+        kinect = FakeKinect()
+        source = KinectFrameSource(kinect, max_skew_ms=5)
+
+        kinect.new_color = True
+        bundle = source.poll(need_depth=True)
+        assert bundle.depth is None
+        print("✅ 无深度帧时帧组不带深度")
+
+        kinect.new_depth = True
+        kinect.new_color = True
+        source.poll(need_depth=True)
+        time.sleep(0.02)
+        kinect.new_color = True
+        bundle = source.poll(need_depth=True)
+        assert bundle.depth is None
+        stats = source.stats()
+        assert stats['depth_stalls'] == 2 and stats['bundles'] == 3
+        print(f"✅ 统计: {stats}")
+
+        kinect.new_color = True
+        kinect.new_depth = True
+        bundle = source.poll(need_depth=False)
+        assert bundle.depth is None and kinect.new_depth
+        print("✅ 不需要深度时不读取深度帧")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 深度停顿测试失败: {e}")
+        return False
+
+def test_no_retry_loop():
+    """检查 3D 计算不再逐检测重试获取深度帧"""
+    print("\n🧪 检查 3D 坐标计算的深度获取方式...")
+
+    try:
+        with open('ui/main_window.py', 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        start = content.index('def _calculate_3d_coordinates')
+        end = content.index('def stop(self):', start)
+        body = content[start:end]
+
+        if 'time.sleep' in body or 'for attempt in range' in body:
+            print("❌ 3D 坐标计算中仍有重试/休眠")
+            return False
+        print("✅ 3D 坐标计算中已无重试/休眠")
+
+        if "packet.extras.get('bundle')" in content:
+            print("✅ 3D 阶段使用帧组中的深度图")
+        else:
+            print("❌ 3D 阶段未使用帧组")
+            return False
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 检查失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis Kinect 帧组采集测试")
+    print("=" * 60)
+
+    tests = [
+        ("帧组配对", test_bundle_pairing),
+        ("深度停顿", test_depth_stall),
+        ("移除重试循环", test_no_retry_loop),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试异常: {e}")
+            results.append((test_name, False))
+
+    # 显示测试结果
+    print("\n" + "=" * 60)
+    print("📊 帧组采集测试结果")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("\n🎉 帧组采集测试通过！")
+        return 0
+    else:
+        print("\n⚠️  部分测试失败，请检查实现。")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
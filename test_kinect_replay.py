@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Kinect 录制与回放测试脚本
+录制合成的彩色/深度会话，再通过回放替身驱动帧组采集
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+
+class FakeDesc:
+    def __init__(self, width, height):
+        self.Width = width
+        self.Height = height
+
+
+def write_session(path, color_frames=10, color_fps=30.0, depth_fps=15.0):
+    """写入合成会话：彩色帧内容为帧序号，深度帧内容为 1000 + 帧序号"""
+    from ui.kinect_replay import KinectRecorder
+
+    recorder = KinectRecorder(path, ['color', 'depth'])
+    color_desc, depth_desc = FakeDesc(64, 36), FakeDesc(32, 24)
+    duration = color_frames / color_fps
+    for i in range(int(duration * depth_fps)):
+        recorder.append('depth', np.full(32 * 24, 1000 + i, dtype=np.uint16), depth_desc,
+                        timestamp=i / depth_fps)
+    for i in range(color_frames):
+        recorder.append('color', np.full(64 * 36 * 4, i, dtype=np.uint8), color_desc,
+                        timestamp=i / color_fps + 0.001)
+    recorder.close()
+    return recorder
+
+
+def test_record_roundtrip():
+    """测试录制后回放帧内容与描述一致"""
+    print("🧪 测试录制与读取...")
+
+    try:
+        from ui.kinect_replay import KinectReplay
+
+        with tempfile.TemporaryDirectory() as tmp:
+            recorder = write_session(tmp)
+            assert recorder.frame_counts == {'color': 10, 'depth': 5}
+
+            replay = KinectReplay(tmp, pacing='fast')
+            assert (replay.color_frame_desc.Width, replay.color_frame_desc.Height) == (64, 36)
+            assert (replay.depth_frame_desc.Width, replay.depth_frame_desc.Height) == (32, 24)
+            assert not hasattr(replay, 'infrared_frame_desc')
+            assert not replay.has_new_infrared_frame()
+            print("✅ 帧描述与录制一致，未录制的流没有新帧")
+
+            colors = []
+            while replay.has_new_color_frame():
+                colors.append(int(replay.get_last_color_frame()[0]))
+            assert colors == list(range(10)), colors
+            assert replay.finished
+            print("✅ fast 模式按顺序取出全部 10 帧彩色帧")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 录制回放测试失败: {e}")
+        return False
+
+def test_replay_drives_frame_source():
+    """测试回放替身驱动 KinectFrameSource 的深度配对"""
+    print("\n🧪 测试回放驱动帧组采集...")
+
+    try:
+        from ui.kinect_replay import KinectReplay
+        from ui.kinect_frames import KinectFrameSource
+
+        with tempfile.TemporaryDirectory() as tmp:
+            write_session(tmp)
+            source = KinectFrameSource(KinectReplay(tmp, pacing='fast'))
+            pairs = []
+            while True:
+                bundle = source.poll(need_depth=True)
+                if bundle is None:
+                    break
+                pairs.append((int(bundle.color[0, 0, 0]), int(bundle.depth[0, 0])))
+
+            # 彩色 30 FPS、深度 15 FPS：每个深度帧对应两个彩色帧
+            expected = [(i, 1000 + i // 2) for i in range(10)]
+            assert pairs == expected, pairs
+            print(f"✅ {len(pairs)} 个帧组均与录制时间之前的最新深度帧配对")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 回放驱动测试失败: {e}")
+        return False
+
+def test_pacing():
+    """测试实时/固定帧率节奏与循环回放"""
+    print("\n🧪 测试回放节奏...")
+
+    try:
+        from ui.kinect_replay import KinectReplay
+
+        with tempfile.TemporaryDirectory() as tmp:
+            write_session(tmp, color_frames=6)
+
+            replay = KinectReplay(tmp, pacing='realtime')
+            assert replay.has_new_color_frame()
+            first = int(replay.get_last_color_frame()[0])
+            assert first == 0 and not replay.has_new_color_frame()
+            time.sleep(0.12)
+            assert int(replay.get_last_color_frame()[0]) >= 3
+            print("✅ realtime 模式按录制时间出帧")
+
+            replay = KinectReplay(tmp, pacing='fixed', fps=1000.0)
+            time.sleep(0.02)
+            assert int(replay.get_last_color_frame()[0]) == 5
+            print("✅ fixed 模式按给定帧率出帧")
+
+            replay = KinectReplay(tmp, pacing='fast', loop=True)
+            frames = [int(replay.get_last_color_frame()[0]) for _ in range(8)
+                      if replay.has_new_color_frame()]
+            assert frames == [0, 1, 2, 3, 4, 5, 0, 1] and replay.loops == 1, frames
+            print("✅ loop 模式结束后从头回放")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 回放节奏测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis Kinect 录制与回放测试")
+    print("=" * 60)
+
+    tests = [
+        ("录制与读取", test_record_roundtrip),
+        ("回放驱动帧组采集", test_replay_drives_frame_source),
+        ("回放节奏", test_pacing),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试异常: {e}")
+            results.append((test_name, False))
+
+    # 显示测试结果
+    print("\n" + "=" * 60)
+    print("📊 录制与回放测试结果")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("\n🎉 录制与回放测试通过！")
+        return 0
+    else:
+        print("\n⚠️  部分测试失败，请检查实现。")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
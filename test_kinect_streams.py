@@ -133,7 +133,7 @@ def test_video_display_improvements():
         with open('ui/main_window.py', 'r', encoding='utf-8') as f:
             content = f.read()
         
-        if 'def update_frame(self, frame, detections=None, stream_type="color")' in content:
+        if 'def update_frame(self, frame, detections=None, stream_type="color"' in content:
             print("✅ update_frame 方法支持 stream_type 参数")
         else:
             print("❌ update_frame 方法缺少 stream_type 参数")
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+阶段延迟统计测试脚本
+测试滚动直方图的分位数精度、窗口淘汰、记录开销与统计文本
+"""
+
+import sys
+import os
+import time
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+
+def test_percentile_accuracy():
+    """测试直方图分位数与精确分位数的误差"""
+    print("🧪 测试分位数精度...")
+
+    try:
+        from ui.latency import LatencyHistogram
+
+        rng = np.random.default_rng(0)
+        samples = rng.lognormal(mean=np.log(8.0), sigma=0.5, size=300)
+        histogram = LatencyHistogram(window=300)
+        for value in samples:
+            histogram.record(float(value))
+
+        for q in (50, 95, 99):
+            exact = float(np.percentile(samples, q))
+            approx = histogram.percentile(q)
+            error = abs(approx - exact) / exact
+            assert error < 0.1, f"p{q} 误差 {error:.1%}"
+            print(f"✅ p{q}: 精确 {exact:.2f}ms, 直方图 {approx:.2f}ms (误差 {error:.1%})")
+        assert abs(histogram.mean_ms - samples.mean()) < 1e-6
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 分位数精度测试失败: {e}")
+        return False
+
+def test_rolling_window():
+    """测试旧样本被挤出窗口"""
+    print("\n🧪 测试滚动窗口...")
+
+    try:
+        from ui.latency import LatencyHistogram
+
+        histogram = LatencyHistogram(window=50)
+        for _ in range(50):
+            histogram.record(100.0)
+        for _ in range(50):
+            histogram.record(2.0)
+
+        assert histogram.size == 50 and histogram.total == 100
+        assert histogram.percentile(99) < 2.5, "窗口外的旧样本仍计入分位数"
+        assert abs(histogram.mean_ms - 2.0) < 1e-9
+        print("✅ 窗口只统计最近 50 个样本")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 滚动窗口测试失败: {e}")
+        return False
+
+def test_monitor_overhead():
+    """测试每帧全部阶段的记录开销低于 30 FPS 帧时间的 1%"""
+    print("\n🧪 测试记录开销...")
+
+    try:
+        from ui.latency import LatencyMonitor, STAGES
+
+        monitor = LatencyMonitor()
+        frames = 2000
+        start = time.perf_counter()
+        for _ in range(frames):
+            t = time.perf_counter()
+            for stage in STAGES:
+                monitor.record(stage, time.perf_counter() - t)
+        per_frame = (time.perf_counter() - start) / frames
+        ratio = per_frame / (1 / 30.0)
+        assert ratio < 0.01, f"记录开销占帧时间 {ratio:.2%}"
+        print(f"✅ 每帧 {len(STAGES)} 个阶段记录耗时 {per_frame * 1e6:.1f}µs，占帧时间 {ratio:.3%}")
+
+        with monitor.measure('infer'):
+            time.sleep(0.005)
+        assert monitor.snapshot()['infer']['last_ms'] >= 5.0
+        print("✅ measure() 上下文管理器记录耗时")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 记录开销测试失败: {e}")
+        return False
+
+def test_format_lines():
+    """测试统计面板与视频叠加层文本"""
+    print("\n🧪 测试统计文本...")
+
+    try:
+        from ui.latency import LatencyMonitor, format_latency_lines, format_overlay_lines
+
+        monitor = LatencyMonitor()
+        monitor.record('infer', 0.020)
+        monitor.record('acquire', 0.002)
+        snapshot = monitor.snapshot()
+        assert list(snapshot) == ['acquire', 'infer'], "阶段应按流水线顺序排列"
+
+        stats = {'capture_fps': 30.0, 'infer_fps': 15.0, 'display_fps': 29.5,
+                 'infer': {'dropped': 4}, 'display': {'dropped': 1}}
+        lines = format_latency_lines(snapshot, stats)
+        assert lines[0].startswith("FPS") and "infer:4" in lines[1]
+        assert any(line.startswith("推理") for line in lines)
+
+        overlay = format_overlay_lines(snapshot, stats)
+        assert all(line.isascii() for line in overlay), "cv2.putText 只支持 ASCII"
+        assert "drop 5" in overlay[0]
+        print("✅ 面板文本与 ASCII 叠加层文本格式正确")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 统计文本测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 阶段延迟统计测试")
+    print("=" * 60)
+
+    tests = [
+        ("分位数精度", test_percentile_accuracy),
+        ("滚动窗口", test_rolling_window),
+        ("记录开销", test_monitor_overhead),
+        ("统计文本", test_format_lines),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试异常: {e}")
+            results.append((test_name, False))
+
+    # 显示测试结果
+    print("\n" + "=" * 60)
+    print("📊 延迟统计测试结果")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("\n🎉 延迟统计测试通过！")
+        return 0
+    else:
+        print("\n⚠️  部分测试失败，请检查实现。")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
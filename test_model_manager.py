@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+模型管理测试脚本
+测试模型 LRU 缓存（数量与内存上限）、加载后预热与进度报告，以及后台线程加载不阻塞界面线程
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+
+class FakeModel:
+    """记录每次推理的输入尺寸"""
+
+    names = {0: 'cup'}
+
+    def __init__(self):
+        self.shapes = []
+
+    def __call__(self, images, **kwargs):
+        self.shapes.append(images.shape)
+        return []
+
+
+class FakeLoader:
+    """模拟加载耗时；模型文件大小决定估算内存"""
+
+    def __init__(self, directory, delay=0.05, size=256 * 1024):
+        self.directory = directory
+        self.delay = delay
+        self.size = size
+        self.loads = []
+
+    def __call__(self, model_path, backend, progress=None):
+        from ui.backends import InferenceEngine
+
+        path = os.path.join(self.directory, model_path)
+        with open(path, 'wb') as f:
+            f.write(b'\0' * self.size)
+        if progress is not None:
+            progress(50, f"加载 {model_path}")
+        time.sleep(self.delay)
+        self.loads.append((model_path, backend))
+        return InferenceEngine(FakeModel(), backend, model_path, path)
+
+
+def test_lru_cache():
+    """测试切换到缓存中的模型不重新加载，超过数量时淘汰最久未使用的模型"""
+    print("🧪 测试模型缓存...")
+
+    try:
+        from ui.model_manager import ModelManager
+
+        with tempfile.TemporaryDirectory() as tmp:
+            loader = FakeLoader(tmp)
+            manager = ModelManager(capacity=2, memory_cap_mb=1024, loader=loader)
+            nano = manager.get('yolo11n.pt')
+            small = manager.get('yolo11s.pt')
+            start = time.perf_counter()
+            assert manager.get('yolo11n.pt') is nano
+            switch_ms = (time.perf_counter() - start) * 1000
+            assert len(loader.loads) == 2 and switch_ms < 5.0
+            assert manager.cached('yolo11s.pt', 'pytorch') is small
+            assert manager.cached('yolo11s.pt', 'openvino') is None
+            print(f"✅ yolo11n ↔ yolo11s 切换 {switch_ms:.3f}ms，不重新加载")
+
+            # yolo11s 最近使用过，加载第三个模型时淘汰 yolo11n
+            manager.get('yolo11m.pt')
+            assert manager.cached('yolo11n.pt', 'pytorch') is None
+            assert manager.cached('yolo11s.pt', 'pytorch') is small
+            stats = manager.stats()
+            assert stats['evictions'] == 1 and stats['misses'] == 3, stats
+            print(f"✅ 超过缓存数量时淘汰最久未使用的模型: {stats['models']}")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 模型缓存测试失败: {e}")
+        return False
+
+def test_memory_cap():
+    """测试超过内存上限时淘汰模型，刚加载的模型总是保留"""
+    print("\n🧪 测试内存上限...")
+
+    try:
+        from ui.model_manager import MODEL_MEMORY_FACTOR, ModelManager
+
+        with tempfile.TemporaryDirectory() as tmp:
+            loader = FakeLoader(tmp, delay=0.0)
+            per_model = loader.size * MODEL_MEMORY_FACTOR / (1024 * 1024)
+            manager = ModelManager(capacity=8, memory_cap_mb=per_model * 2.5, loader=loader)
+            for name in ('a.pt', 'b.pt', 'c.pt'):
+                manager.get(name)
+            assert manager.stats()['models'] == ['b.pt (pytorch)', 'c.pt (pytorch)']
+            assert manager.memory_mb() <= manager.memory_cap_mb
+            print(f"✅ 每个模型约 {per_model:.1f}MB，上限 {manager.memory_cap_mb:.1f}MB 时保留 2 个")
+
+            manager.configure(8, per_model * 0.5)
+            assert manager.stats()['models'] == ['c.pt (pytorch)']
+            print("✅ 降低上限后立即淘汰，最近使用的模型保留")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 内存上限测试失败: {e}")
+        return False
+
+def test_warmup_progress():
+    """测试加载后以配置的输入尺寸预热，进度单调递增到 100"""
+    print("\n🧪 测试预热与进度...")
+
+    try:
+        from ui.model_manager import WARMUP_RUNS, ModelManager
+
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = ModelManager(loader=FakeLoader(tmp, delay=0.0))
+            steps = []
+            engine = manager.get('yolo11n.pt', 'onnxruntime', warmup_size=(1920, 1080),
+                                 progress=lambda percent, text: steps.append((percent, text)))
+            assert engine.model.shapes == [(1080, 1920, 3)] * WARMUP_RUNS
+            percents = [p for p, _ in steps]
+            assert percents == sorted(percents) and percents[-1] == 100
+            assert any('预热' in text for _, text in steps)
+            print(f"✅ 预热 {WARMUP_RUNS} 次 1920x1080，进度: {' → '.join(text for _, text in steps)}")
+
+            steps.clear()
+            manager.get('yolo11n.pt', 'onnxruntime', warmup_size=(1920, 1080),
+                        progress=lambda percent, text: steps.append((percent, text)))
+            assert steps == [(100, "已缓存")] and len(engine.model.shapes) == WARMUP_RUNS
+            print("✅ 缓存命中时不再预热")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 预热与进度测试失败: {e}")
+        return False
+
+def test_background_load():
+    """测试后台线程加载时界面线程的事件循环继续运行"""
+    print("\n🧪 测试后台加载...")
+
+    try:
+        from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+        from ui.main_window import ModelLoadThread
+        from ui.model_manager import ModelManager
+
+        app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = ModelManager(loader=FakeLoader(tmp, delay=0.3))
+            thread = ModelLoadThread(manager, 'yolo11n.pt', 'pytorch', (640, 640))
+            loop = QEventLoop()
+            loaded, progress, ticks = [], [], []
+            thread.loaded.connect(loaded.append)
+            thread.progress.connect(lambda percent, text: progress.append(percent))
+            thread.finished.connect(loop.quit)
+            timer = QTimer()
+            timer.timeout.connect(lambda: ticks.append(1))
+            timer.start(10)
+            QTimer.singleShot(5000, loop.quit)
+            thread.start()
+            loop.exec()
+            timer.stop()
+            thread.wait()
+            QCoreApplication.processEvents()
+            assert len(loaded) == 1 and loaded[0].model.shapes == [(640, 640, 3)] * 2
+            assert progress[-1] == 100
+            assert len(ticks) >= 10, len(ticks)
+            print(f"✅ 加载 0.3s 期间界面事件循环运行 {len(ticks)} 次，进度 {progress}")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 后台加载测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 模型管理测试")
+    print("=" * 60)
+
+    tests = [
+        ("模型缓存", test_lru_cache),
+        ("内存上限", test_memory_cap),
+        ("预热与进度", test_warmup_progress),
+        ("后台加载", test_background_load),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试出现异常: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 60)
+    print("📊 测试结果总结:")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("🎉 模型管理测试通过！")
+    else:
+        print("⚠️  部分测试失败，请检查相关功能")
+
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+变化门控测试脚本
+测试缩小图变化检测（灰度/深度）、跳过/局部/整帧推理的决策与节省的检测器 CPU
+"""
+
+import sys
+import os
+import time
+
+import cv2
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from test_tiling import CLASS_COLORS, BlobModel
+
+
+class RecordingBlobModel(BlobModel):
+    """按颜色找目标的模型（不限目标尺寸），记录每次调用的输入尺寸"""
+
+    def __init__(self):
+        super().__init__(min_side=0)
+        self.calls = []
+
+    def __call__(self, images, **kwargs):
+        images = images if isinstance(images, list) else [images]
+        self.calls.append([image.shape[:2] for image in images])
+        return super().__call__(images, **kwargs)
+
+
+def _scene(objects, seed=0, size=(1080, 1920)):
+    """带传感器噪声的静止背景 + 纯色目标"""
+    rng = np.random.default_rng(seed)
+    background = cv2.resize(np.random.default_rng(99).integers(40, 200, (27, 48, 3), dtype=np.uint8),
+                            (size[1], size[0]), interpolation=cv2.INTER_LINEAR)
+    noise = rng.integers(-3, 4, background.shape)
+    image = np.clip(background.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    for class_id, (x1, y1, x2, y2) in objects:
+        image[y1:y2, x1:x2] = CLASS_COLORS[class_id]
+    return image
+
+
+def test_change_detector():
+    """测试噪声不触发变化，目标移动触发变化并给出变化区域"""
+    print("🧪 测试变化检测...")
+
+    try:
+        from ui.motion_gate import ChangeDetector
+
+        detector = ChangeDetector()
+        cup = (0, (800, 400, 1000, 600))
+        detector.compare(_scene([cup], seed=0))
+        detector.update()
+        changed, ratio, _ = detector.compare(_scene([cup], seed=1))
+        assert not changed, ratio
+        print(f"✅ 传感器噪声不触发变化（变化比例 {ratio:.4f}）")
+
+        changed, ratio, mask = detector.compare(_scene([cup, (1, (300, 200, 330, 260))], seed=2))
+        assert changed
+        regions = detector.regions(mask)
+        assert len(regions) == 1
+        x1, y1, x2, y2 = regions[0].tolist()
+        assert x1 <= 300 and y1 <= 200 and x2 >= 330 and y2 >= 260 and x2 - x1 < 200
+        print(f"✅ 新出现的笔触发变化，变化区域 {[int(v) for v in regions[0]]}")
+
+        frame = _scene([cup], seed=3)
+        start = time.perf_counter()
+        for _ in range(50):
+            detector.compare(frame)
+        per_frame = (time.perf_counter() - start) / 50 * 1000
+        assert per_frame < 5.0, per_frame
+        print(f"✅ 1080p 变化检测 {per_frame:.2f}ms/帧")
+
+        # 深度：几毫米的噪声与无效像素不触发，目标靠近 100mm 触发
+        rng = np.random.default_rng(0)
+        depth = np.full((424, 512), 1500, dtype=np.uint16)
+        detector = ChangeDetector()
+        detector.compare(depth + rng.integers(0, 8, depth.shape).astype(np.uint16))
+        detector.update()
+        noisy = depth + rng.integers(0, 8, depth.shape).astype(np.uint16)
+        noisy[rng.random(depth.shape) < 0.05] = 0
+        assert not detector.compare(noisy)[0]
+        moved = noisy.copy()
+        moved[200:260, 200:260] = 1400
+        assert detector.compare(moved)[0]
+        print("✅ 深度噪声与无效像素不触发变化，目标靠近触发变化")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 变化检测测试失败: {e}")
+        return False
+
+def test_gate_actions():
+    """测试跳过、局部推理、整帧推理与定期刷新"""
+    print("\n🧪 测试门控决策...")
+
+    try:
+        from ui.motion_gate import MotionGate
+        from ui.postprocess import DetectionPostProcessor
+        from ui.tiling import TiledDetector
+
+        model = RecordingBlobModel()
+        processor = DetectionPostProcessor()
+        tiled = TiledDetector()
+        classes = ['cup', 'pen']
+
+        def detect(image):
+            return processor.infer(model, image, classes, 0.5, 50)
+
+        def detect_regions(image, regions):
+            return tiled.infer_regions(processor, model, image, regions, classes, 0.5, 50)
+
+        gate = MotionGate(refresh_interval=5.0)
+        cup = (0, (800, 400, 1000, 600))
+        pen = (1, (300, 200, 330, 260))
+
+        batch, action = gate.process(0.0, _scene([cup], 0), detect, detect_regions)
+        assert action == 'full' and len(batch) == 1
+        batch, action = gate.process(0.1, _scene([cup], 1), detect, detect_regions)
+        assert action == 'skip' and len(batch) == 1 and len(model.calls) == 1
+        print("✅ 静止画面跳过推理，复用缓存检测")
+
+        batch, action = gate.process(0.2, _scene([cup, pen], 2), detect, detect_regions)
+        assert action == 'regions', action
+        shape = model.calls[-1][0]
+        assert shape[0] * shape[1] < 0.05 * 1080 * 1920
+        assert sorted(batch.class_names.tolist()) == ['cup', 'pen']
+        print(f"✅ 新目标只推理变化区域 {shape[1]}x{shape[0]}，缓存的杯子保留")
+
+        # 杯子移动：变化区域扩展到包含原来的框，旧框被替换
+        moved = (0, (840, 420, 1040, 620))
+        batch, action = gate.process(0.3, _scene([moved, pen], 3), detect, detect_regions)
+        assert action == 'regions' and len(batch) == 2
+        assert [840, 420, 1040, 620] in batch.boxes.astype(int).tolist()
+        print("✅ 目标移动时旧框被区域推理结果替换")
+
+        # 大范围变化：整帧推理
+        batch, action = gate.process(0.4, _scene([moved, pen], 4)[:, ::-1].copy(), detect, detect_regions)
+        assert action == 'full'
+        # 超过刷新间隔：整帧推理；强制刷新：整帧推理
+        frame = _scene([moved, pen], 5)
+        gate.process(0.5, frame, detect, detect_regions)
+        assert gate.process(6.0, frame, detect, detect_regions)[1] == 'full'
+        gate.force_refresh()
+        assert gate.process(6.1, frame, detect, detect_regions)[1] == 'full'
+        assert gate.process(6.2, frame, detect, detect_regions)[1] == 'skip'
+        print("✅ 大范围变化、超过刷新间隔与强制刷新时整帧推理")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 门控决策测试失败: {e}")
+        return False
+
+def test_cpu_saved():
+    """测试静止画面上跳过比例与节省的检测器 CPU"""
+    print("\n🧪 测试节省的 CPU...")
+
+    try:
+        from ui.motion_gate import MotionGate
+        from ui.postprocess import DetectionBatch
+
+        names = np.array(['cup'], dtype=object)
+
+        def detect(image):
+            time.sleep(0.02)  # 模拟推理耗时
+            return DetectionBatch(boxes=np.array([[800, 400, 1000, 600]], dtype=np.float32),
+                                  scores=np.array([0.9], dtype=np.float32),
+                                  class_ids=np.array([0], dtype=np.int32), names=names)
+
+        frames = [_scene([(0, (800, 400, 1000, 600))], seed=k) for k in range(8)]
+        gate = MotionGate(refresh_interval=2.0)
+        start = time.perf_counter()
+        for k in range(90):
+            gate.process(k / 30.0, frames[k % len(frames)], detect)
+        elapsed = time.perf_counter() - start
+        stats = gate.stats()
+        assert stats['full'] == 2 and stats['skip'] == 88, stats
+        assert stats['cpu_saved'] > 0.8, stats
+        assert elapsed < 90 * 0.02 * 0.3
+        print(f"✅ 3 秒静止画面跳过 {stats['skip_rate']:.0%}，节省检测器 CPU {stats['cpu_saved']:.0%}，"
+              f"门控 {stats['gate_ms']}ms/帧")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 节省 CPU 测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 变化门控测试")
+    print("=" * 60)
+
+    tests = [
+        ("变化检测", test_change_detector),
+        ("门控决策", test_gate_actions),
+        ("节省 CPU", test_cpu_saved),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试出现异常: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 60)
+    print("📊 测试结果总结:")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("🎉 变化门控测试通过！")
+    else:
+        print("⚠️  部分测试失败，请检查相关功能")
+
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+多路摄像头微批推理测试脚本
+测试各路帧凑批与按来源路由、截止时间、每路最新帧覆盖旧帧，批量后处理与逐帧结果一致，以及视频网格布局
+"""
+
+import sys
+import os
+import threading
+import time
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from test_postprocess import FakeModel
+
+
+def test_batching_routing():
+    """测试各路帧凑成不超过上限的批次，每批每路最多一帧，结果按来源路由"""
+    print("🧪 测试凑批与路由...")
+
+    try:
+        from ui.pipeline import FramePacket, MicroBatcher
+
+        sizes, results = [], {}
+        lock = threading.Lock()
+
+        def infer_batch(packets):
+            sources = [packet.source for packet in packets]
+            assert len(set(sources)) == len(sources), sources
+            sizes.append(len(packets))
+            time.sleep(0.01)
+            return packets
+
+        def on_result(packet):
+            with lock:
+                results.setdefault(packet.source, []).append(packet.frame_id)
+
+        batcher = MicroBatcher(infer_batch, on_result, sources=6, max_batch=4, deadline_ms=20)
+        batcher.start()
+
+        def feed(source):
+            for frame_id in range(20):
+                batcher.submit(FramePacket(frame_id, time.time(), None, source=source))
+                time.sleep(0.005)
+
+        feeders = [threading.Thread(target=feed, args=(source,)) for source in range(6)]
+        for feeder in feeders:
+            feeder.start()
+        for feeder in feeders:
+            feeder.join()
+        time.sleep(0.1)
+        batcher.stop()
+        batcher.join(1.0)
+
+        stats = batcher.stats()
+        assert max(sizes) == 4 and stats['mean_batch'] > 2.0, sizes
+        assert set(results) == set(range(6))
+        assert all(ids == sorted(ids) for ids in results.values())
+        assert stats['frames'] == sum(len(ids) for ids in results.values())
+        print(f"✅ 6 路 {stats['batches']} 批，平均 {stats['mean_batch']} 帧，每路结果按顺序送回")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 凑批与路由测试失败: {e}")
+        return False
+
+def test_deadline():
+    """测试只有一路出帧时等到截止时间再推理，该路停止后不再等待"""
+    print("\n🧪 测试凑批截止时间...")
+
+    try:
+        from ui.pipeline import FramePacket, MicroBatcher
+
+        done = []
+        batcher = MicroBatcher(lambda packets: packets, lambda packet: done.append(time.perf_counter()),
+                               sources=3, max_batch=4, deadline_ms=30)
+        batcher.start()
+
+        submitted = time.perf_counter()
+        batcher.submit(FramePacket(1, time.time(), None, source=0))
+        while not done and time.perf_counter() - submitted < 1.0:
+            time.sleep(0.001)
+        waited = (done[0] - submitted) * 1000
+        assert 25 <= waited < 200, waited
+        print(f"✅ 3 路中只有 1 路出帧时等待 {waited:.1f}ms（截止 30ms）后推理")
+
+        # 其余两路断开后只剩一路，每帧立即推理
+        batcher.source_closed()
+        batcher.source_closed()
+        submitted = time.perf_counter()
+        batcher.submit(FramePacket(2, time.time(), None, source=0))
+        while len(done) < 2 and time.perf_counter() - submitted < 1.0:
+            time.sleep(0.001)
+        waited = (done[1] - submitted) * 1000
+        batcher.stop()
+        batcher.join(1.0)
+        assert waited < 20, waited
+        stats = batcher.stats()
+        assert stats['full_rate'] == 0.5, stats
+        print(f"✅ 其余各路断开后不再等待: {waited:.1f}ms")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 凑批截止时间测试失败: {e}")
+        return False
+
+def test_latest_frame():
+    """测试同一路未推理的旧帧被新帧覆盖，旧帧缓冲区归还；停止时归还所有待推理帧"""
+    print("\n🧪 测试每路最新帧...")
+
+    try:
+        from ui.frame_pool import FramePool
+        from ui.pipeline import FramePacket, MicroBatcher
+
+        pool = FramePool('capture', (4, 4, 3), capacity=3)
+        batcher = MicroBatcher(lambda packets: packets, lambda packet: None, sources=2)
+        for frame_id in range(3):
+            batcher.submit(FramePacket(frame_id, time.time(), None, lease=pool.acquire()))
+        assert pool.in_use == 1 and batcher.stats()['dropped'] == {0: 2}
+        batcher.stop()
+        assert pool.in_use == 0
+        print("✅ 推理跟不上时每路只保留最新一帧，被覆盖的帧立即归还缓冲池")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 每路最新帧测试失败: {e}")
+        return False
+
+def test_infer_batch():
+    """测试多路帧一次批量推理，结果与逐帧推理一致"""
+    print("\n🧪 测试批量后处理...")
+
+    try:
+        from ui.postprocess import DetectionPostProcessor
+
+        rng = np.random.default_rng(0)
+        images = [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) // (k + 1) for k in range(3)]
+        model = FakeModel()
+        processor = DetectionPostProcessor()
+        batches = processor.infer_batch(model, images, ['cup'], 0.1, 50)
+        assert model.calls == [3]
+        for image, batch in zip(images, batches):
+            single = DetectionPostProcessor().infer(model, image, ['cup'], 0.1, 50)
+            assert np.array_equal(batch.boxes, single.boxes)
+            assert np.array_equal(batch.scores, single.scores)
+            assert list(batch.class_names) == ['cup']
+        assert [len(b) for b in processor.infer_batch(model, images, ['bottle'], 0.1, 50)] == [0, 0, 0]
+        assert model.calls == [3, 1, 1, 1]
+        print("✅ 3 路一次推理，各路结果与逐帧推理相同；目标类别不在模型中时跳过推理")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 批量后处理测试失败: {e}")
+        return False
+
+def test_video_grid():
+    """测试视频网格按路数排成接近正方形"""
+    print("\n🧪 测试视频网格...")
+
+    try:
+        from PyQt6.QtWidgets import QApplication
+        from ui.main_window import VideoGridWidget
+
+        app = QApplication.instance() or QApplication(sys.argv)
+        grid = VideoGridWidget()
+        for labels, shape in ((["0", "1", "2"], (2, 2)), (["0", "1", "2", "3", "4"], (2, 3))):
+            grid.set_sources(labels)
+            positions = [grid.grid_layout.getItemPosition(grid.grid_layout.indexOf(cell))[:2]
+                         for cell in grid.cells]
+            rows = max(r for r, _ in positions) + 1
+            columns = max(c for _, c in positions) + 1
+            assert (rows, columns) == shape, positions
+            assert len(grid.cells) == len(labels) and grid.cell(len(labels)) is None
+        print("✅ 3 路排成 2x2，5 路排成 2x3")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 视频网格测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 多路摄像头测试")
+    print("=" * 60)
+
+    tests = [
+        ("凑批与路由", test_batching_routing),
+        ("凑批截止时间", test_deadline),
+        ("每路最新帧", test_latest_frame),
+        ("批量后处理", test_infer_batch),
+        ("视频网格", test_video_grid),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试出现异常: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 60)
+    print("📊 测试结果总结:")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("🎉 多路摄像头测试通过！")
+    else:
+        print("⚠️  部分测试失败，请检查相关功能")
+
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -168,8 +168,7 @@ def test_infrared_fixes():
             'try:',
             'hasattr(self.kinect, \'has_new_infrared_frame\')',
             'frame.size > 0',
-            'frame_max = np.max(frame)',
-            'cv2.equalizeHist',
+            'self._get_infrared_colorizer().colorize(frame)',
             'except Exception as e:'
         ]
         
@@ -183,7 +182,7 @@ def test_infrared_fixes():
                 return False
         
         # 检查深度帧处理的改进
-        if 'valid_depth = frame[frame > 0]' in content:
+        if 'self._get_depth_colorizer().colorize(frame)' in content:
             print("✅ 找到深度帧处理改进")
         else:
             print("❌ 缺少深度帧处理改进")
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+流水线引擎测试脚本
+测试最新帧槽位、流水线阶段和显示节流
+"""
+
+import sys
+import os
+import time
+import threading
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+def test_latest_slot():
+    """测试最新帧槽位的覆盖与丢帧计数"""
+    print("🧪 测试 LatestSlot...")
+
+    try:
+        from ui.pipeline import LatestSlot
+
+        slot = LatestSlot('test')
+        assert slot.put(1) is False
+        assert slot.put(2) is True
+        assert slot.put(3) is True
+        assert slot.get(timeout=0.01) == 3
+        assert slot.get(timeout=0.01) is None
+        assert slot.dropped == 2
+        print("✅ 旧帧被覆盖，消费者拿到最新帧")
+
+        # 关闭后等待中的消费者应立即返回
+        waiter_result = []
+        waiter = threading.Thread(target=lambda: waiter_result.append(slot.get(timeout=5)))
+        waiter.start()
+        time.sleep(0.05)
+        slot.close()
+        waiter.join(1)
+        assert not waiter.is_alive() and waiter_result == [None]
+        print("✅ 关闭槽位可唤醒消费者")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ LatestSlot 测试失败: {e}")
+        return False
+
+def test_pipeline_drops_stale_frames():
+    """测试推理慢于采集时丢弃旧帧"""
+    print("\n🧪 测试流水线丢帧行为...")
+
+    try:
+        from ui.pipeline import DetectionPipeline, FramePacket
+
+        results = []
+
+        def slow_infer(packet):
+            time.sleep(0.02)
+            packet.detections = [{'frame_id': packet.frame_id}]
+            return packet
+
+        def map_3d(packet):
+            packet.extras['mapped'] = True
+            return packet
+
+        pipeline = DetectionPipeline(infer=slow_infer, map_3d=map_3d,
+                                     on_result=results.append)
+        pipeline.start()
+
+        for frame_id in range(1, 51):
+            pipeline.note_capture()
+            pipeline.submit(FramePacket(frame_id, time.time(), None))
+            time.sleep(0.002)
+        time.sleep(0.1)
+        pipeline.stop()
+
+        stats = pipeline.stats()
+        print(f"  统计: {stats}")
+        assert results, "没有输出结果"
+        assert results[-1].frame_id == 50, "最后一帧应被处理"
+        assert all(r.extras.get('mapped') for r in results)
+        assert stats['infer']['dropped'] > 0
+        assert stats['capture']['processed'] == 50
+        print(f"✅ 处理 {len(results)} 帧，丢弃 {stats['infer']['dropped']} 帧旧帧")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 流水线测试失败: {e}")
+        return False
+
+def test_display_throttle():
+    """测试显示节流"""
+    print("\n🧪 测试 DisplayThrottle...")
+
+    try:
+        from ui.pipeline import DisplayThrottle, format_pipeline_stats
+
+        throttle = DisplayThrottle()
+        assert throttle.try_acquire() is True
+        assert throttle.try_acquire() is False
+        throttle.release()
+        assert throttle.try_acquire() is True
+        assert throttle.stats() == {'processed': 2, 'dropped': 1}
+        print("✅ 界面忙时新帧被丢弃")
+
+        text = format_pipeline_stats({'display': throttle.stats(), 'capture_fps': 30.0})
+        assert 'display:1' in text
+        print(f"✅ 状态文本: {text}")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 显示节流测试失败: {e}")
+        return False
+
+def test_threads_use_pipeline():
+    """检查采集线程已接入流水线"""
+    print("\n🧪 检查 VideoThread / CameraThread 流水线接入...")
+
+    try:
+        with open('ui/main_window.py', 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        required = [
+            'from .pipeline import DetectionPipeline',
+            'def _infer_stage(self, packet):',
+            'def _map_3d_stage(self, packet):',
+            'def frame_displayed(self):',
+            'pipeline_stats_ready = pyqtSignal(dict)',
+        ]
+
+        for item in required:
+            if item not in content:
+                print(f"❌ 缺少: {item}")
+                return False
+            print(f"✅ 找到: {item}")
+
+        if 'self.msleep(33)' in content:
+            print("❌ 仍存在固定 33ms 休眠")
+            return False
+        print("✅ 已移除固定 33ms 休眠")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 检查失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 流水线引擎测试")
+    print("=" * 60)
+
+    tests = [
+        ("最新帧槽位", test_latest_slot),
+        ("流水线丢帧", test_pipeline_drops_stale_frames),
+        ("显示节流", test_display_throttle),
+        ("线程接入", test_threads_use_pipeline),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试异常: {e}")
+            results.append((test_name, False))
+
+    # 显示测试结果
+    print("\n" + "=" * 60)
+    print("📊 流水线测试结果")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("\n🎉 流水线引擎测试通过！")
+        return 0
+    else:
+        print("\n⚠️  部分测试失败，请检查实现。")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
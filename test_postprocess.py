@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+检测后处理测试脚本
+测试向量化后处理与逐框循环实现的一致性
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+COCO_NAMES = {0: 'person', 39: 'bottle', 41: 'cup', 64: 'mouse', 67: 'cell phone', 73: 'book'}
+
+
+class FakeBoxes:
+    """模拟 ultralytics Boxes，只提供 data 属性（N, 6）"""
+    def __init__(self, data):
+        self.data = np.asarray(data, dtype=np.float32).reshape(-1, 6)
+
+
+class FakeResult:
+    """模拟 ultralytics Results"""
+    def __init__(self, data):
+        self.boxes = FakeBoxes(data)
+
+
+class FakeModel:
+    """每张图返回一个置信度与图像亮度相关的框，记录每次调用的图像数"""
+
+    names = {0: 'cup', 1: 'pen'}
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, images, **kwargs):
+        images = images if isinstance(images, list) else [images]
+        self.calls.append(len(images))
+        return [FakeResult([[0, 0, 10, 10, float(image.mean()) / 255.0, 0],
+                            [5, 5, 20, 20, 0.9, 1]]) for image in images]
+
+
+def make_results(count, seed=0):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, 600, size=(count, 2))
+    wh = rng.uniform(5, 100, size=(count, 2))
+    conf = rng.uniform(0, 1, size=(count, 1))
+    cls = rng.choice(list(COCO_NAMES.keys()), size=(count, 1))
+    return [FakeResult(np.hstack([xy, xy + wh, conf, cls]))]
+
+
+def reference_process(results, classes, threshold, max_detections):
+    """逐框参考实现（按置信度降序）"""
+    detections = []
+    for r in results:
+        for row in r.boxes.data:
+            name = COCO_NAMES[int(row[5])]
+            if name in classes and row[4] >= threshold:
+                detections.append({'class_name': name, 'confidence': float(row[4]),
+                                   'bbox': tuple(int(v) for v in row[:4])})
+    detections.sort(key=lambda d: -d['confidence'])
+    return detections[:max_detections]
+
+
+def test_matches_reference():
+    """测试与参考实现结果一致"""
+    print("🧪 测试向量化后处理与参考实现一致...")
+
+    try:
+        from ui.postprocess import DetectionPostProcessor
+
+        processor = DetectionPostProcessor()
+        classes = ['bottle', 'cup', 'mouse']
+        results = make_results(500)
+
+        for max_det in (1000, 50, 3):
+            batch = processor.process(results, COCO_NAMES, classes, 0.5, max_det)
+            expected = reference_process(results, classes, 0.5, max_det)
+            actual = batch.to_dicts()
+            assert len(actual) == len(expected), f"数量不一致: {len(actual)} vs {len(expected)}"
+            for a, e in zip(actual, expected):
+                assert a['class_name'] == e['class_name']
+                assert a['bbox'] == e['bbox']
+                assert abs(a['confidence'] - e['confidence']) < 1e-6
+            print(f"✅ max_detections={max_det}: {len(actual)} 个检测结果一致")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 一致性测试失败: {e}")
+        return False
+
+def test_top_k_across_results():
+    """测试 max_detections 跨多个结果生效"""
+    print("\n🧪 测试跨结果 top-k...")
+
+    try:
+        from ui.postprocess import DetectionPostProcessor
+
+        processor = DetectionPostProcessor()
+        results = make_results(40, seed=1) + make_results(40, seed=2)
+        batch = processor.process(results, COCO_NAMES, list(COCO_NAMES.values()), 0.0, 10)
+        assert len(batch) == 10
+        all_scores = np.concatenate([r.boxes.data[:, 4] for r in results])
+        assert np.allclose(batch.scores, np.sort(all_scores)[::-1][:10])
+        print("✅ 两个结果合并后取全局前 10 个")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ top-k 测试失败: {e}")
+        return False
+
+def test_empty_and_recompile():
+    """测试空结果与类别变化时重新编译掩码"""
+    print("\n🧪 测试空结果与类别掩码重建...")
+
+    try:
+        from ui.postprocess import DetectionPostProcessor
+
+        processor = DetectionPostProcessor()
+        empty = processor.process([FakeResult(np.zeros((0, 6)))], COCO_NAMES, ['cup'], 0.5, 50)
+        assert len(empty) == 0 and empty.to_dicts() == []
+        print("✅ 空结果返回空批次")
+
+        processor.compile(COCO_NAMES, ['cup'])
+        assert processor.class_mask.sum() == 1
+        processor.compile(COCO_NAMES, ['cup', 'book', 'pen'])
+        assert processor.class_mask.sum() == 2
+        print("✅ 类别变化后掩码已重建（模型中不存在的类别被忽略）")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 空结果测试失败: {e}")
+        return False
+
+def test_classes_pushed_into_model():
+    """测试目标类别以索引形式传入模型调用"""
+    print("\n🧪 测试类别过滤下推到模型调用...")
+
+    try:
+        from ui.postprocess import DetectionPostProcessor
+
+        class FakeModel:
+            names = COCO_NAMES
+
+            def __init__(self):
+                self.calls = []
+
+            def __call__(self, image, **kwargs):
+                self.calls.append(kwargs)
+                return make_results(50)
+
+        model = FakeModel()
+        processor = DetectionPostProcessor()
+        batch = processor.infer(model, None, ['cup', 'mouse'], 0.5, 20)
+        assert model.calls[-1]['classes'] == [41, 64]
+        assert model.calls[-1]['conf'] == 0.5 and model.calls[-1]['max_det'] == 20
+        assert set(batch.class_names) <= {'cup', 'mouse'}
+        print(f"✅ 模型收到类别索引 {model.calls[-1]['classes']}")
+
+        processor.infer(model, None, ['bottle'], 0.5, 20)
+        assert model.calls[-1]['classes'] == [39]
+        print("✅ 类别变化后无需重建即可生效")
+
+        calls_before = len(model.calls)
+        batch = processor.infer(model, None, ['pen'], 0.5, 20)
+        assert len(model.calls) == calls_before and len(batch) == 0
+        print("✅ 目标类别不在模型中时跳过推理")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 类别下推测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 检测后处理测试")
+    print("=" * 60)
+
+    tests = [
+        ("参考实现一致性", test_matches_reference),
+        ("跨结果 top-k", test_top_k_across_results),
+        ("空结果与掩码重建", test_empty_and_recompile),
+        ("类别过滤下推", test_classes_pushed_into_model),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试异常: {e}")
+            results.append((test_name, False))
+
+    # 显示测试结果
+    print("\n" + "=" * 60)
+    print("📊 后处理测试结果")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("\n🎉 后处理测试通过！")
+        return 0
+    else:
+        print("\n⚠️  部分测试失败，请检查实现。")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+推理进程池测试脚本
+测试共享内存环形缓冲区读写、工作进程结果与进程内推理一致并按来源丢弃过期结果、
+等待空闲进程期间改投最新帧，以及模型加载失败时的处理与共享内存释放
+"""
+
+import sys
+import os
+import time
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from test_postprocess import FakeModel
+
+
+class SlowModel(FakeModel):
+    """每次推理耗时约 20ms"""
+
+    def __call__(self, images, **kwargs):
+        time.sleep(0.02)
+        return super().__call__(images, **kwargs)
+
+
+def load_fake(model_path, backend, progress=None):
+    """工作进程中的模型加载函数（模块级，工作进程按名称导入）"""
+    from ui.backends import InferenceEngine
+    return InferenceEngine(SlowModel(), backend, model_path, model_path)
+
+
+def load_broken(model_path, backend, progress=None):
+    raise RuntimeError(f"找不到模型 {model_path}")
+
+
+def wait_for(condition, timeout=20.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def shm_exists(name):
+    from multiprocessing import shared_memory
+    try:
+        shared_memory.SharedMemory(name=name).close()
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def test_shared_ring():
+    """测试帧写入槽位后按描述读出相同内容，槽位用完后 acquire 返回 None，关闭后共享内存被删除"""
+    print("🧪 测试共享内存环形缓冲区...")
+
+    try:
+        from ui.process_pool import SharedFrameRing, frame_view
+
+        ring = SharedFrameRing(2, 480 * 640 * 3)
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 255, (480, 640, 4), dtype=np.uint8)[:, :, :3] for _ in range(2)]
+        descriptors = []
+        for frame in frames:
+            slot = ring.acquire()
+            descriptors.append(ring.write(slot, frame))
+        assert ring.acquire() is None and ring.in_use == 2
+        for frame, (offset, shape, dtype) in zip(frames, descriptors):
+            view = frame_view(ring.shm, offset, shape, dtype)
+            assert np.array_equal(view, frame) and not view.flags.writeable
+            del view
+        ring.release(0)
+        assert ring.acquire() == 0
+        name = ring.name
+        ring.close()
+        assert not shm_exists(name)
+        print("✅ 非连续的 BGRA 视图写入后内容一致，槽位按先进先出循环，关闭后共享内存已删除")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 共享内存环形缓冲区测试失败: {e}")
+        return False
+
+def test_pool_results():
+    """测试工作进程的检测结果与进程内推理一致，帧缓冲区在投递后立即归还，各来源结果按帧序号递增"""
+    print("\n🧪 测试推理进程池结果...")
+
+    pool = None
+    try:
+        from ui.frame_pool import FramePool
+        from ui.pipeline import FramePacket
+        from ui.postprocess import DetectionPostProcessor
+        from ui.process_pool import InferenceProcessPool
+
+        params = {'classes': ['cup', 'pen'], 'conf': 0.1, 'max_det': 50, 'tiled': False, 'tile': None}
+        results = {}
+        pool = InferenceProcessPool('fake.pt', 'pytorch', workers=2, loader=load_fake)
+        pool.set_callback(lambda packet: results.setdefault(packet.source, []).append(packet))
+        pool.start()
+        assert wait_for(lambda: pool.ready == 2), pool.failures
+
+        frame_pool = FramePool('capture', (48, 64, 3), capacity=4)
+        expected = {}
+        for frame_id in range(1, 13):
+            lease = frame_pool.acquire()
+            lease.array[...] = frame_id * 10
+            packet = FramePacket(frame_id, time.time(), lease.array, source=frame_id % 2, lease=lease)
+            expected[frame_id] = DetectionPostProcessor().infer(FakeModel(), lease.array.copy(), ['cup', 'pen'],
+                                                                0.1, 50)
+            assert pool.submit(packet, params)
+            assert packet.image is None and frame_pool.in_use == 0
+        assert wait_for(lambda: pool.stats()['in_flight'] == 0)
+
+        stats = pool.stats()
+        delivered = [packet for packets in results.values() for packet in packets]
+        assert stats['completed'] == 12 and len(delivered) + stats['stale'] == 12, stats
+        for packets in results.values():
+            ids = [packet.frame_id for packet in packets]
+            assert ids == sorted(ids), ids
+        for packet in delivered:
+            batch = expected[packet.frame_id]
+            assert np.array_equal(packet.batch.boxes, batch.boxes)
+            assert np.allclose(packet.batch.scores, batch.scores)
+            assert packet.batch.to_dicts() == batch.to_dicts()
+        print(f"✅ 2 个进程完成 12 帧（过期 {stats['stale']}），结果与进程内推理相同，帧缓冲区投递后立即归还")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 推理进程池结果测试失败: {e}")
+        return False
+    finally:
+        if pool is not None:
+            pool.stop()
+
+def test_latest_frame():
+    """测试全部进程都忙时 submit() 等待，等到空闲进程后改投上游更新的帧并归还旧帧"""
+    print("\n🧪 测试改投最新帧...")
+
+    pool = None
+    try:
+        from ui.frame_pool import FramePool
+        from ui.pipeline import FramePacket
+        from ui.process_pool import InferenceProcessPool
+
+        params = {'classes': ['cup'], 'conf': 0.0, 'max_det': 50, 'tiled': False, 'tile': None}
+        results = []
+        pool = InferenceProcessPool('fake.pt', 'pytorch', workers=1, loader=load_fake)
+        pool.set_callback(results.append)
+        pool.start()
+        assert wait_for(lambda: pool.ready == 1), pool.failures
+
+        frame_pool = FramePool('capture', (48, 64, 3), capacity=3)
+        newer = []
+
+        def latest():
+            # 等待期间摄像头又采集了一帧
+            if not newer:
+                return None
+            return newer.pop()
+
+        assert pool.submit(FramePacket(1, time.time(), np.zeros((48, 64, 3), np.uint8)), params, latest=latest)
+        old, new = frame_pool.acquire(), frame_pool.acquire()
+        newer.append(FramePacket(3, time.time(), new.array, lease=new))
+        assert pool.submit(FramePacket(2, time.time(), old.array, lease=old), params, latest=latest)
+        assert frame_pool.in_use == 0
+        assert wait_for(lambda: len(results) == 2)
+        assert [packet.frame_id for packet in results] == [1, 3], [packet.frame_id for packet in results]
+        assert pool.stats()['superseded'] == 1
+        print("✅ 进程忙时等待期间到达的新帧替换了旧帧，旧帧缓冲区立即归还")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 改投最新帧测试失败: {e}")
+        return False
+    finally:
+        if pool is not None:
+            pool.stop()
+
+def test_failure_cleanup():
+    """测试模型加载失败时进程池标记为失败、submit() 丢弃帧并归还缓冲区，停止后共享内存被删除"""
+    print("\n🧪 测试加载失败与资源释放...")
+
+    try:
+        from ui.frame_pool import FramePool
+        from ui.pipeline import FramePacket
+        from ui.process_pool import InferenceProcessPool
+
+        params = {'classes': ['cup'], 'conf': 0.1, 'max_det': 50, 'tiled': False, 'tile': None}
+        pool = InferenceProcessPool('missing.pt', 'pytorch', workers=2, loader=load_broken)
+        pool.start()
+        # 失败前投递的帧在全部进程失败后立即收回，不等待超时
+        assert pool.submit(FramePacket(1, time.time(), np.zeros((8, 8, 3), np.uint8)), params)
+        name = pool._ring.name
+        assert wait_for(lambda: pool.failed)
+        assert wait_for(lambda: pool.stats()['in_flight'] == 0, timeout=2.0)
+        assert "missing.pt" in pool.failures[0]
+
+        frame_pool = FramePool('capture', (8, 8, 3), capacity=2)
+        lease = frame_pool.acquire()
+        assert not pool.submit(FramePacket(2, time.time(), lease.array, lease=lease), params)
+        assert frame_pool.in_use == 0 and pool.stats()['dropped'] == 1
+        pool.stop()
+        assert not shm_exists(name)
+        assert not any(process.is_alive() for process in pool._processes)
+        print("✅ 2 个进程加载失败后不再投递，收回了处理中的帧；停止后进程退出、共享内存已删除")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 加载失败与资源释放测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 推理进程池测试")
+    print("=" * 60)
+
+    tests = [
+        ("共享内存环形缓冲区", test_shared_ring),
+        ("推理进程池结果", test_pool_results),
+        ("改投最新帧", test_latest_frame),
+        ("加载失败与资源释放", test_failure_cleanup),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试出现异常: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 60)
+    print("📊 测试结果总结:")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("🎉 推理进程池测试通过！")
+    else:
+        print("⚠️  部分测试失败，请检查相关功能")
+
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
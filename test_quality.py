@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+自适应质量控制测试脚本
+测试质量级别的生成顺序与范围、过载降级与有余量时升级、升级失败后的退避、
+延迟目标与过期样本，以及检测线程按级别跨帧、调整输入尺寸与关闭分块推理
+"""
+
+import sys
+import os
+import time
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from test_postprocess import FakeResult
+
+
+class FakeModel:
+    """记录每次推理的参数"""
+
+    names = {0: 'cup'}
+    model_path = 'yolo11s.pt'
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, images, **kwargs):
+        self.calls.append(kwargs)
+        return [FakeResult([[0, 0, 10, 10, 0.9, 0]])]
+
+
+def make_config(**changes):
+    from ui.config import DetectionConfig
+    config = DetectionConfig.default()
+    config.model_path = 'yolo11s.pt'
+    for key, value in changes.items():
+        setattr(config, key, value)
+    return config
+
+
+def feed(controller, cost_ms, start, seconds, latency_ms=50.0, fps=30.0):
+    """以 fps 的速率送入 seconds 秒的样本，返回结束时间"""
+    t = start
+    for _ in range(int(seconds * fps)):
+        t += 1.0 / fps
+        controller.observe(controller.index, cost_ms, latency_ms, now=t)
+    return t
+
+
+def test_build_levels():
+    """测试级别按 关闭分块 -> 减小尺寸 -> 换小模型 -> 增大跨帧 的顺序逐级降低，并遵守配置的范围"""
+    print("🧪 测试质量级别...")
+
+    try:
+        from ui.quality import build_levels
+
+        levels = build_levels(make_config(tiled_inference=True, quality_min_imgsz=416, quality_max_stride=3,
+                                          quality_model_tiers=['yolo11s.pt', 'yolo11n.pt']))
+        described = [(level.tiling, level.imgsz, level.model_path, level.stride) for level in levels]
+        assert described == [
+            (True, None, 'yolo11s.pt', 1),
+            (False, None, 'yolo11s.pt', 1),
+            (False, 512, 'yolo11s.pt', 1),
+            (False, 416, 'yolo11s.pt', 1),
+            (False, 416, 'yolo11n.pt', 1),
+            (False, 416, 'yolo11n.pt', 2),
+            (False, 416, 'yolo11n.pt', 3),
+        ], described
+
+        # 未启用分块、非 PyTorch 后端、已是最小模型时不生成对应的级别
+        levels = build_levels(make_config(model_path='yolo11n.pt', quality_max_stride=2), backend='onnxruntime')
+        assert [(level.imgsz, level.stride, level.tiling) for level in levels] == [(None, 1, True), (None, 2, True)]
+        print("✅ 7 个级别按顺序逐级降低；导出模型不调整输入尺寸，已是最小模型时不换模型")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 质量级别测试失败: {e}")
+        return False
+
+def test_degrade_upgrade():
+    """测试过载时逐级降级，负载在区间内时保持，有余量时升级"""
+    print("\n🧪 测试降级与升级...")
+
+    try:
+        from ui.quality import QualityController, build_levels
+
+        levels = build_levels(make_config(quality_model_tiers=[]))
+        controller = QualityController(levels, target_fps=15.0)
+        controller._changed_at = 0.0
+        cost = {None: 120.0, 512: 80.0, 416: 55.0, 320: 35.0}
+
+        # 窗口未满或样本不足时不判断
+        t = feed(controller, 120.0, 0.0, 1.0)
+        assert controller.update(now=t) is None and controller.index == 0
+
+        decisions = []
+        for _ in range(10):
+            t = feed(controller, cost[controller.level.imgsz], t, 2.0)
+            decision = controller.update(now=t)
+            if decision is not None:
+                decisions.append(decision)
+        # 120ms -> 负载 1.8；80ms -> 1.2；55ms -> 0.83 保持
+        assert [d.new_index for d in decisions] == [1, 2], [d.reason for d in decisions]
+        assert controller.level.imgsz == 416 and all(d.degraded for d in decisions)
+        assert 0.7 < controller.load < 1.0
+
+        # CPU 竞争消失，耗时降低后逐级恢复
+        for _ in range(4):
+            t = feed(controller, cost[controller.level.imgsz] / 3, t, 2.0)
+            controller.update(now=t)
+        assert controller.index == 0, controller.index
+        assert controller.stats()['changes'] == 4
+        print(f"✅ 过载时 2 次降级到 416px 后保持（负载 {decisions[-1].load} -> 0.83），耗时降低后恢复到最高质量")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 降级与升级测试失败: {e}")
+        return False
+
+def test_backoff():
+    """测试升级后很快又过载时暂停升级到该级别，再次失败时暂停时间加倍"""
+    print("\n🧪 测试升级退避...")
+
+    try:
+        from ui.quality import QualityController, QualityLevel
+
+        levels = [QualityLevel(model_path='m'), QualityLevel(imgsz=320, model_path='m')]
+        controller = QualityController(levels, target_fps=10.0, retry=10.0)
+        controller._changed_at = 0.0
+        # 在级别 1 有余量（40ms），回到级别 0 就过载（150ms）
+        cost = [150.0, 40.0]
+        t = feed(controller, cost[0], 0.0, 2.0)
+        assert controller.update(now=t).new_index == 1
+
+        upgrades = []
+        while t < 60.0:
+            t = feed(controller, cost[controller.index], t, 1.0)
+            decision = controller.update(now=t)
+            if decision is not None and not decision.degraded:
+                upgrades.append(round(t))
+        # 第一次失败后暂停 10s，第二次 20s，第三次 40s
+        gaps = np.diff(upgrades).tolist()
+        assert len(upgrades) == 3 and gaps[1] > gaps[0] > 10, upgrades
+        print(f"✅ 60 秒内只尝试升级 {len(upgrades)} 次（{upgrades} 秒），间隔逐次加倍")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 升级退避测试失败: {e}")
+        return False
+
+def test_latency_target():
+    """测试按延迟 p95 判断过载，级别变化前推理的帧与模型尚未切换的帧不计入样本"""
+    print("\n🧪 测试延迟目标与过期样本...")
+
+    try:
+        from ui.quality import QualityController, QualityLevel
+
+        levels = [QualityLevel(model_path='yolo11s.pt'), QualityLevel(model_path='yolo11n.pt')]
+        controller = QualityController(levels, target_fps=0.0, target_latency_ms=200.0)
+        controller._changed_at = 0.0
+        t = 0.0
+        for k in range(60):
+            t += 1 / 30
+            controller.observe(0, 10.0, 300.0 if k % 10 == 0 else 100.0, now=t)
+        decision = controller.update(now=t)
+        assert decision is not None and "延迟 p95" in decision.reason, decision
+        assert controller.sample_index('yolo11s.pt') is None and controller.sample_index('yolo11n.pt') == 1
+
+        # 新模型加载完成前的帧（级别 0 推理）被忽略
+        for k in range(60):
+            t += 1 / 30
+            controller.observe(0, 10.0, 1000.0, now=t)
+        assert controller.update(now=t) is None and controller.index == 1
+        print("✅ 每 10 帧一帧 300ms 时 p95 超过 200ms 目标而降级；旧级别的帧不影响判断")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 延迟目标与过期样本测试失败: {e}")
+        return False
+
+def test_thread_levels():
+    """测试检测线程按级别跨帧检测、传入输入尺寸、关闭分块推理，并把耗时与延迟送回控制器"""
+    print("\n🧪 测试检测线程应用质量级别...")
+
+    try:
+        from PyQt6.QtWidgets import QApplication
+        from ui.config import config_manager
+        from ui.main_window import CameraThread
+        from ui.pipeline import FramePacket
+        from ui.process_pool import task_params
+        from ui.quality import QualityController, QualityLevel
+
+        app = QApplication.instance() or QApplication(sys.argv)
+        levels = [QualityLevel(model_path='yolo11s.pt'),
+                  QualityLevel(imgsz=320, stride=3, tiling=False, model_path='yolo11s.pt')]
+        controller = QualityController(levels, target_fps=15.0)
+        controller.index = 1
+        model = FakeModel()
+        thread = CameraThread()
+        thread.set_model(model)
+        thread.set_target_classes(['cup'])
+        thread.set_quality_controller(controller)
+
+        tiled = config_manager.detection.tiled_inference
+        config_manager.detection.tiled_inference = True
+        try:
+            assert not thread._tiling_enabled()
+            detected = []
+            for frame_id in range(1, 11):
+                packet = thread._infer_stage(FramePacket(frame_id, time.time(), np.zeros((48, 64, 3), np.uint8)))
+                if packet is not None:
+                    detected.append(frame_id)
+                    thread._emit_detections(packet)
+            params = task_params(['cup'], config_manager.detection, controller.level)
+        finally:
+            config_manager.detection.tiled_inference = tiled
+
+        assert detected == [1, 4, 7, 10], detected
+        assert [call.get('imgsz') for call in model.calls] == [320] * 4
+        assert len(controller._samples) == 4
+        assert params['imgsz'] == 320 and params['tiled'] is False
+        print("✅ 跨帧 3 时只检测第 1/4/7/10 帧，以 320px 推理且不分块，4 个样本送回控制器")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 检测线程应用质量级别测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 自适应质量测试")
+    print("=" * 60)
+
+    tests = [
+        ("质量级别", test_build_levels),
+        ("降级与升级", test_degrade_upgrade),
+        ("升级退避", test_backoff),
+        ("延迟目标与过期样本", test_latency_target),
+        ("检测线程应用质量级别", test_thread_levels),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试出现异常: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 60)
+    print("📊 测试结果总结:")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("🎉 自适应质量测试通过！")
+    else:
+        print("⚠️  部分测试失败，请检查相关功能")
+
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+彩色/深度配准测试脚本
+测试查找表映射精度、批量 3D 坐标计算和磁盘缓存
+"""
+
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+
+def project(point, c):
+    """按标称模型把深度相机坐标系中的点投影到彩色与深度图像"""
+    x, y, z = point
+    depth_uv = (x * c['depth_fx'] / z + c['depth_cx'], y * c['depth_fy'] / z + c['depth_cy'])
+    xc, yc = x - c['color_offset_x'], y - c['color_offset_y']
+    color_uv = (xc * c['color_fx'] / z + c['color_cx'], yc * c['color_fy'] / z + c['color_cy'])
+    return color_uv, depth_uv
+
+
+def test_parallax_corrected_mapping():
+    """测试不同深度下彩色->深度映射与 3D 坐标"""
+    print("🧪 测试配准查找表映射...")
+
+    try:
+        from ui.registration import Registration, NOMINAL_CALIBRATION
+
+        reg = Registration.from_intrinsics()
+        for point in [(100.0, -50.0, 700.0), (-300.0, 200.0, 1500.0), (400.0, 100.0, 3500.0)]:
+            color_uv, depth_uv = project(point, NOMINAL_CALIBRATION)
+            depth = np.full((424, 512), int(point[2]), dtype=np.uint16)
+            box = [color_uv[0] - 10, color_uv[1] - 10, color_uv[0] + 10, color_uv[1] + 10]
+            mapping = reg.map_boxes(np.array([box]), depth)
+
+            err_px = np.abs(mapping['depth_xy'][0] - np.array(depth_uv)).max()
+            err_mm = np.abs(mapping['xyz'][0] - np.array(point)).max()
+            assert err_px <= 2, f"深度像素误差过大: {err_px}"
+            assert err_mm <= 0.01 * point[2] + 5, f"3D 误差过大: {err_mm}"
+            print(f"✅ Z={point[2]:.0f}mm: 深度像素误差 {err_px:.1f}px, 3D 误差 {err_mm:.1f}mm")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 配准映射测试失败: {e}")
+        return False
+
+def test_batch_and_invalid_depth():
+    """测试批量计算与无效深度"""
+    print("\n🧪 测试批量计算与无效深度...")
+
+    try:
+        from ui.registration import Registration
+
+        reg = Registration.from_intrinsics()
+        depth = np.full((424, 512), 1200, dtype=np.uint16)
+        depth[:, :256] = 0  # 左半边无效
+        boxes = np.array([[100, 100, 200, 200], [1500, 500, 1600, 600], [900, 400, 1000, 500]],
+                         dtype=np.float32)
+        mapping = reg.map_boxes(boxes, depth)
+        assert mapping['xyz'].shape == (3, 3)
+        valid = np.isfinite(mapping['depth_mm'])
+        assert valid.sum() >= 1 and not valid.all()
+        assert np.all(mapping['valid_pixels'][~valid] == 0)
+        print(f"✅ 3 个检测框一次计算，有效 {int(valid.sum())} 个")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 批量计算测试失败: {e}")
+        return False
+
+def test_cache_roundtrip():
+    """测试配准表磁盘缓存"""
+    print("\n🧪 测试配准表缓存...")
+
+    try:
+        from ui.registration import Registration, get_registration
+
+        reg = Registration.from_intrinsics(source="sdk-intrinsics")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "reg.npz")
+            reg.save(path)
+            loaded = Registration.load(path)
+            assert loaded.source == "sdk-intrinsics"
+            assert np.allclose(loaded.depth_rays, reg.depth_rays)
+            assert np.allclose(loaded.color_to_depth, reg.color_to_depth, equal_nan=True)
+            print("✅ 保存/读取后查找表一致")
+
+            class Desc:
+                def __init__(self, w, h):
+                    self.Width, self.Height = w, h
+
+            class NoMapperKinect:
+                color_frame_desc = Desc(1920, 1080)
+                depth_frame_desc = Desc(512, 424)
+
+            fallback = get_registration(NoMapperKinect(), cache_dir=tmp)
+            assert fallback.source == "nominal"
+            assert os.listdir(tmp) == ["reg.npz"]
+            print("✅ 无 SDK 映射器时使用标称内参且不写缓存")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 缓存测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 彩色/深度配准测试")
+    print("=" * 60)
+
+    tests = [
+        ("视差修正映射", test_parallax_corrected_mapping),
+        ("批量与无效深度", test_batch_and_invalid_depth),
+        ("磁盘缓存", test_cache_roundtrip),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试异常: {e}")
+            results.append((test_name, False))
+
+    # 显示测试结果
+    print("\n" + "=" * 60)
+    print("📊 配准测试结果")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("\n🎉 配准测试通过！")
+        return 0
+    else:
+        print("\n⚠️  部分测试失败，请检查实现。")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
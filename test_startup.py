@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+启动优化测试脚本
+测试依赖检查只查找不导入、启动耗时分析记录导入与初始化阶段，以及配置在第一次使用时才读取
+"""
+
+import sys
+import os
+import json
+import tempfile
+import time
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+
+def test_module_probe():
+    """测试依赖检查不导入模块"""
+    print("🧪 测试依赖检查...")
+
+    try:
+        from ui.startup import missing_modules, module_available
+
+        sys.modules.pop('wave', None)
+        before = set(sys.modules)
+        assert module_available('wave')
+        assert module_available('xml.dom')
+        assert not module_available('oasis_missing_module')
+        assert not module_available('oasis_missing_module.sub')
+        assert missing_modules(['json', 'oasis_missing_module']) == ['oasis_missing_module']
+        assert 'wave' not in set(sys.modules) - before
+        print("✅ 已安装与未安装的模块都能识别，检查过程中没有导入模块")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 依赖检查测试失败: {e}")
+        return False
+
+def test_profiler():
+    """测试启动耗时分析记录导入耗时与嵌套的初始化阶段，结束后恢复 __import__"""
+    print("\n🧪 测试启动耗时分析...")
+
+    try:
+        import builtins
+        from ui.startup import PROFILE_FLAG, StartupProfiler, profile_requested
+
+        original = builtins.__import__
+        assert not profile_requested(['main_ui.py'])
+        assert builtins.__import__ is original
+
+        profiler = StartupProfiler()
+        profiler.install()
+        try:
+            with profiler.phase("导入"):
+                sys.modules.pop('wave', None)
+                import wave  # noqa: F401
+                import json  # noqa: F401 已导入的模块不计时
+            with profiler.phase("初始化"):
+                with profiler.phase("子阶段"):
+                    time.sleep(0.02)
+        finally:
+            profiler.uninstall()
+        assert builtins.__import__ is original
+
+        assert 'wave' in profiler.imports and 'json' not in profiler.imports
+        packages = dict(profiler.package_times())
+        assert packages['wave'] > 0
+        phases = {name: (depth, seconds) for name, depth, _, seconds in profiler.phases}
+        assert phases["子阶段"][0] == 1 and phases["初始化"][1] >= phases["子阶段"][1] >= 0.02
+        lines = profiler.report()
+        assert any("子阶段" in line for line in lines) and any("wave" in line for line in lines)
+        print(f"✅ {PROFILE_FLAG} 报告:")
+        for line in lines:
+            print(f"  {line}")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 启动耗时分析测试失败: {e}")
+        return False
+
+def test_lazy_config():
+    """测试导入配置模块时不读取配置文件，第一次访问配置时才读取"""
+    print("\n🧪 测试延迟读取配置...")
+
+    try:
+        from ui.config import ConfigManager
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'config.json')
+            with open(os.path.join(project_root, 'config.json'), encoding='utf-8') as f:
+                data = json.load(f)
+            data['detection']['confidence_threshold'] = 0.7
+            del data['ui']
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            manager = ConfigManager(path)
+            assert not manager._loaded
+            assert manager.detection.confidence_threshold == 0.7
+            assert manager._loaded
+            assert manager.ui.preload_model is True
+            print("✅ 第一次访问配置时读取文件，缺少的配置段使用默认值")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 延迟读取配置测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 启动优化测试")
+    print("=" * 60)
+
+    tests = [
+        ("依赖检查", test_module_probe),
+        ("启动耗时分析", test_profiler),
+        ("延迟读取配置", test_lazy_config),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试出现异常: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 60)
+    print("📊 测试结果总结:")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("🎉 启动优化测试通过！")
+    else:
+        print("⚠️  部分测试失败，请检查相关功能")
+
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+分块推理测试脚本
+测试分块网格与 ROI 限制、深度范围筛选分块、跨块合并以及小目标检出
+"""
+
+import sys
+import os
+
+import cv2
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from test_postprocess import FakeResult
+
+NAMES = {0: 'cup', 1: 'pen'}
+# 各类别目标在合成画面中的颜色（BGR）
+CLASS_COLORS = {0: (0, 0, 255), 1: (255, 0, 0)}
+
+
+class BlobModel:
+    """按颜色找目标的模型：与 YOLO 一样把输入缩小到 640，缩小后短边不足 min_side 像素的目标检测不到"""
+
+    names = NAMES
+
+    def __init__(self, imgsz=640, min_side=12):
+        self.imgsz = imgsz
+        self.min_side = min_side
+        self.batches = []
+
+    def _detect(self, image):
+        scale = min(1.0, self.imgsz / max(image.shape[:2]))
+        rows = []
+        for class_id, color in CLASS_COLORS.items():
+            mask = np.all(image == color, axis=2).view(np.uint8)
+            count, _, stats, _ = cv2.connectedComponentsWithStats(np.ascontiguousarray(mask))
+            for x, y, w, h, _ in stats[1:].tolist():
+                if min(w, h) * scale >= self.min_side:
+                    rows.append([x, y, x + w, y + h, 0.9, class_id])
+        return FakeResult(rows)
+
+    def __call__(self, images, **kwargs):
+        images = images if isinstance(images, list) else [images]
+        self.batches.append(len(images))
+        return [self._detect(image) for image in images]
+
+
+def _scene(objects, size=(1080, 1920)):
+    image = np.full(size + (3,), 90, dtype=np.uint8)
+    for class_id, (x1, y1, x2, y2) in objects:
+        image[y1:y2, x1:x2] = CLASS_COLORS[class_id]
+    return image
+
+
+def test_tile_grid():
+    """测试分块覆盖整帧或 ROI，相邻分块重叠"""
+    print("🧪 测试分块网格...")
+
+    try:
+        from ui.tiling import tile_grid
+
+        tiles = tile_grid((1920, 1080), 640, 0.2)
+        assert len(tiles) == 8, len(tiles)
+        assert tiles[:, 0].min() == 0 and tiles[:, 2].max() == 1920
+        assert tiles[:, 1].min() == 0 and tiles[:, 3].max() == 1080
+        xs = np.unique(tiles[:, 0])
+        assert np.all(640 - np.diff(xs) >= 128)
+        print(f"✅ 1920x1080 分为 {len(tiles)} 块，相邻重叠 ≥ {int(640 - np.diff(xs).max())} 像素")
+
+        roi = (900, 400, 1500, 900)
+        tiles = tile_grid((1920, 1080), 640, 0.2, roi)
+        assert len(tiles) == 1
+        x1, y1, x2, y2 = tiles[0].tolist()
+        assert x1 <= roi[0] and y1 <= roi[1] and x2 >= roi[2] and y2 >= roi[3] and y2 <= 1080
+        tiles = tile_grid((1920, 1080), 640, 0.2, (0, 500, 1920, 1200))
+        assert len(tiles) == 4 and tiles[:, 3].max() == 1080
+        print("✅ ROI 内分块覆盖 ROI 且不超出画面")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 分块网格测试失败: {e}")
+        return False
+
+def test_merge():
+    """测试被分块边界截断的框合并为完整框，不同目标与不同类别不合并"""
+    print("\n🧪 测试跨块合并...")
+
+    try:
+        from ui.tiling import merge_tiled
+
+        data = np.array([
+            [500, 100, 640, 200, 0.8, 0],   # 左侧分块中被截断的部分
+            [512, 100, 700, 200, 0.9, 0],   # 右侧分块中被截断的部分
+            [505, 105, 695, 195, 0.7, 0],   # 整帧缩略图中的完整框
+            [520, 120, 560, 160, 0.6, 1],   # 同位置的另一类别
+            [900, 100, 950, 150, 0.9, 0],   # 另一个目标
+        ], dtype=np.float32)
+        cut = np.array([True, True, False, False, False])
+        merged = merge_tiled(data, cut)
+        assert len(merged) == 3, merged
+        assert merged[0].tolist()[:4] == [500, 100, 700, 200] and merged[0, 4] == np.float32(0.9)
+        assert sorted(merged[:, 5].tolist()) == [0, 0, 1]
+        print("✅ 截断框合并为完整框，其他目标保留")
+
+        # 完整的重复框只抑制，不扩大保留框
+        data = np.array([[100, 100, 200, 200, 0.9, 0], [98, 98, 210, 205, 0.5, 0]], dtype=np.float32)
+        merged = merge_tiled(data, np.zeros(2, dtype=bool))
+        assert len(merged) == 1 and merged[0].tolist()[:4] == [100, 100, 200, 200]
+        print("✅ 完整重复框被抑制")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 跨块合并测试失败: {e}")
+        return False
+
+def test_tiled_detection():
+    """测试分块推理检出整帧推理漏掉的小目标，跨块的大目标只输出一次"""
+    print("\n🧪 测试分块推理...")
+
+    try:
+        from ui.postprocess import DetectionPostProcessor
+        from ui.tiling import TiledDetector
+        from ui.tracking import box_iou
+
+        pens = [(1, (x, y, x + 22, y + 22)) for x, y in ((150, 120), (630, 900), (1700, 950), (1500, 300))]
+        big = (0, (480, 300, 1300, 800))  # 跨越多个分块
+        truth = np.array([box for _, box in pens + [big]], dtype=np.float32)
+        image = _scene(pens + [big])
+
+        processor = DetectionPostProcessor()
+        model = BlobModel()
+        full = processor.infer(model, image, ['cup', 'pen'], 0.5, 50)
+        assert len(full) == 1, len(full)
+
+        detector = TiledDetector(640, 0.2)
+        batch = detector.infer(processor, model, image, ['cup', 'pen'], 0.5, 50)
+        assert model.batches[-1] == 9
+        assert len(batch) == len(truth), batch.boxes
+        iou = box_iou(truth, batch.boxes).max(axis=1)
+        assert iou.min() > 0.95, iou
+        stats = detector.stats()
+        print(f"✅ 整帧检出 {len(full)} 个，分块检出 {len(batch)} 个（合并 {stats['raw']}→{stats['merged']}），"
+              f"与真实框 IoU ≥ {iou.min():.2f}")
+
+        # ROI：只推理覆盖 ROI 的分块
+        detector.configure(640, 0.2, True, (560, 820, 760, 1000))
+        batch = detector.infer(processor, model, image, ['pen'], 0.5, 50)
+        assert model.batches[-1] == 2 and list(batch.class_names) == ['pen']
+        print("✅ ROI 内只推理 1 个分块，检出 ROI 内的小目标")
+
+        # 不大于一个分块的画面直接整帧推理
+        detector.infer(processor, model, image[:480, :640], ['pen'], 0.5, 50)
+        assert model.batches[-1] == 1
+        print("✅ 小画面退化为整帧推理")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 分块推理测试失败: {e}")
+        return False
+
+def test_depth_restriction():
+    """测试只保留包含深度范围内像素的分块"""
+    print("\n🧪 测试深度范围筛选...")
+
+    try:
+        from ui.registration import Registration
+        from ui.tiling import TiledDetector, tile_grid
+
+        registration = Registration.from_intrinsics()
+        depth = np.full((424, 512), 3000, dtype=np.uint16)
+        depth[150:260, 300:380] = 900  # 桌面上的近处区域（深度图右半部分）
+
+        detector = TiledDetector(640, 0.2)
+        grid = tile_grid((1920, 1080), 640, 0.2)
+        tiles = detector.tiles_for((1920, 1080), depth, registration, (500, 1500))
+        assert 0 < len(tiles) < len(grid), len(tiles)
+        mapped = registration.color_to_depth_boxes(tiles, np.full(len(tiles), 1000.0))
+        assert np.all((mapped[:, 2] >= 300) & (mapped[:, 0] <= 380))
+        print(f"✅ 深度范围 500-1500mm 内的分块 {len(tiles)}/{len(grid)}")
+
+        assert len(detector.tiles_for((1920, 1080), depth, registration, (4000, 6000))) == 0
+        assert len(detector.tiles_for((1920, 1080), None, registration, (500, 1500))) == len(grid)
+        print("✅ 范围内没有像素时不推理分块，没有深度图时不筛选")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 深度范围筛选测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 分块推理测试")
+    print("=" * 60)
+
+    tests = [
+        ("分块网格", test_tile_grid),
+        ("跨块合并", test_merge),
+        ("分块推理", test_tiled_detection),
+        ("深度范围筛选", test_depth_restriction),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试出现异常: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 60)
+    print("📊 测试结果总结:")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("🎉 分块推理测试通过！")
+    else:
+        print("⚠️  部分测试失败，请检查相关功能")
+
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+多目标跟踪测试脚本
+测试最优分配、跟踪 ID 的持续性、3D 坐标卡尔曼平滑以及静止目标跳过 3D 查询
+"""
+
+import sys
+import os
+import itertools
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+
+def _batch(boxes, class_ids, scores=None):
+    from ui.postprocess import DetectionBatch
+
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    return DetectionBatch(
+        boxes=boxes,
+        scores=np.asarray(scores if scores is not None else [0.9] * len(boxes), dtype=np.float32),
+        class_ids=np.asarray(class_ids, dtype=np.int32),
+        names=np.array(['cup', 'bottle'], dtype=object))
+
+
+def test_assignment():
+    """测试分配结果与穷举最优一致（含不可匹配项与非方阵）"""
+    print("🧪 测试最优分配...")
+
+    try:
+        from ui.tracking import _hungarian, linear_assignment
+
+        rng = np.random.default_rng(0)
+        for trial in range(200):
+            n, m = (int(v) for v in rng.integers(1, 6, 2))
+            cost = rng.random((n, m))
+            if trial % 3 == 0:
+                cost[rng.random((n, m)) < 0.3] = np.inf
+            finite = np.where(np.isfinite(cost), cost, 1e6)
+            if n <= m:
+                best = min(sum(finite[i, j] for i, j in zip(range(n), p))
+                           for p in itertools.permutations(range(m), n))
+                builtin = sum(finite[i, j] for i, j in enumerate(_hungarian(finite)))
+            else:
+                best = min(sum(finite[i, j] for i, j in zip(p, range(m)))
+                           for p in itertools.permutations(range(n), m))
+                builtin = sum(finite[i, j] for j, i in enumerate(_hungarian(finite.T)))
+            assert abs(builtin - best) < 1e-9
+
+            rows, cols = linear_assignment(cost, 0.5)
+            assert len(set(rows.tolist())) == len(rows) and len(set(cols.tolist())) == len(cols)
+            assert all(cost[i, j] <= 0.5 for i, j in zip(rows, cols))
+        print("✅ 200 个随机代价矩阵与穷举最优一致，超过阈值的配对被剔除")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 最优分配测试失败: {e}")
+        return False
+
+def test_persistent_ids():
+    """测试跟踪 ID 在漏检、交错和类别变化时保持稳定"""
+    print("\n🧪 测试跟踪 ID...")
+
+    try:
+        from ui.tracking import MultiObjectTracker
+
+        tracker = MultiObjectTracker(max_missed=5)
+        cup, bottle = [100, 100, 200, 200], [400, 100, 480, 260]
+
+        tracks = tracker.update(_batch([cup, bottle], [0, 1]), 0.0)
+        ids = {t.class_id: t.track_id for t in tracks}
+        assert sorted(ids.values()) == [1, 2]
+
+        # 顺序颠倒、轻微移动：按代价矩阵关联，ID 不变
+        batch = _batch([np.add(bottle, 6), np.add(cup, 4)], [1, 0])
+        tracks = tracker.update(batch, 0.033)
+        assert [t.track_id for t in tracks] == [ids[1], ids[0]]
+        assert batch.track_ids is None  # 不修改传入的批次
+
+        # 杯子漏检 3 帧后重新出现：沿用原 ID
+        for k in range(3):
+            tracker.update(_batch([np.add(bottle, 6)], [1]), 0.066 + k * 0.033)
+        tracks = tracker.update(_batch([np.add(cup, 8), np.add(bottle, 6)], [0, 1]), 0.2)
+        assert [t.track_id for t in tracks] == [ids[0], ids[1]]
+        print("✅ 顺序变化与短暂漏检后 ID 保持不变")
+
+        # 同一位置出现不同类别：新建轨迹
+        batch = _batch([np.add(cup, 8)], [1])
+        tracks = tracker.update(batch, 0.233)
+        assert [t.track_id for t in tracks] == [3]
+
+        # 超过 max_missed 帧未出现的轨迹被删除
+        for k in range(7):
+            tracker.update(_batch([], []), 0.3 + k * 0.033)
+        assert tracker.stats()['tracks'] == 0
+        print("✅ 类别不同不匹配，长时间消失的轨迹被删除")
+
+        detections = batch.to_dicts()
+        tracker.annotate(detections, [tracker.update(_batch([cup], [0]), 1.0)[0]], 1.0)
+        assert detections[0]['track_id'] == 4 and detections[0]['hits'] == 1
+        return True
+
+    except Exception as e:
+        print(f"❌ 跟踪 ID 测试失败: {e}")
+        return False
+
+def test_smoothing_and_skip():
+    """测试 3D 坐标平滑与静止目标跳过 3D 查询"""
+    print("\n🧪 测试 3D 平滑...")
+
+    try:
+        from ui.tracking import MultiObjectTracker
+
+        rng = np.random.default_rng(1)
+        truth = np.array([120.0, -40.0, 1500.0])
+
+        def run_static(tracker, frames):
+            raw, smoothed = [], []
+            for k in range(frames):
+                jitter = rng.normal(0, 1.0, 4)  # 静止目标的检测框抖动约 1 像素
+                box = [100 + jitter[0], 100 + jitter[1], 220 + jitter[2], 260 + jitter[3]]
+                tracks = tracker.update(_batch(box, [0]), k / 30.0)
+                if tracker.needs_mapping(tracks)[0]:
+                    noisy = truth + rng.normal(0, 15.0, 3)
+                    raw.append(noisy)
+                    tracker.set_measurement(tracks[0], {'x': noisy[0], 'y': noisy[1], 'z': noisy[2], 'unit': 'mm'})
+                coords = tracker.smooth(tracks[0], k / 30.0)
+                smoothed.append([coords['x'], coords['y'], coords['z']])
+            return np.array(raw), np.array(smoothed)
+
+        # 每帧都查询时平滑误差明显低于原始观测
+        raw, smoothed = run_static(MultiObjectTracker(remap_interval=1), 90)
+        raw_err = np.abs(raw[30:] - truth).mean()
+        smooth_err = np.abs(smoothed[30:] - truth).mean()
+        assert smooth_err < raw_err * 0.6, (smooth_err, raw_err)
+        print(f"✅ 静止目标平滑误差 {smooth_err:.1f}mm（原始 {raw_err:.1f}mm）")
+
+        # 框未移动时跳过 3D 查询，只按 remap_interval 定期刷新
+        tracker = MultiObjectTracker(remap_interval=10)
+        raw, smoothed = run_static(tracker, 60)
+        assert len(raw) <= 7, len(raw)
+        assert np.allclose(smoothed[1:10], smoothed[1])
+        stats = tracker.stats()
+        assert stats['reuse_ratio'] > 0.85
+        print(f"✅ 60 帧只查询 3D {len(raw)} 次（复用 {stats['reuse_ratio']:.0%}），期间坐标不跳变")
+
+        # 匀速移动：每帧都重新查询，平滑结果跟随运动
+        tracker = MultiObjectTracker()
+        for k in range(45):
+            t = k / 30.0
+            x = 300.0 * t  # 300mm/s
+            tracks = tracker.update(_batch([100 + 10 * k, 100, 200 + 10 * k, 200], [0]), t)
+            assert tracker.needs_mapping(tracks)[0]
+            noisy = np.array([x, 0.0, 1200.0]) + rng.normal(0, 10.0, 3)
+            tracker.set_measurement(tracks[0], {'x': noisy[0], 'y': noisy[1], 'z': noisy[2], 'unit': 'mm'})
+            coords = tracker.smooth(tracks[0], t)
+        assert abs(coords['x'] - x) < 20 and abs(tracks[0].kalman.velocity[0] - 300.0) < 80
+        print(f"✅ 移动目标平滑位置 {coords['x']:.0f}mm（真实 {x:.0f}mm），速度 {tracks[0].kalman.velocity[0]:.0f}mm/s")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 3D 平滑测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 多目标跟踪测试")
+    print("=" * 60)
+
+    tests = [
+        ("最优分配", test_assignment),
+        ("跟踪 ID", test_persistent_ids),
+        ("3D 平滑", test_smoothing_and_skip),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试出现异常: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 60)
+    print("📊 测试结果总结:")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("🎉 多目标跟踪测试通过！")
+    else:
+        print("⚠️  部分测试失败，请检查相关功能")
+
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+传感器帧可视化测试脚本
+测试深度查找表映射的正确性、深度模式预设、显示范围跟踪与每帧开销，
+人体索引调色板与红外显示模式
+"""
+
+import sys
+import os
+import time
+
+import cv2
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+
+def _scene(rng, near=800, far=3000):
+    depth = np.full((424, 512), far, dtype=np.uint16)
+    depth += rng.integers(0, 30, size=depth.shape, dtype=np.uint16)
+    depth[100:250, 60:200] = near
+    depth[rng.random(depth.shape) < 0.03] = 0
+    return depth
+
+
+def test_lut_matches_reference():
+    """测试固定范围下查找表映射与逐像素归一化 + applyColorMap 一致"""
+    print("🧪 测试查找表映射...")
+
+    try:
+        from ui.visualize import DepthColorizer
+
+        depth = _scene(np.random.default_rng(0))
+        depth[0, :10] = 9000  # 超出量程
+        depth[1, :4] = [1, 300, 499, 500]  # 低于量程下限的深度，500 为下限本身
+        colorizer = DepthColorizer((500, 4500), adaptive=False)
+        result = colorizer.colorize(depth)
+
+        low, high = 500.0, 4500.0
+        index = np.clip((depth.astype(np.float32) - low) * (255.0 / (high - low)), 0, 255).astype(np.uint8)
+        reference = cv2.applyColorMap(index, cv2.COLORMAP_JET)
+        reference[(depth < 500) | (depth > 4500)] = 0
+
+        assert result.shape == (424, 512, 3) and result.dtype == np.uint8
+        assert np.array_equal(result, reference)
+        assert not result[1, :3].any() and result[1, 3].any()
+        print("✅ 与逐像素归一化结果完全一致，无效深度与量程外的深度为黑色")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 查找表映射测试失败: {e}")
+        return False
+
+def test_depth_mode_presets():
+    """测试深度模式预设量程与范围跟踪"""
+    print("\n🧪 测试深度模式预设与范围跟踪...")
+
+    try:
+        from ui.config import config_manager
+        from ui.visualize import DepthColorizer
+
+        assert config_manager.get_kinect_depth_range('near') == (500, 4500)
+        assert config_manager.get_kinect_depth_range('default') == (800, 8000)
+        print("✅ near / default 模式量程")
+
+        rng = np.random.default_rng(1)
+        colorizer = DepthColorizer(config_manager.get_kinect_depth_range('default'))
+        for _ in range(60):
+            colorizer.colorize(_scene(rng, near=1000, far=3000))
+        valid = _scene(rng, near=1000, far=3000)
+        valid = valid[valid > 0]
+        low, high = np.percentile(valid, [5, 95])
+        assert abs(colorizer.low - low) < 100 and abs(colorizer.high - high) < 100, \
+            (colorizer.low, colorizer.high, low, high)
+        rebuilds = colorizer.rebuilds
+        for _ in range(30):
+            colorizer.colorize(_scene(rng, near=1000, far=3000))
+        assert colorizer.rebuilds == rebuilds, "场景稳定后不应重建查找表"
+        print(f"✅ 显示范围收敛到 {colorizer.low:.0f}-{colorizer.high:.0f}mm "
+              f"(百分位数 {low:.0f}-{high:.0f}mm)，稳定后不再重建查找表")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 深度模式预设测试失败: {e}")
+        return False
+
+def test_colorize_cost():
+    """测试每帧开销低于原百分位数实现"""
+    print("\n🧪 测试每帧开销...")
+
+    try:
+        from ui.visualize import DepthColorizer
+
+        depth = _scene(np.random.default_rng(2))
+        colorizer = DepthColorizer((500, 4500))
+        for _ in range(50):
+            colorizer.colorize(depth)
+
+        start = time.perf_counter()
+        for _ in range(50):
+            colorizer.colorize(depth)
+        lut_ms = (time.perf_counter() - start) / 50 * 1000
+
+        # 原实现：每帧两次百分位数 + 掩码归一化 + applyColorMap
+        start = time.perf_counter()
+        for _ in range(10):
+            valid_depth = depth[depth > 0]
+            depth_min, depth_max = np.percentile(valid_depth, 5), np.percentile(valid_depth, 95)
+            normalized = np.zeros_like(depth, dtype=np.uint8)
+            mask = (depth > 0) & (depth <= 8000)
+            normalized[mask] = np.clip((depth[mask] - depth_min) / (depth_max - depth_min) * 255,
+                                       0, 255).astype(np.uint8)
+            cv2.applyColorMap(normalized, cv2.COLORMAP_JET)
+        old_ms = (time.perf_counter() - start) / 10 * 1000
+
+        assert lut_ms < old_ms, f"查找表 {lut_ms:.2f}ms 不快于原实现 {old_ms:.2f}ms"
+        print(f"✅ 查找表 {lut_ms:.2f}ms/帧，原实现 {old_ms:.2f}ms/帧")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 每帧开销测试失败: {e}")
+        return False
+
+def test_body_index_palette():
+    """测试人体索引调色板映射与逐帧人体统计"""
+    print("\n🧪 测试人体索引调色板...")
+
+    try:
+        from ui.visualize import BodyIndexColorizer, BODY_COLORS, BACKGROUND_COLOR, format_body_stats
+
+        body = np.full((424, 512), 255, dtype=np.uint8)
+        body[50:150, 50:100] = 0
+        body[200:260, 300:340] = 3
+        colorizer = BodyIndexColorizer()
+        result = colorizer.colorize(body)
+
+        assert tuple(result[0, 0]) == BACKGROUND_COLOR
+        assert tuple(result[60, 60]) == BODY_COLORS[0]
+        assert tuple(result[210, 310]) == BODY_COLORS[3]
+        stats = colorizer.stats
+        assert stats['bodies'] == [0, 3]
+        assert stats['body_pixels'] == {0: 100 * 50, 3: 60 * 40}
+        assert abs(stats['coverage'] - (5000 + 2400) / body.size) < 1e-4
+        print(f"✅ 背景 255 与人体 0-5 按调色板着色，统计: {format_body_stats(stats)}")
+
+        colorizer.colorize(np.full((424, 512), 255, dtype=np.uint8))
+        assert colorizer.stats['bodies'] == [] and format_body_stats(colorizer.stats) == "人体 0"
+        print("✅ 无人体时统计为空")
+
+        start = time.perf_counter()
+        for _ in range(50):
+            colorizer.colorize(body)
+        elapsed_ms = (time.perf_counter() - start) / 50 * 1000
+        assert elapsed_ms < 33.0
+        print(f"✅ 每帧 {elapsed_ms:.2f}ms")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 人体索引调色板测试失败: {e}")
+        return False
+
+def test_infrared_modes():
+    """测试红外三种显示模式的映射与查找表重建频率"""
+    print("\n🧪 测试红外显示模式...")
+
+    try:
+        from ui.visualize import InfraredColorizer
+
+        rng = np.random.default_rng(2)
+        frames = []
+        for _ in range(30):
+            ir = rng.normal(6000, 1500, (424, 512)).clip(1, 65535).astype(np.uint16)
+            ir[rng.random(ir.shape) < 0.02] = 0
+            frames.append(ir)
+
+        fixed = InfraredColorizer('fixed', gain=8.0)
+        result = fixed.colorize(frames[0])
+        expected = np.minimum(frames[0].astype(np.float32) * (8.0 / 256.0), 255).astype(np.uint8)
+        assert np.array_equal(result[:, :, 0], expected) and np.array_equal(result[:, :, 2], expected)
+        for ir in frames:
+            fixed.colorize(ir)
+        assert fixed.rebuilds == 1
+        print("✅ fixed: 固定增益映射正确，查找表只构建一次")
+
+        auto = InfraredColorizer('auto')
+        for ir in frames:
+            result = auto.colorize(ir)
+        assert 2000 < auto.low < 4000 and 8000 < auto.high < 10000, (auto.low, auto.high)
+        assert auto.rebuilds <= 5
+        assert result[frames[-1] == 0].max() == 0
+        valid = result[frames[-1] > 0][:, 0]
+        assert valid.min() == 0 and valid.max() == 255
+        print(f"✅ auto: 显示范围 {auto.low:.0f}-{auto.high:.0f}，{len(frames)} 帧重建查找表 {auto.rebuilds} 次")
+
+        clahe = InfraredColorizer('clahe', clahe_interval=10)
+        for ir in frames:
+            result = clahe.colorize(ir)
+        assert clahe.rebuilds == 3
+        gray = result[:, :, 0][frames[-1] > 0]
+        # 均衡后灰度分布接近均匀
+        assert 100 < float(np.median(gray)) < 155 and gray.std() > 60
+        assert result[frames[-1] == 0].max() == 0
+        print(f"✅ clahe: 每 10 帧重新均衡，中位灰度 {np.median(gray):.0f}")
+
+        auto.set_mode('fixed', 4.0)
+        assert auto.colorize(frames[0])[0, 0, 0] == min(int(frames[0][0, 0] * 4.0 / 256.0), 255)
+        try:
+            auto.set_mode('gamma')
+            return False
+        except ValueError:
+            print("✅ 切换模式即时生效，未知模式报错")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 红外显示模式测试失败: {e}")
+        return False
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("🧪 Oasis 传感器帧可视化测试")
+    print("=" * 60)
+
+    tests = [
+        ("查找表映射", test_lut_matches_reference),
+        ("深度模式预设与范围跟踪", test_depth_mode_presets),
+        ("每帧开销", test_colorize_cost),
+        ("人体索引调色板", test_body_index_palette),
+        ("红外显示模式", test_infrared_modes),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ {test_name} 测试异常: {e}")
+            results.append((test_name, False))
+
+    # 显示测试结果
+    print("\n" + "=" * 60)
+    print("📊 可视化测试结果")
+    print("=" * 60)
+
+    passed = 0
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"  {test_name}: {status}")
+        if result:
+            passed += 1
+
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+
+    if passed == len(results):
+        print("\n🎉 可视化测试通过！")
+        return 0
+    else:
+        print("\n⚠️  部分测试失败，请检查实现。")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
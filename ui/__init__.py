@@ -2,7 +2,13 @@
 Oasis 目标检测系统 UI 模块
 """
 
-from .config import config_manager
+
+def __getattr__(name):
+    # config_manager 在第一次使用时才导入配置模块，导入 ui 包本身（如 ui.startup）不引入其他模块
+    if name == 'config_manager':
+        from .config import config_manager
+        return config_manager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # UI 文件版本的导入（按需导入，避免依赖问题）
 def get_main_window_ui():
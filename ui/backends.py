@@ -0,0 +1,177 @@
+"""
+Oasis 目标检测系统 - 推理后端
+同一个 .pt 模型可以用 PyTorch、ONNX Runtime、OpenVINO 或 OpenCV DNN 推理：
+非 PyTorch 后端首次使用时由 ultralytics 导出一次，导出结果缓存在模型文件旁，之后直接加载；
+各后端都包装为与 YOLO 模型相同的调用方式（names、engine(images, **kwargs)），
+后处理、分块推理与跟踪不需要区分后端
+"""
+
+import importlib.util
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+BACKENDS = ('pytorch', 'onnxruntime', 'openvino', 'opencv')
+
+
+@dataclass(frozen=True)
+class BackendSpec:
+    """推理后端描述
+
+    module: 运行时依赖的模块（只检查是否安装，不导入）
+    export_format: ultralytics 导出格式，None 表示直接加载 .pt
+    suffix: 导出结果路径 = 模型文件路径去掉扩展名 + suffix
+    overrides: 加载后写入模型默认参数的选项（在第一次推理建立后端之前生效）
+    """
+    module: str
+    export_format: Optional[str] = None
+    suffix: str = ''
+    overrides: Dict[str, object] = field(default_factory=dict)
+
+
+BACKEND_SPECS = {
+    'pytorch': BackendSpec('torch'),
+    'onnxruntime': BackendSpec('onnxruntime', 'onnx', '.onnx'),
+    'openvino': BackendSpec('openvino', 'openvino', '_openvino_model'),
+    # 与 ONNX Runtime 共用同一个导出文件，由 ultralytics 改用 cv2.dnn 加载
+    'opencv': BackendSpec('cv2', 'onnx', '.onnx', {'dnn': True}),
+}
+
+# 导出为固定输入 640x640、批大小 1；opset 12 同时兼容 ONNX Runtime 与 cv2.dnn
+EXPORT_ARGS = {
+    'onnx': {'opset': 12, 'dynamic': False},
+    'openvino': {'dynamic': False},
+}
+
+
+def available_backends() -> Dict[str, bool]:
+    """各后端的运行时依赖是否已安装"""
+    available = {}
+    for name, spec in BACKEND_SPECS.items():
+        try:
+            available[name] = importlib.util.find_spec(spec.module) is not None
+        except (ImportError, ValueError):
+            available[name] = False
+    return available
+
+
+def export_path(weights, backend):
+    """后端导出结果的缓存路径（与模型文件同目录）；PyTorch 后端返回模型文件本身"""
+    spec = BACKEND_SPECS[backend]
+    if spec.export_format is None:
+        return weights
+    return os.path.splitext(weights)[0] + spec.suffix
+
+
+def is_fresh(path, weights):
+    """导出结果存在且不比模型文件旧"""
+    if not os.path.exists(path):
+        return False
+    return not os.path.exists(weights) or os.path.getmtime(path) >= os.path.getmtime(weights)
+
+
+def _weights_file(model_path):
+    """本地模型文件路径；官方模型名（如 yolo11n.pt）首次使用时由 ultralytics 下载"""
+    if os.path.exists(model_path):
+        return model_path
+    from ultralytics import YOLO
+    return str(YOLO(model_path).ckpt_path)
+
+
+def export_model(weights, backend):
+    """导出模型到后端格式并缓存，缓存比模型文件新时直接返回缓存路径"""
+    spec = BACKEND_SPECS[backend]
+    target = export_path(weights, backend)
+    if spec.export_format is None or is_fresh(target, weights):
+        return target
+
+    from ultralytics import YOLO
+    # 在临时目录中导出再移动到缓存位置，导出中断时不会留下不完整的缓存
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(target))) as tmp:
+        source = os.path.join(tmp, os.path.basename(weights))
+        shutil.copyfile(weights, source)
+        exported = YOLO(source).export(format=spec.export_format, **EXPORT_ARGS[spec.export_format])
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        os.replace(str(exported), target)
+    return target
+
+
+class InferenceEngine:
+    """推理引擎：调用方式与 YOLO 模型相同
+
+    导出的模型批大小固定为 1，多张图（分块推理）逐张推理后按输入顺序返回结果。
+    names 在加载时缓存一次，后处理器按对象复用编译好的类别掩码。
+    """
+
+    def __init__(self, model, backend, model_path, path, batched=True, requested=None,
+                 fallback=None, export_seconds=0.0, load_seconds=0.0):
+        self.model = model
+        self.backend = backend
+        self.model_path = model_path
+        self.path = path
+        self.batched = batched
+        self.requested = requested or backend
+        self.fallback = fallback
+        self.export_seconds = export_seconds
+        self.load_seconds = load_seconds
+        self.warmup_seconds = 0.0
+        self.names = model.names
+
+    def __call__(self, images, **kwargs):
+        if self.batched or not isinstance(images, list):
+            return self.model(images, **kwargs)
+        results = []
+        for image in images:
+            results.extend(self.model(image, **kwargs))
+        return results
+
+
+def _load_exported(model_path, backend, progress=None):
+    spec = BACKEND_SPECS.get(backend)
+    if spec is None:
+        raise ValueError(f"未知的推理后端: {backend}")
+    if not available_backends()[backend]:
+        raise ImportError(f"未安装 {spec.module}")
+
+    from ultralytics import YOLO
+    start = time.perf_counter()
+    weights = _weights_file(model_path)
+    if progress is not None and not is_fresh(export_path(weights, backend), weights):
+        progress(10, f"导出 {spec.export_format} 模型（只在首次使用时进行）")
+    path = export_model(weights, backend)
+    exported = time.perf_counter()
+    if progress is not None:
+        progress(50, f"加载 {os.path.basename(path)}")
+    model = YOLO(path, task='detect')
+    model.overrides.update(spec.overrides)
+    engine = InferenceEngine(model, backend, model_path, path, batched=False,
+                             export_seconds=exported - start)
+    engine.load_seconds = time.perf_counter() - exported
+    return engine
+
+
+def load_engine(model_path, backend='pytorch', progress=None) -> InferenceEngine:
+    """按后端加载模型；后端未安装或导出、加载失败时回退到 PyTorch，原因记录在 engine.fallback
+
+    progress(百分比, 说明) 在导出与加载开始时调用。
+    """
+    fallback = None
+    if backend != 'pytorch':
+        try:
+            return _load_exported(model_path, backend, progress)
+        except Exception as e:
+            fallback = str(e)
+            print(f"⚠️  推理后端 {backend} 不可用，使用 PyTorch: {e}")
+
+    from ultralytics import YOLO
+    if progress is not None:
+        progress(50, f"加载 {os.path.basename(model_path)}")
+    start = time.perf_counter()
+    model = YOLO(model_path)
+    engine = InferenceEngine(model, 'pytorch', model_path, model_path, requested=backend, fallback=fallback)
+    engine.load_seconds = time.perf_counter() - start
+    return engine
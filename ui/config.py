@@ -4,8 +4,8 @@ Oasis 目标检测系统 - 配置管理
 
 import json
 import os
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Any
+from dataclasses import dataclass, asdict, field
+from typing import List, Dict, Any, Tuple
 
 
 @dataclass
@@ -17,6 +17,35 @@ class DetectionConfig:
     max_detections: int
     enable_3d_coordinates: bool
     custom_classes: List[str]
+    track_and_skip: bool = False
+    keyframe_max_interval: int = 8
+    detector_cpu_budget: float = 0.5
+    tiled_inference: bool = False
+    tile_size: int = 640
+    tile_overlap: float = 0.2
+    tile_full_frame: bool = True
+    tile_roi: List[int] = field(default_factory=list)
+    tile_depth_range: List[int] = field(default_factory=list)
+    motion_gate: bool = False
+    motion_gate_source: str = "gray"
+    motion_threshold: int = 12
+    motion_regions: bool = True
+    motion_refresh_s: float = 5.0
+    inference_backend: str = "pytorch"
+    model_cache_size: int = 3
+    model_cache_mb: int = 1024
+    camera_sources: List[int] = field(default_factory=lambda: [0, 1])
+    micro_batch_size: int = 4
+    micro_batch_deadline_ms: float = 15.0
+    inference_workers: int = 0
+    adaptive_quality: bool = False
+    quality_target_fps: float = 15.0
+    quality_target_latency_ms: float = 0.0
+    quality_min_imgsz: int = 320
+    quality_max_stride: int = 3
+    quality_allow_tiling: bool = True
+    quality_model_tiers: List[str] = field(default_factory=lambda: ['yolo11n.pt'])
+    depth_histogram: bool = False
     
     @classmethod
     def default(cls):
@@ -26,7 +55,36 @@ class DetectionConfig:
             model_path='yolo11n.pt',
             max_detections=50,
             enable_3d_coordinates=False,
-            custom_classes=[]
+            custom_classes=[],
+            track_and_skip=False,  # 只在关键帧上运行检测器，其余帧光流跟踪
+            keyframe_max_interval=8,
+            detector_cpu_budget=0.5,  # 检测器占用 CPU 的目标比例
+            tiled_inference=False,  # 原分辨率重叠分块批量推理，提高小目标检出率
+            tile_size=640,
+            tile_overlap=0.2,
+            tile_full_frame=True,  # 分块之外再推理一次整帧缩略图，检出跨越多个分块的大目标
+            tile_roi=[],  # 彩色图像像素 [x1, y1, x2, y2]，为空时分块覆盖整帧
+            tile_depth_range=[],  # [近, 远] 毫米，非空时只推理包含该深度范围像素的分块
+            motion_gate=False,  # 画面没有变化时复用上次的检测结果
+            motion_gate_source="gray",  # gray, depth
+            motion_threshold=12,  # 灰度差阈值
+            motion_regions=True,  # 局部变化时只重新推理变化区域
+            motion_refresh_s=5.0,  # 画面静止时整帧重新推理的间隔（秒）
+            inference_backend="pytorch",  # pytorch, onnxruntime, openvino, opencv
+            model_cache_size=3,  # 保留在内存中的最近使用模型数
+            model_cache_mb=1024,  # 缓存模型的估算内存上限（MB）
+            camera_sources=[0, 1],  # 多路摄像头模式使用的摄像头索引
+            micro_batch_size=4,  # 多路摄像头一次批量推理的最大帧数
+            micro_batch_deadline_ms=15.0,  # 第一帧到达后凑批的最长等待时间（毫秒）
+            inference_workers=0,  # 推理进程数，0 表示在界面进程的推理线程中推理
+            adaptive_quality=False,  # 按实测耗时自动调整输入尺寸、跨帧数、分块与模型
+            quality_target_fps=15.0,  # 目标帧率，0 表示不限制
+            quality_target_latency_ms=0.0,  # 目标端到端延迟 p95（毫秒），0 表示不限制
+            quality_min_imgsz=320,  # 自动调整时推理输入尺寸的下限
+            quality_max_stride=3,  # 自动调整时检测跨帧数的上限
+            quality_allow_tiling=True,  # 允许自动关闭分块推理
+            quality_model_tiers=['yolo11n.pt'],  # 依次降级使用的更小模型
+            depth_histogram=False  # 3D 坐标的区域深度混入背景时取直方图中位数（每帧多约 10ms）
         )
 
 
@@ -39,6 +97,7 @@ class DisplayConfig:
     font_scale: float
     bbox_color: tuple
     text_color: tuple
+    show_latency_overlay: bool = False
     
     @classmethod
     def default(cls):
@@ -48,7 +107,8 @@ class DisplayConfig:
             bbox_thickness=2,
             font_scale=0.5,
             bbox_color=(0, 255, 0),  # 绿色
-            text_color=(0, 255, 0)   # 绿色
+            text_color=(0, 255, 0),  # 绿色
+            show_latency_overlay=False
         )
 
 
@@ -60,6 +120,10 @@ class KinectConfig:
     auto_exposure: bool
     video_stream_type: str
     depth_mode: str
+    replay_path: str = ""
+    replay_pacing: str = "realtime"
+    infrared_mode: str = "auto"
+    infrared_gain: float = 8.0
     
     @classmethod
     def default(cls):
@@ -68,7 +132,11 @@ class KinectConfig:
             fps=30,
             auto_exposure=True,
             video_stream_type="color",  # color, depth, infrared, body_index
-            depth_mode="near"  # near, default
+            depth_mode="near",  # near, default
+            replay_path="",  # 录制目录，非空时用回放代替 Kinect 设备
+            replay_pacing="realtime",  # realtime, fixed, fast
+            infrared_mode="auto",  # fixed, auto, clahe
+            infrared_gain=8.0  # fixed 模式的增益
         )
 
 
@@ -79,6 +147,7 @@ class UIConfig:
     window_size: tuple
     splitter_sizes: List[int]
     auto_start: bool
+    preload_model: bool = True
     
     @classmethod
     def default(cls):
@@ -86,24 +155,44 @@ class UIConfig:
             theme="light",
             window_size=(1200, 800),
             splitter_sizes=[800, 400],
-            auto_start=False
+            auto_start=False,
+            preload_model=True  # 窗口显示后立即在后台加载模型，否则第一次开始检测时加载
         )
 
 
+# 配置段名 -> 配置类
+CONFIG_SECTIONS = {
+    'detection': DetectionConfig,
+    'display': DisplayConfig,
+    'kinect': KinectConfig,
+    'ui': UIConfig
+}
+
+
 class ConfigManager:
-    """配置管理器"""
+    """配置管理器
+
+    配置文件在第一次访问配置段时才读取，导入本模块不读文件；
+    配置文件中没有的配置段在访问时使用默认值。
+    """
     
     def __init__(self, config_file="config.json"):
         self.config_file = config_file
-        self.detection = DetectionConfig.default()
-        self.display = DisplayConfig.default()
-        self.kinect = KinectConfig.default()
-        self.ui = UIConfig.default()
-        
-        self.load_config()
+        self._loaded = False
+    
+    def __getattr__(self, name):
+        # 只在实例上还没有该配置段时调用
+        if name not in CONFIG_SECTIONS:
+            raise AttributeError(f"'ConfigManager' object has no attribute '{name}'")
+        if not self.__dict__.get('_loaded'):
+            self.load_config()
+        if name not in self.__dict__:
+            setattr(self, name, CONFIG_SECTIONS[name].default())
+        return self.__dict__[name]
     
     def load_config(self):
         """加载配置"""
+        self._loaded = True
         if os.path.exists(self.config_file):
             try:
                 with open(self.config_file, 'r', encoding='utf-8') as f:
@@ -174,6 +263,38 @@ class ConfigManager:
             'default': '默认模式 (0.8-8m)'
         }
     
+    def get_kinect_infrared_modes(self) -> Dict[str, str]:
+        """获取可用的红外显示模式"""
+        return {
+            'fixed': '固定增益',
+            'auto': '自动增益',
+            'clahe': '直方图均衡'
+        }
+    
+    def get_motion_gate_sources(self) -> Dict[str, str]:
+        """获取变化检测可用的输入"""
+        return {
+            'gray': '彩色灰度图',
+            'depth': '深度图 (仅 Kinect)'
+        }
+    
+    def get_inference_backends(self) -> Dict[str, str]:
+        """获取可用的推理后端"""
+        return {
+            'pytorch': 'PyTorch',
+            'onnxruntime': 'ONNX Runtime',
+            'openvino': 'OpenVINO (Intel CPU)',
+            'opencv': 'OpenCV DNN'
+        }
+    
+    def get_kinect_depth_range(self, depth_mode: str = None) -> Tuple[int, int]:
+        """获取深度模式的量程（毫米），默认使用当前配置的深度模式"""
+        ranges = {
+            'near': (500, 4500),
+            'default': (800, 8000)
+        }
+        return ranges.get(depth_mode or self.kinect.depth_mode, ranges['default'])
+    
     def add_custom_class(self, class_name: str):
         """添加自定义检测类别"""
         if class_name and class_name not in self.detection.custom_classes:
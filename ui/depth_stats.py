@@ -0,0 +1,145 @@
+"""
+Oasis 目标检测系统 - 深度区域统计
+每张深度帧构建一次积分图（有效深度之和、有效像素数）与可选的粗粒度深度直方图积分图，
+之后任意矩形区域的均值、有效比例与近似分位数均为 O(1) 查询，供该帧所有检测共享
+"""
+
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+# 直方图积分图的默认参数：32 个深度区间，每 2x2 像素采样一次
+HIST_BINS = 32
+HIST_STRIDE = 2
+
+
+def _integral(image, sdepth):
+    """(H, W[, C]) -> (H+1, W+1[, C]) 积分图，首行首列为 0；多通道时各通道分别积分"""
+    if image.dtype == bool:
+        image = image.view(np.uint8)
+    return cv2.integral(np.ascontiguousarray(image), sdepth=sdepth)
+
+
+def _rect_sum(table, x1, y1, x2, y2):
+    """积分图上的矩形求和，坐标为 (N,) 整数数组，区间 [x1, x2) x [y1, y2)"""
+    return table[y2, x2] - table[y1, x2] - table[y2, x1] + table[y1, x1]
+
+
+class DepthStats:
+    """单张深度帧的区域统计结构
+
+    depth_frame: (H, W) uint16 毫米，0 或超出 [min_depth, max_depth] 视为无效。
+    hist_bins 为 0 时不使用直方图，robust_depth() 只取均值；直方图积分图约为均值积分图的 10 倍开销，
+    在第一次查询分位数时才构建。
+    """
+
+    def __init__(self, depth_frame, min_depth=1, max_depth=8000,
+                 hist_bins=HIST_BINS, hist_stride=HIST_STRIDE):
+        depth = np.asarray(depth_frame)
+        self.shape = depth.shape[:2]
+        self.min_depth = float(min_depth)
+        self.max_depth = float(max_depth)
+        self.hist_bins = int(hist_bins)
+        self.hist_stride = max(int(hist_stride), 1)
+
+        valid = (depth >= min_depth) & (depth <= max_depth)
+        self.depth = depth
+        self._valid = valid
+        # depth * valid 保持 uint16，不经过 np.where 的 int64 中间数组
+        self.sum_table = _integral((depth * valid).astype(np.uint16, copy=False), cv2.CV_64F)
+        self.count_table = _integral(valid, cv2.CV_32S)
+        self._hist_table = None
+
+    @property
+    def bin_width(self):
+        return (self.max_depth - self.min_depth) / self.hist_bins
+
+    def _rects(self, boxes, stride=1):
+        """深度像素 xyxy (N, 4) -> 裁剪后的整数区间，保证每个区域至少 1 个像素"""
+        h, w = self.shape
+        if stride > 1:
+            h, w = -(-h // stride), -(-w // stride)
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4) / stride
+        x1 = np.clip(np.floor(boxes[:, 0]), 0, w - 1).astype(np.intp)
+        y1 = np.clip(np.floor(boxes[:, 1]), 0, h - 1).astype(np.intp)
+        x2 = np.clip(np.ceil(boxes[:, 2]), 0, w).astype(np.intp)
+        y2 = np.clip(np.ceil(boxes[:, 3]), 0, h).astype(np.intp)
+        x2 = np.maximum(x2, x1 + 1)
+        y2 = np.maximum(y2, y1 + 1)
+        return x1, y1, x2, y2
+
+    def region(self, boxes) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """区域有效深度均值、有效像素比例与有效像素数
+
+        boxes: (N, 4) 深度图像素 xyxy。没有有效像素的区域均值为 NaN。
+        """
+        x1, y1, x2, y2 = self._rects(boxes)
+        total = _rect_sum(self.sum_table, x1, y1, x2, y2)
+        count = _rect_sum(self.count_table, x1, y1, x2, y2)
+        area = (x2 - x1) * (y2 - y1)
+        mean = np.full(len(count), np.nan, dtype=np.float32)
+        has = count > 0
+        mean[has] = total[has] / count[has]
+        return mean, (count / area).astype(np.float32), count
+
+    def _build_histogram(self):
+        s = self.hist_stride
+        depth = self.depth[::s, ::s]
+        valid = self._valid[::s, ::s]
+        bins = ((depth.astype(np.float32) - self.min_depth) / self.bin_width).astype(np.int32)
+        bins = np.clip(bins, 0, self.hist_bins - 1).astype(np.uint8)
+        bins[~valid] = 255
+        # 每个深度区间一个通道，(H/s+1, W/s+1, bins) int32
+        onehot = bins[:, :, None] == np.arange(self.hist_bins, dtype=np.uint8)
+        self._hist_table = _integral(onehot, cv2.CV_32S)
+
+    def percentile(self, boxes, q=50.0) -> np.ndarray:
+        """区域有效深度的近似分位数（毫米），在命中区间内线性插值
+
+        精度约为一个直方图区间宽度；没有有效像素的区域返回 NaN。
+        """
+        if self.hist_bins <= 0:
+            raise ValueError("hist_bins 为 0 时不支持分位数查询")
+        if self._hist_table is None:
+            self._build_histogram()
+
+        x1, y1, x2, y2 = self._rects(boxes, self.hist_stride)
+        counts = _rect_sum(self._hist_table, x1, y1, x2, y2)       # (N, bins)
+        cdf = np.cumsum(counts, axis=1)
+        total = cdf[:, -1]
+        target = total * (q / 100.0)
+
+        k = np.argmax(cdf >= target[:, None], axis=1)
+        rows = np.arange(len(k))
+        before = np.where(k > 0, cdf[rows, np.maximum(k - 1, 0)], 0)
+        in_bin = np.maximum(counts[rows, k], 1)
+        frac = np.clip((target - before) / in_bin, 0.0, 1.0)
+
+        value = (self.min_depth + (k + frac) * self.bin_width).astype(np.float32)
+        value[total == 0] = np.nan
+        return value
+
+    def robust_depth(self, boxes, q=50.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """区域稳健深度，返回 (深度, 有效像素比例, 有效像素数)
+
+        均值与近似分位数相差不超过一个直方图区间时（区域内深度单峰）取精确的均值，
+        否则说明混入了背景或前景遮挡，取近似分位数。hist_bins 为 0 时只取均值。
+        """
+        mean, ratio, count = self.region(boxes)
+        if self.hist_bins <= 0:
+            return mean, ratio, count
+        approx = self.percentile(boxes, q)
+        depth = np.where(np.abs(mean - approx) <= self.bin_width, mean, approx)
+        return depth.astype(np.float32), ratio, count
+
+
+def shrink_boxes(boxes, scale):
+    """按中心缩放 xyxy 框，用于只统计目标中心区域、减少背景像素"""
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    cx = (boxes[:, 0] + boxes[:, 2]) * 0.5
+    cy = (boxes[:, 1] + boxes[:, 3]) * 0.5
+    hw = (boxes[:, 2] - boxes[:, 0]) * (0.5 * scale)
+    hh = (boxes[:, 3] - boxes[:, 1]) * (0.5 * scale)
+    return np.column_stack([cx - hw, cy - hh, cx + hw, cy + hh])
+
@@ -0,0 +1,139 @@
+"""
+Oasis 目标检测系统 - 原始帧归档
+每个流一个只追加、固定步长的帧文件和一个时间戳索引文件，读取端通过 np.memmap
+得到零拷贝的帧视图，按帧号或时间 O(1) / O(log n) 随机访问
+"""
+
+import json
+import os
+from typing import Optional, Sequence
+
+import numpy as np
+
+ARCHIVE_MAGIC = b"OASISFRM"
+ARCHIVE_VERSION = 1
+
+# 文件头固定占一页，帧数据从页边界开始
+HEADER_SIZE = 4096
+
+FRAMES_SUFFIX = ".frames"
+INDEX_SUFFIX = ".ts"
+
+
+def archive_paths(directory, stream):
+    """流的帧文件与时间戳索引文件路径"""
+    base = os.path.join(directory, stream)
+    return base + FRAMES_SUFFIX, base + INDEX_SUFFIX
+
+
+class FrameArchiveWriter:
+    """单个流的只追加写入器
+
+    帧数据先于时间戳写入，索引中的每条时间戳都对应一帧完整数据，
+    录制中断时读取端按两者较小的帧数截断。
+    """
+
+    def __init__(self, directory, stream, shape: Sequence[int], dtype, meta: Optional[dict] = None):
+        self.shape = tuple(int(n) for n in shape)
+        self.dtype = np.dtype(dtype)
+        self.frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self.count = 0
+
+        os.makedirs(directory, exist_ok=True)
+        frames_path, index_path = archive_paths(directory, stream)
+        header = {
+            'version': ARCHIVE_VERSION, 'stream': stream,
+            'shape': list(self.shape), 'dtype': self.dtype.str,
+            'frame_bytes': self.frame_bytes, 'meta': meta or {},
+        }
+        encoded = ARCHIVE_MAGIC + json.dumps(header).encode('utf-8')
+        if len(encoded) > HEADER_SIZE:
+            raise ValueError("归档文件头过长")
+
+        self._frames = open(frames_path, 'wb')
+        self._frames.write(encoded.ljust(HEADER_SIZE, b' '))
+        self._index = open(index_path, 'wb')
+
+    def append(self, frame, timestamp):
+        """追加一帧，返回帧号"""
+        frame = np.ascontiguousarray(frame, dtype=self.dtype)
+        if frame.nbytes != self.frame_bytes:
+            raise ValueError(f"帧大小不匹配: {frame.nbytes} != {self.frame_bytes}")
+        self._frames.write(memoryview(frame).cast('B'))
+        self._index.write(np.float64(timestamp).tobytes())
+        self.count += 1
+        return self.count - 1
+
+    def flush(self):
+        self._frames.flush()
+        self._index.flush()
+
+    def close(self):
+        if not self._frames.closed:
+            self._frames.close()
+            self._index.close()
+
+
+class FrameArchive:
+    """单个流的只读归档
+
+    archive[i] 返回第 i 帧的零拷贝 memmap 视图（形状为写入时的 shape），
+    index_at(t) 返回不晚于 t 的最新帧号。
+    """
+
+    def __init__(self, directory, stream):
+        self.stream = stream
+        self.frames_path, self.index_path = archive_paths(directory, stream)
+        with open(self.frames_path, 'rb') as f:
+            raw = f.read(HEADER_SIZE)
+        if not raw.startswith(ARCHIVE_MAGIC):
+            raise ValueError(f"不是帧归档文件: {self.frames_path}")
+        header = json.loads(raw[len(ARCHIVE_MAGIC):].decode('utf-8').rstrip())
+        if header['version'] != ARCHIVE_VERSION:
+            raise ValueError(f"帧归档版本不匹配: {self.frames_path}")
+
+        self.shape = tuple(header['shape'])
+        self.dtype = np.dtype(header['dtype'])
+        self.frame_bytes = header['frame_bytes']
+        self.meta = header['meta']
+        self.frames = None
+        self.timestamps = np.zeros(0, dtype=np.float64)
+        self.refresh()
+
+    def refresh(self):
+        """重新映射文件，读取录制过程中新追加的帧"""
+        data_bytes = os.path.getsize(self.frames_path) - HEADER_SIZE
+        index_count = os.path.getsize(self.index_path) // 8
+        count = min(max(data_bytes, 0) // self.frame_bytes, index_count)
+        if self.frames is not None and count == len(self.frames):
+            return count
+
+        if count:
+            self.frames = np.memmap(self.frames_path, dtype=self.dtype, mode='r',
+                                    offset=HEADER_SIZE, shape=(count,) + self.shape)
+            self.timestamps = np.memmap(self.index_path, dtype=np.float64, mode='r',
+                                        shape=(count,))
+        else:
+            self.frames = np.zeros((0,) + self.shape, dtype=self.dtype)
+            self.timestamps = np.zeros(0, dtype=np.float64)
+        return count
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, index):
+        return self.frames[index]
+
+    def index_at(self, timestamp):
+        """不晚于 timestamp 的最新帧号，timestamp 早于第一帧时返回 -1"""
+        return int(np.searchsorted(self.timestamps, timestamp, side='right')) - 1
+
+    def frame_at(self, timestamp):
+        """不晚于 timestamp 的最新帧，没有时返回 None"""
+        index = self.index_at(timestamp)
+        return self.frames[index] if index >= 0 else None
+
+    def close(self):
+        # 释放 memmap，Windows 下映射中的文件无法删除
+        self.frames = None
+        self.timestamps = np.zeros(0, dtype=np.float64)
@@ -0,0 +1,141 @@
+"""
+Oasis 目标检测系统 - 帧缓冲池
+按流预分配固定数量的帧缓冲区，以引用计数租约的形式在采集、推理与显示之间传递，
+全部持有者归还后缓冲区回到池中复用，稳态运行时不再分配大块内存
+"""
+
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class FrameLease:
+    """缓冲区租约
+
+    创建时引用计数为 1（归采集方所有）；每多一个持有者调用一次 retain()，
+    每个持有者用完后调用一次 release()，计数归零时缓冲区回到池中。
+    """
+
+    __slots__ = ('array', '_pool', '_refs')
+
+    def __init__(self, array, pool=None):
+        self.array = array
+        self._pool = pool
+        self._refs = 1
+
+    def retain(self):
+        """增加一个持有者，返回自身"""
+        pool = self._pool
+        if pool is None:
+            self._refs += 1
+            return self
+        with pool._lock:
+            if self._refs <= 0:
+                raise RuntimeError(f"缓冲池 {pool.name}: 租约已归还，不能再次持有")
+            self._refs += 1
+        return self
+
+    def release(self):
+        """归还一个持有者；最后一个持有者归还时缓冲区回到池中"""
+        pool = self._pool
+        if pool is None:
+            self._refs -= 1
+            return
+        with pool._lock:
+            if self._refs <= 0:
+                raise RuntimeError(f"缓冲池 {pool.name}: 租约被重复归还")
+            self._refs -= 1
+            if self._refs == 0:
+                pool._give_back(self.array)
+
+    @property
+    def refs(self):
+        return self._refs
+
+
+class FramePool:
+    """固定形状的帧缓冲池（线程安全）
+
+    缓冲区用尽时分配一个不入池的临时缓冲区并计入 exhausted，不阻塞采集线程。
+    """
+
+    def __init__(self, name, shape, dtype=np.uint8, capacity=4):
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._free = [np.empty(self.shape, self.dtype) for _ in range(capacity)]
+        self.leased = 0
+        self.exhausted = 0
+        self.peak_in_use = 0
+
+    def acquire(self) -> FrameLease:
+        """租出一个缓冲区（内容未初始化）"""
+        with self._lock:
+            self.leased += 1
+            if self._free:
+                in_use = self.capacity - len(self._free) + 1
+                if in_use > self.peak_in_use:
+                    self.peak_in_use = in_use
+                return FrameLease(self._free.pop(), self)
+            self.exhausted += 1
+        return FrameLease(np.empty(self.shape, self.dtype))
+
+    def _give_back(self, array):
+        # 调用方已持有 self._lock
+        self._free.append(array)
+
+    @property
+    def in_use(self):
+        return self.capacity - len(self._free)
+
+    def stats(self):
+        return {
+            'shape': 'x'.join(str(n) for n in self.shape),
+            'capacity': self.capacity,
+            'in_use': self.in_use,
+            'peak_in_use': self.peak_in_use,
+            'leased': self.leased,
+            'exhausted': self.exhausted,
+        }
+
+
+class FramePoolSet:
+    """按名称管理的一组缓冲池
+
+    同一名称请求的形状或类型变化时（例如显示区域大小改变）用新池替换旧池；
+    旧池中尚未归还的租约归还后随旧池一起释放。
+    """
+
+    def __init__(self, capacity=4):
+        self.capacity = capacity
+        self.pools: Dict[str, FramePool] = {}
+        self._lock = threading.Lock()
+        self.resized = 0
+
+    def get(self, name, shape, dtype=np.uint8, capacity: Optional[int] = None) -> FramePool:
+        pool = self.pools.get(name)
+        if pool is None or pool.shape != tuple(shape) or pool.dtype != np.dtype(dtype):
+            with self._lock:
+                pool = self.pools.get(name)
+                if pool is None or pool.shape != tuple(shape) or pool.dtype != np.dtype(dtype):
+                    if pool is not None:
+                        self.resized += 1
+                    pool = FramePool(name, shape, dtype, capacity or self.capacity)
+                    self.pools[name] = pool
+        return pool
+
+    def lease(self, name, shape, dtype=np.uint8) -> FrameLease:
+        """从指定名称的池中租出一个缓冲区"""
+        return self.get(name, shape, dtype).acquire()
+
+    def stats(self):
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+
+def format_pool_stats(stats):
+    """缓冲池统计文本：占用/容量与耗尽次数"""
+    return " ".join(f"{name}:{s['in_use']}/{s['capacity']}" + (f"!{s['exhausted']}" if s['exhausted'] else "")
+                    for name, s in stats.items())
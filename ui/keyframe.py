@@ -0,0 +1,290 @@
+"""
+Oasis 目标检测系统 - 关键帧检测与光流跟踪
+检测器只在关键帧上运行，关键帧之间用缩小灰度图上的稀疏光流（Lucas-Kanade）平移、缩放上一帧的检测框，
+并沿用其跟踪 ID；关键帧间隔随画面运动与检测器的 CPU 预算自适应
+"""
+
+import math
+import time
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+from .frame_pool import FramePoolSet
+from .postprocess import DetectionBatch
+from .render import prepare_display_frame
+from .tracking import box_iou, linear_assignment
+
+# 光流计算所用灰度图的宽度
+FLOW_WIDTH = 320
+# 每个检测框内的跟踪点网格（GRID x GRID）
+FLOW_GRID = 4
+# 前向-后向误差超过此值（灰度图像素）的跟踪点视为丢失
+FLOW_FB_ERROR = 1.0
+
+_LK_PARAMS = dict(winSize=(15, 15), maxLevel=2,
+                  criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+
+class FlowTracker:
+    """稀疏光流检测框传播
+
+    每个框内取 FLOW_GRID x FLOW_GRID 个点，所有框的点一次调用 calcOpticalFlowPyrLK，
+    经前向-后向校验后取位移中位数平移框、取点到中心距离之比的中位数缩放框。
+    灰度图由 prepare_display_frame 缩小到 FLOW_WIDTH 宽（写入缓冲池）后转换，缓冲区跨帧复用。
+    """
+
+    def __init__(self, width=FLOW_WIDTH, grid=FLOW_GRID, fb_error=FLOW_FB_ERROR):
+        self.width = width
+        self.grid = grid
+        self.fb_error = fb_error
+        self.scale = 1.0
+        self._prev = None
+        self._gray = None
+        self._pools = FramePoolSet(capacity=1)
+        self.boxes = np.zeros((0, 4), dtype=np.float32)
+        offsets = (np.arange(grid, dtype=np.float32) + 0.5) / grid
+        gx, gy = np.meshgrid(offsets, offsets)
+        self._offsets = np.stack([gx.ravel(), gy.ravel()], axis=1)
+
+    def _to_gray(self, image):
+        """BGR 帧 -> 缩小的灰度图（与上一帧交替使用两个缓冲区）"""
+        lease, self.scale = prepare_display_frame(image, (self.width, self.width), self._pools)
+        try:
+            small = lease.array
+            if self._gray is None or self._gray[0].shape != small.shape[:2]:
+                # 帧尺寸变化：上一帧的灰度图无法与新帧比较，跟踪到下一个关键帧重新开始
+                self._gray = [np.empty(small.shape[:2], dtype=np.uint8) for _ in range(2)]
+                self._prev = None
+            gray = self._gray[1] if self._prev is self._gray[0] else self._gray[0]
+            if small.ndim == 2:
+                np.copyto(gray, small)
+                return gray
+            return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=gray)
+        finally:
+            lease.release()
+
+    def reset(self, image, boxes):
+        """以关键帧及其检测框重新开始跟踪"""
+        self._prev = self._to_gray(image)
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4).copy()
+
+    def track(self, image):
+        """传播到新的一帧，返回 (检测框, 运动量, 丢失比例)
+
+        运动量为各框位移相对框对角线长度的最大值；框内有效点不足 3 个时保持原位并计为丢失。
+        """
+        gray = self._to_gray(image)
+        prev, self._prev = self._prev, gray
+        count = len(self.boxes)
+        if prev is None or not count:
+            return self.boxes, 0.0, 0.0
+
+        boxes = self.boxes * self.scale
+        size = boxes[:, 2:] - boxes[:, :2]
+        inner = boxes[:, :2] + size * 0.1
+        points = (inner[:, None, :] + self._offsets[None, :, :] * (size * 0.8)[:, None, :])
+        points = points.reshape(-1, 1, 2).astype(np.float32)
+
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(prev, gray, points, None, **_LK_PARAMS)
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, prev, moved, None, **_LK_PARAMS)
+        fb = np.linalg.norm((back - points).reshape(-1, 2), axis=1)
+        valid = ((status.ravel() == 1) & (back_status.ravel() == 1) & (fb < self.fb_error))
+        valid = valid.reshape(count, -1)
+        old = points.reshape(count, -1, 2)
+        new = moved.reshape(count, -1, 2)
+
+        motion = 0.0
+        lost = 0
+        for i in range(count):
+            keep = valid[i]
+            if keep.sum() < 3:
+                lost += 1
+                continue
+            p0, p1 = old[i][keep], new[i][keep]
+            shift = np.median(p1 - p0, axis=0)
+            d0 = np.linalg.norm(p0 - p0.mean(axis=0), axis=1)
+            d1 = np.linalg.norm(p1 - p1.mean(axis=0), axis=1)
+            ratio = float(np.median(d1[d0 > 1e-3] / d0[d0 > 1e-3])) if (d0 > 1e-3).any() else 1.0
+            ratio = min(max(ratio, 0.8), 1.25)
+            center = (boxes[i, :2] + boxes[i, 2:]) / 2 + shift
+            half = size[i] * ratio / 2
+            boxes[i] = np.concatenate([center - half, center + half])
+            motion = max(motion, float(np.linalg.norm(shift)) / max(float(np.linalg.norm(size[i])), 1.0))
+
+        self.boxes = boxes / self.scale
+        return self.boxes, motion, lost / count
+
+
+class KeyframeScheduler:
+    """关键帧间隔调度
+
+    预算：关键帧之间的帧只做跟踪，检测器占用的 CPU 比例约为
+    detect / (detect + (interval - 1) * frame)，不超过 cpu_budget 时所需的最小间隔为预算间隔；
+    运动：跟踪框位移大或跟踪点丢失多时运动间隔减半，画面平稳时每个关键帧加一。
+    实际间隔取两者的较大值并限制在 [min_interval, max_interval] 内。
+    """
+
+    def __init__(self, min_interval=1, max_interval=8, cpu_budget=0.5,
+                 fast_motion=0.05, slow_motion=0.01, max_lost=0.5, alpha=0.2):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.cpu_budget = cpu_budget
+        self.fast_motion = fast_motion
+        self.slow_motion = slow_motion
+        self.max_lost = max_lost
+        self.alpha = alpha
+        self.detect_ms = None
+        self.frame_ms = None
+        self.motion_interval = min(2, max_interval)
+        self.interval = self.motion_interval
+        self.since_keyframe = 0
+        self._force = True
+        self._peak_motion = 0.0
+        self.keyframes = 0
+        self.tracked = 0
+
+    def _ema(self, current, value):
+        return value if current is None else current + self.alpha * (value - current)
+
+    def note_frame_period(self, seconds):
+        """两帧采集间隔（秒）"""
+        if seconds > 0:
+            self.frame_ms = self._ema(self.frame_ms, seconds * 1000.0)
+
+    def force_keyframe(self):
+        """下一帧强制运行检测器（目标类别变化、跟踪失败等）"""
+        self._force = True
+
+    def should_detect(self):
+        return self._force or self.since_keyframe + 1 >= self.interval
+
+    @property
+    def budget_interval(self):
+        if self.detect_ms is None or not self.frame_ms or self.cpu_budget >= 1.0:
+            return self.min_interval
+        budget = max(self.cpu_budget, 0.01)
+        return 1 + math.ceil(self.detect_ms * (1.0 - budget) / (budget * self.frame_ms))
+
+    def detected(self, seconds):
+        """关键帧检测完成"""
+        self.detect_ms = self._ema(self.detect_ms, seconds * 1000.0)
+        if self.keyframes:
+            if self._peak_motion > self.fast_motion:
+                self.motion_interval = max(self.min_interval, self.motion_interval // 2)
+            elif self._peak_motion < self.slow_motion:
+                self.motion_interval = min(self.max_interval, self.motion_interval + 1)
+        self.interval = min(self.max_interval,
+                            max(self.min_interval, self.motion_interval, self.budget_interval))
+        self.keyframes += 1
+        self.since_keyframe = 0
+        self._peak_motion = 0.0
+        self._force = False
+
+    def tracked_frame(self, motion, lost):
+        """非关键帧跟踪完成；跟踪点大量丢失时下一帧强制检测"""
+        self.tracked += 1
+        self.since_keyframe += 1
+        self._peak_motion = max(self._peak_motion, motion)
+        if lost > self.max_lost:
+            self.motion_interval = self.min_interval
+            self._force = True
+
+    def stats(self):
+        total = self.keyframes + self.tracked
+        return {
+            'interval': self.interval,
+            'budget_interval': self.budget_interval,
+            'motion_interval': self.motion_interval,
+            'detect_ms': round(self.detect_ms or 0.0, 1),
+            'frame_ms': round(self.frame_ms or 0.0, 1),
+            'keyframes': self.keyframes,
+            'tracked': self.tracked,
+            'keyframe_ratio': round(self.keyframes / total, 3) if total else 0.0,
+        }
+
+
+class TrackAndSkip:
+    """关键帧检测 + 光流跟踪
+
+    关键帧上运行检测器，新检测与传播后的跟踪框按同类别 IoU 最优分配以沿用跟踪 ID，
+    未匹配的检测分配新 ID；非关键帧返回传播后的框（置信度与类别沿用关键帧）。
+    只应由推理阶段一个线程调用。
+    """
+
+    def __init__(self, scheduler: Optional[KeyframeScheduler] = None,
+                 tracker: Optional[FlowTracker] = None, match_iou=0.3):
+        self.scheduler = scheduler or KeyframeScheduler()
+        self.tracker = tracker or FlowTracker()
+        self.match_iou = match_iou
+        self.batch = None
+        self._next_id = 1
+        self._last_frame = None
+
+    def configure(self, max_interval, cpu_budget):
+        self.scheduler.max_interval = max(1, max_interval)
+        self.scheduler.cpu_budget = cpu_budget
+
+    def _assign_ids(self, batch):
+        count = len(batch)
+        ids = np.zeros(count, dtype=np.int64)
+        matched = np.zeros(count, dtype=bool)
+        previous = self.batch
+        if previous is not None and len(previous) and count:
+            cost = 1.0 - box_iou(batch.boxes, self.tracker.boxes)
+            cost[batch.class_ids[:, None] != previous.class_ids[None, :]] = np.inf
+            rows, cols = linear_assignment(cost, 1.0 - self.match_iou)
+            ids[rows] = previous.track_ids[cols]
+            matched[rows] = True
+        new = np.flatnonzero(~matched)
+        ids[new] = np.arange(self._next_id, self._next_id + len(new))
+        self._next_id += len(new)
+        batch.track_ids = ids
+        return batch
+
+    def process(self, frame_id, timestamp, image, detect: Callable[[np.ndarray], DetectionBatch],
+                monitor=None):
+        """处理一帧，返回 (DetectionBatch, 是否关键帧)"""
+        scheduler = self.scheduler
+        if self._last_frame is not None and frame_id > self._last_frame[0]:
+            scheduler.note_frame_period((timestamp - self._last_frame[1]) / (frame_id - self._last_frame[0]))
+        self._last_frame = (frame_id, timestamp)
+
+        if self.batch is None or scheduler.should_detect():
+            start = time.perf_counter()
+            batch = self._assign_ids(detect(image))
+            self.tracker.reset(image, batch.boxes)
+            scheduler.detected(time.perf_counter() - start)
+            self.batch = batch
+            return batch, True
+
+        start = time.perf_counter()
+        boxes, motion, lost = self.tracker.track(image)
+        scheduler.tracked_frame(motion, lost)
+        previous = self.batch
+        batch = DetectionBatch(boxes=boxes.copy(), scores=previous.scores,
+                               class_ids=previous.class_ids, names=previous.names,
+                               track_ids=previous.track_ids)
+        if monitor is not None:
+            monitor.record('track', time.perf_counter() - start)
+        return batch, False
+
+    def force_keyframe(self):
+        """下一帧重新检测，已有跟踪 ID 仍可被沿用"""
+        self.scheduler.force_keyframe()
+
+    def reset(self):
+        """重新开始（新的检测会话）"""
+        self.batch = None
+        self._last_frame = None
+        self.scheduler.force_keyframe()
+
+    def stats(self):
+        return self.scheduler.stats()
+
+
+def format_keyframe_stats(stats):
+    """关键帧调度统计文本"""
+    return (f"关键帧间隔 {stats['interval']} (预算 {stats['budget_interval']} 运动 {stats['motion_interval']}) "
+            f"检测 {stats['keyframe_ratio']:.0%}")
@@ -0,0 +1,112 @@
+"""
+Oasis 目标检测系统 - Kinect 帧组采集
+每个采集周期获取一次彩色帧并与最近的深度帧配对，供该帧的所有检测共享
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+@dataclass
+class FrameBundle:
+    """同步的彩色 + 深度帧组
+
+    时间戳为主机端取到帧时的 time.perf_counter() 值（秒）。
+    """
+    frame_id: int
+    color: np.ndarray
+    color_timestamp: float
+    depth: Optional[np.ndarray] = None
+    depth_timestamp: Optional[float] = None
+
+    @property
+    def skew_ms(self):
+        """彩色帧与深度帧的时间差（毫秒），没有深度帧时为 None"""
+        if self.depth_timestamp is None:
+            return None
+        return (self.color_timestamp - self.depth_timestamp) * 1000.0
+
+
+class KinectFrameSource:
+    """PyKinectRuntime 的帧组采集层
+
+    poll() 每次调用先刷新缓存的最新深度帧，再检查新彩色帧；有新彩色帧时返回
+    FrameBundle。深度帧超过 max_skew_ms 未更新视为停顿，此时帧组不带深度数据。
+    """
+
+    def __init__(self, kinect, max_skew_ms=100.0):
+        self.kinect = kinect
+        self.max_skew_ms = max_skew_ms
+        self.last_bundle = None
+
+        self._depth = None
+        self._depth_timestamp = None
+        self._frame_id = 0
+
+        self.bundles = 0
+        self.depth_frames = 0
+        self.depth_stalls = 0
+        self._skew_sum = 0.0
+        self._skew_count = 0
+        self.max_skew_seen = 0.0
+
+    def _poll_depth(self):
+        """取最新深度帧并缓存"""
+        kinect = self.kinect
+        if not hasattr(kinect, 'has_new_depth_frame') or not kinect.has_new_depth_frame():
+            return
+        frame = kinect.get_last_depth_frame()
+        if frame is None or frame.size == 0:
+            return
+        desc = kinect.depth_frame_desc
+        self._depth = frame.reshape((desc.Height, desc.Width))
+        self._depth_timestamp = time.perf_counter()
+        self.depth_frames += 1
+
+    def poll(self, need_depth=False) -> Optional[FrameBundle]:
+        """获取新的帧组，没有新彩色帧时返回 None"""
+        if need_depth:
+            self._poll_depth()
+
+        kinect = self.kinect
+        if not kinect.has_new_color_frame():
+            return None
+        frame = kinect.get_last_color_frame()
+        if frame is None or frame.size == 0:
+            return None
+
+        desc = kinect.color_frame_desc
+        # Kinect v2 提供 BGRA 格式，取前 3 个通道即为 BGR
+        color = frame.reshape((desc.Height, desc.Width, 4))[:, :, :3]
+        now = time.perf_counter()
+        self._frame_id += 1
+
+        bundle = FrameBundle(self._frame_id, color, now)
+        if need_depth:
+            if self._depth is not None and (now - self._depth_timestamp) * 1000.0 <= self.max_skew_ms:
+                bundle.depth = self._depth
+                bundle.depth_timestamp = self._depth_timestamp
+                skew = bundle.skew_ms
+                self._skew_sum += skew
+                self._skew_count += 1
+                self.max_skew_seen = max(self.max_skew_seen, skew)
+            else:
+                self.depth_stalls += 1
+
+        self.bundles += 1
+        self.last_bundle = bundle
+        return bundle
+
+    def stats(self):
+        """帧组统计：帧组数、深度帧数、深度停顿数、平均/最大时间差"""
+        mean_skew = self._skew_sum / self._skew_count if self._skew_count else 0.0
+        return {
+            'bundles': self.bundles,
+            'depth_frames': self.depth_frames,
+            'depth_stalls': self.depth_stalls,
+            'mean_skew_ms': round(mean_skew, 1),
+            'max_skew_ms': round(self.max_skew_seen, 1),
+        }
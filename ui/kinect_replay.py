@@ -0,0 +1,265 @@
+"""
+Oasis 目标检测系统 - Kinect 录制与回放
+录制彩色/深度/红外/人体索引帧及时间戳，回放时提供与 PyKinectRuntime 相同的接口，
+无需 Kinect 设备即可在任意平台上运行和分析完整的采集 -> 检测流程
+"""
+
+import json
+import os
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from .frame_archive import FrameArchive, FrameArchiveWriter
+
+SESSION_VERSION = 2
+SESSION_FILE = "session.json"
+
+# 流名称 -> (帧描述属性, 新帧检查方法, 取帧方法)，与 PyKinectRuntime 一致
+STREAMS = {
+    'color': ('color_frame_desc', 'has_new_color_frame', 'get_last_color_frame'),
+    'depth': ('depth_frame_desc', 'has_new_depth_frame', 'get_last_depth_frame'),
+    'infrared': ('infrared_frame_desc', 'has_new_infrared_frame', 'get_last_infrared_frame'),
+    'body_index': ('body_index_frame_desc', 'has_new_body_index_frame', 'get_last_body_index_frame'),
+}
+
+PACING_MODES = ('realtime', 'fixed', 'fast')
+
+
+class FrameDesc:
+    """与 PyKinect2 FrameDescription 相同的宽高属性"""
+
+    def __init__(self, width, height):
+        self.Width = int(width)
+        self.Height = int(height)
+
+
+class SessionWriter:
+    """录制目录写入：每个流一个帧归档（固定步长帧文件 + 时间戳索引）
+
+    session.json 在出现新流时即写入，录制中断时已写入的帧仍可回放。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.streams: Dict[str, dict] = {}
+        self._archives: Dict[str, FrameArchiveWriter] = {}
+        os.makedirs(path, exist_ok=True)
+
+    def append(self, stream, frame, width, height, timestamp):
+        frame = np.asarray(frame).reshape(-1)
+        archive = self._archives.get(stream)
+        if archive is None:
+            info = {'width': int(width), 'height': int(height),
+                    'dtype': frame.dtype.str, 'size': int(frame.size)}
+            archive = FrameArchiveWriter(self.path, stream, frame.shape, frame.dtype, meta=info)
+            self._archives[stream] = archive
+            self.streams[stream] = info
+            self._write_meta()
+        return archive.append(frame, timestamp)
+
+    def _write_meta(self):
+        with open(os.path.join(self.path, SESSION_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'version': SESSION_VERSION, 'streams': self.streams}, f, indent=2)
+
+    def close(self):
+        for stream, archive in self._archives.items():
+            archive.close()
+            self.streams[stream]['count'] = archive.count
+        self._write_meta()
+
+
+class SessionReader:
+    """录制目录读取，帧为帧归档的零拷贝 memmap 视图"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, SESSION_FILE), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != SESSION_VERSION:
+            raise ValueError(f"录制版本不匹配: {path}")
+        self.streams: Dict[str, dict] = meta['streams']
+        self.archives = {stream: FrameArchive(path, stream) for stream in self.streams}
+
+    def timestamps(self, stream) -> np.ndarray:
+        """流的时间戳（秒，相对录制开始）"""
+        return self.archives[stream].timestamps
+
+    def frame(self, stream, index) -> np.ndarray:
+        """第 index 帧的一维数组，与 PyKinectRuntime.get_last_*_frame() 格式相同"""
+        return self.archives[stream][index]
+
+    def close(self):
+        for archive in self.archives.values():
+            archive.close()
+
+
+class KinectRecorder:
+    """Kinect 帧录制器
+
+    poll(kinect) 检查各流的新帧并写入，时间戳为相对录制开始的 time.perf_counter() 秒数。
+    """
+
+    def __init__(self, path, streams: Sequence[str] = tuple(STREAMS)):
+        unknown = set(streams) - set(STREAMS)
+        if unknown:
+            raise ValueError(f"未知的流类型: {sorted(unknown)}")
+        self.streams = tuple(streams)
+        self.writer = SessionWriter(path)
+        self.start_time = time.perf_counter()
+        self.frame_counts = {stream: 0 for stream in self.streams}
+
+    def append(self, stream, frame, desc, timestamp=None):
+        """写入一帧，desc 为带 Width/Height 的帧描述"""
+        if timestamp is None:
+            timestamp = time.perf_counter() - self.start_time
+        self.writer.append(stream, frame, desc.Width, desc.Height, timestamp)
+        self.frame_counts[stream] += 1
+
+    def poll(self, kinect):
+        """读取所有有新帧的流，返回本次写入的帧数"""
+        written = 0
+        for stream in self.streams:
+            desc_attr, has_new, get_last = STREAMS[stream]
+            if not hasattr(kinect, has_new) or not getattr(kinect, has_new)():
+                continue
+            frame = getattr(kinect, get_last)()
+            if frame is None or frame.size == 0:
+                continue
+            self.append(stream, frame, getattr(kinect, desc_attr))
+            written += 1
+        return written
+
+    def close(self):
+        self.writer.close()
+
+
+class KinectReplay:
+    """PyKinectRuntime 的回放替身
+
+    pacing:
+        realtime - 按录制时间戳以实际速度回放（speed 为倍速）
+        fixed    - 主流（彩色，无彩色时为第一个流）以固定 fps 出帧
+        fast     - 尽可能快：主流每取一帧立即有下一帧
+    其他流按主流的录制时间对齐，始终提供不晚于主流当前帧的最新一帧。
+    master 指定主流，应为实际读取的流（例如只显示深度时为 depth）。
+    """
+
+    def __init__(self, path, pacing='realtime', fps=30.0, speed=1.0, loop=False, copy=True,
+                 master=None):
+        if pacing not in PACING_MODES:
+            raise ValueError(f"未知的回放节奏: {pacing}")
+        self.reader = SessionReader(path)
+        self.pacing = pacing
+        self.fps = float(fps)
+        self.speed = float(speed)
+        self.loop = loop
+        self.copy = copy
+        self.loops = 0
+
+        streams = self.reader.streams
+        if master not in streams:
+            master = 'color' if 'color' in streams else next(iter(streams))
+        self.master = master
+        self._timestamps = {s: self.reader.timestamps(s) for s in streams}
+        # 回放从主流第一帧开始，第一次检查即有新帧
+        self._t0 = float(self._timestamps[master][0])
+        self._t_end = max(float(ts[-1]) for ts in self._timestamps.values() if len(ts))
+        self._delivered = {s: -1 for s in streams}
+        self._next_master = 0
+        self._start = time.perf_counter()
+
+        for stream, info in streams.items():
+            setattr(self, STREAMS[stream][0], FrameDesc(info['width'], info['height']))
+
+    # ---- 回放时钟 ----
+
+    def _clock(self):
+        """当前回放位置对应的录制时间（秒）"""
+        master_ts = self._timestamps[self.master]
+        elapsed = time.perf_counter() - self._start
+        if self.pacing == 'realtime':
+            return self._t0 + elapsed * self.speed
+        if self.pacing == 'fixed':
+            return master_ts[min(int(elapsed * self.fps), len(master_ts) - 1)]
+        return master_ts[min(self._next_master, len(master_ts) - 1)]
+
+    @property
+    def finished(self):
+        """录制已回放完毕"""
+        master_count = len(self._timestamps[self.master])
+        if self.pacing == 'fast':
+            return self._next_master >= master_count
+        elapsed = time.perf_counter() - self._start
+        if self.pacing == 'fixed':
+            return int(elapsed * self.fps) >= master_count
+        return self._t0 + elapsed * self.speed > self._t_end
+
+    def _restart(self):
+        self._delivered = {s: -1 for s in self._delivered}
+        self._next_master = 0
+        self._start = time.perf_counter()
+        self.loops += 1
+
+    def _available(self, stream):
+        """当前时刻该流可取的最新帧序号，-1 表示尚无帧"""
+        if self.loop and self.finished:
+            self._restart()
+        ts = self._timestamps[stream]
+        return int(np.searchsorted(ts, self._clock(), side='right')) - 1
+
+    def _has_new(self, stream):
+        if stream not in self._timestamps:
+            return False
+        return self._available(stream) > self._delivered[stream]
+
+    def _get_last(self, stream):
+        if stream not in self._timestamps:
+            return None
+        index = max(self._available(stream), self._delivered[stream])
+        if index < 0:
+            return None
+        self._delivered[stream] = index
+        if stream == self.master:
+            self._next_master = index + 1
+        frame = self.reader.frame(stream, index)
+        return np.array(frame) if self.copy else frame
+
+    # ---- PyKinectRuntime 接口 ----
+
+    def has_new_color_frame(self):
+        return self._has_new('color')
+
+    def has_new_depth_frame(self):
+        return self._has_new('depth')
+
+    def has_new_infrared_frame(self):
+        return self._has_new('infrared')
+
+    def has_new_body_index_frame(self):
+        return self._has_new('body_index')
+
+    def get_last_color_frame(self):
+        return self._get_last('color')
+
+    def get_last_depth_frame(self):
+        return self._get_last('depth')
+
+    def get_last_infrared_frame(self):
+        return self._get_last('infrared')
+
+    def get_last_body_index_frame(self):
+        return self._get_last('body_index')
+
+    def close(self):
+        self.reader.close()
+
+
+def open_replay(path, pacing='realtime', **kwargs) -> Optional[KinectReplay]:
+    """打开录制目录，失败时打印原因并返回 None"""
+    try:
+        return KinectReplay(path, pacing=pacing, **kwargs)
+    except Exception as e:
+        print(f"录制回放打开失败: {e}")
+        return None
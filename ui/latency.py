@@ -0,0 +1,194 @@
+"""
+Oasis 目标检测系统 - 阶段延迟统计
+各流水线阶段记录耗时到滚动直方图（对数分桶，最近 N 个样本），
+界面按需读取快照显示，每次记录为 O(1)，不影响帧率
+"""
+
+import bisect
+import math
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from .frame_pool import format_pool_stats
+from .visualize import format_body_stats
+from .keyframe import format_keyframe_stats
+from .tracking import format_tracking_stats
+from .tiling import format_tiling_stats
+from .motion_gate import format_gate_stats
+from .process_pool import format_worker_stats
+from .quality import format_quality_stats
+
+# 阶段顺序即显示顺序
+STAGES = ('acquire', 'convert', 'gate', 'infer', 'postprocess', 'track', '3d', 'draw', 'qimage', 'paint')
+
+STAGE_LABELS = {
+    'acquire': '采集',
+    'convert': '转换',
+    'gate': '变化检测',
+    'infer': '推理',
+    'postprocess': '后处理',
+    'track': '跟踪',
+    '3d': '3D映射',
+    'draw': '绘制',
+    'qimage': 'QImage',
+    'paint': '显示',
+}
+
+# 对数分桶：0.01ms - 10s，每桶约 10%，分位数相对误差约 5%
+_BIN_EDGES_MS = [0.01 * 1.1 ** i for i in range(int(math.log(1e6) / math.log(1.1)) + 2)]
+
+
+class LatencyHistogram:
+    """滚动窗口延迟直方图
+
+    只保留最近 window 个样本：新样本入桶，被挤出窗口的旧样本出桶，
+    分位数由桶计数累加得到。只应由一个线程写入。
+    """
+
+    def __init__(self, window=300):
+        self.window = window
+        self.counts = [0] * (len(_BIN_EDGES_MS) + 1)
+        self._bins = [0] * window
+        self._values = [0.0] * window
+        self._pos = 0
+        self._sum = 0.0
+        self.size = 0
+        self.total = 0
+        self.last_ms = 0.0
+
+    def record(self, ms):
+        b = bisect.bisect_right(_BIN_EDGES_MS, ms)
+        pos = self._pos
+        if self.size == self.window:
+            self.counts[self._bins[pos]] -= 1
+            self._sum -= self._values[pos]
+        else:
+            self.size += 1
+        self.counts[b] += 1
+        self._bins[pos] = b
+        self._values[pos] = ms
+        self._sum += ms
+        self._pos = (pos + 1) % self.window
+        self.total += 1
+        self.last_ms = ms
+
+    def percentile(self, q):
+        """近似分位数（毫秒），取所在桶的几何中点"""
+        if not self.size:
+            return 0.0
+        target = self.size * q / 100.0
+        seen = 0
+        for b, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                lo = _BIN_EDGES_MS[b - 1] if b > 0 else 0.0
+                hi = _BIN_EDGES_MS[b] if b < len(_BIN_EDGES_MS) else lo
+                return math.sqrt(lo * hi) if lo > 0 else hi
+        return self.last_ms
+
+    @property
+    def mean_ms(self):
+        return self._sum / self.size if self.size else 0.0
+
+    def snapshot(self):
+        return {
+            'count': self.total,
+            'last_ms': round(self.last_ms, 3),
+            'mean_ms': round(self.mean_ms, 3),
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'p99_ms': round(self.percentile(99), 3),
+        }
+
+
+class LatencyMonitor:
+    """各阶段的滚动直方图集合
+
+    每个阶段固定由一个线程写入（采集线程、推理阶段、3D 阶段或界面线程），
+    读取端只做近似快照，不需要加锁。
+    """
+
+    def __init__(self, window=300):
+        self.window = window
+        self.enabled = True
+        self.histograms: Dict[str, LatencyHistogram] = {
+            stage: LatencyHistogram(window) for stage in STAGES}
+
+    def record(self, stage, seconds):
+        """记录一次阶段耗时（秒）"""
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms.setdefault(stage, LatencyHistogram(self.window))
+        histogram.record(seconds * 1000.0)
+
+    @contextmanager
+    def measure(self, stage):
+        """with latency_monitor.measure('infer'): ..."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def snapshot(self):
+        """有样本的阶段的统计，按 STAGES 顺序"""
+        return {stage: h.snapshot() for stage, h in self.histograms.items() if h.size}
+
+    def reset(self):
+        self.histograms = {stage: LatencyHistogram(self.window) for stage in STAGES}
+
+
+def format_latency_lines(snapshot, pipeline_stats=None):
+    """统计面板文本行（FPS、丢帧、缓冲池占用、各阶段 p50/p95）"""
+    lines = []
+    if pipeline_stats:
+        lines.append(f"FPS 采集 {pipeline_stats.get('capture_fps', 0)} | "
+                     f"推理 {pipeline_stats.get('infer_fps', 0)} | "
+                     f"显示 {pipeline_stats.get('display_fps', 0)}")
+        drops = [f"{name}:{pipeline_stats[name]['dropped']}"
+                 for name in ('infer', 'map3d', 'display') if name in pipeline_stats]
+        if drops:
+            lines.append("丢帧 " + " ".join(drops))
+        if pipeline_stats.get('pools'):
+            lines.append("缓冲池 " + format_pool_stats(pipeline_stats['pools']))
+        if 'body_index' in pipeline_stats:
+            lines.append(format_body_stats(pipeline_stats['body_index']))
+        if 'keyframe' in pipeline_stats:
+            lines.append(format_keyframe_stats(pipeline_stats['keyframe']))
+        if 'tracking' in pipeline_stats:
+            lines.append(format_tracking_stats(pipeline_stats['tracking']))
+        if 'tiling' in pipeline_stats:
+            lines.append(format_tiling_stats(pipeline_stats['tiling']))
+        if 'motion_gate' in pipeline_stats:
+            lines.append(format_gate_stats(pipeline_stats['motion_gate']))
+        if 'process_pool' in pipeline_stats:
+            lines.append(format_worker_stats(pipeline_stats['process_pool']))
+        if 'quality' in pipeline_stats:
+            lines.append(format_quality_stats(pipeline_stats['quality']))
+            if pipeline_stats['quality']['last_decision']:
+                lines.append(pipeline_stats['quality']['last_decision'])
+    for stage, s in snapshot.items():
+        label = STAGE_LABELS.get(stage, stage)
+        lines.append(f"{label} {s['p50_ms']:.2f} / {s['p95_ms']:.2f} ms")
+    return lines
+
+
+def format_overlay_lines(snapshot, pipeline_stats=None):
+    """视频叠加层文本行；cv2.putText 不支持中文，只使用 ASCII"""
+    lines = []
+    if pipeline_stats:
+        drops = sum(pipeline_stats[name]['dropped']
+                    for name in ('infer', 'map3d', 'display') if name in pipeline_stats)
+        lines.append(f"FPS cap {pipeline_stats.get('capture_fps', 0)} "
+                     f"inf {pipeline_stats.get('infer_fps', 0)} "
+                     f"disp {pipeline_stats.get('display_fps', 0)}  drop {drops}")
+    for stage, s in snapshot.items():
+        lines.append(f"{stage:<11} {s['p50_ms']:7.2f} {s['p95_ms']:7.2f} ms")
+    return lines
+
+
+# 全局延迟统计实例
+latency_monitor = LatencyMonitor()
@@ -5,44 +5,315 @@ Oasis 目标检测系统 - 主窗口界面
 
 import sys
 import os
+import math
+import threading
+import time
 import cv2
 import numpy as np
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QPushButton, QTextEdit, 
-                             QGroupBox, QListWidget, QSlider, QSpinBox,
+                             QGroupBox, QListWidget, QListWidgetItem, QSlider, QSpinBox,
                              QCheckBox, QComboBox, QStatusBar, QSplitter,
                              QFrame, QGridLayout, QSpacerItem, QSizePolicy,
-                             QMessageBox, QLineEdit, QScrollArea)
-from PyQt6.QtCore import QTimer, Qt, pyqtSignal, QThread, pyqtSlot
-from PyQt6.QtGui import QPixmap, QImage, QFont, QPalette, QColor, QIcon, QAction
-from ultralytics import YOLO
+                             QMessageBox, QLineEdit, QScrollArea, QProgressBar, QStackedWidget)
+from PyQt6.QtCore import QTimer, Qt, pyqtSignal, QThread, pyqtSlot, QRect
+from PyQt6.QtGui import QPixmap, QImage, QFont, QPalette, QColor, QIcon, QAction, QPainter
 from .config import config_manager
 from .settings_dialog import SettingsDialog
+from .pipeline import DetectionPipeline, DisplayThrottle, FramePacket, MicroBatcher, format_pipeline_stats
+from .postprocess import DetectionPostProcessor
+from .kinect_frames import KinectFrameSource
+from .registration import get_registration
+from .depth_stats import HIST_BINS, DepthStats
+from .kinect_replay import open_replay
+from .render import draw_detections, draw_stream_label, draw_text_lines, prepare_display_frame
+from .latency import latency_monitor, format_latency_lines, format_overlay_lines
+from .frame_pool import FramePoolSet
+from .visualize import DepthColorizer, InfraredColorizer, BodyIndexColorizer
+from .keyframe import TrackAndSkip
+from .tracking import MultiObjectTracker
+from .tiling import TiledDetector
+from .motion_gate import MotionGate
+from .model_manager import ModelManager
+from .process_pool import InferenceProcessPool, task_params
+from .quality import FULL_QUALITY, QualityController, build_levels, format_decision
+from .startup import startup_profiler
 
 
-class VideoThread(QThread):
-    """Kinect 视频处理线程"""
-    frame_ready = pyqtSignal(np.ndarray)
+class DetectionThread(QThread):
+    """单路检测线程的公共部分（VideoThread、CameraThread）
+
+    子类实现采集循环；推理阶段的检测器选项（关键帧跟踪、分块推理、变化门控）只在这里实现一次，
+    子类覆盖 _depth_frame() 提供与彩色帧配对的深度图。
+    """
+    frame_ready = pyqtSignal(np.ndarray, float)  # 显示帧, 相对原始帧的缩放比例
     detection_ready = pyqtSignal(list)
-    stream_info_ready = pyqtSignal(str)
+    pipeline_stats_ready = pyqtSignal(dict)
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.model = None
-        self.kinect = None
         self.running = False
+        self.pipeline = None
+        self.display_size = None
+        # 显示帧缓冲池：发送中与界面正在显示的帧各占一个租约；CameraThread 的采集帧也从这里租用，
+        # 由采集循环与推理阶段共同持有
+        self.frame_pools = FramePoolSet()
+        self._display_lease = None
+        self._shown_lease = None
+        self.postprocessor = DetectionPostProcessor()
+        # 关键帧检测：只由推理阶段线程使用
+        self.track_and_skip = TrackAndSkip()
+        # 分块推理：只由推理阶段线程使用
+        self.tiled_detector = TiledDetector()
+        # 变化门控：只由推理阶段线程使用
+        self.motion_gate = MotionGate()
+        # 多目标跟踪：VideoThread 在 3D 映射阶段、CameraThread 在推理阶段使用
+        self.tracker = MultiObjectTracker()
+        # 推理进程池：设置时推理阶段只把帧交给工作进程
+        self.inference_pool = None
+        # 自适应质量控制器：为 None 时按配置推理
+        self.quality = None
+        self._last_detected = None
         self.target_classes = config_manager.detection.target_classes
-        self.stream_type = config_manager.kinect.video_stream_type
-        self.depth_mode = config_manager.kinect.depth_mode
-        
+    
     def set_model(self, model):
         self.model = model
+    
+    def set_target_classes(self, classes):
+        # 推理阶段会在下一帧按新类别重新编译类别索引并重新检测，无需重启线程
+        self.target_classes = list(classes)
+        self.track_and_skip.force_keyframe()
+        self.motion_gate.force_refresh()
+    
+    def set_display_size(self, width, height):
+        """显示区域大小（物理像素），显示帧在采集线程中缩小到此大小"""
+        self.display_size = (width, height)
+    
+    def set_quality_controller(self, controller):
+        """自适应质量控制器，推理阶段每帧按其当前级别推理，为 None 时按配置推理"""
+        self.quality = controller
+    
+    def set_inference_pool(self, pool):
+        """推理进程池，为 None 时在推理阶段线程中推理；运行中切换时从下一帧起生效"""
+        old, self.inference_pool = self.inference_pool, pool
+        if self.running:
+            if old is not None:
+                old.set_callback(None)
+            if pool is not None:
+                pool.set_callback(self._pool_result)
+    
+    def frame_displayed(self):
+        """界面收到一帧后调用：归还上一帧的显示缓冲区，允许发送下一帧"""
+        if self._shown_lease is not None:
+            self._shown_lease.release()
+        self._shown_lease, self._display_lease = self._display_lease, None
+        if self.pipeline:
+            self.pipeline.display.release()
+    
+    def _emit_display_frame(self, frame):
+        """缩小到显示区域大小写入池中缓冲区后发送；租约在界面换上下一帧后归还"""
+        lease, scale = prepare_display_frame(frame, self.display_size, self.frame_pools)
+        self._display_lease = lease
+        self.frame_ready.emit(lease.array, scale)
+    
+    def _start_pipeline(self, **stages):
+        """创建并启动检测流水线；设置了推理进程池时由进程池回调接收推理结果"""
+        self.pipeline = DetectionPipeline(infer=self._infer_stage, on_result=self._emit_detections, **stages)
+        if self.inference_pool is not None:
+            self.inference_pool.set_callback(self._pool_result)
+        self._last_detected = None
+        self.pipeline.start()
+    
+    def _stop_pipeline(self):
+        if self.inference_pool is not None:
+            self.inference_pool.set_callback(None)
+        self.pipeline.stop()
+    
+    def _add_inference_stats(self, stats):
+        """推理进程池与自适应质量的统计"""
+        if self.inference_pool is not None:
+            stats['process_pool'] = self.inference_pool.stats()
+        if self.quality is not None:
+            stats['quality'] = self.quality.stats()
+    
+    def _active_classes(self):
+        """当前目标类别"""
+        return self.target_classes
+    
+    def _postprocess(self, results):
+        """向量化后处理，返回 DetectionBatch"""
+        return self.postprocessor.process(
+            results, self.model.names, self._active_classes(),
+            config_manager.detection.confidence_threshold,
+            config_manager.detection.max_detections)
+    
+    def _infer_stage(self, packet):
+        """推理阶段：YOLO 推理 + 后处理；使用推理进程池时只投递帧"""
+        model = self.model
+        if model is None:
+            packet.release()
+            return None
+        level = self._quality_level(packet, model)
+        if level is None:
+            packet.release()
+            return None
+        classes = self._active_classes()
+        pool = self.inference_pool
+        if pool is not None and not pool.failed:
+            quality = level if self.quality is not None else None
+            pool.submit(packet, task_params(classes, config_manager.detection, quality),
+                        latest=lambda: self._latest_packet(packet))
+            return None
+        start = time.perf_counter()
+        try:
+            self.postprocessor.imgsz = level.imgsz
+            packet.batch = self._detect_or_track(packet, model, classes)
+            packet.extras['detect_ms'] = (time.perf_counter() - start) * 1000
+        finally:
+            # 后续阶段不再使用图像，归还缓冲区
+            packet.release()
+        packet.detections = packet.batch.to_dicts()
+        self._associate(packet)
+        return packet
+    
+    def _quality_level(self, packet, model):
+        """当前质量级别；按跨帧数跳过的帧返回 None（沿用上次的检测结果）"""
+        quality = self.quality
+        if quality is None:
+            return FULL_QUALITY
+        level = quality.level
+        if self._last_detected is not None and 0 <= packet.frame_id - self._last_detected < level.stride:
+            return None
+        self._last_detected = packet.frame_id
+        packet.extras['quality'] = quality.sample_index(model.model_path)
+        return level
+    
+    def _latest_packet(self, packet):
+        """等待空闲推理进程期间到达的更新帧（沿用 packet 的质量级别），没有时返回 None"""
+        newer = self.pipeline.infer_slot.get(timeout=0)
+        if newer is not None and 'quality' in packet.extras:
+            newer.extras['quality'] = packet.extras['quality']
+            self._last_detected = newer.frame_id
+        return newer
+    
+    def _pool_result(self, packet):
+        """推理进程的结果（在进程池收集线程中调用）：关联到轨迹后交给下游"""
+        latency_monitor.record('infer', packet.extras['infer_seconds'])
+        # 多个进程并行推理，折算为每帧占用的推理时间
+        pool = self.inference_pool
+        packet.extras['detect_ms'] = packet.extras['infer_seconds'] * 1000 / (pool.workers if pool else 1)
+        packet.detections = packet.batch.to_dicts()
+        self._associate(packet)
+        self._deliver(packet)
+    
+    def _emit_detections(self, packet):
+        if self.quality is not None and 'detect_ms' in packet.extras:
+            self.quality.observe(packet.extras.get('quality'), packet.extras['detect_ms'],
+                                 (time.time() - packet.timestamp) * 1000)
+        self.detection_ready.emit(packet.detections)
+    
+    def _associate(self, packet):
+        """关联到轨迹，每个目标保持稳定的 ID"""
+        tracks = self.tracker.update(packet.batch, packet.timestamp)
+        self.tracker.annotate(packet.detections, tracks, packet.timestamp)
+    
+    def _deliver(self, packet):
+        """推理进程的结果直接发送"""
+        self._emit_detections(packet)
+    
+    def _depth_frame(self, packet):
+        """与 packet 彩色帧配对的深度图，没有深度来源时为 None"""
+        return None
+    
+    def _tiling_enabled(self):
+        """配置启用了分块推理，且自适应质量没有关闭它"""
+        return config_manager.detection.tiled_inference and (self.quality is None or self.quality.level.tiling)
+    
+    def _detect_or_track(self, packet, model, classes):
+        """运行检测器；启用关键帧检测时非关键帧改为光流跟踪上一关键帧的检测框，
+        启用变化门控时画面没有变化的帧复用上次的检测结果"""
+        def run_detector(image):
+            if self._tiling_enabled():
+                return self._tiled_detect(packet, model, image, classes)
+            return self.postprocessor.infer(
+                model, image, classes,
+                config_manager.detection.confidence_threshold,
+                config_manager.detection.max_detections,
+                monitor=latency_monitor)
+        
+        def detect_regions(image, regions):
+            return self.tiled_detector.infer_regions(
+                self.postprocessor, model, image, regions, classes,
+                config_manager.detection.confidence_threshold,
+                config_manager.detection.max_detections,
+                monitor=latency_monitor)
+        
+        def detect(image):
+            if config_manager.detection.motion_gate:
+                return self._gated_detect(packet, image, run_detector, detect_regions)
+            return run_detector(image)
+        
+        config = config_manager.detection
+        if not config.track_and_skip:
+            return detect(packet.image)
+        self.track_and_skip.configure(config.keyframe_max_interval, config.detector_cpu_budget)
+        batch, packet.extras['keyframe'] = self.track_and_skip.process(
+            packet.frame_id, packet.timestamp, packet.image, detect, monitor=latency_monitor)
+        return batch
+    
+    def _gated_detect(self, packet, image, run_detector, detect_regions):
+        """变化门控：与上次推理时的画面（灰度图，配置为深度且有配对深度图时为深度图）比较，
+        决定跳过、只推理变化区域或整帧推理"""
+        config = config_manager.detection
+        self.motion_gate.configure(config.motion_threshold, config.motion_refresh_s)
+        change_frame = self._depth_frame(packet) if config.motion_gate_source == "depth" else None
+        batch, packet.extras['gate'] = self.motion_gate.process(
+            packet.timestamp, image, run_detector, detect_regions if config.motion_regions else None,
+            change_frame=change_frame, monitor=latency_monitor)
+        return batch
+    
+    def _tiled_detect(self, packet, model, image, classes):
+        """分块推理：分块限制在 ROI 内，设置了深度范围且有配对深度图时只推理包含该范围像素的分块"""
+        config = config_manager.detection
+        self.tiled_detector.configure(config.tile_size, config.tile_overlap,
+                                      config.tile_full_frame, config.tile_roi)
+        depth_data = registration = None
+        if config.tile_depth_range:
+            depth_data = self._depth_frame(packet)
+            if depth_data is not None:
+                registration = self._get_registration()
+        return self.tiled_detector.infer(
+            self.postprocessor, model, image, classes,
+            config.confidence_threshold, config.max_detections,
+            depth_frame=depth_data, registration=registration,
+            depth_range=config.tile_depth_range, monitor=latency_monitor)
+
+
+class VideoThread(DetectionThread):
+    """Kinect 视频处理线程
+
+    本线程只负责采集，推理与 3D 映射在 DetectionPipeline 的独立阶段中运行，
+    显示按传感器帧率进行，检测按 CPU 能力尽快进行。
+    """
+    stream_info_ready = pyqtSignal(str)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.kinect = None
+        self.frame_source = None
+        self.registration = None
+        self.depth_stats = None
+        self.depth_colorizer = None
+        self.infrared_colorizer = None
+        self.body_index_colorizer = BodyIndexColorizer()
+        self._acquired_at = None
+        self.stream_type = config_manager.kinect.video_stream_type
+        self.depth_mode = config_manager.kinect.depth_mode
         
     def set_kinect(self, kinect):
         self.kinect = kinect
-        
-    def set_target_classes(self, classes):
-        self.target_classes = classes
+        self.frame_source = KinectFrameSource(kinect) if kinect else None
     
     def set_stream_type(self, stream_type):
         """设置视频流类型"""
@@ -51,9 +322,32 @@ class VideoThread(QThread):
     def set_depth_mode(self, depth_mode):
         """设置深度模式"""
         self.depth_mode = depth_mode
+        if self.depth_colorizer is not None:
+            self.depth_colorizer.set_range(config_manager.get_kinect_depth_range(depth_mode))
+    
+    def get_pipeline_stats(self):
+        """获取流水线各阶段统计"""
+        if not self.pipeline:
+            return {}
+        stats = self.pipeline.stats()
+        if self.frame_source:
+            stats['bundle'] = self.frame_source.stats()
+        stats['pools'] = self.frame_pools.stats()
+        if config_manager.detection.track_and_skip and self.stream_type == "color":
+            stats['keyframe'] = self.track_and_skip.stats()
+        if self.model and self.stream_type == "color":
+            stats['tracking'] = self.tracker.stats()
+            if self._tiling_enabled():
+                stats['tiling'] = self.tiled_detector.stats()
+            if config_manager.detection.motion_gate:
+                stats['motion_gate'] = self.motion_gate.stats()
+        if self.stream_type == "body_index":
+            stats['body_index'] = self.body_index_colorizer.stats
+        self._add_inference_stats(stats)
+        return stats
         
     def run(self):
-        """主运行循环"""
+        """主运行循环（采集阶段）"""
         self.running = True
         
         if not self.kinect:
@@ -63,63 +357,134 @@ class VideoThread(QThread):
         stream_name = config_manager.get_kinect_stream_types().get(self.stream_type, self.stream_type)
         self.stream_info_ready.emit(f"Kinect 模式: {stream_name}")
         
-        while self.running:
-            try:
-                frame = None
-                
-                if self.stream_type == "color":
-                    frame = self._get_color_frame()
-                elif self.stream_type == "depth":
-                    frame = self._get_depth_frame()
-                elif self.stream_type == "infrared":
-                    frame = self._get_infrared_frame()
-                elif self.stream_type == "body_index":
-                    frame = self._get_body_index_frame()
-                
-                if frame is not None:
-                    # 发送原始帧
-                    self.frame_ready.emit(frame.copy())
+        self._start_pipeline(map_3d=self._map_3d_stage)
+        
+        if self.stream_type != "color":
+            # 非彩色流不进行目标检测
+            self.detection_ready.emit([])
+        
+        frame_id = 0
+        last_info_time = time.perf_counter()
+        
+        try:
+            while self.running:
+                try:
+                    frame = self.capture_frame()
+                    
+                    if frame is None:
+                        # 传感器尚无新帧，短暂等待后继续轮询
+                        self.msleep(2)
+                        continue
+                    
+                    frame_id += 1
+                    self.pipeline.note_capture()
+                    
+                    # 显示阶段：界面空闲时才发送，旧帧直接丢弃
+                    if self.pipeline.display.try_acquire():
+                        self._emit_display_frame(frame)
                     
-                    # 只对彩色图像执行目标检测
+                    # 只对彩色图像执行目标检测，深度帧随帧组一起传递给 3D 阶段
                     if self.model and self.stream_type == "color":
-                          results = self.model(frame, verbose=False)
-                          detections = self.process_detections(results, frame)
-                          self.detection_ready.emit(detections)
-                    elif self.stream_type != "color":
-                        # 非彩色流不进行目标检测
-                        self.detection_ready.emit([])
-                
-                # 发送流信息用于状态显示
-                if hasattr(self, 'stream_info_ready'):
-                    stream_info = f"Kinect {self.stream_type.title()} 模式"
-                    if self.stream_type == "color" and config_manager.detection.enable_3d_coordinates:
-                        stream_info += " | 3D坐标已启用"
-                    self.stream_info_ready.emit(stream_info)
-                        
-                self.msleep(33)  # 约30FPS
-                
-            except Exception as e:
-                print(f"Kinect 视频线程错误: {e}")
+                        packet = FramePacket(frame_id, time.time(), frame, self.stream_type)
+                        packet.extras['bundle'] = self.frame_source.last_bundle
+                        self.pipeline.submit(packet)
+                    
+                    # 每秒发送一次流信息与流水线统计
+                    now = time.perf_counter()
+                    if now - last_info_time >= 1.0:
+                        last_info_time = now
+                        stats = self.get_pipeline_stats()
+                        stream_info = f"Kinect {self.stream_type.title()} 模式"
+                        if self.stream_type == "color" and config_manager.detection.enable_3d_coordinates:
+                            stream_info += " | 3D坐标已启用"
+                        stream_info += " | " + format_pipeline_stats(stats)
+                        self.stream_info_ready.emit(stream_info)
+                        self.pipeline_stats_ready.emit(stats)
+                    
+                except Exception as e:
+                    print(f"Kinect 视频线程错误: {e}")
+        finally:
+            self._stop_pipeline()
+    
+    def capture_frame(self):
+        """采集阶段：按当前流类型获取一帧可显示的 BGR 图像，没有新帧时返回 None
+
+        取帧（acquire）与转换为可显示图像（convert）分别计时，
+        分界点由各 _get_*_frame 在取到原始帧后写入 _acquired_at。
+        """
+        start = time.perf_counter()
+        self._acquired_at = None
+        if self.stream_type == "color":
+            frame = self._get_color_frame()
+        elif self.stream_type == "depth":
+            frame = self._get_depth_frame()
+        elif self.stream_type == "infrared":
+            frame = self._get_infrared_frame()
+        elif self.stream_type == "body_index":
+            frame = self._get_body_index_frame()
+        else:
+            return None
+        if frame is not None:
+            end = time.perf_counter()
+            acquired_at = self._acquired_at or end
+            latency_monitor.record('acquire', acquired_at - start)
+            latency_monitor.record('convert', end - acquired_at)
+        return frame
+    
+    def _associate(self, packet):
+        """跟踪与 3D 坐标平滑共用轨迹，在 3D 映射阶段进行"""
+    
+    def _deliver(self, packet):
+        """推理进程的结果交给跟踪与 3D 映射阶段"""
+        if self.pipeline is not None and self.pipeline.map3d_slot is not None:
+            self.pipeline.map3d_slot.put(packet)
+    
+    def _depth_frame(self, packet):
+        """帧组中与彩色帧配对的深度图（按需采集，没有时为 None）"""
+        bundle = packet.extras.get('bundle')
+        return bundle.depth if bundle is not None else None
+    
+    def _map_3d_stage(self, packet):
+        """跟踪与 3D 映射阶段：检测关联到轨迹（稳定 ID），为检测结果附加平滑后的 3D 坐标"""
+        tracks = self.tracker.update(packet.batch, packet.timestamp)
+        self.tracker.annotate(packet.detections, tracks, packet.timestamp)
+        if config_manager.detection.enable_3d_coordinates and self.stream_type == "color":
+            # 同一帧的所有检测共享帧组中的同一张深度图
+            depth_data = self._depth_frame(packet)
+            if depth_data is None:
+                if packet.detections:
+                    print("⚠️  无法获取深度帧")
+                return packet
+            if not packet.detections:
+                return packet
+            with latency_monitor.measure('3d'):
+                # 只查询新出现或移动过的轨迹，这些框一次向量化查表，深度取自该深度帧共享的积分图
+                stale = self.tracker.needs_mapping(tracks)
+                if stale.any():
+                    mapping = self._get_registration().map_boxes(
+                        packet.batch.boxes[stale], depth_data, stats=self._get_depth_stats(depth_data))
+                    for k, i in enumerate(np.flatnonzero(stale).tolist()):
+                        self.tracker.set_measurement(tracks[i], self._coords_from_mapping(mapping, k))
+                # 各轨迹的卡尔曼滤波平滑 3D 坐标
+                for i, detection in enumerate(packet.detections):
+                    coords_3d = self.tracker.smooth(tracks[i], packet.timestamp)
+                    if coords_3d:
+                        detection['coordinates_3d'] = coords_3d
+        return packet
     
     def _get_color_frame(self):
-        """获取彩色帧"""
+        """获取彩色帧（同时按需刷新配对的深度帧）"""
         try:
-            if self.kinect.has_new_color_frame():
-                frame_width = self.kinect.color_frame_desc.Width
-                frame_height = self.kinect.color_frame_desc.Height
-                frame = self.kinect.get_last_color_frame()
-                
-                if frame is not None and frame.size > 0:
-                    # Kinect v2 实际提供的是BGRA格式（注意顺序）
-                    frame = frame.reshape((frame_height, frame_width, 4))
-                    
-                    # 方法1：直接移除Alpha通道，保持BGRA->BGR
-                    frame_bgr = frame[:, :, :3]  # 取前3个通道 (BGR)
-                    
-                    # 调试：检查帧是否正常
-                    print(f"彩色帧: {frame_width}x{frame_height}, 数据范围: {frame_bgr.min()}-{frame_bgr.max()}")
-                    
-                    return frame_bgr
+            config = config_manager.detection
+            # 3D 坐标、按深度范围筛选分块与深度变化检测都需要配对的深度帧
+            need_depth = (config.enable_3d_coordinates
+                          or bool(config.tiled_inference and config.tile_depth_range)
+                          or (config.motion_gate and config.motion_gate_source == "depth"))
+            bundle = self.frame_source.poll(need_depth=need_depth)
+            if bundle is not None:
+                # BGRA -> BGR 只是视图，取帧即完成转换
+                self._acquired_at = time.perf_counter()
+                return bundle.color
             return None
         except Exception as e:
             print(f"彩色帧处理错误: {e}")
@@ -132,34 +497,13 @@ class VideoThread(QThread):
                 frame_width = self.kinect.depth_frame_desc.Width
                 frame_height = self.kinect.depth_frame_desc.Height
                 frame = self.kinect.get_last_depth_frame()
+                self._acquired_at = time.perf_counter()
                 
                 if frame is not None and frame.size > 0:
                     frame = frame.reshape((frame_height, frame_width))
                     
-                    # 改进深度数据转换，处理异常值
-                    valid_depth = frame[frame > 0]  # 过滤无效深度值
-                    if len(valid_depth) > 0:
-                        # 使用实际深度范围进行归一化，避免异常值影响
-                        depth_min = np.percentile(valid_depth, 5)  # 第5百分位数
-                        depth_max = np.percentile(valid_depth, 95)  # 第95百分位数
-                        depth_max = min(depth_max, 8000)  # 限制最大值
-                        
-                        # 创建归一化图像
-                        frame_normalized = np.zeros_like(frame, dtype=np.uint8)
-                        valid_mask = (frame > 0) & (frame <= 8000)
-                        
-                        if depth_max > depth_min:
-                            frame_normalized[valid_mask] = np.clip(
-                                (frame[valid_mask] - depth_min) / (depth_max - depth_min) * 255, 0, 255
-                            ).astype(np.uint8)
-                        
-                        # 应用颜色映射增强可视化效果
-                        frame_colored = cv2.applyColorMap(frame_normalized, cv2.COLORMAP_JET)
-                        return frame_colored
-                    else:
-                        # 没有有效深度数据时返回黑色图像
-                        frame_normalized = np.zeros((frame_height, frame_width), dtype=np.uint8)
-                        return cv2.cvtColor(frame_normalized, cv2.COLOR_GRAY2BGR)
+                    # 查找表一次映射为伪彩色（无效深度为黑色），显示范围按深度模式预设并随场景增量更新
+                    return self._get_depth_colorizer().colorize(frame)
             return None
         except Exception as e:
             print(f"深度帧处理错误: {e}")
@@ -172,26 +516,13 @@ class VideoThread(QThread):
                 frame_width = self.kinect.infrared_frame_desc.Width
                 frame_height = self.kinect.infrared_frame_desc.Height
                 frame = self.kinect.get_last_infrared_frame()
+                self._acquired_at = time.perf_counter()
                 
                 if frame is not None and frame.size > 0:
                     frame = frame.reshape((frame_height, frame_width))
                     
-                    # 改进的红外数据转换，使用更保守的归一化
-                    # 避免除零和数据溢出问题
-                    frame_max = np.max(frame) if np.max(frame) > 0 else 65535
-                    frame_min = np.min(frame[frame > 0]) if np.any(frame > 0) else 0
-                    
-                    # 使用动态范围进行归一化
-                    if frame_max > frame_min:
-                        frame_normalized = np.clip(
-                            (frame - frame_min) / (frame_max - frame_min) * 255, 0, 255
-                        ).astype(np.uint8)
-                    else:
-                        frame_normalized = np.zeros_like(frame, dtype=np.uint8)
-                    
-                    # 应用适度的对比度增强
-                    frame_enhanced = cv2.equalizeHist(frame_normalized)
-                    return cv2.cvtColor(frame_enhanced, cv2.COLOR_GRAY2BGR)
+                    # 按配置的显示模式（固定增益/自动增益/直方图均衡）一次查表映射
+                    return self._get_infrared_colorizer().colorize(frame)
             return None
         except Exception as e:
             print(f"红外帧处理错误: {e}")
@@ -204,45 +535,13 @@ class VideoThread(QThread):
                 frame_width = self.kinect.body_index_frame_desc.Width
                 frame_height = self.kinect.body_index_frame_desc.Height
                 frame = self.kinect.get_last_body_index_frame()
+                self._acquired_at = time.perf_counter()
                 
                 if frame is not None and frame.size > 0:
                     frame = frame.reshape((frame_height, frame_width))
                     
-                    # 将人体索引转换为彩色图像
-                    # 不同的人体索引用不同颜色表示
-                    frame_colored = np.zeros((frame_height, frame_width, 3), dtype=np.uint8)
-                    
-                    # 更鲜明的颜色组合，包括背景处理
-                    colors = [
-                        (50, 50, 50),      # 背景 - 深灰色
-                        (255, 100, 100),   # 人体1 - 红色
-                        (100, 255, 100),   # 人体2 - 绿色  
-                        (100, 100, 255),   # 人体3 - 蓝色
-                        (255, 255, 100),   # 人体4 - 黄色
-                        (255, 100, 255),   # 人体5 - 紫色
-                        (100, 255, 255),   # 人体6 - 青色
-                    ]
-                    
-                    # 检查是否有人体数据
-                    unique_values = np.unique(frame)
-                    print(f"人体索引帧包含值: {unique_values}")
-                    
-                    # 处理所有可能的索引值
-                    for i in range(min(len(colors), 256)):  # 最多256个索引
-                        mask = (frame == i)
-                        if np.any(mask):
-                            frame_colored[mask] = colors[i % len(colors)]
-                            if i > 0:  # 人体索引 (非背景)
-                                print(f"检测到人体索引 {i}: {np.sum(mask)} 像素")
-                    
-                    # 如果没有检测到任何人体，显示原始数据的可视化
-                    if len(unique_values) <= 1 or np.all(frame == 0):
-                        print("未检测到人体，显示原始索引数据")
-                        # 将原始数据标准化为灰度图
-                        frame_norm = np.clip(frame.astype(np.float32) * 40, 0, 255).astype(np.uint8)
-                        frame_colored = cv2.cvtColor(frame_norm, cv2.COLOR_GRAY2BGR)
-                    
-                    return frame_colored
+                    # 调色板一次查表（0-5 为人体，255 为背景），各人体像素数记录在 stats 中
+                    return self.body_index_colorizer.colorize(frame)
                 else:
                     print("人体索引帧数据为空")
             return None
@@ -252,173 +551,80 @@ class VideoThread(QThread):
                 
     def process_detections(self, results, color_frame=None):
         """处理检测结果"""
-        detections = []
-        
-        for r in results:
-            for box in r.boxes:
-                class_id = int(box.cls[0])
-                class_name = self.model.names[class_id]
-                conf = box.conf[0].item()
-                
-                # 检查类别是否在目标类别中（包括自定义类别）
-                all_target_classes = self.target_classes + config_manager.detection.custom_classes
-                
-                if class_name in all_target_classes and conf >= config_manager.detection.confidence_threshold:
-                    x1, y1, x2, y2 = box.xyxy[0].tolist()
-                    
-                    detection = {
-                        'class_name': class_name,
-                        'confidence': conf,
-                        'bbox': (int(x1), int(y1), int(x2), int(y2))
-                    }
-                    
-                    # 计算3D坐标（如果启用且有深度数据）
-                    if config_manager.detection.enable_3d_coordinates and self.stream_type == "color":
-                        coords_3d = self._calculate_3d_coordinates(detection['bbox'], color_frame)
-                        if coords_3d:
-                            detection['coordinates_3d'] = coords_3d
-                    
-                    detections.append(detection)
-                    
-                    # 限制最大检测数量
-                    if len(detections) >= config_manager.detection.max_detections:
-                        break
-                    
-        return detections
+        # 3D坐标在流水线的独立 3D 映射阶段中计算
+        return self._postprocess(results).to_dicts()
+    
+    def _active_classes(self):
+        """当前目标类别（包括自定义类别）"""
+        all_target_classes = self.target_classes + config_manager.detection.custom_classes
+        return all_target_classes
+    
+    def _get_registration(self):
+        """获取彩色/深度配准表（首次使用时在流水线线程中构建或读取缓存）"""
+        if self.registration is None:
+            self.registration = get_registration(self.kinect)
+            print(f"配准表已加载: 来源={self.registration.source}")
+        return self.registration
+    
+    def _get_depth_colorizer(self):
+        """深度伪彩色映射器（按需创建，跨帧复用查找表与输出缓冲区）"""
+        if self.depth_colorizer is None:
+            self.depth_colorizer = DepthColorizer(config_manager.get_kinect_depth_range(self.depth_mode))
+        return self.depth_colorizer
+    
+    def _get_infrared_colorizer(self):
+        """红外灰度映射器，显示模式与增益跟随配置（设置对话框修改后下一帧生效）"""
+        config = config_manager.kinect
+        if self.infrared_colorizer is None:
+            self.infrared_colorizer = InfraredColorizer(config.infrared_mode, config.infrared_gain)
+        elif (self.infrared_colorizer.mode != config.infrared_mode
+              or self.infrared_colorizer.gain != config.infrared_gain):
+            self.infrared_colorizer.set_mode(config.infrared_mode, config.infrared_gain)
+        return self.infrared_colorizer
+    
+    def _get_depth_stats(self, depth_data):
+        """获取深度帧的区域统计结构，每张深度帧只构建一次
+
+        深度帧慢于彩色帧时多个帧组共享同一深度数组，按对象身份复用。
+        深度直方图默认关闭（区域深度只取均值），构建开销约为均值积分图的 10 倍。
+        """
+        bins = HIST_BINS if config_manager.detection.depth_histogram else 0
+        if (self.depth_stats is None or self.depth_stats.depth is not depth_data
+                or self.depth_stats.hist_bins != bins):
+            self.depth_stats = DepthStats(depth_data, hist_bins=bins)
+        return self.depth_stats
+    
+    @staticmethod
+    def _coords_from_mapping(mapping, index):
+        """从批量配准结果中取出单个检测的3D坐标"""
+        depth_mm = float(mapping['depth_mm'][index])
+        if not (depth_mm > 0 and depth_mm < 8000):  # 有效深度值范围
+            return None
+        x, y, z = mapping['xyz'][index].tolist()
+        depth_x, depth_y = mapping['depth_xy'][index].tolist()
+        return {
+            'x': round(x, 1),
+            'y': round(y, 1),
+            'z': round(z, 1),
+            'unit': 'mm',
+            'depth_pos': f"({depth_x},{depth_y})",
+            'valid_pixels': int(mapping['valid_pixels'][index]),
+            'valid_ratio': round(float(mapping['valid_ratio'][index]), 3)
+        }
     
-    def _calculate_3d_coordinates(self, bbox, color_frame):
-        """计算目标的3D坐标 - 结合深度图进行坐标绘制"""
+    def _calculate_3d_coordinates(self, bbox, color_frame, depth_data):
+        """计算目标的3D坐标 - 结合深度图进行坐标绘制
+
+        depth_data 为帧组中与彩色帧配对的深度图 (H, W)。批量计算请直接使用
+        Registration.map_boxes，本方法用于单个检测框。
+        """
         try:
             if not self.kinect:
                 print("Kinect 设备未初始化")
                 return None
             
-            # 获取深度数据 - 改进的同步策略
-            depth_frame = None
-            depth_data = None
-            
-            # 尝试多种方式获取深度帧
-            for attempt in range(5):  # 增加重试次数
-                try:
-                    # 方法1：检查是否有新的深度帧
-                    if hasattr(self.kinect, 'has_new_depth_frame'):
-                        if self.kinect.has_new_depth_frame():
-                            depth_frame = self.kinect.get_last_depth_frame()
-                            print(f"方法1成功获取深度帧 (尝试{attempt+1})")
-                            break
-                    
-                    # 方法2：直接获取最后的深度帧
-                    if hasattr(self.kinect, 'get_last_depth_frame') and depth_frame is None:
-                        depth_frame = self.kinect.get_last_depth_frame()
-                        if depth_frame is not None:
-                            print(f"方法2成功获取深度帧 (尝试{attempt+1})")
-                            break
-                    
-                    # 短暂等待让Kinect更新数据
-                    import time
-                    time.sleep(0.005)  # 5ms等待
-                    
-                except Exception as e:
-                    print(f"尝试{attempt+1}获取深度帧失败: {e}")
-                    continue
-            
-            if depth_frame is None:
-                print("⚠️  无法获取深度帧")
-                print("📝 建议:")
-                print("   1. 确保Kinect正在运行且连接正常")
-                print("   2. 检查深度传感器是否被遮挡")
-                print("   3. 尝试重启Kinect服务")
-                print("   4. 在Kinect设置中同时启用彩色和深度传感器")
-                return None
-                
-            try:
-                depth_width = self.kinect.depth_frame_desc.Width
-                depth_height = self.kinect.depth_frame_desc.Height
-                depth_data = depth_frame.reshape((depth_height, depth_width))
-                print(f"成功获取深度数据: {depth_width}x{depth_height}")
-            except Exception as e:
-                print(f"深度数据处理错误: {e}")
-                return None
-            
-            # 计算边界框中心点在彩色图像中的位置
-            x1, y1, x2, y2 = bbox
-            center_x = int((x1 + x2) / 2)
-            center_y = int((y1 + y2) / 2)
-            
-            # 获取彩色图像尺寸
-            try:
-                color_width = self.kinect.color_frame_desc.Width
-                color_height = self.kinect.color_frame_desc.Height
-            except:
-                # 从实际帧获取尺寸
-                if color_frame is not None:
-                    color_height, color_width = color_frame.shape[:2]
-                else:
-                    # 默认值（常见的Kinect v2分辨率）
-                    color_width = 1920
-                    color_height = 1080
-            
-            # 坐标映射：彩色图像坐标 -> 深度图像坐标
-            # Kinect v2的深度和彩色相机略有偏移，这里使用简化映射
-            depth_x = int(center_x * depth_width / color_width)
-            depth_y = int(center_y * depth_height / color_height)
-            
-            # 确保坐标在深度图像范围内
-            depth_x = max(0, min(depth_x, depth_width - 1))
-            depth_y = max(0, min(depth_y, depth_height - 1))
-            
-            # 获取深度值（毫米）- 使用周围几个像素的平均值提高准确性
-            radius = 2
-            depth_values = []
-            for dy in range(-radius, radius + 1):
-                for dx in range(-radius, radius + 1):
-                    try:
-                        px = max(0, min(depth_x + dx, depth_width - 1))
-                        py = max(0, min(depth_y + dy, depth_height - 1))
-                        depth_val = depth_data[py, px]
-                        if depth_val > 0:
-                            depth_values.append(depth_val)
-                    except:
-                        continue
-            
-            if not depth_values:
-                print(f"在位置({depth_x},{depth_y})周围未找到有效深度值")
-                return None
-            
-            # 使用中位数减少噪声影响
-            depth_mm = np.median(depth_values)
-            
-            # 调试信息
-            print(f"3D坐标计算: bbox={bbox}, center=({center_x},{center_y}), depth_pos=({depth_x},{depth_y})")
-            print(f"深度映射: color({color_width}x{color_height}) -> depth({depth_width}x{depth_height})")
-            print(f"深度位置: ({depth_x},{depth_y}), 深度值: {depth_mm}mm (来自{len(depth_values)}个有效像素)")
-            
-            if depth_mm > 0 and depth_mm < 8000:  # 有效深度值范围
-                # Kinect v2 深度相机内参（标准值）
-                fx = 365.481  # 焦距x
-                fy = 365.481  # 焦距y  
-                cx = depth_width / 2.0  # 主点x
-                cy = depth_height / 2.0  # 主点y
-                
-                # 将深度图像坐标转换为3D世界坐标（Kinect坐标系）
-                z = depth_mm  # Z坐标（深度，毫米）
-                x = (depth_x - cx) * z / fx  # X坐标（毫米）
-                y = (depth_y - cy) * z / fy  # Y坐标（毫米）
-                
-                coords_3d = {
-                    'x': round(x, 1),
-                    'y': round(y, 1), 
-                    'z': round(z, 1),
-                    'unit': 'mm',
-                    'depth_pos': f"({depth_x},{depth_y})",
-                    'valid_pixels': len(depth_values)
-                }
-                
-                print(f"计算出的3D坐标: X={coords_3d['x']}mm, Y={coords_3d['y']}mm, Z={coords_3d['z']}mm")
-                return coords_3d
-            else:
-                print(f"无效深度值: {depth_mm}mm (有效范围: 0-8000mm)")
-                return None
+            mapping = self._get_registration().map_boxes(np.array([bbox], dtype=np.float32), depth_data)
+            return self._coords_from_mapping(mapping, 0)
             
         except Exception as e:
             print(f"3D坐标计算异常: {e}")
@@ -430,28 +636,37 @@ class VideoThread(QThread):
         self.running = False
 
 
-class CameraThread(QThread):
-    """电脑摄像头视频处理线程（调试模式）"""
-    frame_ready = pyqtSignal(np.ndarray)
-    detection_ready = pyqtSignal(list)
+class CameraThread(DetectionThread):
+    """电脑摄像头视频处理线程（调试模式）
+
+    与 VideoThread 相同，本线程只负责采集，推理在流水线阶段中运行。
+    """
     error_occurred = pyqtSignal(str)
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.model = None
         self.camera = None
-        self.running = False
-        self.target_classes = config_manager.detection.target_classes
         self.camera_index = 0
         
-    def set_model(self, model):
-        self.model = model
-        
     def set_camera_index(self, index):
         self.camera_index = index
-        
-    def set_target_classes(self, classes):
-        self.target_classes = classes
+    
+    def get_pipeline_stats(self):
+        """获取流水线各阶段统计"""
+        if not self.pipeline:
+            return {}
+        stats = self.pipeline.stats()
+        stats['pools'] = self.frame_pools.stats()
+        if config_manager.detection.track_and_skip:
+            stats['keyframe'] = self.track_and_skip.stats()
+        if self.model:
+            stats['tracking'] = self.tracker.stats()
+            if self._tiling_enabled():
+                stats['tiling'] = self.tiled_detector.stats()
+            if config_manager.detection.motion_gate:
+                stats['motion_gate'] = self.motion_gate.stats()
+        self._add_inference_stats(stats)
+        return stats
         
     def run(self):
         """主运行循环"""
@@ -469,54 +684,64 @@ class CameraThread(QThread):
         self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
         self.camera.set(cv2.CAP_PROP_FPS, 30)
         
-        while self.running:
-            try:
-                ret, frame = self.camera.read()
-                
-                if not ret:
-                    self.error_occurred.emit("无法从摄像头读取帧")
-                    break
-                
-                # 发送原始帧
-                self.frame_ready.emit(frame.copy())
-                
-                # 执行检测
-                if self.model:
-                    results = self.model(frame, verbose=False)
-                    detections = self.process_detections(results)
-                    self.detection_ready.emit(detections)
-                
-                self.msleep(33)  # 约30FPS
-                
-            except Exception as e:
-                self.error_occurred.emit(f"摄像头线程错误: {e}")
-                break
-                
-    def process_detections(self, results):
-        """处理检测结果"""
-        detections = []
+        self._start_pipeline()
         
-        for r in results:
-            for box in r.boxes:
-                class_id = int(box.cls[0])
-                class_name = self.model.names[class_id]
-                conf = box.conf[0].item()
-                
-                if class_name in self.target_classes and conf >= config_manager.detection.confidence_threshold:
-                    x1, y1, x2, y2 = box.xyxy[0].tolist()
-                    
-                    detection = {
-                        'class_name': class_name,
-                        'confidence': conf,
-                        'bbox': (int(x1), int(y1), int(x2), int(y2))
-                    }
-                    detections.append(detection)
+        frame_id = 0
+        last_stats_time = time.perf_counter()
+        capture_shape = None
+        
+        try:
+            while self.running:
+                lease = None
+                try:
+                    # read() 按摄像头帧率阻塞，无需额外休眠；分辨率确定后直接读入池中缓冲区
+                    if capture_shape is not None:
+                        lease = self.frame_pools.lease('capture', capture_shape)
+                        ret, frame = self.camera.read(lease.array)
+                    else:
+                        ret, frame = self.camera.read()
                     
-                    # 限制最大检测数量
-                    if len(detections) >= config_manager.detection.max_detections:
+                    if not ret:
+                        self.error_occurred.emit("无法从摄像头读取帧")
                         break
+                    if lease is not None and frame is not lease.array:
+                        # 分辨率变化，OpenCV 另行分配了输出，下一帧起使用新尺寸的缓冲池
+                        lease.release()
+                        lease = None
+                    capture_shape = frame.shape
                     
-        return detections
+                    frame_id += 1
+                    self.pipeline.note_capture()
+                    
+                    # 发送缩小后的显示帧（界面忙时丢弃）
+                    if self.pipeline.display.try_acquire():
+                        self._emit_display_frame(frame)
+                    
+                    # 投递到推理阶段，推理阶段持有缓冲区直到推理完成
+                    if self.model:
+                        packet = FramePacket(frame_id, time.time(), frame)
+                        if lease is not None:
+                            packet.lease = lease.retain()
+                        self.pipeline.submit(packet)
+                    
+                    now = time.perf_counter()
+                    if now - last_stats_time >= 1.0:
+                        last_stats_time = now
+                        self.pipeline_stats_ready.emit(self.get_pipeline_stats())
+                    
+                except Exception as e:
+                    self.error_occurred.emit(f"摄像头线程错误: {e}")
+                    break
+                finally:
+                    # 采集循环自身的持有到此结束
+                    if lease is not None:
+                        lease.release()
+        finally:
+            self._stop_pipeline()
+    
+    def process_detections(self, results):
+        """处理检测结果"""
+        return self._postprocess(results).to_dicts()
     
     def stop(self):
         self.running = False
@@ -524,6 +749,230 @@ class CameraThread(QThread):
             self.camera.release()
 
 
+class MultiCameraThread(QThread):
+    """多路电脑摄像头线程（调试模式）
+
+    每路摄像头一个采集线程，共用一个 MicroBatcher 推理线程：各路最新帧在截止时间内凑成一批，
+    一次批量推理后按来源分别跟踪并发回对应的显示格。本线程只负责启动、统计与停止。
+    关键帧检测、分块推理与变化门控按路保存状态、每路推理不同的图像，会打散批次，多路模式下不使用。
+    """
+    frame_ready = pyqtSignal(int, np.ndarray, float)  # 来源, 显示帧, 相对原始帧的缩放比例
+    detection_ready = pyqtSignal(int, list)  # 来源, 检测结果
+    error_occurred = pyqtSignal(str)
+    pipeline_stats_ready = pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.model = None
+        self.running = False
+        self.camera_indices = []
+        self.batcher = None
+        self.postprocessor = DetectionPostProcessor()
+        self.target_classes = config_manager.detection.target_classes
+        # 以下按来源序号保存：跟踪器只由推理线程使用，其余由各路采集线程与界面线程使用
+        self.trackers = {}
+        self.frame_pools = {}
+        self.throttles = {}
+        self.display_sizes = {}
+        self.captured = {}
+        self._display_leases = {}
+        self._shown_leases = {}
+        self._started_at = None
+
+    def set_model(self, model):
+        self.model = model
+
+    def set_camera_indices(self, indices):
+        """摄像头索引列表，列表中的位置即来源序号"""
+        self.camera_indices = list(indices)
+
+    def set_display_size(self, source, width, height):
+        """一路显示格的大小（物理像素），显示帧在该路采集线程中缩小到此大小"""
+        self.display_sizes[source] = (width, height)
+
+    def set_target_classes(self, classes):
+        self.target_classes = list(classes)
+
+    def frame_displayed(self, source):
+        """界面绘制完一路的一帧后调用：归还该路上一帧的显示缓冲区，允许发送下一帧"""
+        shown = self._shown_leases.get(source)
+        if shown is not None:
+            shown.release()
+        self._shown_leases[source] = self._display_leases.pop(source, None)
+        throttle = self.throttles.get(source)
+        if throttle is not None:
+            throttle.release()
+
+    def get_pipeline_stats(self):
+        """获取多路统计：总采集 / 显示 / 推理帧率、各路丢帧与微批统计"""
+        if not self.batcher:
+            return {}
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        batch = self.batcher.stats()
+        captured = sum(self.captured.values())
+        shown = sum(t.shown for t in self.throttles.values())
+        stats = {
+            'capture': {'processed': captured},
+            'infer': {'processed': batch['frames'], 'errors': batch['errors'],
+                      'dropped': sum(batch['dropped'].values()), 'busy_ms': batch['busy_ms']},
+            'display': {'processed': shown, 'dropped': sum(t.dropped for t in self.throttles.values())},
+            'pools': {f"{name}{source}": pool_stats for source, pools in self.frame_pools.items()
+                      for name, pool_stats in pools.stats().items()},
+            'micro_batch': batch,
+        }
+        if elapsed > 0:
+            stats['capture_fps'] = round(captured / elapsed, 1)
+            stats['display_fps'] = round(shown / elapsed, 1)
+            stats['infer_fps'] = batch['infer_fps']
+        return stats
+
+    def run(self):
+        """启动各路采集线程与微批推理线程，定时发送统计，直到停止或所有摄像头都已断开"""
+        self.running = True
+        config = config_manager.detection
+        sources = range(len(self.camera_indices))
+        for source in sources:
+            self.trackers[source] = MultiObjectTracker()
+            self.frame_pools[source] = FramePoolSet()
+            self.throttles[source] = DisplayThrottle()
+            self.captured[source] = 0
+
+        self.batcher = MicroBatcher(self._infer_batch, self._emit_detections, len(self.camera_indices),
+                                    config.micro_batch_size, config.micro_batch_deadline_ms)
+        self.batcher.start()
+        captures = [threading.Thread(target=self._capture_loop, args=(source, index),
+                                     name=f"oasis-capture-{source}", daemon=True)
+                    for source, index in zip(sources, self.camera_indices)]
+        self._started_at = time.perf_counter()
+        for capture in captures:
+            capture.start()
+
+        last_stats_time = time.perf_counter()
+        try:
+            while self.running and any(capture.is_alive() for capture in captures):
+                self.msleep(50)
+                now = time.perf_counter()
+                if now - last_stats_time >= 1.0:
+                    last_stats_time = now
+                    self.pipeline_stats_ready.emit(self.get_pipeline_stats())
+        finally:
+            self.running = False
+            for capture in captures:
+                capture.join(1.0)
+            self.batcher.stop()
+            self.batcher.join(1.0)
+
+    def _capture_loop(self, source, index):
+        """一路摄像头的采集循环（在独立线程中运行）"""
+        camera = cv2.VideoCapture(index)
+        if not camera.isOpened():
+            self.error_occurred.emit(f"无法打开摄像头 {index}")
+            self.batcher.source_closed()
+            return
+        camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+        camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        camera.set(cv2.CAP_PROP_FPS, 30)
+
+        pools = self.frame_pools[source]
+        throttle = self.throttles[source]
+        frame_id = 0
+        capture_shape = None
+        try:
+            while self.running:
+                lease = None
+                try:
+                    if capture_shape is not None:
+                        lease = pools.lease('capture', capture_shape)
+                        ret, frame = camera.read(lease.array)
+                    else:
+                        ret, frame = camera.read()
+
+                    if not ret:
+                        self.error_occurred.emit(f"无法从摄像头 {index} 读取帧")
+                        break
+                    if lease is not None and frame is not lease.array:
+                        lease.release()
+                        lease = None
+                    capture_shape = frame.shape
+
+                    frame_id += 1
+                    self.captured[source] += 1
+
+                    if throttle.try_acquire():
+                        display, scale = prepare_display_frame(frame, self.display_sizes.get(source), pools)
+                        self._display_leases[source] = display
+                        self.frame_ready.emit(source, display.array, scale)
+
+                    # 投递到微批推理线程，推理线程持有缓冲区直到整批推理完成
+                    if self.model:
+                        packet = FramePacket(frame_id, time.time(), frame, source=source)
+                        if lease is not None:
+                            packet.lease = lease.retain()
+                        self.batcher.submit(packet)
+                except Exception as e:
+                    self.error_occurred.emit(f"摄像头 {index} 线程错误: {e}")
+                    break
+                finally:
+                    if lease is not None:
+                        lease.release()
+        finally:
+            camera.release()
+            self.batcher.source_closed()
+
+    def _infer_batch(self, packets):
+        """微批推理：各路帧一次批量推理，再按来源分别跟踪"""
+        model = self.model
+        if model is None:
+            for packet in packets:
+                packet.release()
+            return []
+        config = config_manager.detection
+        try:
+            batches = self.postprocessor.infer_batch(
+                model, [packet.image for packet in packets], self.target_classes,
+                config.confidence_threshold, config.max_detections, monitor=latency_monitor)
+        finally:
+            for packet in packets:
+                packet.release()
+
+        for packet, batch in zip(packets, batches):
+            packet.batch = batch
+            packet.detections = batch.to_dicts()
+            tracker = self.trackers[packet.source]
+            tracks = tracker.update(batch, packet.timestamp)
+            tracker.annotate(packet.detections, tracks, packet.timestamp)
+        return packets
+
+    def _emit_detections(self, packet):
+        self.detection_ready.emit(packet.source, packet.detections)
+
+    def stop(self):
+        self.running = False
+
+
+class ModelLoadThread(QThread):
+    """模型加载线程：在后台加载并预热模型，界面线程不被阻塞"""
+    progress = pyqtSignal(int, str)  # 百分比, 说明
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, manager, model_path, backend, warmup_size, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.model_path = model_path
+        self.backend = backend
+        self.warmup_size = warmup_size
+        
+    def run(self):
+        try:
+            engine = self.manager.get(self.model_path, self.backend, self.warmup_size,
+                                      progress=self.progress.emit)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.loaded.emit(engine)
+
+
 class ModernButton(QPushButton):
     """现代化样式按钮"""
     def __init__(self, text, primary=False):
@@ -609,17 +1058,29 @@ class DetectionWidget(QWidget):
         layout.addWidget(self.stats_label)
         
         self.setLayout(layout)
+        # 跟踪 ID -> 列表项
+        self._items = {}
         
     def update_detections(self, detections):
-        """更新检测结果"""
-        self.result_list.clear()
-        
+        """更新检测结果
+
+        带跟踪 ID 的检测按 ID 原位更新列表项，只增删出现或消失的目标，列表顺序保持稳定；
+        没有跟踪 ID 时整表重建。
+        """
+        tracked = all('track_id' in d for d in detections)
+        if not tracked or not self._items:
+            self.result_list.clear()
+            self._items = {}
+        
+        seen = set()
         for detection in detections:
             class_name = detection['class_name']
             confidence = detection['confidence']
             
             # 基础检测信息
             item_text = f"{class_name} ({confidence:.2f})"
+            if tracked:
+                item_text = f"#{detection['track_id']} " + item_text
             
             # 如果有3D坐标信息，添加到显示中
             if 'coordinates_3d' in detection:
@@ -627,11 +1088,30 @@ class DetectionWidget(QWidget):
                 coords_text = f" | 3D: ({coords_3d['x']}, {coords_3d['y']}, {coords_3d['z']}) {coords_3d['unit']}"
                 item_text += coords_text
             
-            self.result_list.addItem(item_text)
+            if not tracked:
+                self.result_list.addItem(item_text)
+                continue
+            track_id = detection['track_id']
+            seen.add(track_id)
+            item = self._items.get(track_id)
+            if item is None:
+                item = QListWidgetItem(item_text)
+                self._items[track_id] = item
+                self.result_list.addItem(item)
+            elif item.text() != item_text:
+                item.setText(item_text)
+        
+        for track_id in [t for t in self._items if t not in seen]:
+            item = self._items.pop(track_id)
+            self.result_list.takeItem(self.result_list.row(item))
             
         self.stats_label.setText(f"当前检测: {len(detections)} 个对象")
 
 
+# 摄像头选择框中多路摄像头项的数据
+MULTI_CAMERA = "multi"
+
+
 class ControlPanel(QWidget):
     """控制面板"""
     start_detection = pyqtSignal()
@@ -679,6 +1159,8 @@ class ControlPanel(QWidget):
         self.camera_label = QLabel("摄像头:")
         self.camera_combo = QComboBox()
         self.camera_combo.addItems(["摄像头 0", "摄像头 1", "摄像头 2"])
+        # 多路：设置中配置的全部摄像头共用一个微批推理线程
+        self.camera_combo.addItem("多路摄像头", MULTI_CAMERA)
         self.camera_combo.setCurrentIndex(0)
         self.camera_combo.currentIndexChanged.connect(self.on_camera_changed)
         
@@ -864,6 +1346,10 @@ class ControlPanel(QWidget):
         """获取选择的摄像头索引"""
         return self.camera_combo.currentIndex()
     
+    def is_multi_camera(self):
+        """是否选择了多路摄像头"""
+        return self.camera_combo.currentData() == MULTI_CAMERA
+    
     def get_kinect_stream_type(self):
         """获取选择的 Kinect 视频流类型"""
         return self.kinect_stream_combo.currentData()
@@ -919,7 +1405,14 @@ class ControlPanel(QWidget):
 
 
 class VideoDisplayWidget(QLabel):
-    """视频显示组件"""
+    """视频显示组件
+
+    显示帧由采集线程缩小到控件大小后发送，这里直接以 BGR888 格式包装为 QImage
+    （不复制、不做颜色转换），在 paintEvent 中用 QPainter 绘制。
+    """
+    # 显示区域大小变化（物理像素），通知采集线程调整显示帧大小
+    display_size_changed = pyqtSignal(int, int)
+    
     def __init__(self):
         super().__init__()
         self.setMinimumSize(640, 480)
@@ -932,66 +1425,147 @@ class VideoDisplayWidget(QLabel):
         """)
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.setText("等待视频输入...")
-        self.setScaledContents(True)
-        
-    def update_frame(self, frame, detections=None, stream_type="color"):
-        """更新显示帧"""
-        # 为不同的流类型添加标识
-        if stream_type != "color":
+        # 延迟叠加层文本，由主窗口定时刷新；为空时不绘制
+        self.overlay_lines = []
+        # QImage 不持有像素数据，保留显示帧的引用直到下一帧
+        self._frame = None
+        self._image = None
+    
+    def display_size(self):
+        """显示区域的物理像素大小"""
+        rect = self.contentsRect()
+        ratio = self.devicePixelRatioF()
+        return int(rect.width() * ratio), int(rect.height() * ratio)
+        
+    def update_frame(self, frame, detections=None, stream_type="color", scale=1.0):
+        """更新显示帧（scale 为显示帧相对原始帧的缩放比例，用于换算检测框坐标）"""
+        draw_start = time.perf_counter()
+        if stream_type == "color":
+            # 只在彩色流上绘制检测结果
+            if detections:
+                draw_detections(frame, detections, config_manager.display, scale)
+        else:
+            # 为不同的流类型添加标识
             stream_names = {
                 "depth": "深度图像",
                 "infrared": "红外图像", 
                 "body_index": "人体索引"
             }
-            stream_label = stream_names.get(stream_type, stream_type)
-            
-            # 在图像顶部添加流类型标识
-            cv2.putText(frame, stream_label, (10, 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-        
-        # 只在彩色流上绘制检测结果
-        if detections and stream_type == "color":
-            # 在帧上绘制检测结果
-            display_config = config_manager.display
-            
-            for detection in detections:
-                bbox = detection['bbox']
-                class_name = detection['class_name']
-                confidence = detection['confidence']
-                
-                x1, y1, x2, y2 = bbox
-                
-                # 绘制边界框
-                cv2.rectangle(frame, (x1, y1), (x2, y2), 
-                             display_config.bbox_color, display_config.bbox_thickness)
-                
-                # 构建标签文本
-                label_parts = []
-                if display_config.show_class_names:
-                    label_parts.append(class_name)
-                if display_config.show_confidence:
-                    label_parts.append(f"{confidence:.2f}")
-                
-                if label_parts:
-                    label = " ".join(label_parts)
-                    cv2.putText(frame, label, (x1, y1 - 10), 
-                               cv2.FONT_HERSHEY_SIMPLEX, display_config.font_scale, 
-                               display_config.text_color, display_config.bbox_thickness)
+            draw_stream_label(frame, stream_names.get(stream_type, stream_type))
+        
+        if self.overlay_lines:
+            draw_text_lines(frame, self.overlay_lines)
+        
+        qimage_start = time.perf_counter()
+        latency_monitor.record('draw', qimage_start - draw_start)
         
-        # 转换为 QImage 并显示
+        # 零拷贝包装为 QImage：BGR888 与 OpenCV 的内存布局一致，所有流类型都无需颜色转换
         height, width, channel = frame.shape
-        bytes_per_line = 3 * width
+        bytes_per_line = frame.strides[0]
+        self._image = QImage(frame.data, width, height, bytes_per_line, QImage.Format.Format_BGR888)
+        self._frame = frame
+        latency_monitor.record('qimage', time.perf_counter() - qimage_start)
+        
+        if self.text():
+            self.setText("")
+        self.update()
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.display_size_changed.emit(*self.display_size())
+    
+    def paintEvent(self, event):
+        """绘制边框与背景后，按宽高比居中绘制当前帧；计入 paint 阶段"""
+        super().paintEvent(event)
+        image = self._image
+        if image is None:
+            return
         
-        if stream_type == "color":
-            # 对于彩色流，Kinect提供BGR格式，需要转换为RGB用于Qt显示
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            q_image = QImage(frame_rgb.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
-        else:
-            # 对于其他流类型（深度、红外等），已经是BGR格式，直接使用rgbSwapped
-            q_image = QImage(frame.data, width, height, bytes_per_line, QImage.Format.Format_RGB888).rgbSwapped()
+        start = time.perf_counter()
+        rect = self.contentsRect()
+        ratio = self.devicePixelRatioF()
+        # 通常显示帧已是控件大小，只在控件刚改变大小、新尺寸的帧尚未到达时缩放
+        scale = min(rect.width() * ratio / image.width(), rect.height() * ratio / image.height())
+        width, height = int(image.width() * scale / ratio), int(image.height() * scale / ratio)
+        target = QRect(rect.x() + (rect.width() - width) // 2,
+                       rect.y() + (rect.height() - height) // 2, width, height)
+        
+        painter = QPainter(self)
+        if abs(scale - 1.0) > 0.01:
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.drawImage(target, image)
+        painter.end()
+        latency_monitor.record('paint', time.perf_counter() - start)
+
+
+class VideoGridWidget(QWidget):
+    """多路视频网格：每路一个 VideoDisplayWidget，排成接近正方形的网格"""
+    # 一路显示格大小变化（物理像素）：来源, 宽, 高
+    display_size_changed = pyqtSignal(int, int, int)
+    
+    def __init__(self):
+        super().__init__()
+        self.grid_layout = QGridLayout()
+        self.grid_layout.setSpacing(6)
+        self.grid_layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(self.grid_layout)
+        self.cells = []
+    
+    def set_sources(self, labels):
+        """按来源标签重建网格"""
+        for cell in self.cells:
+            self.grid_layout.removeWidget(cell)
+            cell.deleteLater()
+        self.cells = []
+        columns = max(1, math.ceil(math.sqrt(len(labels))))
+        for source, label in enumerate(labels):
+            cell = VideoDisplayWidget()
+            cell.setMinimumSize(160, 120)
+            cell.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+            cell.setText(f"{label}: 等待视频输入...")
+            cell.display_size_changed.connect(
+                lambda width, height, source=source: self.display_size_changed.emit(source, width, height))
+            self.grid_layout.addWidget(cell, source // columns, source % columns)
+            self.cells.append(cell)
+    
+    def cell(self, source):
+        return self.cells[source] if 0 <= source < len(self.cells) else None
+
+
+class LatencyStatsWidget(QWidget):
+    """流水线延迟统计组件：FPS、丢帧与各阶段 p50/p95 耗时"""
+    def __init__(self):
+        super().__init__()
+        self.init_ui()
+        
+    def init_ui(self):
+        layout = QVBoxLayout()
+        
+        # 标题
+        title = QLabel("性能统计")
+        title.setFont(QFont("Arial", 16, QFont.Weight.Bold))
+        layout.addWidget(title)
         
-        pixmap = QPixmap.fromImage(q_image)
-        self.setPixmap(pixmap)
+        # 统计文本
+        self.stats_label = QLabel("暂无数据")
+        self.stats_label.setFont(QFont("Menlo", 11))
+        self.stats_label.setStyleSheet("""
+            QLabel {
+                border: 1px solid #C7C7CC;
+                border-radius: 8px;
+                background-color: white;
+                padding: 5px;
+                color: #3A3A3C;
+            }
+        """)
+        layout.addWidget(self.stats_label)
+        
+        self.setLayout(layout)
+        
+    def update_stats(self, snapshot, pipeline_stats=None):
+        """更新统计显示"""
+        lines = format_latency_lines(snapshot, pipeline_stats)
+        self.stats_label.setText("\n".join(lines) if lines else "暂无数据")
 
 
 class MainWindow(QMainWindow):
@@ -1000,14 +1574,33 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.video_thread = None
         self.camera_thread = None
+        self.multi_camera_thread = None
         self.model = None
         self.kinect = None
         self.current_detections = []
+        # 多路摄像头：来源序号 -> 检测结果
+        self.source_detections = {}
         self.debug_mode = False
-        
-        self.init_ui()
-        self.init_model()
-        self.init_kinect()
+        self.pipeline_stats = {}
+        # 模型在后台线程加载，最近使用的模型保留在缓存中
+        self.model_manager = ModelManager(config_manager.detection.model_cache_size,
+                                          config_manager.detection.model_cache_mb)
+        self.model_loader = None
+        # 推理进程池（配置了推理进程数时在开始检测时创建，模型或进程数变化时重建）
+        self.inference_pool = None
+        # 自适应质量控制器（启用时检测线程按其当前级别推理）
+        self.quality_controller = QualityController()
+        self._reload_model = False
+        self._start_when_loaded = False
+        
+        with startup_profiler.phase("init_ui"):
+            self.init_ui()
+        with startup_profiler.phase("init_kinect"):
+            self.init_kinect()
+        # 模型（ultralytics / torch）在窗口显示后才开始在后台加载；
+        # 关闭预加载时推迟到第一次开始检测
+        if config_manager.ui.preload_model:
+            QTimer.singleShot(0, self.init_model)
         
     def init_ui(self):
         """初始化界面"""
@@ -1037,7 +1630,15 @@ class MainWindow(QMainWindow):
         # 设置视频显示的最小尺寸和大小策略
         self.video_display.setMinimumSize(480, 360)
         self.video_display.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        splitter.addWidget(self.video_display)
+        self.video_display.display_size_changed.connect(self.on_display_size_changed)
+        
+        # 多路摄像头的视频网格，与单路视频显示叠放，按检测模式切换
+        self.video_grid = VideoGridWidget()
+        self.video_grid.display_size_changed.connect(self.on_grid_display_size_changed)
+        self.video_stack = QStackedWidget()
+        self.video_stack.addWidget(self.video_display)
+        self.video_stack.addWidget(self.video_grid)
+        splitter.addWidget(self.video_stack)
         
         # 右侧：控制面板和检测结果（带滚动条）
         right_panel = QWidget()
@@ -1078,6 +1679,11 @@ class MainWindow(QMainWindow):
         self.detection_widget.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Expanding)
         right_layout.addWidget(self.detection_widget)
         
+        # 性能统计
+        self.latency_widget = LatencyStatsWidget()
+        self.latency_widget.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Maximum)
+        right_layout.addWidget(self.latency_widget)
+        
         splitter.addWidget(right_panel)
         
         # 设置分割器比例：视频区域占大部分，控制面板占较小部分
@@ -1094,6 +1700,18 @@ class MainWindow(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("就绪")
         
+        # 模型加载进度，只在加载时显示
+        self.model_progress = QProgressBar()
+        self.model_progress.setRange(0, 100)
+        self.model_progress.setMaximumWidth(160)
+        self.model_progress.hide()
+        self.status_bar.addPermanentWidget(self.model_progress)
+        
+        # 定时刷新性能统计与视频叠加层
+        self.latency_timer = QTimer(self)
+        self.latency_timer.timeout.connect(self.refresh_latency_stats)
+        self.latency_timer.start(500)
+        
     def load_stylesheet(self):
         """加载样式表"""
         try:
@@ -1187,23 +1805,171 @@ class MainWindow(QMainWindow):
         # 重新加载配置
         if self.video_thread:
             self.video_thread.set_target_classes(config_manager.detection.target_classes)
+        if self.camera_thread:
+            self.camera_thread.set_target_classes(config_manager.detection.target_classes)
+        if self.multi_camera_thread:
+            self.multi_camera_thread.set_target_classes(config_manager.detection.target_classes)
+            if self.multi_camera_thread.batcher:
+                self.multi_camera_thread.batcher.configure(config_manager.detection.micro_batch_size,
+                                                           config_manager.detection.micro_batch_deadline_ms)
         
         # 更新控制面板的类别选择
         self.control_panel.update_class_selection(config_manager.detection.target_classes)
         
         self.status_bar.showMessage("设置已更新")
+        
+        # 模型文件或推理后端变化时切换模型（已缓存时立即切换，否则在后台加载）
+        config = config_manager.detection
+        self.model_manager.configure(config.model_cache_size, config.model_cache_mb)
+        self._configure_quality()
+        if self.model is None or (self.model.model_path, self.model.requested) != \
+                (self._active_model_path(), config.inference_backend):
+            self.init_model()
+        if self.inference_pool or self.video_thread or self.camera_thread:
+            self._sync_inference_pool()
 
     def init_model(self):
-        """初始化 YOLO 模型"""
+        """在后台线程加载并预热配置的模型；模型已在缓存中时立即切换"""
+        config = config_manager.detection
+        model_path = self._active_model_path()
+        self.model_manager.configure(config.model_cache_size, config.model_cache_mb)
+        engine = self.model_manager.cached(model_path, config.inference_backend)
+        if engine is not None:
+            self.on_model_loaded(engine)
+            return
+        if self.model_loader is not None and self.model_loader.isRunning():
+            # 当前加载完成后再按最新的配置加载
+            self._reload_model = True
+            return
+        
+        self.model_loader = ModelLoadThread(self.model_manager, model_path,
+                                            config.inference_backend, self._warmup_size())
+        self.model_loader.progress.connect(self.on_model_progress)
+        self.model_loader.loaded.connect(self.on_model_loaded)
+        self.model_loader.failed.connect(self.on_model_failed)
+        self.model_progress.setValue(0)
+        self.model_progress.show()
+        self.model_loader.start()
+    
+    def _sync_inference_pool(self):
+        """按配置创建、替换或关闭推理进程池，运行中的线程从下一帧起使用新的进程池"""
+        config = config_manager.detection
+        pool = self.inference_pool
+        key = (self._active_model_path(), config.inference_backend, config.inference_workers)
+        if pool is not None and pool.key == key and not pool.failed:
+            return pool
+        
+        new_pool = None
+        if config.inference_workers > 0:
+            # 工作进程在后台加载模型，就绪前投递的帧在任务队列中等待
+            new_pool = InferenceProcessPool(*key, warmup_size=self._warmup_size())
+            new_pool.start()
+        for thread in (self.video_thread, self.camera_thread):
+            if thread:
+                thread.set_inference_pool(new_pool)
+        if pool is not None:
+            pool.stop()
+        self.inference_pool = new_pool
+        return new_pool
+    
+    def _active_model_path(self):
+        """当前应使用的模型：启用自适应质量时为当前质量级别的模型，否则为配置的模型"""
+        config = config_manager.detection
+        if config.adaptive_quality and self.quality_controller.level.model_path:
+            return self.quality_controller.level.model_path
+        return config.model_path
+    
+    def _configure_quality(self):
+        """按配置与当前推理后端更新自适应质量控制器，并交给运行中的检测线程"""
+        config = config_manager.detection
+        backend = self.model.backend if self.model else config.inference_backend
+        self.quality_controller.configure(build_levels(config, backend), config.quality_target_fps,
+                                          config.quality_target_latency_ms)
+        controller = self.quality_controller if config.adaptive_quality else None
+        for thread in (self.video_thread, self.camera_thread):
+            if thread:
+                thread.set_quality_controller(controller)
+        return controller
+    
+    def on_quality_decision(self, decision):
+        """自适应质量调整了级别：记录日志，需要换用其他模型时在后台切换"""
+        text = format_decision(decision, config_manager.detection.tiled_inference)
+        print(f"⚙️  自适应质量: {text}")
+        self.status_bar.showMessage(f"自适应质量: {text}")
+        if self.model is None or self.model.model_path != decision.level.model_path:
+            self.init_model()
+        if self.inference_pool:
+            self._sync_inference_pool()
+    
+    def _warmup_size(self):
+        """预热输入尺寸：分块推理时为分块大小，否则为彩色帧分辨率"""
+        config = config_manager.detection
+        if config.tiled_inference:
+            return (config.tile_size, config.tile_size)
         try:
-            model_path = config_manager.detection.model_path
-            self.model = YOLO(model_path)
-            self.status_bar.showMessage("YOLO 模型加载成功")
-        except Exception as e:
-            self.status_bar.showMessage(f"模型加载失败: {e}")
+            width, height = (int(v) for v in config_manager.kinect.color_resolution.split('x'))
+        except ValueError:
+            width, height = 1920, 1080
+        return (width, height)
+    
+    def on_model_progress(self, percent, text):
+        """模型加载进度"""
+        self.model_progress.setValue(percent)
+        self.status_bar.showMessage(f"模型加载: {text}")
+    
+    def on_model_loaded(self, engine):
+        """模型加载完成：运行中的线程从下一帧起使用新模型"""
+        self.model_progress.hide()
+        self.model = engine
+        for thread in (self.video_thread, self.camera_thread, self.multi_camera_thread):
+            if thread:
+                thread.set_model(engine)
+        # 级别列表取决于实际使用的推理后端；切换到其他规格的模型后重新开始测量
+        self._configure_quality()
+        self.quality_controller.restart()
+        
+        config = config_manager.detection
+        backend = config_manager.get_inference_backends().get(engine.backend, engine.backend)
+        message = f"YOLO 模型加载成功 ({backend}, 预热 {engine.warmup_seconds * 1000:.0f}ms)"
+        if engine.fallback:
+            message += f"，{engine.requested} 后端不可用: {engine.fallback}"
+        self.status_bar.showMessage(message)
+        self._after_model_load()
+    
+    def on_model_failed(self, error_message):
+        """模型加载失败"""
+        self.model_progress.hide()
+        self.status_bar.showMessage(f"模型加载失败: {error_message}")
+        self._after_model_load()
+    
+    def _after_model_load(self):
+        """加载期间配置又发生变化时重新加载；加载期间点击了开始检测时开始检测"""
+        if self._reload_model:
+            self._reload_model = False
+            config = config_manager.detection
+            if self.model is None or (self.model.model_path, self.model.requested) != \
+                    (self._active_model_path(), config.inference_backend):
+                self.init_model()
+                return
+        if self._start_when_loaded:
+            self._start_when_loaded = False
+            if self.model:
+                self.start_detection()
             
     def init_kinect(self):
         """初始化 Kinect 传感器"""
+        replay_path = config_manager.kinect.replay_path
+        if replay_path:
+            # 回放录制的会话，接口与 PyKinectRuntime 相同
+            self.kinect = open_replay(replay_path, pacing=config_manager.kinect.replay_pacing,
+                                      fps=config_manager.kinect.fps, loop=True,
+                                      master=config_manager.kinect.video_stream_type)
+            if self.kinect:
+                self.status_bar.showMessage(f"Kinect 回放: {replay_path}")
+            else:
+                self.status_bar.showMessage(f"Kinect 回放打开失败: {replay_path}")
+            return
+        
         try:
             from pykinect2 import PyKinectV2, PyKinectRuntime
             
@@ -1257,21 +2023,39 @@ class MainWindow(QMainWindow):
     def start_detection(self):
         """开始检测"""
         if not self.model:
-            self.status_bar.showMessage("模型未加载")
-            return
+            if self.model_loader is None or not self.model_loader.isRunning():
+                # 未预加载或上次加载失败：开始检测时加载模型
+                self.init_model()
+            if self.model_loader is not None and self.model_loader.isRunning():
+                self._start_when_loaded = True
+                self.status_bar.showMessage("模型加载中，加载完成后开始检测")
+                return
+            if not self.model:
+                self.status_bar.showMessage("模型未加载")
+                return
         
         # 根据模式选择不同的检测方式
-        if self.debug_mode:
+        if self.debug_mode and self.control_panel.is_multi_camera():
+            self.start_multi_camera()
+        elif self.debug_mode:
             # 调试模式：使用电脑摄像头
+            self.video_stack.setCurrentWidget(self.video_display)
             self.camera_thread = CameraThread()
             self.camera_thread.set_model(self.model)
+            self.camera_thread.set_inference_pool(self._sync_inference_pool())
+            self._configure_quality()
+            self.quality_controller.restart()
             self.camera_thread.set_camera_index(self.control_panel.get_camera_index())
+            self.camera_thread.set_display_size(*self.video_display.display_size())
             self.camera_thread.set_target_classes(config_manager.detection.target_classes)
             
             self.camera_thread.frame_ready.connect(self.update_video_display)
             self.camera_thread.detection_ready.connect(self.update_detections)
             self.camera_thread.error_occurred.connect(self.on_camera_error)
+            self.camera_thread.pipeline_stats_ready.connect(self.update_pipeline_stats)
             
+            latency_monitor.reset()
+            self.pipeline_stats = {}
             self.camera_thread.start()
             self.status_bar.showMessage("调试模式检测运行中...")
         else:
@@ -1280,18 +2064,55 @@ class MainWindow(QMainWindow):
                 self.status_bar.showMessage("Kinect 设备未就绪")
                 return
                 
+            self.video_stack.setCurrentWidget(self.video_display)
             self.video_thread = VideoThread()
             self.video_thread.set_model(self.model)
+            self.video_thread.set_inference_pool(self._sync_inference_pool())
+            self._configure_quality()
+            self.quality_controller.restart()
             self.video_thread.set_kinect(self.kinect)
             self.video_thread.set_target_classes(config_manager.detection.target_classes)
             self.video_thread.set_stream_type(self.control_panel.get_kinect_stream_type())
+            self.video_thread.set_display_size(*self.video_display.display_size())
             
             self.video_thread.frame_ready.connect(self.update_video_display)
             self.video_thread.detection_ready.connect(self.update_detections)
             self.video_thread.stream_info_ready.connect(self.update_stream_info)
+            self.video_thread.pipeline_stats_ready.connect(self.update_pipeline_stats)
             
+            latency_monitor.reset()
+            self.pipeline_stats = {}
             self.video_thread.start()
             self.status_bar.showMessage("Kinect 检测运行中...")
+    
+    def start_multi_camera(self):
+        """多路摄像头模式：每路一个采集线程，共用一个微批推理线程，视频以网格显示"""
+        indices = config_manager.detection.camera_sources
+        if not indices:
+            self.status_bar.showMessage("未配置多路摄像头，请在设置中填写摄像头索引")
+            self.control_panel.on_stop_clicked()
+            return
+        
+        self.video_grid.set_sources([f"摄像头 {index}" for index in indices])
+        self.video_stack.setCurrentWidget(self.video_grid)
+        self.source_detections = {}
+        
+        self.multi_camera_thread = MultiCameraThread()
+        self.multi_camera_thread.set_model(self.model)
+        self.multi_camera_thread.set_camera_indices(indices)
+        self.multi_camera_thread.set_target_classes(config_manager.detection.target_classes)
+        for source, cell in enumerate(self.video_grid.cells):
+            self.multi_camera_thread.set_display_size(source, *cell.display_size())
+        
+        self.multi_camera_thread.frame_ready.connect(self.update_grid_display)
+        self.multi_camera_thread.detection_ready.connect(self.update_source_detections)
+        self.multi_camera_thread.error_occurred.connect(self.on_multi_camera_error)
+        self.multi_camera_thread.pipeline_stats_ready.connect(self.update_pipeline_stats)
+        
+        latency_monitor.reset()
+        self.pipeline_stats = {}
+        self.multi_camera_thread.start()
+        self.status_bar.showMessage(f"多路摄像头检测运行中 ({len(indices)} 路)...")
         
     def stop_detection(self):
         """停止检测"""
@@ -1304,6 +2125,11 @@ class MainWindow(QMainWindow):
             self.camera_thread.stop()
             self.camera_thread.wait()
             self.camera_thread = None
+        
+        if self.multi_camera_thread:
+            self.multi_camera_thread.stop()
+            self.multi_camera_thread.wait()
+            self.multi_camera_thread = None
             
         self.status_bar.showMessage("检测已停止")
     
@@ -1312,7 +2138,7 @@ class MainWindow(QMainWindow):
         self.debug_mode = debug_mode
         
         # 如果正在运行检测，先停止
-        if self.video_thread or self.camera_thread:
+        if self.video_thread or self.camera_thread or self.multi_camera_thread:
             self.stop_detection()
             self.control_panel.on_stop_clicked()  # 更新按钮状态
         
@@ -1324,8 +2150,8 @@ class MainWindow(QMainWindow):
     
     def on_camera_index_changed(self, index):
         """摄像头索引改变处理"""
-        if self.camera_thread and self.camera_thread.isRunning():
-            # 如果摄像头线程正在运行，重启以使用新的摄像头
+        if any(thread and thread.isRunning() for thread in (self.camera_thread, self.multi_camera_thread)):
+            # 如果摄像头线程正在运行，重启以使用新的摄像头（或切换单路 / 多路）
             self.stop_detection()
             self.start_detection()
     
@@ -1334,6 +2160,10 @@ class MainWindow(QMainWindow):
         self.status_bar.showMessage(f"摄像头错误: {error_message}")
         QMessageBox.warning(self, "摄像头错误", error_message)
     
+    def on_multi_camera_error(self, error_message):
+        """多路摄像头错误：只在状态栏提示，其余各路继续运行"""
+        self.status_bar.showMessage(f"摄像头错误: {error_message}")
+    
     def on_kinect_stream_changed(self, stream_type):
         """Kinect 视频流类型改变处理"""
         # 更新配置
@@ -1346,6 +2176,25 @@ class MainWindow(QMainWindow):
             self.init_kinect()
             self.start_detection()
     
+    def update_pipeline_stats(self, stats):
+        """更新流水线统计显示（调试模式）；启用自适应质量时按最新的测量调整质量级别"""
+        self.pipeline_stats = stats
+        if config_manager.detection.adaptive_quality and (self.video_thread or self.camera_thread):
+            decision = self.quality_controller.update(capture_fps=stats.get('capture_fps', 0.0))
+            if decision is not None:
+                self.on_quality_decision(decision)
+        if self.debug_mode:
+            self.status_bar.showMessage(f"调试模式 | {format_pipeline_stats(stats)}")
+    
+    def refresh_latency_stats(self):
+        """刷新性能统计面板与视频叠加层"""
+        snapshot = latency_monitor.snapshot()
+        self.latency_widget.update_stats(snapshot, self.pipeline_stats)
+        if config_manager.display.show_latency_overlay:
+            self.video_display.overlay_lines = format_overlay_lines(snapshot, self.pipeline_stats)
+        else:
+            self.video_display.overlay_lines = []
+    
     def update_stream_info(self, info):
         """更新流信息显示"""
         # 可以在界面上显示当前流类型信息
@@ -1384,25 +2233,68 @@ class MainWindow(QMainWindow):
             self.video_thread.set_target_classes(classes)
         if self.camera_thread:
             self.camera_thread.set_target_classes(classes)
+        if self.multi_camera_thread:
+            self.multi_camera_thread.set_target_classes(classes)
             
-    @pyqtSlot(np.ndarray)
-    def update_video_display(self, frame):
+    def on_display_size_changed(self, width, height):
+        """显示区域大小变化，通知采集线程"""
+        for thread in (self.video_thread, self.camera_thread):
+            if thread:
+                thread.set_display_size(width, height)
+    
+    def on_grid_display_size_changed(self, source, width, height):
+        """多路网格中一格大小变化，通知多路摄像头线程"""
+        if self.multi_camera_thread:
+            self.multi_camera_thread.set_display_size(source, width, height)
+    
+    @pyqtSlot(np.ndarray, float)
+    def update_video_display(self, frame, scale=1.0):
         """更新视频显示"""
         # 获取当前流类型
         stream_type = "color"  # 默认
         if not self.debug_mode and self.video_thread:
             stream_type = self.video_thread.stream_type
         
-        self.video_display.update_frame(frame, self.current_detections, stream_type)
+        self.video_display.update_frame(frame, self.current_detections, stream_type, scale)
+        
+        # 通知采集线程可以发送下一帧
+        source = self.camera_thread if self.debug_mode else self.video_thread
+        if source:
+            source.frame_displayed()
         
     @pyqtSlot(list)
     def update_detections(self, detections):
         """更新检测结果"""
         self.current_detections = detections
         self.detection_widget.update_detections(detections)
+    
+    @pyqtSlot(int, np.ndarray, float)
+    def update_grid_display(self, source, frame, scale=1.0):
+        """更新多路网格中一路的视频显示"""
+        cell = self.video_grid.cell(source)
+        if cell is not None:
+            cell.update_frame(frame, self.source_detections.get(source), "color", scale)
+        if self.multi_camera_thread:
+            self.multi_camera_thread.frame_displayed(source)
+    
+    @pyqtSlot(int, list)
+    def update_source_detections(self, source, detections):
+        """更新一路的检测结果；检测结果列表显示各路合并的结果，跟踪 ID 加上来源前缀"""
+        self.source_detections[source] = detections
+        merged = []
+        for key in sorted(self.source_detections):
+            for detection in self.source_detections[key]:
+                if 'track_id' in detection:
+                    detection = dict(detection, track_id=f"{key}.{detection['track_id']}")
+                merged.append(detection)
+        self.current_detections = merged
+        self.detection_widget.update_detections(merged)
         
     def closeEvent(self, event):
         """关闭事件"""
+        if self.model_loader:
+            self.model_loader.wait()
+            
         if self.video_thread:
             self.video_thread.stop()
             self.video_thread.wait()
@@ -1410,6 +2302,13 @@ class MainWindow(QMainWindow):
         if self.camera_thread:
             self.camera_thread.stop()
             self.camera_thread.wait()
+        
+        if self.multi_camera_thread:
+            self.multi_camera_thread.stop()
+            self.multi_camera_thread.wait()
+        
+        if self.inference_pool:
+            self.inference_pool.stop()
             
         if self.kinect:
             self.kinect.close()
@@ -15,8 +15,9 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QMenuBar, QMessageBox, QListWidgetItem)
 from PyQt6.QtCore import QTimer, Qt, pyqtSignal, QThread, pyqtSlot
 from PyQt6.QtGui import QPixmap, QImage, QFont, QPalette, QColor, QIcon, QAction
-from ultralytics import YOLO
 from .config import config_manager
+from .postprocess import DetectionPostProcessor
+from .backends import load_engine
 from .settings_dialog_ui import SettingsDialogUI
 from .ui_loader import UILoader, UI_FILES
 
@@ -31,6 +32,7 @@ class VideoThread(QThread):
         self.model = None
         self.kinect = None
         self.running = False
+        self.postprocessor = DetectionPostProcessor()
         self.target_classes = config_manager.detection.target_classes
         
     def set_model(self, model):
@@ -65,8 +67,10 @@ class VideoThread(QThread):
                     
                     # 执行检测
                     if self.model:
-                        results = self.model(frame_bgr, verbose=False)
-                        detections = self.process_detections(results)
+                        detections = self.postprocessor.infer(
+                            self.model, frame_bgr, self.target_classes,
+                            config_manager.detection.confidence_threshold,
+                            config_manager.detection.max_detections).to_dicts()
                         self.detection_ready.emit(detections)
                         
                 self.msleep(30)  # 约30FPS
@@ -76,29 +80,10 @@ class VideoThread(QThread):
                 
     def process_detections(self, results):
         """处理检测结果"""
-        detections = []
-        
-        for r in results:
-            for box in r.boxes:
-                class_id = int(box.cls[0])
-                class_name = self.model.names[class_id]
-                conf = box.conf[0].item()
-                
-                if class_name in self.target_classes and conf >= config_manager.detection.confidence_threshold:
-                    x1, y1, x2, y2 = box.xyxy[0].tolist()
-                    
-                    detection = {
-                        'class_name': class_name,
-                        'confidence': conf,
-                        'bbox': (int(x1), int(y1), int(x2), int(y2))
-                    }
-                    detections.append(detection)
-                    
-                    # 限制最大检测数量
-                    if len(detections) >= config_manager.detection.max_detections:
-                        break
-                    
-        return detections
+        return self.postprocessor.process(
+            results, self.model.names, self.target_classes,
+            config_manager.detection.confidence_threshold,
+            config_manager.detection.max_detections).to_dicts()
     
     def stop(self):
         self.running = False
@@ -168,8 +153,9 @@ class MainWindowUI(QMainWindow):
         
         # 加载 UI
         self.setup_ui()
-        self.init_model()
         self.init_kinect()
+        # 模型（ultralytics / torch）在窗口显示后再加载
+        QTimer.singleShot(0, self.init_model)
         
     def setup_ui(self):
         """设置用户界面"""
@@ -317,8 +303,8 @@ class MainWindowUI(QMainWindow):
     def init_model(self):
         """初始化 YOLO 模型"""
         try:
-            model_path = config_manager.detection.model_path
-            self.model = YOLO(model_path)
+            config = config_manager.detection
+            self.model = load_engine(config.model_path, config.inference_backend)
             self.ui.statusbar.showMessage("YOLO 模型加载成功")
         except Exception as e:
             self.ui.statusbar.showMessage(f"模型加载失败: {e}")
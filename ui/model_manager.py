@@ -0,0 +1,127 @@
+"""
+Oasis 目标检测系统 - 模型管理
+加载模型后立即以实际输入尺寸做预热推理，第一帧检测不再承担延迟初始化的开销；
+最近使用的模型保留在 LRU 缓存中，在 yolo11n / yolo11s 等模型之间切换时不需要重新加载，
+缓存超过数量或内存上限时淘汰最久未使用的模型
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+
+from .backends import load_engine
+
+# 加载后占用的内存约为模型文件大小的倍数（fp16 权重展开为 fp32，加上推理缓冲区）
+MODEL_MEMORY_FACTOR = 4.0
+WARMUP_RUNS = 2
+
+
+def model_memory_mb(engine):
+    """按模型文件（或导出目录）大小估算加载后占用的内存（MB）"""
+    path = engine.path
+    if not os.path.exists(path):
+        path = str(getattr(engine.model, 'ckpt_path', None) or '')
+    if os.path.isdir(path):
+        size = sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, names in os.walk(path) for name in names)
+    elif os.path.isfile(path):
+        size = os.path.getsize(path)
+    else:
+        size = 0
+    return size * MODEL_MEMORY_FACTOR / (1024 * 1024)
+
+
+def warm_up(engine, size, runs=WARMUP_RUNS):
+    """以 size=(宽, 高) 的空白图推理 runs 次，完成后端初始化与各级缓存分配，返回总耗时（秒）"""
+    image = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+    start = time.perf_counter()
+    for _ in range(runs):
+        engine(image, verbose=False)
+    return time.perf_counter() - start
+
+
+class ModelManager:
+    """已加载模型的 LRU 缓存
+
+    以 (模型路径, 推理后端) 为键，get() 命中时直接返回，否则加载并预热后放入缓存。
+    缓存模型数超过 capacity 或估算内存超过 memory_cap_mb 时淘汰最久未使用的模型
+    （刚加载的模型总是保留）；被淘汰的模型在没有线程引用后由垃圾回收释放。
+    get() 会阻塞，应在后台线程中调用；其余方法可在任意线程调用。
+    """
+
+    def __init__(self, capacity=3, memory_cap_mb=1024, loader: Callable = load_engine):
+        self.capacity = capacity
+        self.memory_cap_mb = memory_cap_mb
+        self.loader = loader
+        self._models = OrderedDict()
+        self._memory = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, capacity, memory_cap_mb):
+        with self._lock:
+            self.capacity = capacity
+            self.memory_cap_mb = memory_cap_mb
+            self._evict()
+
+    def cached(self, model_path, backend):
+        """已缓存的模型（标记为最近使用），未缓存时返回 None"""
+        key = (model_path, backend)
+        with self._lock:
+            engine = self._models.get(key)
+            if engine is not None:
+                self._models.move_to_end(key)
+                self.hits += 1
+            return engine
+
+    def get(self, model_path, backend='pytorch', warmup_size=None,
+            progress: Optional[Callable[[int, str], None]] = None):
+        """返回模型，未缓存时加载并以 warmup_size=(宽, 高) 预热；progress(百分比, 说明) 报告进度"""
+        engine = self.cached(model_path, backend)
+        if engine is not None:
+            if progress is not None:
+                progress(100, "已缓存")
+            return engine
+
+        engine = self.loader(model_path, backend, progress=progress)
+        if warmup_size is not None:
+            if progress is not None:
+                progress(80, f"预热 {warmup_size[0]}x{warmup_size[1]}")
+            engine.warmup_seconds = warm_up(engine, warmup_size)
+
+        key = (model_path, backend)
+        with self._lock:
+            self.misses += 1
+            self._models[key] = engine
+            self._memory[key] = model_memory_mb(engine)
+            self._evict()
+        if progress is not None:
+            progress(100, "完成")
+        return engine
+
+    def memory_mb(self):
+        with self._lock:
+            return sum(self._memory.values())
+
+    def _evict(self):
+        while len(self._models) > 1 and (len(self._models) > self.capacity
+                                         or sum(self._memory.values()) > self.memory_cap_mb):
+            key, _ = self._models.popitem(last=False)
+            self._memory.pop(key, None)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'models': [f"{path} ({backend})" for path, backend in self._models],
+                'memory_mb': round(sum(self._memory.values()), 1),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
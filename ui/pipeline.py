@@ -0,0 +1,411 @@
+"""
+Oasis 目标检测系统 - 流水线引擎
+采集 / 推理 / 3D映射 / 显示 分阶段并行运行，阶段之间用"最新帧槽位"连接
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .frame_pool import format_pool_stats
+from .visualize import format_body_stats
+from .keyframe import format_keyframe_stats
+from .tracking import format_tracking_stats
+from .tiling import format_tiling_stats
+from .motion_gate import format_gate_stats
+from .process_pool import format_worker_stats
+from .quality import format_quality_stats
+
+
+@dataclass
+class FramePacket:
+    """在流水线各阶段之间传递的帧数据包"""
+    frame_id: int
+    timestamp: float
+    image: Any
+    stream_type: str = "color"
+    detections: List[dict] = field(default_factory=list)
+    batch: Any = None
+    extras: Dict[str, Any] = field(default_factory=dict)
+    lease: Any = None  # image 所在缓冲池租约（FrameLease），没有时为 None
+    source: int = 0  # 来源序号（多路摄像头）
+
+    def release(self):
+        """归还图像缓冲区（推理阶段用完图像或帧被丢弃时调用，可重复调用）"""
+        lease, self.lease = self.lease, None
+        if lease is not None:
+            lease.release()
+
+
+def _release_item(item):
+    release = getattr(item, 'release', None)
+    if release is not None:
+        release()
+
+
+class LatestSlot:
+    """容量为 1 的"最新者胜出"槽位
+
+    生产者写入时若旧数据尚未被取走，直接覆盖并计入丢帧数，
+    保证消费者拿到的永远是最新的一帧，而不是排队的旧帧。
+    被覆盖或关闭时未取走的数据交给 on_drop（用于归还帧缓冲区）。
+    """
+
+    def __init__(self, name, on_drop: Optional[Callable] = None):
+        self.name = name
+        self.on_drop = on_drop
+        self._cond = threading.Condition()
+        self._item = None
+        self._closed = False
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, item):
+        """写入数据，返回是否覆盖了未消费的旧数据"""
+        with self._cond:
+            old = self._item
+            replaced = old is not None
+            if replaced:
+                self.dropped += 1
+            self._item = item
+            self.put_count += 1
+            self._cond.notify()
+        if replaced and self.on_drop is not None:
+            self.on_drop(old)
+        return replaced
+
+    def get(self, timeout=None):
+        """取走数据，超时或槽位关闭时返回 None"""
+        with self._cond:
+            if self._item is None and not self._closed:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            return item
+
+    def close(self):
+        """关闭槽位并唤醒等待中的消费者"""
+        with self._cond:
+            self._closed = True
+            item, self._item = self._item, None
+            self._cond.notify_all()
+        if item is not None and self.on_drop is not None:
+            self.on_drop(item)
+
+    def stats(self):
+        return {'put': self.put_count, 'dropped': self.dropped}
+
+
+class PipelineStage(threading.Thread):
+    """流水线阶段：从输入槽位取数据，处理后写入输出槽位或回调"""
+
+    def __init__(self, name, func: Callable, input_slot: LatestSlot,
+                 output_slot: Optional[LatestSlot] = None,
+                 on_output: Optional[Callable] = None):
+        super().__init__(name=f"oasis-{name}", daemon=True)
+        self.stage_name = name
+        self.func = func
+        self.input_slot = input_slot
+        self.output_slot = output_slot
+        self.on_output = on_output
+        self.running = False
+        self.processed = 0
+        self.errors = 0
+        self.busy_time = 0.0
+
+    def run(self):
+        self.running = True
+        while self.running:
+            item = self.input_slot.get(timeout=0.1)
+            if item is None:
+                continue
+
+            start = time.perf_counter()
+            try:
+                result = self.func(item)
+            except Exception as e:
+                self.errors += 1
+                print(f"流水线阶段 {self.stage_name} 错误: {e}")
+                continue
+            finally:
+                self.busy_time += time.perf_counter() - start
+            self.processed += 1
+
+            # 返回 None 表示该帧在本阶段终止
+            if result is None:
+                continue
+            if self.output_slot is not None:
+                self.output_slot.put(result)
+            elif self.on_output is not None:
+                self.on_output(result)
+
+    def stop(self):
+        self.running = False
+        self.input_slot.close()
+
+    def stats(self):
+        return {
+            'processed': self.processed,
+            'errors': self.errors,
+            'dropped': self.input_slot.dropped,
+            'busy_ms': round(self.busy_time * 1000, 1),
+        }
+
+
+class MicroBatcher(threading.Thread):
+    """多路来源共用的推理线程：在截止时间内把各路最新帧凑成一批推理
+
+    每路只保留最新一帧，尚未推理的旧帧被新帧覆盖并计入该路丢帧数；
+    最早的待推理帧到达后最多等待 deadline_ms，凑满 max_batch 帧或每路都已有帧时立即推理。
+    infer_batch(packets) 按输入顺序返回处理后的数据包（None 表示该帧终止），
+    各数据包按 packet.source 交给 on_result 路由回对应来源。
+    """
+
+    def __init__(self, infer_batch: Callable[[List[FramePacket]], List[Optional[FramePacket]]],
+                 on_result: Callable[[FramePacket], None], sources=1, max_batch=4, deadline_ms=15.0):
+        super().__init__(name="oasis-microbatch", daemon=True)
+        self.infer_batch = infer_batch
+        self.on_result = on_result
+        self.sources = sources
+        self.max_batch = max_batch
+        self.deadline = deadline_ms / 1000.0
+        self._cond = threading.Condition()
+        self._pending = OrderedDict()  # 来源 -> (到达时间, 数据包)，按到达顺序
+        self.running = False
+        self.submitted = {}
+        self.dropped = {}
+        self.batches = 0
+        self.frames = 0
+        self.full_batches = 0
+        self.errors = 0
+        self.wait_time = 0.0
+        self.busy_time = 0.0
+        self._started_at = None
+
+    def configure(self, max_batch, deadline_ms):
+        with self._cond:
+            self.max_batch = max(1, int(max_batch))
+            self.deadline = deadline_ms / 1000.0
+            self._cond.notify()
+
+    def source_closed(self):
+        """一路来源停止（如摄像头断开），不再等待它的帧凑批"""
+        with self._cond:
+            self.sources = max(1, self.sources - 1)
+            self._cond.notify()
+
+    def submit(self, packet: FramePacket):
+        """投递一帧；同一来源尚未推理的旧帧被覆盖并归还缓冲区"""
+        source = packet.source
+        with self._cond:
+            old = self._pending.pop(source, None)
+            self._pending[source] = (time.perf_counter(), packet)
+            self.submitted[source] = self.submitted.get(source, 0) + 1
+            if old is not None:
+                self.dropped[source] = self.dropped.get(source, 0) + 1
+            self._cond.notify()
+        if old is not None:
+            _release_item(old[1])
+
+    def _next_batch(self):
+        """等待下一批：凑满或到达截止时间时返回 (数据包列表, 是否凑满)，停止时返回空列表"""
+        with self._cond:
+            while self.running and not self._pending:
+                self._cond.wait(0.1)
+            while self.running:
+                ready = min(self.max_batch, self.sources)
+                oldest = next(iter(self._pending.values()))[0]
+                remaining = oldest + self.deadline - time.perf_counter()
+                if len(self._pending) >= ready or remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if not self.running:
+                return [], False
+
+            now = time.perf_counter()
+            batch = []
+            while self._pending and len(batch) < self.max_batch:
+                _, (arrived, packet) = self._pending.popitem(last=False)
+                if not batch:
+                    self.wait_time += now - arrived
+                batch.append(packet)
+            return batch, len(batch) >= min(self.max_batch, self.sources)
+
+    def run(self):
+        self.running = True
+        self._started_at = time.perf_counter()
+        while self.running:
+            batch, full = self._next_batch()
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                results = self.infer_batch(batch)
+            except Exception as e:
+                self.errors += 1
+                print(f"微批推理错误: {e}")
+                for packet in batch:
+                    packet.release()
+                continue
+            finally:
+                self.busy_time += time.perf_counter() - start
+            self.batches += 1
+            self.frames += len(batch)
+            self.full_batches += full
+
+            for packet in results:
+                if packet is not None:
+                    self.on_result(packet)
+
+    def stop(self):
+        with self._cond:
+            self.running = False
+            pending = [packet for _, packet in self._pending.values()]
+            self._pending.clear()
+            self._cond.notify_all()
+        for packet in pending:
+            packet.release()
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            'batches': self.batches,
+            'frames': self.frames,
+            'mean_batch': round(self.frames / self.batches, 2) if self.batches else 0.0,
+            'max_batch': self.max_batch,
+            'full_rate': round(self.full_batches / self.batches, 3) if self.batches else 0.0,
+            'mean_wait_ms': round(self.wait_time * 1000 / self.batches, 2) if self.batches else 0.0,
+            'busy_ms': round(self.busy_time * 1000, 1),
+            'infer_fps': round(self.frames / elapsed, 1) if elapsed > 0 else 0.0,
+            'errors': self.errors,
+            'dropped': dict(self.dropped),
+        }
+
+
+def format_batch_stats(stats):
+    """微批统计文本：平均批大小 / 上限、凑满比例与最早一帧的平均等待时间"""
+    return (f"微批 {stats['mean_batch']:.1f}/{stats['max_batch']} "
+            f"凑满 {stats['full_rate']:.0%} 等待 {stats['mean_wait_ms']:.1f}ms")
+
+
+class DisplayThrottle:
+    """显示节流：上一帧尚未绘制完成时丢弃新帧，避免 Qt 事件队列堆积旧帧"""
+
+    def __init__(self):
+        self._idle = threading.Event()
+        self._idle.set()
+        self.shown = 0
+        self.dropped = 0
+
+    def try_acquire(self):
+        """界面空闲时返回 True 并进入忙碌状态，否则计入丢帧"""
+        if self._idle.is_set():
+            self._idle.clear()
+            self.shown += 1
+            return True
+        self.dropped += 1
+        return False
+
+    def release(self):
+        """界面完成绘制后调用"""
+        self._idle.set()
+
+    def stats(self):
+        return {'processed': self.shown, 'dropped': self.dropped}
+
+
+class DetectionPipeline:
+    """检测流水线
+
+    采集线程调用 submit() 投递帧；推理阶段与 3D 映射阶段各自运行在独立线程，
+    阶段之间使用 LatestSlot 连接，处理不过来时丢弃旧帧而不是排队。
+    """
+
+    def __init__(self, infer: Callable[[FramePacket], Optional[FramePacket]],
+                 on_result: Callable[[FramePacket], None],
+                 map_3d: Optional[Callable[[FramePacket], Optional[FramePacket]]] = None):
+        self.on_result = on_result
+        # 推理前被丢弃的帧直接归还缓冲区；推理阶段用完图像后自行归还
+        self.infer_slot = LatestSlot('infer', on_drop=_release_item)
+        self.stages = []
+
+        if map_3d is not None:
+            self.map3d_slot = LatestSlot('map3d')
+            self.stages.append(PipelineStage('infer', infer, self.infer_slot,
+                                             output_slot=self.map3d_slot))
+            self.stages.append(PipelineStage('map3d', map_3d, self.map3d_slot,
+                                             on_output=on_result))
+        else:
+            self.map3d_slot = None
+            self.stages.append(PipelineStage('infer', infer, self.infer_slot,
+                                             on_output=on_result))
+
+        self.display = DisplayThrottle()
+        self.captured = 0
+        self._started_at = None
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self, timeout=1.0):
+        for stage in self.stages:
+            stage.stop()
+        for stage in self.stages:
+            if stage.is_alive():
+                stage.join(timeout)
+
+    def note_capture(self):
+        """采集阶段每获取一帧调用一次"""
+        self.captured += 1
+
+    def submit(self, packet: FramePacket):
+        """投递一帧到推理阶段"""
+        self.infer_slot.put(packet)
+
+    def stats(self):
+        """各阶段统计：处理数、丢帧数、累计耗时以及整体帧率"""
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        stats = {stage.stage_name: stage.stats() for stage in self.stages}
+        stats['display'] = self.display.stats()
+        stats['capture'] = {'processed': self.captured}
+        if elapsed > 0:
+            stats['capture_fps'] = round(self.captured / elapsed, 1)
+            stats['display_fps'] = round(self.display.shown / elapsed, 1)
+            stats['infer_fps'] = round(self.stages[0].processed / elapsed, 1)
+        return stats
+
+
+def format_pipeline_stats(stats):
+    """将流水线统计格式化为状态栏文本"""
+    parts = [f"采集 {stats.get('capture_fps', 0)} FPS",
+             f"显示 {stats.get('display_fps', 0)} FPS",
+             f"推理 {stats.get('infer_fps', 0)} FPS"]
+    drops = [f"{name}:{stats[name]['dropped']}"
+             for name in ('infer', 'map3d', 'display') if name in stats]
+    parts.append("丢帧 " + " ".join(drops))
+    if stats.get('pools'):
+        parts.append("缓冲池 " + format_pool_stats(stats['pools']))
+    if 'body_index' in stats:
+        parts.append(format_body_stats(stats['body_index']))
+    if 'keyframe' in stats:
+        parts.append(format_keyframe_stats(stats['keyframe']))
+    if 'tracking' in stats:
+        parts.append(format_tracking_stats(stats['tracking']))
+    if 'tiling' in stats:
+        parts.append(format_tiling_stats(stats['tiling']))
+    if 'motion_gate' in stats:
+        parts.append(format_gate_stats(stats['motion_gate']))
+    if 'micro_batch' in stats:
+        parts.append(format_batch_stats(stats['micro_batch']))
+    if 'process_pool' in stats:
+        parts.append(format_worker_stats(stats['process_pool']))
+    if 'quality' in stats:
+        parts.append(format_quality_stats(stats['quality']))
+    bundle = stats.get('bundle')
+    if bundle and bundle.get('depth_frames'):
+        parts.append(f"深度停顿 {bundle['depth_stalls']} 时间差 {bundle['mean_skew_ms']}ms")
+    return " | ".join(parts)
@@ -0,0 +1,215 @@
+"""
+Oasis 目标检测系统 - 检测结果后处理
+直接在 r.boxes.data 数组上做向量化的类别过滤、置信度过滤和 top-k 截断
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class DetectionBatch:
+    """数组形式的检测结果
+
+    boxes: (N, 4) float32 xyxy 像素坐标
+    scores: (N,) float32 置信度，按降序排列
+    class_ids: (N,) int32 类别索引
+    names: 类别索引 -> 名称 的数组
+    track_ids: (N,) int64 跟踪 ID，未经跟踪时为 None
+    """
+    boxes: np.ndarray
+    scores: np.ndarray
+    class_ids: np.ndarray
+    names: np.ndarray
+    track_ids: Optional[np.ndarray] = None
+
+    @classmethod
+    def empty(cls, names=None):
+        return cls(
+            boxes=np.zeros((0, 4), dtype=np.float32),
+            scores=np.zeros(0, dtype=np.float32),
+            class_ids=np.zeros(0, dtype=np.int32),
+            names=names if names is not None else np.zeros(0, dtype=object),
+        )
+
+    def __len__(self):
+        return len(self.scores)
+
+    @property
+    def class_names(self):
+        return self.names[self.class_ids] if len(self) else []
+
+    def to_dicts(self) -> List[dict]:
+        """转换为界面使用的检测字典列表"""
+        if not len(self):
+            return []
+        bboxes = self.boxes.astype(np.int32).tolist()
+        scores = self.scores.tolist()
+        class_names = self.class_names
+        detections = [
+            {'class_name': class_names[i], 'confidence': scores[i], 'bbox': tuple(bboxes[i])}
+            for i in range(len(scores))
+        ]
+        if self.track_ids is not None:
+            for detection, track_id in zip(detections, self.track_ids.tolist()):
+                detection['track_id'] = track_id
+        return detections
+
+
+def _result_data(result):
+    """取出单个结果的 (N, 6|7) 数组: x1, y1, x2, y2, [track_id,] conf, cls"""
+    boxes = getattr(result, 'boxes', None)
+    if boxes is None:
+        return None
+    data = boxes.data
+    if hasattr(data, 'cpu'):
+        data = data.cpu().numpy()
+    data = np.asarray(data, dtype=np.float32)
+    if data.ndim != 2 or data.shape[0] == 0:
+        return None
+    return data
+
+
+def results_array(results, offsets=None):
+    """把多个结果合并为一个 (N, 6) 数组: x1, y1, x2, y2, conf, cls；没有检测时返回 None
+
+    offsets: 与 results 对应的 (dx, dy)，给出时各结果的框平移到原图坐标（分块推理）。
+    """
+    arrays = []
+    for k, result in enumerate(results):
+        data = _result_data(result)
+        if data is None:
+            continue
+        if offsets is not None:
+            data = data[:, [0, 1, 2, 3, -2, -1]]
+            data[:, [0, 2]] += offsets[k][0]
+            data[:, [1, 3]] += offsets[k][1]
+        arrays.append(data)
+    if not arrays:
+        return None
+    if len(arrays) == 1:
+        return arrays[0]
+    return np.concatenate([a[:, [0, 1, 2, 3, -2, -1]] for a in arrays])
+
+
+class DetectionPostProcessor:
+    """向量化检测后处理器
+
+    目标类别被预编译为按类别索引的布尔掩码，只在类别列表或模型类别表变化时重建。
+    imgsz 不为 None 时作为推理输入尺寸传给模型（自适应质量控制）。
+    """
+
+    def __init__(self):
+        self.imgsz = None
+        self._names_ref = None
+        self._classes_key = None
+        self.names = np.zeros(0, dtype=object)
+        self.class_mask = np.zeros(0, dtype=bool)
+        self.class_indices = []
+
+    def compile(self, names: Dict[int, str], classes: Sequence[str]):
+        """根据模型类别表和目标类别编译类别掩码"""
+        key = tuple(classes)
+        if names is self._names_ref and key == self._classes_key:
+            return
+
+        if isinstance(names, dict):
+            count = max(names.keys()) + 1 if names else 0
+            name_list = [names.get(i, str(i)) for i in range(count)]
+        else:
+            name_list = list(names)
+
+        wanted = set(classes)
+        self.names = np.array(name_list, dtype=object)
+        self.class_mask = np.array([name in wanted for name in name_list], dtype=bool)
+        self.class_indices = np.flatnonzero(self.class_mask).tolist()
+        self._names_ref = names
+        self._classes_key = key
+
+    def infer(self, model, image, classes, confidence_threshold, max_detections,
+              monitor=None) -> DetectionBatch:
+        """运行模型并后处理
+
+        目标类别以类别索引的形式传入模型，NMS 和结果构建不会处理非目标类别；
+        目标类别在模型中一个都不存在时直接跳过推理。
+        monitor 提供 record(stage, seconds) 时分别记录 infer 与 postprocess 耗时。
+        """
+        start = time.perf_counter()
+        self.compile(model.names, classes)
+        if not self.class_indices:
+            return DetectionBatch.empty(self.names)
+
+        results = self.predict(model, image, confidence_threshold, max_detections)
+        if monitor is None:
+            return self.process(results, model.names, classes, confidence_threshold, max_detections)
+
+        predicted = time.perf_counter()
+        batch = self.process(results, model.names, classes, confidence_threshold, max_detections)
+        monitor.record('infer', predicted - start)
+        monitor.record('postprocess', time.perf_counter() - predicted)
+        return batch
+
+    def infer_batch(self, model, images, classes, confidence_threshold, max_detections,
+                    monitor=None) -> List[DetectionBatch]:
+        """多张图一次批量推理（多路摄像头微批），按输入顺序返回各自的检测批次
+
+        monitor 提供 record(stage, seconds) 时记录整批的 infer 与 postprocess 耗时。
+        """
+        start = time.perf_counter()
+        self.compile(model.names, classes)
+        if not self.class_indices or not images:
+            return [DetectionBatch.empty(self.names) for _ in images]
+
+        results = self.predict(model, list(images), confidence_threshold, max_detections)
+        predicted = time.perf_counter()
+        batches = [self.select(results_array([result]), confidence_threshold, max_detections)
+                   for result in results]
+        if monitor is not None:
+            monitor.record('infer', predicted - start)
+            monitor.record('postprocess', time.perf_counter() - predicted)
+        return batches
+
+    def predict(self, model, image, confidence_threshold, max_detections):
+        """只运行模型，使用最近一次 compile() 的类别索引；返回原始结果"""
+        if self.imgsz is not None:
+            return model(image, verbose=False, classes=self.class_indices,
+                         conf=confidence_threshold, max_det=max_detections, imgsz=self.imgsz)
+        return model(image, verbose=False, classes=self.class_indices,
+                     conf=confidence_threshold, max_det=max_detections)
+
+    def process(self, results, names, classes, confidence_threshold, max_detections) -> DetectionBatch:
+        """处理一次推理的全部结果，返回按置信度降序的检测批次"""
+        self.compile(names, classes)
+        return self.select(results_array(results), confidence_threshold, max_detections)
+
+    def select(self, data, confidence_threshold, max_detections) -> DetectionBatch:
+        """在 (N, 6|7) 数组上做类别、置信度过滤与全局 top-k，使用最近一次 compile() 的类别掩码"""
+        if data is None or not len(data):
+            return DetectionBatch.empty(self.names)
+
+        scores = data[:, -2]
+        class_ids = data[:, -1].astype(np.int32)
+
+        # 类别掩码 + 置信度掩码
+        in_range = (class_ids >= 0) & (class_ids < len(self.class_mask))
+        keep = in_range & (scores >= confidence_threshold)
+        keep[keep] = self.class_mask[class_ids[keep]]
+        idx = np.flatnonzero(keep)
+
+        # 全局 top-k
+        if max_detections is not None and len(idx) > max_detections:
+            if max_detections <= 0:
+                return DetectionBatch.empty(self.names)
+            part = np.argpartition(-scores[idx], max_detections - 1)[:max_detections]
+            idx = idx[part]
+        idx = idx[np.argsort(-scores[idx], kind='stable')]
+
+        return DetectionBatch(
+            boxes=np.ascontiguousarray(data[idx, :4]),
+            scores=scores[idx],
+            class_ids=class_ids[idx],
+            names=self.names,
+        )
@@ -0,0 +1,394 @@
+"""
+Oasis 目标检测系统 - 推理进程池
+推理与后处理在独立的工作进程中运行，不与界面进程中的绘制、3D 计算和 Qt 渲染争用 GIL；
+帧通过共享内存环形缓冲区传递，进程之间只传递帧描述（槽位、形状）与检测结果数组
+"""
+
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Callable, Optional
+
+import numpy as np
+
+from .backends import load_engine
+from .postprocess import DetectionBatch, DetectionPostProcessor
+
+# 工作进程处理一帧超过此时间（秒）仍没有结果时视为丢失（如进程崩溃），收回其槽位
+TASK_TIMEOUT = 10.0
+
+
+class SharedFrameRing:
+    """共享内存帧环形缓冲区
+
+    一块共享内存分为 slots 个大小为 slot_bytes 的槽位，按先进先出的顺序循环使用；
+    槽位只由主进程分配与归还，工作进程按描述中的偏移只读访问。不是线程安全的，由调用方加锁。
+    """
+
+    def __init__(self, slots, slot_bytes):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, slots * slot_bytes))
+        self._free = deque(range(slots))
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def in_use(self):
+        return self.slots - len(self._free)
+
+    def acquire(self) -> Optional[int]:
+        """取一个空闲槽位，没有时返回 None"""
+        return self._free.popleft() if self._free else None
+
+    def release(self, slot):
+        self._free.append(slot)
+
+    def write(self, slot, image):
+        """把图像复制到槽位（非连续的 BGRA 视图等也在复制时变为连续），返回 (偏移, 形状, 类型)"""
+        offset = slot * self.slot_bytes
+        view = np.ndarray(image.shape, image.dtype, buffer=self.shm.buf, offset=offset)
+        view[...] = image
+        del view
+        return offset, image.shape, image.dtype.str
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def frame_view(shm, offset, shape, dtype):
+    """共享内存中一帧的只读视图（不复制）"""
+    view = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf, offset=offset)
+    view.flags.writeable = False
+    return view
+
+
+def task_params(classes, config, quality=None):
+    """一帧推理所需的参数（随帧描述发送）；config 为 DetectionConfig，quality 为当前的 QualityLevel"""
+    return {
+        'classes': list(classes),
+        'conf': config.confidence_threshold,
+        'max_det': config.max_detections,
+        'tiled': config.tiled_inference and (quality is None or quality.tiling),
+        'tile': (config.tile_size, config.tile_overlap, config.tile_full_frame, config.tile_roi),
+        'imgsz': quality.imgsz if quality is not None else None,
+    }
+
+
+def _worker_main(worker_id, model_path, backend, loader, warmup_size, threads, tasks, results):
+    """工作进程：加载模型后循环处理帧描述，把检测结果数组发回主进程"""
+    # 每个进程的数学库线程数按进程数分摊，避免 N 个进程各自占满全部核心
+    for name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ.setdefault(name, str(threads))
+    import cv2
+    cv2.setNumThreads(threads)
+    from .model_manager import warm_up
+    from .tiling import TiledDetector
+
+    try:
+        engine = loader(model_path, backend)
+        if warmup_size is not None:
+            warm_up(engine, warmup_size)
+    except Exception as e:
+        results.put(('failed', worker_id, str(e)))
+        return
+    results.put(('ready', worker_id, engine.backend, engine.names))
+
+    processor = DetectionPostProcessor()
+    tiled = TiledDetector()
+    shm = None
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            task_id, ring_name, offset, shape, dtype, params = task
+            try:
+                if shm is None or shm.name != ring_name:
+                    if shm is not None:
+                        shm.close()
+                    shm = shared_memory.SharedMemory(name=ring_name)
+                image = frame_view(shm, offset, shape, dtype)
+                processor.imgsz = params.get('imgsz')
+                start = time.perf_counter()
+                if params['tiled']:
+                    tiled.configure(*params['tile'])
+                    batch = tiled.infer(processor, engine, image, params['classes'],
+                                        params['conf'], params['max_det'])
+                else:
+                    batch = processor.infer(engine, image, params['classes'], params['conf'], params['max_det'])
+                elapsed = time.perf_counter() - start
+                del image
+                results.put(('done', task_id, worker_id, batch.boxes, batch.scores, batch.class_ids, elapsed))
+            except Exception as e:
+                results.put(('error', task_id, worker_id, str(e)))
+    finally:
+        if shm is not None:
+            shm.close()
+
+
+class InferenceProcessPool:
+    """推理进程池
+
+    每个工作进程加载一份模型；submit() 把帧复制到共享内存槽位后立即归还帧缓冲区，
+    把帧描述放入任务队列，由空闲的工作进程推理。同时在处理中的帧数不超过进程数，
+    全部进程都在忙时 submit() 阻塞，上游的最新帧槽位继续用新帧覆盖旧帧。
+    结果由收集线程按 packet.source 交给 set_callback() 设置的回调，
+    比同一来源已送出的结果更旧的帧（多个进程乱序完成）直接丢弃。
+    loader 需要能在工作进程中导入（模块级函数）。
+    """
+
+    def __init__(self, model_path, backend='pytorch', workers=2, loader: Callable = load_engine,
+                 warmup_size=None):
+        self.model_path = model_path
+        self.backend = backend
+        self.workers = max(1, int(workers))
+        self.loader = loader
+        self.warmup_size = warmup_size
+        self.key = (model_path, backend, self.workers)
+        context = multiprocessing.get_context('spawn')
+        self._context = context
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._processes = []
+        self._collector = None
+        self._cond = threading.Condition()
+        self._ring = None
+        self._pending = {}  # task_id -> (数据包, 槽位, 提交时间)
+        self._ids = itertools.count()
+        self._callback = None
+        self._last_frame = {}  # 来源 -> 已送出结果的最新帧序号
+        self._names = None
+        self._name_array = None
+        self.running = False
+        self.ready = 0
+        self.failures = []
+        self._exited = set()
+        self.engine_backend = None
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.superseded = 0
+        self.stale = 0
+        self.errors = 0
+        self.lost = 0
+        self.worker_time = 0.0
+        self._started_at = None
+
+    def start(self):
+        """启动工作进程与结果收集线程（模型在工作进程中加载，不阻塞调用方）"""
+        self.running = True
+        self._started_at = time.perf_counter()
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        for worker_id in range(self.workers):
+            process = self._context.Process(
+                target=_worker_main, name=f"oasis-infer-{worker_id}", daemon=True,
+                args=(worker_id, self.model_path, self.backend, self.loader, self.warmup_size,
+                      threads, self._tasks, self._results))
+            process.start()
+            self._processes.append(process)
+        self._collector = threading.Thread(target=self._collect, name="oasis-infer-results", daemon=True)
+        self._collector.start()
+
+    def set_callback(self, callback: Optional[Callable]):
+        """设置结果回调（采集线程开始检测时设置，停止时设为 None，之后到达的结果被丢弃）"""
+        with self._cond:
+            self._callback = callback
+            self._last_frame = {}
+
+    @property
+    def failed(self):
+        """全部工作进程都未能加载模型"""
+        return len(self.failures) >= self.workers
+
+    def submit(self, packet, params, latest: Optional[Callable] = None) -> bool:
+        """投递一帧；帧复制到共享内存后归还 packet 的缓冲区。进程池停止或全部进程失败时丢弃并返回 False
+
+        latest() 在等到空闲进程后调用，返回等待期间上游到达的更新帧（没有时返回 None），
+        有更新帧时改为投递它，旧帧归还缓冲区，避免把等待过的旧帧交给工作进程。
+        """
+        if latest is not None:
+            with self._cond:
+                while self.running and not self.failed and len(self._pending) >= self.workers:
+                    self._cond.wait(0.1)
+            newer = latest()
+            if newer is not None:
+                packet.release()
+                packet = newer
+                self.superseded += 1
+        image = packet.image
+        try:
+            with self._cond:
+                # 帧变大（如切换视频流）时等处理中的帧全部完成后换用更大的环形缓冲区
+                while self.running and not self.failed and (
+                        len(self._pending) >= self.workers
+                        or (self._ring is not None and image.nbytes > self._ring.slot_bytes and self._pending)):
+                    self._cond.wait(0.1)
+                if not self.running or self.failed:
+                    self.dropped += 1
+                    return False
+                if self._ring is None or image.nbytes > self._ring.slot_bytes:
+                    if self._ring is not None:
+                        self._ring.close()
+                    self._ring = SharedFrameRing(self.workers, image.nbytes)
+                ring = self._ring
+                slot = ring.acquire()
+                task_id = next(self._ids)
+                self._pending[task_id] = (packet, slot, time.perf_counter())
+            # 槽位归本帧独占，复制时不持有锁
+            offset, shape, dtype = ring.write(slot, image)
+        finally:
+            packet.release()
+        packet.image = None
+        self._tasks.put((task_id, ring.name, offset, shape, dtype, params))
+        self.submitted += 1
+        return True
+
+    def _collect(self):
+        """结果收集线程：归还槽位，重建检测批次并按来源送出"""
+        while self.running:
+            try:
+                message = self._results.get(timeout=0.1)
+            except queue.Empty:
+                self._check_workers()
+                self._reclaim_lost()
+                continue
+            except (EOFError, OSError):
+                break
+
+            kind = message[0]
+            if kind == 'ready':
+                _, _, backend, names = message
+                with self._cond:
+                    self.ready += 1
+                    self.engine_backend = backend
+                    if self._names is None:
+                        self._names = names
+                        compiler = DetectionPostProcessor()
+                        compiler.compile(names, [])
+                        self._name_array = compiler.names
+                continue
+            if kind == 'failed':
+                with self._cond:
+                    self._exited.add(message[1])
+                    self.failures.append(message[2])
+                    self._cond.notify_all()
+                print(f"⚠️  推理进程 {message[1]} 加载模型失败: {message[2]}")
+                continue
+
+            task_id = message[1]
+            with self._cond:
+                entry = self._pending.pop(task_id, None)
+                if entry is not None and self._ring is not None:
+                    self._ring.release(entry[1])
+                self._cond.notify_all()
+                callback = self._callback
+            if entry is None:
+                continue
+            packet = entry[0]
+            if kind == 'error':
+                self.errors += 1
+                print(f"推理进程 {message[2]} 错误: {message[3]}")
+                continue
+
+            _, _, _, boxes, scores, class_ids, elapsed = message
+            self.completed += 1
+            self.worker_time += elapsed
+            with self._cond:
+                last = self._last_frame.get(packet.source, -1)
+                if packet.frame_id <= last:
+                    self.stale += 1
+                    continue
+                self._last_frame[packet.source] = packet.frame_id
+            packet.batch = DetectionBatch(boxes, scores, class_ids, self._name_array)
+            packet.extras['infer_seconds'] = elapsed
+            if callback is not None:
+                try:
+                    callback(packet)
+                except Exception as e:
+                    print(f"推理结果处理错误: {e}")
+
+    def _check_workers(self):
+        """意外退出的工作进程（如加载模型时崩溃）计为失败，全部失败后 submit() 不再等待"""
+        for worker_id, process in enumerate(self._processes):
+            if not self.running or worker_id in self._exited or process.is_alive():
+                continue
+            self._exited.add(worker_id)
+            with self._cond:
+                self.failures.append(f"进程退出 (exitcode {process.exitcode})")
+                self._cond.notify_all()
+            print(f"⚠️  推理进程 {worker_id} 意外退出 (exitcode {process.exitcode})")
+
+    def _reclaim_lost(self):
+        """收回超时未完成的帧（工作进程崩溃时其处理中的帧不会再有结果）；全部进程失败时立即收回"""
+        now = time.perf_counter()
+        with self._cond:
+            lost = [task_id for task_id, (_, _, submitted) in self._pending.items()
+                    if self.failed or now - submitted > TASK_TIMEOUT]
+            for task_id in lost:
+                _, slot, _ = self._pending.pop(task_id)
+                self._ring.release(slot)
+            if lost:
+                self.lost += len(lost)
+                self._cond.notify_all()
+
+    def stop(self, timeout=2.0):
+        """停止工作进程与收集线程，释放共享内存"""
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout)
+        if self._collector is not None:
+            self._collector.join(timeout)
+        with self._cond:
+            self._pending.clear()
+            if self._ring is not None:
+                self._ring.close()
+                self._ring = None
+        self._tasks.close()
+        self._results.close()
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        with self._cond:
+            in_flight = len(self._pending)
+        return {
+            'workers': self.workers,
+            'ready': self.ready,
+            'failed': len(self.failures),
+            'in_flight': in_flight,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'dropped': self.dropped,
+            'superseded': self.superseded,
+            'stale': self.stale,
+            'errors': self.errors,
+            'lost': self.lost,
+            'fps': round(self.completed / elapsed, 1) if elapsed > 0 else 0.0,
+            'worker_ms': round(self.worker_time * 1000 / self.completed, 2) if self.completed else 0.0,
+        }
+
+
+def format_worker_stats(stats):
+    """推理进程统计文本：就绪进程数、处理中的帧数、每帧推理耗时与完成帧率"""
+    text = f"推理进程 {stats['ready']}/{stats['workers']} 在途 {stats['in_flight']} " \
+           f"{stats['worker_ms']:.1f}ms {stats['fps']} FPS"
+    if stats['failed']:
+        text += f" 失败 {stats['failed']}"
+    if stats['stale']:
+        text += f" 过期 {stats['stale']}"
+    return text
@@ -0,0 +1,248 @@
+"""
+Oasis 目标检测系统 - 自适应质量控制
+按实测的每帧检测耗时与端到端延迟，在配置的范围内逐级调整推理输入尺寸、检测跨帧数、
+分块推理开关与模型规格，使流水线保持目标帧率 / 延迟，CPU 紧张时逐步降级而不是越来越落后
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import List, Optional
+
+import numpy as np
+
+# 可选的推理输入尺寸（ultralytics 默认 640），从大到小逐级降低
+IMGSZ_STEPS = (640, 512, 416, 320, 256)
+# 级别变化后至少观察这么久（秒）再做下一次判断，也是计算负载的滑动窗口
+QUALITY_WINDOW = 2.0
+# 窗口内至少需要的检测样本数
+QUALITY_MIN_SAMPLES = 5
+# 负载低于此值时尝试升级
+QUALITY_UPGRADE_RATIO = 0.7
+# 升级后很快又过载时，该级别暂停升级的初始时间（秒），连续失败时加倍
+QUALITY_RETRY = 10.0
+QUALITY_MAX_RETRY = 300.0
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    """一个质量级别
+
+    imgsz: 推理输入尺寸，None 为模型默认
+    stride: 每 stride 个采集帧最多检测一帧，其余帧沿用上次的检测结果
+    tiling: 是否允许分块推理（配置中启用时）
+    model_path: 使用的模型文件
+    """
+    imgsz: Optional[int] = None
+    stride: int = 1
+    tiling: bool = True
+    model_path: str = ''
+
+    def describe(self, tiled_configured=False):
+        parts = [f"{self.imgsz or IMGSZ_STEPS[0]}px"]
+        if self.stride > 1:
+            parts.append(f"跨帧 {self.stride}")
+        if tiled_configured:
+            parts.append("分块" if self.tiling else "不分块")
+        parts.append(self.model_path)
+        return " ".join(parts)
+
+
+FULL_QUALITY = QualityLevel()
+
+
+def build_levels(config, backend='pytorch') -> List[QualityLevel]:
+    """按配置生成从最高到最低质量的级别列表，每级在上一级基础上再降低一项：
+    关闭分块推理 -> 逐级减小输入尺寸 -> 换用更小的模型 -> 增大检测跨帧数
+
+    导出的模型输入尺寸固定为 640，非 PyTorch 后端不调整输入尺寸。
+    """
+    levels = [QualityLevel(model_path=config.model_path)]
+
+    def push(**changes):
+        levels.append(replace(levels[-1], **changes))
+
+    if config.tiled_inference and config.quality_allow_tiling:
+        push(tiling=False)
+    if backend == 'pytorch':
+        for size in IMGSZ_STEPS[1:]:
+            if size >= config.quality_min_imgsz:
+                push(imgsz=size)
+    for model_path in config.quality_model_tiers:
+        if model_path and model_path != levels[-1].model_path:
+            push(model_path=model_path)
+    for stride in range(2, config.quality_max_stride + 1):
+        push(stride=stride)
+    return levels
+
+
+@dataclass
+class QualityDecision:
+    """一次级别调整"""
+    timestamp: float
+    old_index: int
+    new_index: int
+    level: QualityLevel
+    load: float
+    reason: str
+
+    @property
+    def degraded(self):
+        return self.new_index > self.old_index
+
+
+class QualityController:
+    """自适应质量控制器
+
+    检测线程每送出一帧检测结果调用一次 observe()（检测耗时、端到端延迟），
+    界面线程约每秒调用一次 update()：负载 = max(目标帧率下检测器的占用率, 延迟 p95 / 目标延迟)，
+    负载超过 1 时降一级，低于 QUALITY_UPGRADE_RATIO 时升一级；级别变化后清空样本，
+    至少观察 QUALITY_WINDOW 秒再判断。升级后很快又过载的级别暂停升级一段时间（指数退避），避免来回振荡。
+    observe() 可在任意线程调用，其余方法只应由界面线程调用。
+    """
+
+    def __init__(self, levels: Optional[List[QualityLevel]] = None, target_fps=15.0, target_latency_ms=0.0,
+                 window=QUALITY_WINDOW, upgrade_ratio=QUALITY_UPGRADE_RATIO, retry=QUALITY_RETRY):
+        self.levels = list(levels) if levels else [FULL_QUALITY]
+        self.target_fps = target_fps
+        self.target_latency_ms = target_latency_ms
+        self.window = window
+        self.upgrade_ratio = upgrade_ratio
+        self.retry = retry
+        self.index = 0
+        self.load = 0.0
+        self.history = deque(maxlen=20)
+        self._lock = threading.Lock()
+        self._samples = deque()  # (时间, 检测耗时 ms, 端到端延迟 ms)
+        self._changed_at = time.perf_counter()
+        self._last_upgrade = None  # (时间, 升级到的级别)
+        self._blocked = {}  # 级别 -> (暂停升级到此时间, 退避时间)
+
+    @property
+    def level(self) -> QualityLevel:
+        return self.levels[self.index]
+
+    def configure(self, levels, target_fps, target_latency_ms):
+        """更新级别与目标；级别列表变化（如设置或推理后端改变）时回到最高质量"""
+        self.target_fps = target_fps
+        self.target_latency_ms = target_latency_ms
+        if list(levels) != self.levels:
+            self.levels = list(levels)
+            self.index = 0
+            self._blocked = {}
+            self.restart()
+
+    def restart(self):
+        """清空样本（开始检测或切换模型后），保持当前级别"""
+        with self._lock:
+            self._samples.clear()
+        self._changed_at = time.perf_counter()
+        self._last_upgrade = None
+
+    def sample_index(self, model_path) -> Optional[int]:
+        """推理阶段取当前级别；模型还没有切换到该级别的模型时返回 None（该帧不计入样本）"""
+        index = self.index
+        return index if self.levels[index].model_path == model_path else None
+
+    def observe(self, index, cost_ms, latency_ms, now=None):
+        """记录一帧：index 为推理时的级别，级别已变化的帧被忽略"""
+        if index is None or index != self.index:
+            return
+        with self._lock:
+            self._samples.append((now or time.perf_counter(), cost_ms, latency_ms))
+
+    def _measure(self, now, capture_fps):
+        """计算窗口内的负载，样本不足时返回 None"""
+        with self._lock:
+            while self._samples and now - self._samples[0][0] > self.window:
+                self._samples.popleft()
+            if len(self._samples) < QUALITY_MIN_SAMPLES:
+                return None
+            samples = np.array([sample[1:] for sample in self._samples], dtype=np.float64)
+
+        loads = []
+        if self.target_fps > 0:
+            # 帧率不超过采集帧率；跨帧时检测器只需处理 1/stride 的帧
+            fps = min(self.target_fps, capture_fps) if capture_fps > 0 else self.target_fps
+            cost = float(samples[:, 0].mean())
+            loads.append((fps * cost / (1000.0 * self.level.stride),
+                          f"检测 {cost:.1f}ms/帧 目标 {fps:g} FPS"))
+        if self.target_latency_ms > 0:
+            latency = float(np.percentile(samples[:, 1], 95))
+            loads.append((latency / self.target_latency_ms,
+                          f"延迟 p95 {latency:.0f}ms 目标 {self.target_latency_ms:g}ms"))
+        if not loads:
+            return None
+        return max(loads)
+
+    def update(self, now=None, capture_fps=0.0) -> Optional[QualityDecision]:
+        """按最近窗口的负载调整级别，调整时返回 QualityDecision"""
+        now = now or time.perf_counter()
+        if now - self._changed_at < self.window:
+            return None
+        measured = self._measure(now, capture_fps)
+        if measured is None:
+            return None
+        self.load, reason = measured
+
+        old = self.index
+        if self.load > 1.0 and old < len(self.levels) - 1:
+            new = old + 1
+            self._back_off(now, old)
+            action = "降级"
+        elif self.load < self.upgrade_ratio and old > 0 and now >= self._blocked.get(old - 1, (0.0, 0.0))[0]:
+            new = old - 1
+            self._last_upgrade = (now, new)
+            action = "升级"
+        else:
+            return None
+
+        self.index = new
+        self._changed_at = now
+        with self._lock:
+            self._samples.clear()
+        decision = QualityDecision(now, old, new, self.levels[new], round(self.load, 2),
+                                   f"{action}: 负载 {self.load:.2f}（{reason}）")
+        self.history.append(decision)
+        return decision
+
+    def _back_off(self, now, index):
+        """刚升级到 index 就过载：暂停升级到该级别，连续失败时暂停时间加倍"""
+        if self._last_upgrade is None or self._last_upgrade[1] != index \
+                or now - self._last_upgrade[0] > self.retry:
+            return
+        backoff = self._blocked.get(index, (0.0, self.retry / 2))[1] * 2
+        backoff = min(backoff, QUALITY_MAX_RETRY)
+        self._blocked[index] = (now + backoff, backoff)
+        self._last_upgrade = None
+
+    def stats(self):
+        last = self.history[-1] if self.history else None
+        return {
+            'level': self.index,
+            'levels': len(self.levels),
+            'imgsz': self.level.imgsz or IMGSZ_STEPS[0],
+            'stride': self.level.stride,
+            'tiling': self.level.tiling,
+            'model': self.level.model_path,
+            'load': round(self.load, 2),
+            'changes': len(self.history),
+            'last_decision': last.reason if last else '',
+        }
+
+
+def format_quality_stats(stats):
+    """自适应质量统计文本：当前级别、各项设置与负载"""
+    text = f"质量 {stats['level']}/{stats['levels'] - 1} {stats['imgsz']}px"
+    if stats['stride'] > 1:
+        text += f" 跨帧 {stats['stride']}"
+    if not stats['tiling']:
+        text += " 不分块"
+    return text + f" {stats['model']} 负载 {stats['load']:.2f}"
+
+
+def format_decision(decision: QualityDecision, tiled_configured=False):
+    """级别调整日志文本"""
+    return (f"质量级别 {decision.old_index} -> {decision.new_index} "
+            f"({decision.level.describe(tiled_configured)})，{decision.reason}")
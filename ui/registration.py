@@ -0,0 +1,322 @@
+"""
+Oasis 目标检测系统 - 彩色/深度配准
+每个传感器只构建一次 彩色->深度 与 深度->相机空间 查找表并缓存到磁盘，
+之后每帧所有检测框的 3D 坐标通过一次向量化查表得到
+"""
+
+import os
+from typing import Optional
+
+import numpy as np
+
+from .depth_stats import shrink_boxes
+
+# 构建查找表使用的参考深度平面（毫米）。彩色与深度相机存在基线，
+# 同一彩色像素在不同深度对应的深度像素不同，按 1/Z 在相邻平面之间插值
+PLANE_DEPTHS_MM = (500.0, 1000.0, 2000.0, 4000.0, 8000.0)
+
+# 彩色->深度查找表的采样步长（彩色像素）。一个深度像素约对应 3.7 个彩色像素
+LUT_STRIDE = 4
+
+CACHE_VERSION = 1
+
+# Kinect v2 标称内参，仅在无法从 SDK 读取标定时使用
+NOMINAL_CALIBRATION = {
+    'depth_fx': 365.481, 'depth_fy': 365.481, 'depth_cx': 254.878, 'depth_cy': 205.395,
+    'color_fx': 1081.372, 'color_fy': 1081.372, 'color_cx': 959.5, 'color_cy': 539.5,
+    # 彩色相机原点在深度相机坐标系中的位置（毫米）
+    'color_offset_x': -52.0, 'color_offset_y': 0.0,
+}
+
+DEFAULT_CACHE_DIR = "calibration"
+
+
+class Registration:
+    """彩色/深度配准查找表
+
+    depth_rays: (Hd, Wd, 2) float32，深度像素 (u, v) 处 X/Z 与 Y/Z，
+                坐标系为 x 向右、y 向下、z 向前（与原实现一致）
+    color_to_depth: (P, Hc/s, Wc/s, 2) float32，各参考平面上彩色像素对应的深度像素坐标，
+                    无法映射处为 NaN
+    """
+
+    def __init__(self, color_size, depth_size, depth_rays, color_to_depth,
+                 plane_depths=PLANE_DEPTHS_MM, stride=LUT_STRIDE, source="nominal"):
+        self.color_size = tuple(color_size)
+        self.depth_size = tuple(depth_size)
+        self.depth_rays = np.asarray(depth_rays, dtype=np.float32)
+        self.color_to_depth = np.asarray(color_to_depth, dtype=np.float32)
+        self.plane_depths = np.asarray(plane_depths, dtype=np.float32)
+        self.stride = int(stride)
+        self.source = source
+        # 按 1/Z 升序排列的平面，用于插值
+        self._inv_planes = 1.0 / self.plane_depths[::-1]
+        # 没有深度估计时使用的中间参考平面
+        self._mid_depth = float(np.median(self.plane_depths))
+
+    # ---- 构建 ----
+
+    @classmethod
+    def from_intrinsics(cls, color_size=(1920, 1080), depth_size=(512, 424), calibration=None,
+                        plane_depths=PLANE_DEPTHS_MM, stride=LUT_STRIDE, source="nominal"):
+        """根据针孔内参构建查找表"""
+        c = dict(NOMINAL_CALIBRATION)
+        if calibration:
+            c.update(calibration)
+
+        wd, hd = depth_size
+        u = (np.arange(wd, dtype=np.float32) - c['depth_cx']) / c['depth_fx']
+        v = (np.arange(hd, dtype=np.float32) - c['depth_cy']) / c['depth_fy']
+        depth_rays = np.stack(np.broadcast_arrays(u[None, :], v[:, None]), axis=-1)
+
+        wc, hc = color_size
+        cu = (np.arange(0, wc, stride, dtype=np.float32) - c['color_cx']) / c['color_fx']
+        cv = (np.arange(0, hc, stride, dtype=np.float32) - c['color_cy']) / c['color_fy']
+        planes = []
+        for z in plane_depths:
+            xd = cu[None, :] * z + c['color_offset_x']
+            yd = cv[:, None] * z + c['color_offset_y']
+            px = xd * c['depth_fx'] / z + c['depth_cx']
+            py = yd * c['depth_fy'] / z + c['depth_cy']
+            planes.append(np.stack(np.broadcast_arrays(px, py), axis=-1))
+
+        return cls(color_size, depth_size, depth_rays, np.stack(planes),
+                   plane_depths, stride, source)
+
+    @classmethod
+    def from_kinect(cls, kinect, plane_depths=PLANE_DEPTHS_MM, stride=LUT_STRIDE):
+        """使用 Kinect SDK 的坐标映射器构建查找表
+
+        依次尝试：SDK 映射表 -> SDK 深度内参 -> 标称内参。
+        """
+        color_size = (kinect.color_frame_desc.Width, kinect.color_frame_desc.Height)
+        depth_size = (kinect.depth_frame_desc.Width, kinect.depth_frame_desc.Height)
+        mapper = getattr(kinect, '_mapper', None)
+
+        if mapper is not None:
+            try:
+                depth_rays = _sdk_depth_rays(mapper, depth_size)
+                color_to_depth = np.stack([
+                    _sdk_color_plane(mapper, color_size, depth_size, z, stride)
+                    for z in plane_depths
+                ])
+                return cls(color_size, depth_size, depth_rays, color_to_depth,
+                           plane_depths, stride, source="sdk")
+            except Exception as e:
+                print(f"SDK 配准表读取失败，改用内参: {e}")
+
+            try:
+                intrinsics = mapper.GetDepthCameraIntrinsics()
+                calibration = {
+                    'depth_fx': intrinsics.FocalLengthX, 'depth_fy': intrinsics.FocalLengthY,
+                    'depth_cx': intrinsics.PrincipalPointX, 'depth_cy': intrinsics.PrincipalPointY,
+                }
+                return cls.from_intrinsics(color_size, depth_size, calibration,
+                                           plane_depths, stride, source="sdk-intrinsics")
+            except Exception as e:
+                print(f"SDK 深度内参读取失败，使用标称内参: {e}")
+
+        return cls.from_intrinsics(color_size, depth_size, None, plane_depths, stride)
+
+    # ---- 缓存 ----
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(
+            path, version=CACHE_VERSION, color_size=self.color_size, depth_size=self.depth_size,
+            depth_rays=self.depth_rays, color_to_depth=self.color_to_depth,
+            plane_depths=self.plane_depths, stride=self.stride, source=self.source)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['version']) != CACHE_VERSION:
+                raise ValueError(f"配准缓存版本不匹配: {path}")
+            return cls(tuple(data['color_size']), tuple(data['depth_size']),
+                       data['depth_rays'], data['color_to_depth'],
+                       data['plane_depths'], int(data['stride']), str(data['source']))
+
+    # ---- 查询 ----
+
+    def _lut_index(self, points):
+        """彩色像素坐标 -> 查找表网格索引"""
+        s = self.stride
+        _, gh, gw, _ = self.color_to_depth.shape
+        gx = np.clip(np.rint(points[:, 0] / s).astype(np.intp), 0, gw - 1)
+        gy = np.clip(np.rint(points[:, 1] / s).astype(np.intp), 0, gh - 1)
+        return gy, gx
+
+    def color_to_depth_points(self, points, depth_mm=None):
+        """彩色像素 (N, 2) -> 深度像素 (N, 2) float32
+
+        depth_mm 为各点的深度估计（毫米）；未给出或无效时使用中间参考平面。
+        """
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        gy, gx = self._lut_index(points)
+        table = self.color_to_depth[:, gy, gx]          # (P, N, 2)
+        planes = table[::-1]                             # 与 _inv_planes 同序
+
+        count = len(points)
+        if depth_mm is None:
+            depth_mm = np.full(count, np.nan, dtype=np.float32)
+        depth_mm = np.asarray(depth_mm, dtype=np.float32)
+        valid = np.isfinite(depth_mm) & (depth_mm > 0)
+        inv = np.where(valid, 1.0 / np.where(valid, depth_mm, 1.0), 1.0 / self._mid_depth)
+        inv = np.clip(inv, self._inv_planes[0], self._inv_planes[-1])
+
+        hi = np.clip(np.searchsorted(self._inv_planes, inv), 1, len(self._inv_planes) - 1)
+        lo = hi - 1
+        w = (inv - self._inv_planes[lo]) / (self._inv_planes[hi] - self._inv_planes[lo])
+        idx = np.arange(count)
+        return planes[lo, idx] * (1 - w)[:, None] + planes[hi, idx] * w[:, None]
+
+    def color_to_depth_boxes(self, boxes, depth_mm=None):
+        """彩色图像 xyxy (N, 4) -> 深度图像 xyxy (N, 4)，两个角点按同一深度映射"""
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        if depth_mm is not None:
+            depth_mm = np.repeat(np.asarray(depth_mm, dtype=np.float32), 2)
+        corners = self.color_to_depth_points(boxes.reshape(-1, 2), depth_mm).reshape(-1, 4)
+        wd, hd = self.depth_size
+        p1 = _clip_points(corners[:, :2], wd, hd)
+        p2 = _clip_points(corners[:, 2:], wd, hd)
+        return np.hstack([np.minimum(p1, p2), np.maximum(p1, p2)])
+
+    def depth_to_camera(self, depth_points, depth_mm):
+        """深度像素 (N, 2) + 深度 (N,) -> 相机空间坐标 (N, 3)，单位毫米"""
+        depth_points = np.asarray(depth_points)
+        wd, hd = self.depth_size
+        u = np.clip(np.rint(depth_points[:, 0]).astype(np.intp), 0, wd - 1)
+        v = np.clip(np.rint(depth_points[:, 1]).astype(np.intp), 0, hd - 1)
+        rays = self.depth_rays[v, u]
+        z = np.asarray(depth_mm, dtype=np.float32)
+        return np.column_stack([rays[:, 0] * z, rays[:, 1] * z, z])
+
+    def sample_depth(self, depth_frame, depth_points, radius=2):
+        """在深度像素周围 (2r+1)^2 邻域取有效深度中位数，返回 (深度, 有效像素数)"""
+        hd, wd = depth_frame.shape[:2]
+        offsets = np.arange(-radius, radius + 1)
+        u = np.rint(depth_points[:, 0]).astype(np.intp)
+        v = np.rint(depth_points[:, 1]).astype(np.intp)
+        uu = np.clip(u[:, None, None] + offsets[None, None, :], 0, wd - 1)
+        vv = np.clip(v[:, None, None] + offsets[None, :, None], 0, hd - 1)
+        patch = depth_frame[vv, uu].reshape(len(u), -1).astype(np.float32)
+        patch[patch <= 0] = np.nan
+        counts = np.sum(np.isfinite(patch), axis=1)
+        depth = np.full(len(u), np.nan, dtype=np.float32)
+        has = counts > 0
+        if np.any(has):
+            depth[has] = np.nanmedian(patch[has], axis=1)
+        return depth, counts
+
+    def map_boxes(self, boxes, depth_frame, radius=2, stats=None, roi_scale=0.5):
+        """批量计算检测框中心的 3D 坐标
+
+        boxes: (N, 4) 彩色图像 xyxy；depth_frame: (Hd, Wd) uint16 毫米
+        stats: 该深度帧的 DepthStats。给出时深度取检测框中心 roi_scale 区域在深度图中的
+               稳健深度（积分图 O(1) 查询），否则取中心点 (2r+1)^2 邻域中位数
+        返回 dict: depth_xy (N, 2)、depth_mm (N,)、xyz (N, 3)、valid_pixels (N,)、valid_ratio (N,)
+        """
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        centers = np.column_stack([(boxes[:, 0] + boxes[:, 2]) * 0.5,
+                                   (boxes[:, 1] + boxes[:, 3]) * 0.5])
+        wd, hd = self.depth_size
+
+        # 第一次按中间平面映射取得深度估计，第二次按估计深度插值修正视差
+        if stats is not None:
+            regions = shrink_boxes(boxes, roi_scale)
+            depth_mm, _, _ = stats.robust_depth(self.color_to_depth_boxes(regions))
+            depth_mm, valid_ratio, valid_pixels = stats.robust_depth(
+                self.color_to_depth_boxes(regions, depth_mm))
+            depth_xy = _clip_points(self.color_to_depth_points(centers, depth_mm), wd, hd)
+        else:
+            depth_xy = self.color_to_depth_points(centers)
+            depth_xy = _clip_points(depth_xy, wd, hd)
+            depth_mm, _ = self.sample_depth(depth_frame, depth_xy, radius)
+            depth_xy = _clip_points(self.color_to_depth_points(centers, depth_mm), wd, hd)
+            depth_mm, valid_pixels = self.sample_depth(depth_frame, depth_xy, radius)
+            valid_ratio = valid_pixels / float((2 * radius + 1) ** 2)
+
+        xyz = self.depth_to_camera(depth_xy, np.nan_to_num(depth_mm))
+        return {
+            'depth_xy': np.rint(depth_xy).astype(np.int32),
+            'depth_mm': depth_mm,
+            'xyz': xyz,
+            'valid_pixels': valid_pixels,
+            'valid_ratio': valid_ratio,
+        }
+
+
+def _clip_points(points, width, height):
+    points = np.nan_to_num(points, nan=-1.0)
+    return np.column_stack([np.clip(points[:, 0], 0, width - 1),
+                            np.clip(points[:, 1], 0, height - 1)])
+
+
+def _sdk_depth_rays(mapper, depth_size):
+    """读取 SDK 的 深度帧->相机空间 映射表"""
+    import ctypes
+    from pykinect2 import PyKinectV2
+
+    wd, hd = depth_size
+    count = ctypes.c_uint()
+    table = ctypes.POINTER(PyKinectV2._PointF)()
+    mapper.GetDepthFrameToCameraSpaceTable(ctypes.byref(count), ctypes.byref(table))
+    if count.value != wd * hd:
+        raise ValueError(f"映射表大小不匹配: {count.value}")
+    floats = ctypes.cast(table, ctypes.POINTER(ctypes.c_float))
+    rays = np.ctypeslib.as_array(floats, shape=(count.value * 2,)).copy().reshape(hd, wd, 2)
+    # SDK 相机空间 y 轴向上，转换为与图像一致的 y 向下
+    rays[..., 1] *= -1.0
+    return rays
+
+
+def _sdk_color_plane(mapper, color_size, depth_size, depth_mm, stride):
+    """用恒定深度的合成深度帧求 彩色->深度 映射"""
+    import ctypes
+    from pykinect2 import PyKinectV2
+
+    wc, hc = color_size
+    wd, hd = depth_size
+    depth = np.full(wd * hd, int(depth_mm), dtype=np.uint16)
+    points = (PyKinectV2._DepthSpacePoint * (wc * hc))()
+    mapper.MapColorFrameToDepthSpace(
+        ctypes.c_uint(wd * hd), depth.ctypes.data_as(ctypes.POINTER(ctypes.c_ushort)),
+        ctypes.c_uint(wc * hc), points)
+    floats = ctypes.cast(points, ctypes.POINTER(ctypes.c_float))
+    plane = np.ctypeslib.as_array(floats, shape=(wc * hc * 2,)).reshape(hc, wc, 2)
+    plane = plane[::stride, ::stride].copy()
+    plane[~np.isfinite(plane)] = np.nan
+    return plane
+
+
+def _sensor_key(kinect):
+    """传感器标识，用于区分不同设备的缓存"""
+    key = "default"
+    try:
+        key = str(kinect._sensor.UniqueKinectId) or key
+    except Exception:
+        pass
+    safe = "".join(ch if ch.isalnum() else "_" for ch in key)
+    color = f"{kinect.color_frame_desc.Width}x{kinect.color_frame_desc.Height}"
+    depth = f"{kinect.depth_frame_desc.Width}x{kinect.depth_frame_desc.Height}"
+    return f"kinect_{safe}_{color}_{depth}"
+
+
+def get_registration(kinect, cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> Registration:
+    """获取传感器的配准表，优先读取磁盘缓存"""
+    path = os.path.join(cache_dir, _sensor_key(kinect) + ".npz") if cache_dir else None
+
+    if path and os.path.exists(path):
+        try:
+            return Registration.load(path)
+        except Exception as e:
+            print(f"配准缓存读取失败，重新构建: {e}")
+
+    registration = Registration.from_kinect(kinect)
+    # 标称内参构建的表不写缓存，接上真实设备后可重新获取 SDK 标定
+    if path and registration.source != "nominal":
+        try:
+            registration.save(path)
+        except Exception as e:
+            print(f"配准缓存保存失败: {e}")
+    return registration
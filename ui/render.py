@@ -0,0 +1,126 @@
+"""
+Oasis 目标检测系统 - 显示帧绘制
+与 Qt 无关的叠加层绘制，界面与无界面基准测试共用
+"""
+
+import cv2
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+
+def draw_stream_label(frame, label):
+    """在图像顶部添加流类型标识"""
+    cv2.putText(frame, label, (10, 30),
+                cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+    return frame
+
+
+def fit_size(width, height, max_width, max_height):
+    """保持宽高比缩放到不超过 (max_width, max_height) 的最大尺寸，不放大"""
+    scale = min(max_width / width, max_height / height, 1.0)
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def _packed_source(frame):
+    """Kinect 彩色帧是 BGRA 缓冲区上的 BGR 视图（非连续），按 4 通道连续数组读取以免 OpenCV 先复制"""
+    if (frame.ndim == 3 and frame.shape[2] == 3 and frame.dtype == np.uint8
+            and frame.strides[1:] == (4, 1) and frame.strides[0] == 4 * frame.shape[1]):
+        return as_strided(frame, shape=frame.shape[:2] + (4,), strides=frame.strides), True
+    return frame, False
+
+
+def prepare_display_frame(frame, display_size=None, pools=None):
+    """采集线程中准备显示帧，返回 (显示帧, 缩放比例)
+
+    按显示区域大小一次性缩小，界面线程只需绘制叠加层并原样绘制；返回的帧总是
+    C 连续的新缓冲区，界面可以在上面绘制，不影响推理阶段使用的原始帧。
+    缩小一半以上时先做整数倍 INTER_AREA 降采样（快速路径，避免混叠），再线性插值到目标尺寸。
+    pools 为 FramePoolSet 时所有输出与中间结果都写入池中缓冲区，显示帧以租约
+    （FrameLease）形式返回，由调用方在显示完成后归还。
+    """
+    height, width = frame.shape[:2]
+    new_width, new_height = fit_size(width, height, *display_size) if display_size else (width, height)
+
+    def output(name, shape, dtype=np.uint8):
+        if pools is None:
+            return None, None
+        lease = pools.lease(name, shape, dtype)
+        return lease, lease.array
+
+    image, packed = _packed_source(frame)
+    if new_width >= width:
+        lease, out = output('display', frame.shape, frame.dtype)
+        if packed:
+            out = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR, dst=out)
+        elif out is None:
+            out = frame.copy()
+        else:
+            np.copyto(out, frame)
+        return (out if lease is None else lease), 1.0
+
+    channels = image.shape[2] if image.ndim == 3 else 1
+    scratch = []
+    while image.shape[1] // 2 >= new_width and image.shape[0] // 2 >= new_height:
+        size = (image.shape[1] // 2, image.shape[0] // 2)
+        lease, out = output(f'display_{size[0]}', (size[1], size[0]) + image.shape[2:])
+        image = cv2.resize(image, size, dst=out, interpolation=cv2.INTER_AREA)
+        scratch.append(lease)
+
+    final_shape = (new_height, new_width) + ((3,) if packed else image.shape[2:])
+    result_lease = None
+    if image.shape[1] != new_width:
+        if packed:
+            lease, out = output('display_scaled', (new_height, new_width, channels))
+            scratch.append(lease)
+        else:
+            result_lease, out = output('display', final_shape)
+        image = cv2.resize(image, (new_width, new_height), dst=out, interpolation=cv2.INTER_LINEAR)
+    if packed:
+        result_lease, out = output('display', final_shape)
+        image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR, dst=out)
+    elif result_lease is None and pools is not None:
+        # 恰好整数倍缩小：最后一次降采样的结果直接作为显示帧
+        result_lease = scratch.pop()
+
+    for lease in scratch:
+        if lease is not None:
+            lease.release()
+    return (image if pools is None else result_lease), new_width / width
+
+
+def draw_detections(frame, detections, display_config, scale=1.0):
+    """在 BGR 帧上原地绘制检测框与标签；scale 为显示帧相对原始帧的缩放比例"""
+    for detection in detections:
+        x1, y1, x2, y2 = detection['bbox']
+        if scale != 1.0:
+            x1, y1, x2, y2 = (int(v * scale) for v in (x1, y1, x2, y2))
+
+        # 绘制边界框
+        cv2.rectangle(frame, (x1, y1), (x2, y2),
+                      display_config.bbox_color, display_config.bbox_thickness)
+
+        # 构建标签文本
+        label_parts = []
+        if 'track_id' in detection:
+            label_parts.append(f"#{detection['track_id']}")
+        if display_config.show_class_names:
+            label_parts.append(detection['class_name'])
+        if display_config.show_confidence:
+            label_parts.append(f"{detection['confidence']:.2f}")
+
+        if label_parts:
+            cv2.putText(frame, " ".join(label_parts), (x1, y1 - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, display_config.font_scale,
+                        display_config.text_color, display_config.bbox_thickness)
+    return frame
+
+
+def draw_text_lines(frame, lines, origin=(10, 60), line_height=22):
+    """在帧左上角绘制多行文本（带深色底衬，便于在任意画面上阅读）"""
+    x, y = origin
+    for line in lines:
+        (w, h), _ = cv2.getTextSize(line, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+        cv2.rectangle(frame, (x - 4, y - h - 4), (x + w + 4, y + 6), (0, 0, 0), -1)
+        cv2.putText(frame, line, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+        y += line_height
+    return frame
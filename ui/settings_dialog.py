@@ -2,15 +2,19 @@
 Oasis 目标检测系统 - 设置对话框
 """
 
+import os
+
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTabWidget,
                              QWidget, QLabel, QCheckBox, QSlider, QSpinBox,
                              QDoubleSpinBox, QComboBox, QPushButton, QGroupBox,
                              QGridLayout, QColorDialog, QFileDialog, QMessageBox,
                              QListWidget, QListWidgetItem, QFrame, QSpacerItem,
-                             QSizePolicy)
+                             QSizePolicy, QLineEdit)
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont, QColor, QPalette
 from .config import config_manager
+from .backends import available_backends
+from .quality import IMGSZ_STEPS
 
 
 class ColorButton(QPushButton):
@@ -90,9 +94,207 @@ class DetectionSettingsTab(QWidget):
         self.max_detections_spin.setValue(50)
         model_layout.addWidget(self.max_detections_spin, 2, 1)
         
+        # 非 PyTorch 后端首次使用时导出模型，导出结果缓存在模型文件旁
+        model_layout.addWidget(QLabel("推理后端:"), 3, 0)
+        self.backend_combo = QComboBox()
+        available = available_backends()
+        for backend, name in config_manager.get_inference_backends().items():
+            self.backend_combo.addItem(name if available.get(backend) else f"{name} (未安装)", backend)
+        model_layout.addWidget(self.backend_combo, 3, 1)
+        
+        # 最近使用的模型保留在内存中，切换模型时不需要重新加载
+        model_layout.addWidget(QLabel("模型缓存数量:"), 4, 0)
+        self.model_cache_size_spin = QSpinBox()
+        self.model_cache_size_spin.setRange(1, 8)
+        model_layout.addWidget(self.model_cache_size_spin, 4, 1)
+        
+        model_layout.addWidget(QLabel("模型缓存内存上限 (MB):"), 5, 0)
+        self.model_cache_mb_spin = QSpinBox()
+        self.model_cache_mb_spin.setRange(64, 16384)
+        self.model_cache_mb_spin.setSingleStep(128)
+        model_layout.addWidget(self.model_cache_mb_spin, 5, 1)
+        
+        # 推理与后处理放到独立进程，不与界面进程争用 GIL；每个进程各加载一份模型
+        model_layout.addWidget(QLabel("推理进程数:"), 6, 0)
+        self.inference_workers_spin = QSpinBox()
+        self.inference_workers_spin.setRange(0, max(1, os.cpu_count() or 1))
+        self.inference_workers_spin.setSpecialValueText("不使用（推理线程）")
+        model_layout.addWidget(self.inference_workers_spin, 6, 1)
+        
+        # 默认只取区域深度均值；直方图在目标混入背景时更稳健，但每帧多约 10ms
+        self.depth_histogram_cb = QCheckBox("3D 坐标使用深度直方图中位数")
+        model_layout.addWidget(self.depth_histogram_cb, 7, 0, 1, 2)
+        
         model_group.setLayout(model_layout)
         layout.addWidget(model_group)
         
+        # 关键帧检测组
+        keyframe_group = QGroupBox("关键帧检测")
+        keyframe_layout = QGridLayout()
+        
+        self.track_and_skip_cb = QCheckBox("只在关键帧运行检测器，其余帧光流跟踪")
+        keyframe_layout.addWidget(self.track_and_skip_cb, 0, 0, 1, 2)
+        
+        keyframe_layout.addWidget(QLabel("最大关键帧间隔:"), 1, 0)
+        self.keyframe_interval_spin = QSpinBox()
+        self.keyframe_interval_spin.setRange(1, 30)
+        keyframe_layout.addWidget(self.keyframe_interval_spin, 1, 1)
+        
+        keyframe_layout.addWidget(QLabel("检测器 CPU 预算:"), 2, 0)
+        self.cpu_budget_spin = QDoubleSpinBox()
+        self.cpu_budget_spin.setRange(0.05, 1.0)
+        self.cpu_budget_spin.setSingleStep(0.05)
+        keyframe_layout.addWidget(self.cpu_budget_spin, 2, 1)
+        
+        keyframe_group.setLayout(keyframe_layout)
+        layout.addWidget(keyframe_group)
+        
+        # 分块推理组
+        tiling_group = QGroupBox("分块推理")
+        tiling_layout = QGridLayout()
+        
+        self.tiled_inference_cb = QCheckBox("原分辨率重叠分块推理（提高小目标检出率）")
+        tiling_layout.addWidget(self.tiled_inference_cb, 0, 0, 1, 2)
+        
+        tiling_layout.addWidget(QLabel("分块大小:"), 1, 0)
+        self.tile_size_spin = QSpinBox()
+        self.tile_size_spin.setRange(320, 1280)
+        self.tile_size_spin.setSingleStep(32)
+        tiling_layout.addWidget(self.tile_size_spin, 1, 1)
+        
+        tiling_layout.addWidget(QLabel("重叠比例:"), 2, 0)
+        self.tile_overlap_spin = QDoubleSpinBox()
+        self.tile_overlap_spin.setRange(0.0, 0.5)
+        self.tile_overlap_spin.setSingleStep(0.05)
+        tiling_layout.addWidget(self.tile_overlap_spin, 2, 1)
+        
+        self.tile_full_frame_cb = QCheckBox("同时推理整帧缩略图（检出跨分块的大目标）")
+        tiling_layout.addWidget(self.tile_full_frame_cb, 3, 0, 1, 2)
+        
+        # ROI 四个坐标均为 0 时分块覆盖整帧
+        tiling_layout.addWidget(QLabel("ROI (x1, y1, x2, y2):"), 4, 0)
+        roi_layout = QHBoxLayout()
+        self.tile_roi_spins = []
+        for maximum in (1920, 1080, 1920, 1080):
+            spin = QSpinBox()
+            spin.setRange(0, maximum)
+            roi_layout.addWidget(spin)
+            self.tile_roi_spins.append(spin)
+        tiling_layout.addLayout(roi_layout, 4, 1)
+        
+        # 深度范围为 0 时不按深度筛选分块
+        tiling_layout.addWidget(QLabel("深度范围 (mm):"), 5, 0)
+        depth_layout = QHBoxLayout()
+        self.tile_depth_near_spin = QSpinBox()
+        self.tile_depth_near_spin.setRange(0, 8000)
+        self.tile_depth_near_spin.setSingleStep(100)
+        self.tile_depth_far_spin = QSpinBox()
+        self.tile_depth_far_spin.setRange(0, 8000)
+        self.tile_depth_far_spin.setSingleStep(100)
+        depth_layout.addWidget(self.tile_depth_near_spin)
+        depth_layout.addWidget(QLabel("-"))
+        depth_layout.addWidget(self.tile_depth_far_spin)
+        tiling_layout.addLayout(depth_layout, 5, 1)
+        
+        tiling_group.setLayout(tiling_layout)
+        layout.addWidget(tiling_group)
+        
+        # 变化门控组
+        gate_group = QGroupBox("变化门控")
+        gate_layout = QGridLayout()
+        
+        self.motion_gate_cb = QCheckBox("画面没有变化时跳过推理，复用上次的检测结果")
+        gate_layout.addWidget(self.motion_gate_cb, 0, 0, 1, 2)
+        
+        gate_layout.addWidget(QLabel("变化检测输入:"), 1, 0)
+        self.motion_source_combo = QComboBox()
+        for source, name in config_manager.get_motion_gate_sources().items():
+            self.motion_source_combo.addItem(name, source)
+        gate_layout.addWidget(self.motion_source_combo, 1, 1)
+        
+        gate_layout.addWidget(QLabel("灰度差阈值:"), 2, 0)
+        self.motion_threshold_spin = QSpinBox()
+        self.motion_threshold_spin.setRange(2, 64)
+        gate_layout.addWidget(self.motion_threshold_spin, 2, 1)
+        
+        self.motion_regions_cb = QCheckBox("局部变化时只重新推理变化区域")
+        gate_layout.addWidget(self.motion_regions_cb, 3, 0, 1, 2)
+        
+        gate_layout.addWidget(QLabel("静止时刷新间隔 (秒):"), 4, 0)
+        self.motion_refresh_spin = QDoubleSpinBox()
+        self.motion_refresh_spin.setRange(0.5, 60.0)
+        self.motion_refresh_spin.setSingleStep(0.5)
+        gate_layout.addWidget(self.motion_refresh_spin, 4, 1)
+        
+        gate_group.setLayout(gate_layout)
+        layout.addWidget(gate_group)
+        
+        # 多路摄像头组
+        multi_group = QGroupBox("多路摄像头")
+        multi_layout = QGridLayout()
+        
+        multi_layout.addWidget(QLabel("摄像头索引:"), 0, 0)
+        self.camera_sources_edit = QLineEdit()
+        self.camera_sources_edit.setPlaceholderText("逗号分隔，如 0, 1, 2")
+        multi_layout.addWidget(self.camera_sources_edit, 0, 1)
+        
+        multi_layout.addWidget(QLabel("微批最大帧数:"), 1, 0)
+        self.micro_batch_size_spin = QSpinBox()
+        self.micro_batch_size_spin.setRange(1, 16)
+        multi_layout.addWidget(self.micro_batch_size_spin, 1, 1)
+        
+        multi_layout.addWidget(QLabel("凑批等待上限 (ms):"), 2, 0)
+        self.micro_batch_deadline_spin = QDoubleSpinBox()
+        self.micro_batch_deadline_spin.setRange(0.0, 100.0)
+        self.micro_batch_deadline_spin.setSingleStep(5.0)
+        multi_layout.addWidget(self.micro_batch_deadline_spin, 2, 1)
+        
+        multi_group.setLayout(multi_layout)
+        layout.addWidget(multi_group)
+        
+        # 自适应质量组：按实测耗时在下列范围内逐级降低或恢复质量
+        quality_group = QGroupBox("自适应质量")
+        quality_layout = QGridLayout()
+        
+        self.adaptive_quality_cb = QCheckBox("按实测耗时自动调整推理质量以保持目标帧率 / 延迟")
+        quality_layout.addWidget(self.adaptive_quality_cb, 0, 0, 1, 2)
+        
+        quality_layout.addWidget(QLabel("目标帧率 (FPS):"), 1, 0)
+        self.quality_fps_spin = QDoubleSpinBox()
+        self.quality_fps_spin.setRange(0.0, 120.0)
+        self.quality_fps_spin.setSingleStep(5.0)
+        self.quality_fps_spin.setSpecialValueText("不限制")
+        quality_layout.addWidget(self.quality_fps_spin, 1, 1)
+        
+        quality_layout.addWidget(QLabel("目标延迟 p95 (ms):"), 2, 0)
+        self.quality_latency_spin = QDoubleSpinBox()
+        self.quality_latency_spin.setRange(0.0, 5000.0)
+        self.quality_latency_spin.setSingleStep(50.0)
+        self.quality_latency_spin.setSpecialValueText("不限制")
+        quality_layout.addWidget(self.quality_latency_spin, 2, 1)
+        
+        quality_layout.addWidget(QLabel("最小输入尺寸:"), 3, 0)
+        self.quality_min_imgsz_combo = QComboBox()
+        for size in IMGSZ_STEPS:
+            self.quality_min_imgsz_combo.addItem(f"{size}", size)
+        quality_layout.addWidget(self.quality_min_imgsz_combo, 3, 1)
+        
+        quality_layout.addWidget(QLabel("最大检测跨帧数:"), 4, 0)
+        self.quality_max_stride_spin = QSpinBox()
+        self.quality_max_stride_spin.setRange(1, 10)
+        quality_layout.addWidget(self.quality_max_stride_spin, 4, 1)
+        
+        self.quality_allow_tiling_cb = QCheckBox("允许关闭分块推理")
+        quality_layout.addWidget(self.quality_allow_tiling_cb, 5, 0, 1, 2)
+        
+        quality_layout.addWidget(QLabel("降级模型:"), 6, 0)
+        self.quality_model_tiers_edit = QLineEdit()
+        self.quality_model_tiers_edit.setPlaceholderText("逗号分隔，按顺序换用，如 yolo11s.pt, yolo11n.pt")
+        quality_layout.addWidget(self.quality_model_tiers_edit, 6, 1)
+        
+        quality_group.setLayout(quality_layout)
+        layout.addWidget(quality_group)
+        
         # 目标类别组
         classes_group = QGroupBox("目标类别")
         classes_layout = QVBoxLayout()
@@ -175,6 +377,42 @@ class DetectionSettingsTab(QWidget):
         self.model_path_combo.setCurrentText(config.model_path)
         self.confidence_slider.setValue(int(config.confidence_threshold * 100))
         self.max_detections_spin.setValue(config.max_detections)
+        index = self.backend_combo.findData(config.inference_backend)
+        self.backend_combo.setCurrentIndex(max(index, 0))
+        self.model_cache_size_spin.setValue(config.model_cache_size)
+        self.model_cache_mb_spin.setValue(config.model_cache_mb)
+        self.inference_workers_spin.setValue(config.inference_workers)
+        self.depth_histogram_cb.setChecked(config.depth_histogram)
+        self.track_and_skip_cb.setChecked(config.track_and_skip)
+        self.keyframe_interval_spin.setValue(config.keyframe_max_interval)
+        self.cpu_budget_spin.setValue(config.detector_cpu_budget)
+        self.tiled_inference_cb.setChecked(config.tiled_inference)
+        self.tile_size_spin.setValue(config.tile_size)
+        self.tile_overlap_spin.setValue(config.tile_overlap)
+        self.tile_full_frame_cb.setChecked(config.tile_full_frame)
+        roi = config.tile_roi if len(config.tile_roi) == 4 else [0, 0, 0, 0]
+        for spin, value in zip(self.tile_roi_spins, roi):
+            spin.setValue(int(value))
+        near, far = config.tile_depth_range if len(config.tile_depth_range) == 2 else (0, 0)
+        self.tile_depth_near_spin.setValue(int(near))
+        self.tile_depth_far_spin.setValue(int(far))
+        self.motion_gate_cb.setChecked(config.motion_gate)
+        index = self.motion_source_combo.findData(config.motion_gate_source)
+        self.motion_source_combo.setCurrentIndex(max(index, 0))
+        self.motion_threshold_spin.setValue(config.motion_threshold)
+        self.motion_regions_cb.setChecked(config.motion_regions)
+        self.motion_refresh_spin.setValue(config.motion_refresh_s)
+        self.camera_sources_edit.setText(", ".join(str(index) for index in config.camera_sources))
+        self.micro_batch_size_spin.setValue(config.micro_batch_size)
+        self.micro_batch_deadline_spin.setValue(config.micro_batch_deadline_ms)
+        self.adaptive_quality_cb.setChecked(config.adaptive_quality)
+        self.quality_fps_spin.setValue(config.quality_target_fps)
+        self.quality_latency_spin.setValue(config.quality_target_latency_ms)
+        index = self.quality_min_imgsz_combo.findData(config.quality_min_imgsz)
+        self.quality_min_imgsz_combo.setCurrentIndex(index if index >= 0 else self.quality_min_imgsz_combo.count() - 1)
+        self.quality_max_stride_spin.setValue(config.quality_max_stride)
+        self.quality_allow_tiling_cb.setChecked(config.quality_allow_tiling)
+        self.quality_model_tiers_edit.setText(", ".join(config.quality_model_tiers))
         
         # 设置目标类别
         for i in range(self.classes_list.count()):
@@ -189,6 +427,39 @@ class DetectionSettingsTab(QWidget):
         config.model_path = self.model_path_combo.currentText()
         config.confidence_threshold = self.confidence_slider.value() / 100.0
         config.max_detections = self.max_detections_spin.value()
+        config.inference_backend = self.backend_combo.currentData()
+        config.model_cache_size = self.model_cache_size_spin.value()
+        config.model_cache_mb = self.model_cache_mb_spin.value()
+        config.inference_workers = self.inference_workers_spin.value()
+        config.depth_histogram = self.depth_histogram_cb.isChecked()
+        config.track_and_skip = self.track_and_skip_cb.isChecked()
+        config.keyframe_max_interval = self.keyframe_interval_spin.value()
+        config.detector_cpu_budget = self.cpu_budget_spin.value()
+        config.tiled_inference = self.tiled_inference_cb.isChecked()
+        config.tile_size = self.tile_size_spin.value()
+        config.tile_overlap = self.tile_overlap_spin.value()
+        config.tile_full_frame = self.tile_full_frame_cb.isChecked()
+        x1, y1, x2, y2 = (spin.value() for spin in self.tile_roi_spins)
+        config.tile_roi = [x1, y1, x2, y2] if x2 > x1 and y2 > y1 else []
+        near, far = self.tile_depth_near_spin.value(), self.tile_depth_far_spin.value()
+        config.tile_depth_range = [near, far] if far > near else []
+        config.motion_gate = self.motion_gate_cb.isChecked()
+        config.motion_gate_source = self.motion_source_combo.currentData()
+        config.motion_threshold = self.motion_threshold_spin.value()
+        config.motion_regions = self.motion_regions_cb.isChecked()
+        config.motion_refresh_s = self.motion_refresh_spin.value()
+        sources = [part.strip() for part in self.camera_sources_edit.text().replace('，', ',').split(',')]
+        config.camera_sources = [int(part) for part in sources if part.isdigit()]
+        config.micro_batch_size = self.micro_batch_size_spin.value()
+        config.micro_batch_deadline_ms = self.micro_batch_deadline_spin.value()
+        config.adaptive_quality = self.adaptive_quality_cb.isChecked()
+        config.quality_target_fps = self.quality_fps_spin.value()
+        config.quality_target_latency_ms = self.quality_latency_spin.value()
+        config.quality_min_imgsz = self.quality_min_imgsz_combo.currentData()
+        config.quality_max_stride = self.quality_max_stride_spin.value()
+        config.quality_allow_tiling = self.quality_allow_tiling_cb.isChecked()
+        tiers = [part.strip() for part in self.quality_model_tiers_edit.text().replace('，', ',').split(',')]
+        config.quality_model_tiers = [part for part in tiers if part]
         
         # 获取选中的类别
         selected_classes = []
@@ -233,6 +504,9 @@ class DisplaySettingsTab(QWidget):
         self.font_scale_spin.setDecimals(1)
         display_layout.addWidget(self.font_scale_spin, 2, 1)
         
+        self.show_latency_overlay_cb = QCheckBox("在视频上显示性能统计")
+        display_layout.addWidget(self.show_latency_overlay_cb, 3, 0, 1, 2)
+        
         display_group.setLayout(display_layout)
         layout.addWidget(display_group)
         
@@ -264,6 +538,7 @@ class DisplaySettingsTab(QWidget):
         self.font_scale_spin.setValue(config.font_scale)
         self.bbox_color_btn.set_color(config.bbox_color)
         self.text_color_btn.set_color(config.text_color)
+        self.show_latency_overlay_cb.setChecked(config.show_latency_overlay)
     
     def save_settings(self):
         """保存设置"""
@@ -275,6 +550,7 @@ class DisplaySettingsTab(QWidget):
         config.font_scale = self.font_scale_spin.value()
         config.bbox_color = self.bbox_color_btn.color
         config.text_color = self.text_color_btn.color
+        config.show_latency_overlay = self.show_latency_overlay_cb.isChecked()
 
 
 class KinectSettingsTab(QWidget):
@@ -305,6 +581,18 @@ class KinectSettingsTab(QWidget):
         self.auto_exposure_cb = QCheckBox("自动曝光")
         kinect_layout.addWidget(self.auto_exposure_cb, 2, 0, 1, 2)
         
+        kinect_layout.addWidget(QLabel("红外显示模式:"), 3, 0)
+        self.infrared_mode_combo = QComboBox()
+        for mode, label in config_manager.get_kinect_infrared_modes().items():
+            self.infrared_mode_combo.addItem(label, mode)
+        kinect_layout.addWidget(self.infrared_mode_combo, 3, 1)
+        
+        kinect_layout.addWidget(QLabel("红外固定增益:"), 4, 0)
+        self.infrared_gain_spin = QDoubleSpinBox()
+        self.infrared_gain_spin.setRange(1.0, 64.0)
+        self.infrared_gain_spin.setSingleStep(1.0)
+        kinect_layout.addWidget(self.infrared_gain_spin, 4, 1)
+        
         kinect_group.setLayout(kinect_layout)
         layout.addWidget(kinect_group)
         
@@ -348,6 +636,9 @@ class KinectSettingsTab(QWidget):
         self.resolution_combo.setCurrentText(config.color_resolution)
         self.fps_spin.setValue(config.fps)
         self.auto_exposure_cb.setChecked(config.auto_exposure)
+        index = self.infrared_mode_combo.findData(config.infrared_mode)
+        self.infrared_mode_combo.setCurrentIndex(max(index, 0))
+        self.infrared_gain_spin.setValue(config.infrared_gain)
     
     def save_settings(self):
         """保存设置"""
@@ -356,6 +647,8 @@ class KinectSettingsTab(QWidget):
         config.color_resolution = self.resolution_combo.currentText()
         config.fps = self.fps_spin.value()
         config.auto_exposure = self.auto_exposure_cb.isChecked()
+        config.infrared_mode = self.infrared_mode_combo.currentData()
+        config.infrared_gain = self.infrared_gain_spin.value()
 
 
 class SettingsDialog(QDialog):
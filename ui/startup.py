@@ -0,0 +1,153 @@
+"""
+Oasis 目标检测系统 - 启动辅助
+依赖检查只查找模块（importlib.util.find_spec），不导入模块；
+启动耗时分析（--profile-startup）统计主线程上各模块的导入耗时与各初始化阶段耗时。
+本模块只使用标准库，启动器在导入其他模块之前导入它
+"""
+
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, List
+
+PROFILE_FLAG = '--profile-startup'
+
+
+def module_available(name) -> bool:
+    """模块是否已安装（只查找，不导入；子模块会导入其父包）"""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def missing_modules(names: Iterable[str]) -> List[str]:
+    """未安装的模块"""
+    return [name for name in names if not module_available(name)]
+
+
+class StartupProfiler:
+    """启动耗时分析
+
+    install() 之后替换 builtins.__import__，只对主线程上真正加载（不在 sys.modules 中）的模块计时，
+    子模块的导入耗时从父模块的自身耗时中扣除；phase() 记录初始化阶段耗时。
+    finish() 打印报告并恢复原来的 __import__。
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.enabled = False
+        self.imports = {}  # 模块名 -> [累计秒, 自身秒]
+        self.phases = []  # (名称, 层级, 开始秒, 耗时秒)
+        self._stack = []
+        self._depth = 0
+        self._original = builtins.__import__
+        self._installed = False
+        self._thread = threading.main_thread()
+
+    def install(self):
+        if self._installed:
+            return
+        self.enabled = True
+        self._installed = True
+        self._original = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._installed:
+            builtins.__import__ = self._original
+            self._installed = False
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original
+        if threading.current_thread() is not self._thread:
+            return original(name, globals, locals, fromlist, level)
+        absolute = name
+        if level:
+            package = (globals or {}).get('__package__') or ''
+            try:
+                absolute = importlib.util.resolve_name('.' * level + name, package)
+            except (ImportError, ValueError):
+                pass
+        module = sys.modules.get(absolute)
+        if module is not None and all(hasattr(module, item) for item in fromlist or ()):
+            return original(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            entry = self.imports.setdefault(absolute, [0.0, 0.0])
+            entry[0] += elapsed
+            entry[1] += elapsed - children
+
+    @contextmanager
+    def phase(self, name):
+        """记录一个初始化阶段的耗时（可嵌套）"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        index = len(self.phases)
+        self.phases.append((name, self._depth, start - self.start, 0.0))
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.phases[index] = (name, self._depth, start - self.start, time.perf_counter() - start)
+
+    def package_times(self):
+        """按顶层包汇总的导入自身耗时（秒），降序"""
+        totals = {}
+        for name, (_, own) in self.imports.items():
+            package = name.split('.')[0]
+            totals[package] = totals.get(package, 0.0) + own
+        return sorted(totals.items(), key=lambda item: -item[1])
+
+    def report(self, top=12):
+        """报告文本行：到目前为止的总耗时、初始化阶段与导入耗时最多的包"""
+        total = time.perf_counter() - self.start
+        imported = sum(own for _, own in self.imports.values())
+        lines = [f"启动耗时分析: 总计 {total * 1000:.0f}ms，其中导入 {imported * 1000:.0f}ms"]
+        lines.append("  初始化阶段:")
+        for name, depth, start, seconds in self.phases:
+            label = "  " * depth + name
+            lines.append(f"    {label:<24}{seconds * 1000:>9.1f}ms   @{start * 1000:>7.0f}ms")
+        lines.append(f"  导入耗时（按顶层包，前 {top} 个）:")
+        for package, seconds in self.package_times()[:top]:
+            share = seconds / total if total > 0 else 0.0
+            lines.append(f"    {package:<24}{seconds * 1000:>9.1f}ms   {share:>6.1%}")
+        return lines
+
+    def finish(self, label="首个窗口显示"):
+        """记录到 label 为止的总耗时，打印报告并停止计时导入"""
+        if not self.enabled:
+            return
+        self.phases.append((label, 0, time.perf_counter() - self.start, 0.0))
+        self.uninstall()
+        print("\n".join(self.report()))
+        self.enabled = False
+
+
+# 全局启动耗时分析器（启动器传入 --profile-startup 时启用）
+startup_profiler = StartupProfiler()
+
+
+def profile_requested(argv=None) -> bool:
+    """命令行是否带 --profile-startup；带时启用全局分析器"""
+    argv = sys.argv if argv is None else argv
+    if PROFILE_FLAG in argv:
+        startup_profiler.install()
+        return True
+    return False
@@ -0,0 +1,276 @@
+"""
+Oasis 目标检测系统 - 分块高分辨率推理
+1920x1080 彩色帧整帧推理时被缩小到 640，小目标（笔、鼠标）只剩几个像素；
+分块推理把 ROI / 深度范围内的区域切成相互重叠的原分辨率分块，与（可选的）整帧缩略图一起作为一个批次推理，
+再把各分块的检测平移回原图坐标并跨块合并
+"""
+
+import math
+import time
+from typing import Optional, Sequence
+
+import cv2
+import numpy as np
+
+from .postprocess import DetectionBatch, results_array
+
+# 分块边长（像素），与 YOLO 输入尺寸一致时分块不再缩放
+TILE_SIZE = 640
+# 相邻分块的最小重叠比例
+TILE_OVERLAP = 0.2
+# 距分块内部边界（不是整帧边界）不超过此距离的框视为被分块截断
+TILE_EDGE_MARGIN = 4
+# 同类别两个框的交集占较小框面积的比例（IoS）超过此值时视为同一目标
+TILE_MERGE_IOS = 0.6
+
+
+def _axis_starts(lo, hi, tile, limit, overlap):
+    """一个轴上的分块起点：覆盖 [lo, hi)，相邻分块重叠不少于 overlap，分块完全位于 [0, limit) 内"""
+    tile = min(tile, limit)
+    length = hi - lo
+    if length <= tile:
+        start = int(round((lo + hi - tile) / 2))
+        return [min(max(start, 0), limit - tile)]
+    step = tile * (1.0 - overlap)
+    count = int(math.ceil((length - tile) / step)) + 1
+    starts = np.rint(np.linspace(lo, hi - tile, count)).astype(np.int64)
+    return np.clip(starts, 0, limit - tile).tolist()
+
+
+def tile_grid(frame_size, tile_size=TILE_SIZE, overlap=TILE_OVERLAP, roi=None):
+    """覆盖 roi（默认整帧）的分块 (K, 4) int32 xyxy，frame_size 为 (宽, 高)
+
+    roi 为原图像素 xyxy，会被裁剪到画面内；为空或裁剪后为空时覆盖整帧。
+    ROI 小于一个分块时返回以 ROI 为中心的单个分块。
+    """
+    width, height = frame_size
+    x1, y1, x2, y2 = 0, 0, width, height
+    if roi is not None and len(roi) == 4:
+        rx1, ry1 = max(int(roi[0]), 0), max(int(roi[1]), 0)
+        rx2, ry2 = min(int(roi[2]), width), min(int(roi[3]), height)
+        if rx2 > rx1 and ry2 > ry1:
+            x1, y1, x2, y2 = rx1, ry1, rx2, ry2
+    tw, th = min(tile_size, width), min(tile_size, height)
+    xs = _axis_starts(x1, x2, tile_size, width, overlap)
+    ys = _axis_starts(y1, y2, tile_size, height, overlap)
+    return np.array([[x, y, x + tw, y + th] for y in ys for x in xs], dtype=np.int32).reshape(-1, 4)
+
+
+def depth_tile_mask(tiles, depth_frame, registration, depth_range, min_fraction=0.01):
+    """各分块内是否有足够的像素深度落在 depth_range=(近, 远) 毫米内
+
+    分块按深度范围中点映射到深度图（视差按该深度修正），在范围掩码的积分图上求和。
+    彩色画面边缘没有深度覆盖的分块映射后面积为 0，视为不在范围内。
+    """
+    near, far = depth_range
+    depth = np.asarray(depth_frame)
+    in_range = ((depth >= near) & (depth <= far)).view(np.uint8)
+    table = cv2.integral(np.ascontiguousarray(in_range), sdepth=cv2.CV_32S)
+    hd, wd = depth.shape[:2]
+
+    boxes = registration.color_to_depth_boxes(tiles, np.full(len(tiles), (near + far) / 2.0))
+    x1 = np.clip(np.floor(boxes[:, 0]).astype(np.intp), 0, wd)
+    y1 = np.clip(np.floor(boxes[:, 1]).astype(np.intp), 0, hd)
+    x2 = np.clip(np.ceil(boxes[:, 2]).astype(np.intp) + 1, 0, wd)
+    y2 = np.clip(np.ceil(boxes[:, 3]).astype(np.intp) + 1, 0, hd)
+    counts = table[y2, x2] - table[y1, x2] - table[y2, x1] + table[y1, x1]
+    area = (x2 - x1) * (y2 - y1)
+    return (area > 0) & (counts >= min_fraction * np.maximum(area, 1))
+
+
+def cut_mask(boxes, tile, frame_size, margin=TILE_EDGE_MARGIN):
+    """分块中的框 (N, 4)（原图坐标）是否贴近该分块的内部边界，即可能被截断"""
+    width, height = frame_size
+    x1, y1, x2, y2 = (int(v) for v in tile)
+    cut = np.zeros(len(boxes), dtype=bool)
+    if x1 > 0:
+        cut |= boxes[:, 0] <= x1 + margin
+    if y1 > 0:
+        cut |= boxes[:, 1] <= y1 + margin
+    if x2 < width:
+        cut |= boxes[:, 2] >= x2 - margin
+    if y2 < height:
+        cut |= boxes[:, 3] >= y2 - margin
+    return cut
+
+
+def merge_tiled(data, cut, ios_threshold=TILE_MERGE_IOS):
+    """跨块合并 (N, 6) 检测数组（x1, y1, x2, y2, conf, cls），返回按置信度降序的合并结果
+
+    按置信度降序贪心：同类别且与保留框 IoS 超过阈值的框被并入保留框。
+    被截断的框与保留框取并集以补全被分块边界切掉的部分；完整的框直接抑制。
+    """
+    count = len(data)
+    if count == 0:
+        return data
+    boxes = data[:, :4]
+    classes = data[:, 5]
+    areas = np.maximum((boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1]), 1e-6)
+    order = np.argsort(-data[:, 4], kind='stable')
+    done = np.zeros(count, dtype=bool)
+    merged = []
+    for i in order.tolist():
+        if done[i]:
+            continue
+        done[i] = True
+        box = boxes[i].copy()
+        partial = cut[i]
+        # 保留框扩大后可能与更远分块中的片段重叠，重复直到没有新的匹配
+        while True:
+            rest = np.flatnonzero(~done & (classes == classes[i]))
+            if not len(rest):
+                break
+            other = boxes[rest]
+            iw = np.clip(np.minimum(box[2], other[:, 2]) - np.maximum(box[0], other[:, 0]), 0, None)
+            ih = np.clip(np.minimum(box[3], other[:, 3]) - np.maximum(box[1], other[:, 1]), 0, None)
+            area = (box[2] - box[0]) * (box[3] - box[1])
+            ios = iw * ih / np.minimum(area, areas[rest])
+            hit = rest[ios > ios_threshold]
+            if not len(hit):
+                break
+            done[hit] = True
+            grow = hit if partial else hit[cut[hit]]
+            if not len(grow):
+                break
+            box[:2] = np.minimum(box[:2], boxes[grow, :2].min(axis=0))
+            box[2:] = np.maximum(box[2:], boxes[grow, 2:].max(axis=0))
+        row = data[i].copy()
+        row[:4] = box
+        merged.append(row)
+    return np.stack(merged)
+
+
+class TiledDetector:
+    """分块推理
+
+    分块网格按 (画面尺寸, 分块参数, ROI) 缓存，深度范围限制每帧按深度图重新筛选分块。
+    分块是原图的视图（不复制），与整帧一起作为一个列表传给模型，一次批量推理。
+    画面不大于一个分块时退化为普通的整帧推理。只应由推理阶段一个线程调用。
+    """
+
+    def __init__(self, tile_size=TILE_SIZE, overlap=TILE_OVERLAP, full_frame=True, roi=None,
+                 ios_threshold=TILE_MERGE_IOS):
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.full_frame = full_frame
+        self.roi = roi
+        self.ios_threshold = ios_threshold
+        self._grid = None
+        self._grid_key = None
+        self.last = {'grid': 0, 'tiles': 0, 'raw': 0, 'merged': 0}
+        self.frames = 0
+        self.tiles_run = 0
+
+    def configure(self, tile_size, overlap, full_frame, roi=None):
+        self.tile_size = int(tile_size)
+        self.overlap = float(overlap)
+        self.full_frame = bool(full_frame)
+        self.roi = tuple(roi) if roi else None
+
+    def grid(self, frame_size):
+        key = (tuple(frame_size), self.tile_size, self.overlap, self.roi)
+        if key != self._grid_key:
+            self._grid = tile_grid(frame_size, self.tile_size, self.overlap, self.roi)
+            self._grid_key = key
+        return self._grid
+
+    def tiles_for(self, frame_size, depth_frame=None, registration=None, depth_range=None):
+        """本帧需要推理的分块：ROI 网格中深度范围内的分块（没有深度图或配准表时不筛选）"""
+        tiles = self.grid(frame_size)
+        if depth_range and depth_frame is not None and registration is not None and len(tiles):
+            tiles = tiles[depth_tile_mask(tiles, depth_frame, registration, depth_range)]
+        return tiles
+
+    def infer(self, postprocessor, model, image, classes, confidence_threshold, max_detections,
+              depth_frame=None, registration=None, depth_range: Optional[Sequence[float]] = None,
+              monitor=None) -> DetectionBatch:
+        """分块推理并合并，返回与 DetectionPostProcessor.infer 相同的检测批次
+
+        monitor 提供 record(stage, seconds) 时分别记录 infer（批量推理）与 postprocess（平移、合并、过滤）耗时。
+        """
+        height, width = image.shape[:2]
+        if width <= self.tile_size and height <= self.tile_size:
+            return postprocessor.infer(model, image, classes, confidence_threshold, max_detections,
+                                       monitor=monitor)
+
+        postprocessor.compile(model.names, classes)
+        if not postprocessor.class_indices:
+            return DetectionBatch.empty(postprocessor.names)
+
+        frame_size = (width, height)
+        tiles = self.tiles_for(frame_size, depth_frame, registration, depth_range)
+        self.frames += 1
+        self.tiles_run += len(tiles)
+        batch, raw, merged = self._run(postprocessor, model, image, tiles, self.full_frame,
+                                       confidence_threshold, max_detections, monitor)
+        self.last = {'grid': len(self.grid(frame_size)), 'tiles': len(tiles), 'raw': raw, 'merged': merged}
+        return batch
+
+    def infer_regions(self, postprocessor, model, image, regions, classes, confidence_threshold,
+                      max_detections, monitor=None) -> DetectionBatch:
+        """只推理给定的原图区域 (K, 4) xyxy（如画面中变化的区域），区域大小任意，不推理整帧"""
+        postprocessor.compile(model.names, classes)
+        if not postprocessor.class_indices:
+            return DetectionBatch.empty(postprocessor.names)
+        regions = np.asarray(regions, dtype=np.int32).reshape(-1, 4)
+        return self._run(postprocessor, model, image, regions, False,
+                         confidence_threshold, max_detections, monitor)[0]
+
+    def _run(self, postprocessor, model, image, tiles, full_frame, confidence_threshold, max_detections,
+             monitor):
+        """分块（与整帧）一次批量推理，平移回原图坐标、跨块合并后过滤；返回 (检测批次, 合并前框数, 合并后框数)"""
+        start = time.perf_counter()
+        frame_size = (image.shape[1], image.shape[0])
+        images = [image[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles.tolist()]
+        if full_frame:
+            images.append(image)
+        if not images:
+            return DetectionBatch.empty(postprocessor.names), 0, 0
+
+        results = postprocessor.predict(model, images, confidence_threshold, max_detections)
+        predicted = time.perf_counter()
+
+        raw = merged = 0
+        arrays, cuts = [], []
+        for k, result in enumerate(results):
+            if k < len(tiles):
+                data = results_array([result], [tiles[k, :2]])
+                if data is not None:
+                    cuts.append(cut_mask(data[:, :4], tiles[k], frame_size))
+            else:
+                data = results_array([result])
+                if data is not None:
+                    data = data[:, [0, 1, 2, 3, -2, -1]]
+                    cuts.append(np.zeros(len(data), dtype=bool))
+            if data is not None:
+                arrays.append(data)
+        if arrays:
+            data = np.concatenate(arrays)
+            raw = len(data)
+            data = merge_tiled(data, np.concatenate(cuts), self.ios_threshold)
+            merged = len(data)
+        else:
+            data = None
+        batch = postprocessor.select(data, confidence_threshold, max_detections)
+
+        if monitor is not None:
+            monitor.record('infer', predicted - start)
+            monitor.record('postprocess', time.perf_counter() - predicted)
+        return batch, raw, merged
+
+    def stats(self):
+        return {
+            **self.last,
+            'full_frame': self.full_frame,
+            'tiles_per_frame': round(self.tiles_run / self.frames, 2) if self.frames else 0.0,
+        }
+
+
+def format_tiling_stats(stats):
+    """分块推理统计文本：本帧分块数 / 网格分块数，以及跨块合并前后的框数"""
+    text = f"分块 {stats['tiles']}/{stats['grid']}"
+    if stats['full_frame']:
+        text += "+整帧"
+    if stats['raw']:
+        text += f" 合并 {stats['raw']}→{stats['merged']}"
+    return text
@@ -0,0 +1,292 @@
+"""
+Oasis 目标检测系统 - 多目标跟踪
+逐帧检测结果与已有轨迹按代价矩阵（1 - IoU，不同类别不可匹配）求最优分配，每个目标保持稳定的跟踪 ID；
+3D 坐标经常速卡尔曼滤波平滑，检测框几乎未动的轨迹沿用上次的 3D 查询结果
+"""
+
+import itertools
+from typing import List, Optional
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment as _scipy_assignment
+except ImportError:
+    _scipy_assignment = None
+
+# 不可匹配的代价（类别不同等），求解前替换为有限的大数
+_FORBIDDEN = 1e6
+
+
+def box_iou(a, b):
+    """(N, 4) 与 (M, 4) xyxy 框的 IoU 矩阵 (N, M)"""
+    if not len(a) or not len(b):
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-6)
+
+
+def _hungarian(cost):
+    """最小代价完全分配（行数 <= 列数），返回每行分配到的列
+
+    Kuhn-Munkres 势函数算法，O(n^2 m)，内层对所有列向量化。
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    owner = np.zeros(m + 1, dtype=np.int64)  # 列 j 分配给的行（从 1 开始，0 表示空闲）
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            free = ~used[1:]
+            reduced = cost[owner[j0] - 1] - u[owner[j0]] - v[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+    rows = np.zeros(n, dtype=np.int64)
+    assigned = np.flatnonzero(owner[1:])
+    rows[owner[1:][assigned] - 1] = assigned
+    return rows
+
+
+def linear_assignment(cost, max_cost):
+    """代价矩阵 (N, M) 的最优一对一分配，返回代价不超过 max_cost 的 (行, 列) 数组
+
+    安装了 scipy 时使用 linear_sum_assignment，否则使用内置实现。
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.size == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    cost = np.where(np.isfinite(cost), cost, _FORBIDDEN)
+    if _scipy_assignment is not None:
+        rows, cols = _scipy_assignment(cost)
+    elif cost.shape[0] <= cost.shape[1]:
+        rows = np.arange(cost.shape[0])
+        cols = _hungarian(cost)
+    else:
+        cols = np.arange(cost.shape[1])
+        rows = _hungarian(cost.T)
+    keep = cost[rows, cols] <= max_cost
+    return np.asarray(rows)[keep], np.asarray(cols)[keep]
+
+
+class Kalman3D:
+    """三维常速卡尔曼滤波
+
+    三个轴独立且噪声模型相同，状态为 (位置, 速度) x 3 轴，三个轴共用一个 2x2 协方差。
+    单位：毫米、秒。
+    """
+
+    def __init__(self, xyz, measurement_std=25.0, acceleration_std=200.0):
+        self.state = np.zeros((2, 3))
+        self.state[0] = xyz
+        self.measurement_var = measurement_std ** 2
+        self.acceleration_var = acceleration_std ** 2
+        self.cov = np.diag([self.measurement_var, 1000.0 ** 2])
+
+    def predict(self, dt):
+        if dt <= 0:
+            return
+        transition = np.array([[1.0, dt], [0.0, 1.0]])
+        self.state = transition @ self.state
+        noise = self.acceleration_var * np.array([[dt ** 4 / 4, dt ** 3 / 2], [dt ** 3 / 2, dt ** 2]])
+        self.cov = transition @ self.cov @ transition.T + noise
+
+    def update(self, xyz):
+        gain = self.cov[:, 0] / (self.cov[0, 0] + self.measurement_var)
+        self.state += gain[:, None] * (np.asarray(xyz, dtype=np.float64) - self.state[0])
+        self.cov = self.cov - np.outer(gain, self.cov[0])
+
+    @property
+    def position(self):
+        return self.state[0]
+
+    @property
+    def velocity(self):
+        return self.state[1]
+
+
+class Track:
+    """单个目标的轨迹"""
+
+    __slots__ = ('track_id', 'class_id', 'box', 'score', 'hits', 'missed',
+                 'first_seen', 'last_seen', 'kalman', 'filtered_at', 'measurement', 'mapped_box',
+                 'since_mapped')
+
+    def __init__(self, track_id, class_id, box, score, timestamp):
+        self.track_id = track_id
+        self.class_id = class_id
+        self.box = box
+        self.score = score
+        self.hits = 1
+        self.missed = 0
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.kalman: Optional[Kalman3D] = None
+        self.filtered_at = timestamp
+        self.measurement = None  # 最近一次 3D 查询结果（_coords_from_mapping 的字典）
+        self.mapped_box = None   # 最近一次 3D 查询时的检测框
+        self.since_mapped = 0
+
+
+class MultiObjectTracker:
+    """多目标跟踪器
+
+    update() 把一帧的检测批次分配到轨迹：未匹配的检测新建轨迹，
+    连续 max_missed 帧未匹配的轨迹删除（期间重新出现仍沿用原 ID）。
+    只应由一个线程调用。
+    """
+
+    def __init__(self, min_iou=0.2, max_missed=15, static_iou=0.9, remap_interval=15,
+                 measurement_std=25.0, acceleration_std=200.0):
+        self.min_iou = min_iou
+        self.max_missed = max_missed
+        self.static_iou = static_iou
+        self.remap_interval = remap_interval
+        self.measurement_std = measurement_std
+        self.acceleration_std = acceleration_std
+        self.tracks: List[Track] = []
+        self._ids = itertools.count(1)
+        self.mapped = 0
+        self.reused = 0
+
+    def reset(self):
+        self.tracks = []
+        self._ids = itertools.count(1)
+
+    def update(self, batch, timestamp) -> List[Track]:
+        """关联一帧的检测，返回与检测逐行对应的轨迹列表
+
+        不修改 batch：关键帧检测时 batch 是 TrackAndSkip 在推理阶段线程中保存的批次，
+        跟踪 ID 由调用方通过 annotate() 写入检测字典。
+        """
+        count = len(batch)
+        tracks = self.tracks
+        matched: List[Optional[Track]] = [None] * count
+        if tracks and count:
+            boxes = np.array([t.box for t in tracks], dtype=np.float32)
+            classes = np.array([t.class_id for t in tracks])
+            cost = 1.0 - box_iou(batch.boxes, boxes)
+            cost[batch.class_ids[:, None] != classes[None, :]] = np.inf
+            rows, cols = linear_assignment(cost, 1.0 - self.min_iou)
+            for i, j in zip(rows.tolist(), cols.tolist()):
+                track = tracks[j]
+                track.box = batch.boxes[i].copy()
+                track.score = float(batch.scores[i])
+                track.hits += 1
+                track.missed = 0
+                track.last_seen = timestamp
+                matched[i] = track
+
+        live = {id(t) for t in matched if t is not None}
+        survivors = []
+        for track in tracks:
+            if id(track) not in live:
+                track.missed += 1
+                if track.missed > self.max_missed:
+                    continue
+            survivors.append(track)
+        for i in range(count):
+            if matched[i] is None:
+                track = Track(next(self._ids), int(batch.class_ids[i]), batch.boxes[i].copy(),
+                              float(batch.scores[i]), timestamp)
+                matched[i] = track
+                survivors.append(track)
+        self.tracks = survivors
+        return matched
+
+    def needs_mapping(self, tracks: List[Track]):
+        """需要重新查询 3D 坐标的轨迹掩码：新轨迹、框移动（与上次查询时 IoU 低于 static_iou）
+        或距上次查询已超过 remap_interval 帧"""
+        need = np.ones(len(tracks), dtype=bool)
+        for i, track in enumerate(tracks):
+            if track.mapped_box is None or track.since_mapped >= self.remap_interval:
+                continue
+            iou = box_iou(track.box[None, :], track.mapped_box[None, :])[0, 0]
+            need[i] = iou < self.static_iou
+        return need
+
+    def set_measurement(self, track: Track, coords):
+        """记录一次 3D 查询结果（无效深度时为 None）"""
+        track.measurement = coords
+        track.mapped_box = track.box.copy()
+        track.since_mapped = 0
+        self.mapped += 1
+
+    def smooth(self, track: Track, timestamp):
+        """返回轨迹平滑后的 coordinates_3d 字典（没有有效 3D 坐标时为 None）
+
+        本帧重新查询过的轨迹用查询结果更新卡尔曼滤波；未重新查询的轨迹框未移动，
+        目标视为静止，直接沿用滤波器当前位置。
+        """
+        fresh = track.since_mapped == 0
+        if track.mapped_box is not None and not fresh:
+            self.reused += 1
+        track.since_mapped += 1
+        coords = track.measurement
+        if coords is None:
+            return None
+        if fresh:
+            xyz = (coords['x'], coords['y'], coords['z'])
+            if track.kalman is None:
+                track.kalman = Kalman3D(xyz, self.measurement_std, self.acceleration_std)
+            else:
+                track.kalman.predict(timestamp - track.filtered_at)
+                track.kalman.update(xyz)
+            track.filtered_at = timestamp
+        elif track.kalman is None:
+            return coords
+        smoothed = dict(coords)
+        x, y, z = track.kalman.position.tolist()
+        smoothed.update(x=round(x, 1), y=round(y, 1), z=round(z, 1))
+        return smoothed
+
+    def annotate(self, detections, tracks: List[Track], timestamp):
+        """为检测字典补充跟踪信息：track_id、hits（累计匹配帧数）、age_s（出现时长）"""
+        for detection, track in zip(detections, tracks):
+            detection['track_id'] = track.track_id
+            detection['hits'] = track.hits
+            detection['age_s'] = round(timestamp - track.first_seen, 2)
+        return detections
+
+    def stats(self):
+        total = self.mapped + self.reused
+        return {
+            'tracks': len(self.tracks),
+            'mapped': self.mapped,
+            'reused': self.reused,
+            'reuse_ratio': round(self.reused / total, 3) if total else 0.0,
+        }
+
+
+def format_tracking_stats(stats):
+    """跟踪统计文本：轨迹数与 3D 查询复用比例"""
+    text = f"跟踪 {stats['tracks']} 个目标"
+    if stats['mapped']:
+        text += f" 3D 复用 {stats['reuse_ratio']:.0%}"
+    return text
@@ -0,0 +1,322 @@
+"""
+Oasis 目标检测系统 - 传感器帧可视化
+深度、红外、人体索引等传感器帧通过预计算的查找表（深度与红外 65536 项、人体索引 256 项）一次映射为 BGR 图像；
+深度与红外的显示范围由抽样直方图的指数滑动平均增量更新，不再每帧对全部像素求百分位数
+"""
+
+import cv2
+import numpy as np
+
+# 抽样步长与直方图分桶（毫米），用于估计显示范围
+RANGE_SAMPLE_STRIDE = 4
+RANGE_BIN_MM = 32
+# 红外强度直方图分桶
+INFRARED_BIN = 64
+
+# 红外显示模式
+INFRARED_MODES = ('fixed', 'auto', 'clahe')
+
+
+def sampled_histogram(image, bin_size, stride=RANGE_SAMPLE_STRIDE):
+    """每隔 stride 行列抽样的 uint16 图像直方图（bin_size 宽的分桶，共 65536 // bin_size 个）"""
+    sample = image[::stride, ::stride]
+    return np.bincount((sample // bin_size).ravel(), minlength=65536 // bin_size)
+
+
+def histogram_range(hist, first, last, q_low, q_high):
+    """直方图 [first, last) 分桶内的 q_low/q_high 分位数所在的分桶 (low, high)，没有样本时返回 None"""
+    hist = hist[first:last]
+    total = int(hist.sum())
+    if total == 0:
+        return None
+    cdf = np.cumsum(hist)
+    return (first + int(np.searchsorted(cdf, total * q_low)),
+            first + int(np.searchsorted(cdf, total * q_high)))
+
+
+class PackedLookup:
+    """索引图像 -> BGR 的查找表映射
+
+    (N, 3) BGR 表打包为 uint32 表（按字节查看即为 BGRA），一次 np.take 完成映射，
+    再去掉 alpha 通道写入输出；索引、打包结果与输出缓冲区跨帧复用。
+    """
+
+    def __init__(self, bgr=None):
+        self.table = None
+        self._packed = None
+        self.index = None
+        self._packed_out = None
+        self._out = None
+        if bgr is not None:
+            self.set_table(bgr)
+
+    def set_table(self, bgr):
+        table = np.zeros((len(bgr), 4), dtype=np.uint8)
+        table[:, :3] = bgr
+        self.table = bgr
+        self._packed = table.view(np.uint32).ravel()
+
+    def apply(self, image, out=None):
+        """未提供 out 时写入内部复用的缓冲区，结果在下一次调用前有效；
+        调用后 self.index 为本帧的 intp 索引，可直接用于统计"""
+        height, width = image.shape
+        if self._packed_out is None or self._packed_out.shape != (height, width):
+            self.index = np.empty((height, width), dtype=np.intp)
+            self._packed_out = np.empty((height, width), dtype=np.uint32)
+            self._out = np.empty((height, width, 3), dtype=np.uint8)
+        if out is None:
+            out = self._out
+
+        # 索引先转换到预分配的 intp 缓冲区，整数图像不会越过表长，mode='clip' 使 np.take
+        # 直接写入 out，两者都避免 numpy 每帧分配临时数组
+        np.copyto(self.index, image, casting='unsafe')
+        packed = np.take(self._packed, self.index, out=self._packed_out, mode='clip')
+        return cv2.cvtColor(packed.view(np.uint8).reshape(height, width, 4), cv2.COLOR_BGRA2BGR, dst=out)
+
+
+class DepthColorizer:
+    """深度帧伪彩色映射
+
+    显示范围限制在深度模式的量程内（config_manager.get_kinect_depth_range），
+    adaptive 时由第一帧抽样直方图的 5%/95% 分位数初始化，之后以指数滑动平均跟踪，
+    非 adaptive 时固定为整个量程。范围变化超过 rebuild_mm 时才重建查找表；
+    无效深度（0）与超出模式量程的值显示为黑色。
+    """
+
+    def __init__(self, depth_range=(500, 4500), adaptive=True, alpha=0.1,
+                 colormap=cv2.COLORMAP_JET, rebuild_mm=RANGE_BIN_MM):
+        self.limits = tuple(depth_range)
+        self.adaptive = adaptive
+        self.alpha = alpha
+        self.colormap = colormap
+        self.rebuild_mm = rebuild_mm
+        self.low, self.high = float(self.limits[0]), float(self.limits[1])
+        self._tracking = False
+        self._table_range = None
+        self._lookup = PackedLookup()
+        self.rebuilds = 0
+
+    def set_range(self, depth_range):
+        """切换深度模式时重新预设显示范围"""
+        self.limits = tuple(depth_range)
+        self.low, self.high = float(self.limits[0]), float(self.limits[1])
+        self._tracking = False
+        self._table_range = None
+
+    def _update_range(self, depth):
+        hist = sampled_histogram(depth, RANGE_BIN_MM)
+        lo_bin, hi_bin = (int(np.ceil(v / RANGE_BIN_MM)) for v in self.limits)
+        # 只统计模式量程内的有效深度
+        bins = histogram_range(hist, max(lo_bin, 1), hi_bin, 0.05, 0.95)
+        if bins is None:
+            return
+        low, high = bins[0] * RANGE_BIN_MM, (bins[1] + 1) * RANGE_BIN_MM
+        if not self._tracking:
+            # 第一帧直接采用场景范围，之后平滑跟踪
+            self.low, self.high = float(low), float(high)
+            self._tracking = True
+            return
+        self.low += self.alpha * (low - self.low)
+        self.high += self.alpha * (high - self.high)
+
+    def _build_table(self, low, high):
+        depth = np.arange(65536, dtype=np.float32)
+        scale = 255.0 / max(high - low, 1.0)
+        index = np.clip((depth - low) * scale, 0, 255).astype(np.uint8)
+        palette = cv2.applyColorMap(np.arange(256, dtype=np.uint8).reshape(-1, 1), self.colormap)
+        bgr = palette.reshape(256, 3)[index]
+        # 无效深度与模式量程外的深度显示为黑色
+        bgr[:max(int(self.limits[0]), 1)] = 0
+        bgr[int(self.limits[1]) + 1:] = 0
+        self._lookup.set_table(bgr)
+        self._table_range = (low, high)
+        self.rebuilds += 1
+
+    @property
+    def table(self):
+        """当前的 (65536, 3) BGR 查找表"""
+        return self._lookup.table
+
+    def colorize(self, depth, out=None):
+        """uint16 深度图 (H, W) -> BGR 图像 (H, W, 3)
+
+        未提供 out 时写入内部复用的缓冲区，结果在下一次调用前有效。
+        """
+        if self.adaptive:
+            self._update_range(depth)
+        current = self._table_range
+        if (current is None or abs(current[0] - self.low) > self.rebuild_mm
+                or abs(current[1] - self.high) > self.rebuild_mm):
+            self._build_table(self.low, self.high)
+
+        return self._lookup.apply(depth, out)
+
+
+class InfraredColorizer:
+    """红外帧灰度映射
+
+    三种模式的映射都折叠进 65536 项查找表，每帧只读一遍 uint16 数据查表，不产生浮点中间结果：
+      fixed  固定增益，强度 v 显示为 min(v * gain / 256, 255)，不随画面变化
+      auto   自动增益，抽样直方图 1%/99% 分位数的指数滑动平均作为显示范围，
+             范围变化超过 rebuild 时才重建查找表
+      clahe  限制对比度的直方图均衡，每 clahe_interval 帧由抽样直方图重新计算均衡曲线
+             （全局曲线，不分块，才能折叠进查找表）
+    强度为 0 的无效像素显示为黑色。
+    """
+
+    def __init__(self, mode='auto', gain=8.0, alpha=0.1, clip_limit=3.0,
+                 clahe_interval=10, rebuild=INFRARED_BIN):
+        self.alpha = alpha
+        self.clip_limit = clip_limit
+        self.clahe_interval = clahe_interval
+        self.rebuild = rebuild
+        self._lookup = PackedLookup()
+        self.rebuilds = 0
+        self.set_mode(mode, gain)
+
+    def set_mode(self, mode, gain=None):
+        """切换显示模式（与增益），下一帧重建查找表"""
+        if mode not in INFRARED_MODES:
+            raise ValueError(f"未知的红外显示模式: {mode}")
+        self.mode = mode
+        if gain is not None:
+            self.gain = float(gain)
+        self.low = self.high = None
+        self._table_key = None
+        self.frames = 0
+
+    def _gray_table(self, gray):
+        bgr = np.repeat(gray.astype(np.uint8)[:, None], 3, axis=1)
+        bgr[0] = 0
+        self._lookup.set_table(bgr)
+        self.rebuilds += 1
+
+    def _update_fixed(self):
+        if self._table_key != self.gain:
+            values = np.arange(65536, dtype=np.float32)
+            self._gray_table(np.minimum(values * (self.gain / 256.0), 255))
+            self._table_key = self.gain
+
+    def _update_auto(self, frame):
+        hist = sampled_histogram(frame, INFRARED_BIN)
+        bins = histogram_range(hist, 1, len(hist), 0.01, 0.99)
+        if bins is not None:
+            low, high = bins[0] * INFRARED_BIN, (bins[1] + 1) * INFRARED_BIN
+            if self.low is None:
+                # 第一帧直接采用画面范围，之后平滑跟踪
+                self.low, self.high = float(low), float(high)
+            else:
+                self.low += self.alpha * (low - self.low)
+                self.high += self.alpha * (high - self.high)
+        elif self.low is None:
+            self.low, self.high = 0.0, 65535.0
+
+        current = self._table_key
+        if (current is None or abs(current[0] - self.low) > self.rebuild
+                or abs(current[1] - self.high) > self.rebuild):
+            values = np.arange(65536, dtype=np.float32)
+            scale = 255.0 / max(self.high - self.low, 1.0)
+            self._gray_table(np.clip((values - self.low) * scale, 0, 255))
+            self._table_key = (self.low, self.high)
+
+    def _update_clahe(self, frame):
+        if self._table_key is not None and self.frames % self.clahe_interval:
+            return
+        hist = sampled_histogram(frame, INFRARED_BIN)
+        bins = histogram_range(hist, 1, len(hist), 0.005, 0.995)
+        if bins is None:
+            if self._table_key is None:
+                self._gray_table(np.zeros(65536, dtype=np.uint8))
+                self._table_key = self.frames
+            return
+        first, last = bins
+        counts = hist[first:last + 1].astype(np.float64)
+        # 超过限幅的计数均匀分配到范围内的各分桶，限制均衡后的对比度放大
+        limit = max(self.clip_limit * counts.sum() / len(counts), 1.0)
+        excess = np.maximum(counts - limit, 0).sum()
+        counts = np.minimum(counts, limit) + excess / len(counts)
+        cdf = np.cumsum(counts)
+        levels = np.concatenate(([0.0], cdf * (255.0 / cdf[-1])))
+        edges = np.arange(first, last + 2, dtype=np.float64) * INFRARED_BIN
+        self._gray_table(np.interp(np.arange(65536), edges, levels))
+        self.low, self.high = float(edges[0]), float(edges[-1])
+        self._table_key = self.frames
+
+    @property
+    def table(self):
+        """当前的 (65536, 3) BGR 查找表"""
+        return self._lookup.table
+
+    def colorize(self, frame, out=None):
+        """uint16 红外图 (H, W) -> BGR 图像 (H, W, 3)
+
+        未提供 out 时写入内部复用的缓冲区，结果在下一次调用前有效。
+        """
+        if self.mode == 'fixed':
+            self._update_fixed()
+        elif self.mode == 'auto':
+            self._update_auto(frame)
+        else:
+            self._update_clahe(frame)
+        self.frames += 1
+        return self._lookup.apply(frame, out)
+
+
+# Kinect v2 人体索引：0-5 为检测到的人体，255 为背景
+BODY_COUNT = 6
+BODY_BACKGROUND = 255
+BODY_COLORS = [
+    (255, 100, 100),   # 人体1 - 红色
+    (100, 255, 100),   # 人体2 - 绿色
+    (100, 100, 255),   # 人体3 - 蓝色
+    (255, 255, 100),   # 人体4 - 黄色
+    (255, 100, 255),   # 人体5 - 紫色
+    (100, 255, 255),   # 人体6 - 青色
+]
+BACKGROUND_COLOR = (50, 50, 50)  # 背景 - 深灰色
+
+
+class BodyIndexColorizer:
+    """人体索引帧调色板映射
+
+    256 项调色板一次查表得到彩色图像，同一份索引上一次 np.bincount 得到各人体的像素数，
+    结果保存在 stats 中（结构化的逐帧统计），不再逐帧输出到终端。
+    """
+
+    def __init__(self):
+        palette = np.zeros((256, 3), dtype=np.uint8)
+        palette[:BODY_COUNT] = BODY_COLORS
+        palette[BODY_BACKGROUND] = BACKGROUND_COLOR
+        self._lookup = PackedLookup(palette)
+        self.frames = 0
+        self.stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats():
+        return {'frame': 0, 'bodies': [], 'body_pixels': {}, 'coverage': 0.0}
+
+    @property
+    def palette(self):
+        return self._lookup.table
+
+    def colorize(self, body_index, out=None):
+        """uint8 人体索引 (H, W) -> BGR 图像 (H, W, 3)，同时更新 stats"""
+        result = self._lookup.apply(body_index, out)
+        counts = np.bincount(self._lookup.index.ravel(), minlength=256)[:BODY_COUNT]
+        self.frames += 1
+        bodies = np.flatnonzero(counts).tolist()
+        self.stats = {
+            'frame': self.frames,
+            'bodies': bodies,
+            'body_pixels': {i: int(counts[i]) for i in bodies},
+            'coverage': round(float(counts.sum()) / body_index.size, 4),
+        }
+        return result
+
+
+def format_body_stats(stats):
+    """人体索引统计文本"""
+    if not stats or not stats['bodies']:
+        return "人体 0"
+    pixels = " ".join(f"{i}:{n}" for i, n in stats['body_pixels'].items())
+    return f"人体 {len(stats['bodies'])} ({pixels}) 覆盖 {stats['coverage']:.1%}"